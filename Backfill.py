@@ -0,0 +1,82 @@
+"""
+Customer Support Response Evaluator - Sharded Backfill Entry Point
+
+Evaluates a large JSONL or CSV file of historical support responses across
+several worker processes. Tickets are sharded by a hash of their ID, each
+worker writes its shards' results as they complete, and the shards are
+merged into one output at the end. Progress is kept in a manifest next to
+the output, so a stopped backfill resumes when run again with the same
+arguments.
+
+Usage:
+    python Backfill.py tickets.jsonl results.jsonl [--workers N] [--concurrency N]
+"""
+
+import argparse
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Ensure OpenAI API key is set, unless the offline backend is configured
+from src.utils.helpers import load_settings, require_api_key
+
+require_api_key()
+
+# Import after environment setup
+from src.batch.backfill import run_backfill
+
+
+def parse_args() -> argparse.Namespace:
+    settings = load_settings()
+    backfill_settings = settings.get('backfill', {})
+    parser = argparse.ArgumentParser(description="Evaluate support responses in shards across worker processes.")
+    parser.add_argument("input", help="Input tickets (.jsonl or .csv)")
+    parser.add_argument("output", help="Output EvaluationResult records (.jsonl or .csv)")
+    parser.add_argument("--errors", help="Output for failed tickets (default: <output>.errors.jsonl)")
+    parser.add_argument("--manifest", help="Progress manifest (default: <output>.manifest.sqlite3)")
+    parser.add_argument("--workers", type=int, default=backfill_settings.get('workers', 4),
+                        help="Number of worker processes")
+    parser.add_argument("--shards", type=int,
+                        help="Number of shards the input is partitioned into (default: --workers)")
+    parser.add_argument("--concurrency", type=int, default=backfill_settings.get('concurrency', 8),
+                        help="Maximum number of tickets evaluated at once per worker")
+    parser.add_argument("--report-interval", type=float,
+                        default=settings.get('batch', {}).get('report_interval', 5),
+                        help="Seconds between progress reports")
+    parser.add_argument("--id-field", default="ticket_id", help="Name of the ticket ID field")
+    parser.add_argument("--response-field", default="response", help="Name of the response text field")
+    parser.add_argument("--no-count", action="store_true",
+                        help="Skip the initial pass that counts tickets for the ETA")
+    parser.add_argument("--no-store", action="store_true",
+                        help="Do not add the results to the persistent result store")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    try:
+        stats = run_backfill(
+            args.input,
+            args.output,
+            workers=args.workers,
+            shards=args.shards,
+            concurrency=args.concurrency,
+            errors=args.errors,
+            manifest_path=args.manifest,
+            id_field=args.id_field,
+            response_field=args.response_field,
+            store=not args.no_store,
+            report_interval=args.report_interval,
+            count=not args.no_count
+        )
+    except KeyboardInterrupt:
+        print("Stopped. Run the same command again to resume the backfill.")
+        exit(130)
+
+    if stats['already_merged']:
+        print(f"This backfill already completed: {stats['done']} tickets in {args.output} ({stats['failed']} failed)")
+    else:
+        print(f"Evaluated {stats['evaluated']} tickets in {stats['elapsed']:.1f}s with {args.workers} workers "
+              f"({stats['llm_calls']:.0f} LLM calls)")
+        print(f"Merged {stats['done']} results into {args.output} ({stats['failed']} failed)")
@@ -0,0 +1,117 @@
+"""
+Customer Support Response Evaluator - Batch Evaluation Entry Point
+
+Evaluates a JSONL or CSV file of support responses headlessly and writes
+one EvaluationResult record per ticket as each evaluation completes.
+
+Usage:
+    python Batch.py tickets.jsonl results.jsonl [--concurrency N]
+"""
+
+import argparse
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Ensure OpenAI API key is set, unless the offline backend is configured
+from src.utils.helpers import load_settings, require_api_key
+
+require_api_key()
+
+# Import after environment setup
+from src.batch.io import ResultWriter, read_tickets, count_tickets
+from src.batch.runner import BatchProgress, run_batch, with_prescores
+from src.evaluator.checkpoint import get_checkpointer
+from src.evaluator.dedup import get_near_duplicate_index
+from src.evaluator.evaluator import feedback_stats
+from src.evaluator.instrumentation import get_metrics, start_metrics_server
+from src.evaluator.ratelimit import rate_limiter_stats
+from src.evaluator.store import get_result_store
+from src.utils.config import get_settings
+from src.constants import BATCH_ERROR_FIELDS
+
+
+def parse_args() -> argparse.Namespace:
+    batch_settings = load_settings().get('batch', {})
+    parser = argparse.ArgumentParser(description="Evaluate support responses in batch.")
+    parser.add_argument("input", help="Input tickets (.jsonl or .csv)")
+    parser.add_argument("output", help="Output EvaluationResult records (.jsonl or .csv)")
+    parser.add_argument("--errors", help="Output for failed tickets (default: <output>.errors.jsonl)")
+    parser.add_argument("--concurrency", type=int, default=batch_settings.get('concurrency', 8),
+                        help="Maximum number of tickets evaluated at once")
+    parser.add_argument("--report-interval", type=float, default=batch_settings.get('report_interval', 5),
+                        help="Seconds between progress reports")
+    parser.add_argument("--id-field", default="ticket_id", help="Name of the ticket ID field")
+    parser.add_argument("--response-field", default="response", help="Name of the response text field")
+    parser.add_argument("--no-count", action="store_true",
+                        help="Skip the initial pass that counts tickets for the ETA")
+    parser.add_argument("--metrics-port", type=int,
+                        default=load_settings().get('instrumentation', {}).get('metrics_port'),
+                        help="Serve Prometheus metrics at /metrics on this port while the batch runs")
+    parser.add_argument("--no-store", action="store_true",
+                        help="Do not add the results to the persistent result store")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    if args.metrics_port:
+        start_metrics_server(args.metrics_port)
+    total = None if args.no_count else count_tickets(args.input)
+    tickets = read_tickets(args.input, args.id_field, args.response_field)
+    prescore_settings = get_settings().prescore
+    if prescore_settings.enabled:
+        tickets = with_prescores(tickets, prescore_settings.batch_size)
+
+    store = None if args.no_store else get_result_store()
+
+    with ResultWriter(args.output) as writer, \
+            ResultWriter(args.errors or f"{args.output}.errors.jsonl", fields=BATCH_ERROR_FIELDS) as error_writer:
+        progress = run_batch(
+            tickets,
+            writer,
+            concurrency=args.concurrency,
+            error_writer=error_writer,
+            progress=BatchProgress(total),
+            report_interval=args.report_interval,
+            store=store
+        )
+
+    stats = progress.snapshot()
+    print(f"Evaluated {stats['completed']} tickets in {stats['elapsed']:.1f}s "
+          f"({stats['failed']} failed)")
+    saved = get_metrics().total('evaluator_llm_calls_saved_total', {'reason': 'prescore'})
+    if saved:
+        print(f"LLM calls saved by the local pre-scorer: {saved:.0f}")
+    coalesced = get_metrics().total('evaluator_llm_calls_saved_total', {'reason': 'coalesced'})
+    if coalesced:
+        print(f"LLM calls coalesced with an identical in-flight call: {coalesced:.0f}")
+    feedback = feedback_stats()
+    if feedback['templates']:
+        saved_latency = f", ~{feedback['latency_saved']:.1f}s of LLM feedback saved" \
+            if feedback['latency_saved'] is not None else ""
+        print(f"Feedback from templates: {feedback['templates']}/{feedback['tickets']} tickets "
+              f"({feedback['template_share']:.1%}){saved_latency}")
+    escalations = get_metrics().total('evaluator_llm_escalations_total')
+    if escalations:
+        print(f"Near-threshold ratings escalated to {load_settings()['llm']['escalation']['model']}: "
+              f"{escalations:.0f}")
+    for limiter in rate_limiter_stats():
+        if limiter['retries'] or limiter['throttled']:
+            print(f"Rate limiter {limiter['model']}: {limiter['retries']} retries, {limiter['failures']} failed calls, "
+                  f"{limiter['throttled']:.1f}s throttled, concurrency limit {limiter['concurrency_limit']:.1f}")
+    restored = get_metrics().total('evaluator_checkpoint_runs_total', {'outcome': 'restored'})
+    resumed = get_metrics().total('evaluator_checkpoint_runs_total', {'outcome': 'resumed'})
+    if restored or resumed:
+        print(f"Checkpoints: {restored:.0f} tickets already completed, {resumed:.0f} resumed part way "
+              f"({get_checkpointer().stats()['threads']} threads in {get_checkpointer().path})")
+    if store is not None:
+        store_stats = store.stats()
+        print(f"Stored {store_stats['written']} results in {store_stats['transactions']} transactions "
+              f"({store_stats['records']} in {store.path})")
+    index = get_near_duplicate_index()
+    if index is not None:
+        index_stats = index.stats()
+        print(f"Near-duplicate reuse: {index_stats['reuses']}/{index_stats['lookups']} tickets "
+              f"({index_stats['reuse_rate']:.1%}), {index_stats['entries']} indexed responses")
@@ -0,0 +1,66 @@
+"""
+Customer Support Response Evaluator - Bulk Export Entry Point
+
+Streams the stored EvaluationResult records into one CSV, JSONL, Parquet or
+ZIP-of-markdown-reports file, chosen by the output extension, without
+holding them all in memory. No LLM calls are made.
+
+Usage:
+    python Export.py results.csv [--band poor] [--since 2024-01-01] [--until 2024-02-01]
+    python Export.py reports.zip --band poor
+"""
+
+import argparse
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+from src.utils.helpers import load_settings
+from src.constants import SCORE_BANDS, EXPORT_FORMATS
+from src.batch.export import export_results
+from src.evaluator.store import close_result_store, get_result_store
+
+
+def parse_args() -> argparse.Namespace:
+    export_settings = load_settings().get('export', {})
+    parser = argparse.ArgumentParser(description="Export stored evaluation results.")
+    parser.add_argument("output", help="Output file (.csv, .jsonl, .parquet or .zip of markdown reports)")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="Output format (default: from the extension)")
+    parser.add_argument("--ticket-id", help="Only export this ticket")
+    parser.add_argument("--band", choices=SCORE_BANDS, help="Only export results in this effectiveness band")
+    parser.add_argument("--since", help="Only export results evaluated at or after this date or timestamp")
+    parser.add_argument("--until", help="Only export results evaluated before this date or timestamp")
+    parser.add_argument("--chunk-size", type=int, default=export_settings.get('chunk_size', 1000),
+                        help="Results read and written at a time")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    store = get_result_store()
+    if store is None:
+        print("ERROR: The result store is disabled in settings.yaml.")
+        exit(1)
+
+    try:
+        stats = export_results(
+            store,
+            args.output,
+            file_format=args.format,
+            chunk_size=args.chunk_size,
+            row_group_size=load_settings().get('export', {}).get('row_group_size', 10000),
+            ticket_id=args.ticket_id,
+            band=args.band,
+            since=args.since,
+            until=args.until
+        )
+    except (ValueError, ImportError) as e:
+        print(f"ERROR: {e}")
+        exit(1)
+    finally:
+        close_result_store()
+
+    rate = stats['exported'] / stats['elapsed'] if stats['elapsed'] else 0.0
+    print(f"Exported {stats['exported']} results to {args.output} ({stats['bytes'] / 1e6:.1f} MB) "
+          f"in {stats['elapsed']:.1f}s ({rate:.0f} results/s)")
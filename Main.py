@@ -5,16 +5,15 @@ This application evaluates customer support responses using LangGraph and LLM te
 to provide actionable feedback for support agents.
 """
 
-import os
 from dotenv import load_dotenv
 
 # Load environment variables
 load_dotenv()
 
-# Ensure OpenAI API key is set
-if not os.getenv('OPENAI_API_KEY'):
-    print("ERROR: No OpenAI API key found. Please set OPENAI_API_KEY in your .env file.")
-    exit(1)
+# Ensure OpenAI API key is set, unless the offline backend is configured
+from src.utils.helpers import require_api_key
+
+require_api_key()
 
 # Import after environment setup
 from src.ui.app import run_app
@@ -0,0 +1,70 @@
+"""
+Customer Support Response Evaluator - Re-scoring Entry Point
+
+Brings the stored EvaluationResult records up to date after the weights or
+thresholds in settings.yaml change. Effectiveness is recomputed locally;
+only the metric nodes a lowered threshold un-gates, and the feedback of
+the results they complete, are sent to the LLM.
+
+Usage:
+    python Rescore.py [--dry-run] [--band poor] [--since "2024-01-01 00:00:00"]
+"""
+
+import argparse
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Ensure OpenAI API key is set, unless the offline backend is configured
+from src.utils.helpers import load_settings, require_api_key
+from src.constants import SCORE_BANDS
+
+require_api_key()
+
+# Import after environment setup
+from src.evaluator.rescore import rescore_results
+from src.evaluator.store import close_result_store, get_result_store
+
+
+def parse_args() -> argparse.Namespace:
+    batch_settings = load_settings().get('batch', {})
+    parser = argparse.ArgumentParser(description="Re-score stored results with the current weights and thresholds.")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="Only report how many results would change and need the LLM")
+    parser.add_argument("--concurrency", type=int, default=batch_settings.get('concurrency', 8),
+                        help="Maximum number of results sent to the LLM at once")
+    parser.add_argument("--keep-feedback", action="store_true",
+                        help="Keep the feedback of results whose scores a raised threshold zeroed")
+    parser.add_argument("--ticket-id", help="Only re-score this ticket")
+    parser.add_argument("--band", choices=SCORE_BANDS, help="Only re-score results in this effectiveness band")
+    parser.add_argument("--since", help="Only re-score results evaluated at or after this timestamp")
+    parser.add_argument("--until", help="Only re-score results evaluated before this timestamp")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    store = get_result_store()
+    if store is None:
+        print("ERROR: The result store is disabled in settings.yaml.")
+        exit(1)
+
+    stats = rescore_results(
+        store,
+        concurrency=args.concurrency,
+        refresh_feedback=not args.keep_feedback,
+        dry_run=args.dry_run,
+        ticket_id=args.ticket_id,
+        band=args.band,
+        since=args.since,
+        until=args.until
+    )
+    close_result_store()
+
+    prefix = "Would update" if args.dry_run else "Updated"
+    print(f"Checked {stats['checked']} results. {prefix} {stats['updated']} locally "
+          f"({stats['gated']} newly gated), {stats['ungated']} need un-gated metric nodes.")
+    if not args.dry_run:
+        print(f"Ran {stats['metric_calls']} metric nodes and {stats['feedback_calls']} feedback nodes "
+              f"({stats['failed']} failed).")
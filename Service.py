@@ -0,0 +1,49 @@
+"""
+Customer Support Response Evaluator - HTTP Service Entry Point
+
+Serves the evaluator over HTTP for ticketing systems and other callers,
+with a bounded request queue, a worker pool and asynchronous jobs.
+
+Usage:
+    python Service.py [--host 127.0.0.1] [--port 8600]
+
+    curl -X POST localhost:8600/evaluate -d '{"ticket_id": "T-1", "response": "Hello, ..."}'
+"""
+
+import argparse
+from dotenv import load_dotenv
+
+# Load environment variables
+load_dotenv()
+
+# Ensure OpenAI API key is set, unless the offline backend is configured
+from src.utils.helpers import require_api_key
+
+require_api_key()
+
+# Import after environment setup
+from src.service.server import create_server
+
+
+def parse_args() -> argparse.Namespace:
+    parser = argparse.ArgumentParser(description="Serve the support response evaluator over HTTP.")
+    parser.add_argument("--host", help="Interface to bind (default: service.host)")
+    parser.add_argument("--port", type=int, help="Port to listen on (default: service.port)")
+    return parser.parse_args()
+
+
+if __name__ == "__main__":
+    args = parse_args()
+    server = create_server(args.host, args.port)
+    host, port = server.server_address[:2]
+    service = server.service
+    print(f"Serving on http://{host}:{port} with {service.workers} workers "
+          f"and a queue of {service.queue_size} tickets")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.shutdown()
+        server.server_close()
+        service.stop()
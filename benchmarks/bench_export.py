@@ -0,0 +1,137 @@
+"""
+Throughput and memory benchmark of the bulk result export.
+
+Fills a temporary result store with synthetic EvaluationResult records,
+then exports it in every format, each in a fresh process so its peak
+resident set size is its own. Reports results/sec, output size, and the
+process's RSS before the export next to its peak RSS. A last scenario loads every
+record into a list before writing the CSV, for comparison with the
+streaming export. Running several store sizes shows the streaming exports'
+memory staying flat as the store grows.
+
+Usage:
+    python -m benchmarks.bench_export [--tickets 20000,200000] [--chunk-size 1000]
+"""
+
+import os
+import csv
+import random
+import shutil
+import argparse
+import datetime
+import tempfile
+import multiprocessing
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List
+
+from benchmarks.bench_workflow import load_responses, peak_rss_mb as max_rss_mb, DEFAULT_FIXTURES
+from src.constants import BATCH_RESULT_FIELDS, EXPORT_FORMATS, SCORE_BANDS
+
+# Scenario that materialises every record before writing, as a single-download export would
+IN_MEMORY = "csv (list)"
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process's address space in MiB."""
+    try:
+        # Unlike ru_maxrss, VmHWM is not inherited from the parent of a spawned process
+        with open('/proc/self/status', 'r') as status_file:
+            for line in status_file:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    return max_rss_mb()
+
+
+def open_store(path: str):
+    """Open a result store at ``path`` with the configured thresholds."""
+    from src.evaluator.store import ResultStore
+    from src.utils.helpers import load_settings
+
+    thresholds = load_settings()['evaluation']['thresholds']
+    return ResultStore(path, thresholds['color'], thresholds, batch_size=5000)
+
+
+def fill_store(path: str, count: int, fixtures: str) -> None:
+    """Write ``count`` synthetic records, with random scores and timestamps over the past year."""
+    rng = random.Random(42)
+    store = open_store(path)
+    started = datetime.datetime(2024, 1, 1)
+    for index, response in enumerate(load_responses(fixtures, count)):
+        scores = [rng.random() for _ in range(4)]
+        timestamp = started + datetime.timedelta(seconds=index * 365 * 86400 // count)
+        store.add({
+            'ticket_id': f"T-{index}",
+            'response': response,
+            'clarity_score': scores[0],
+            'politeness_score': scores[1],
+            'professionalism_score': scores[2],
+            'resolution_score': scores[3],
+            'effectiveness_score': sum(scores) / 4,
+            'feedback': "Acknowledge the customer's issue and state the next step clearly. " * 3,
+            'timestamp': timestamp.strftime("%Y-%m-%d %H:%M:%S")
+        })
+    store.close()
+
+
+def run_scenario(path: str, output: str, scenario: str, chunk_size: int, filters: Dict[str, Any]) -> Dict[str, Any]:
+    """Export the store in one scenario; runs in its own process."""
+    from src.batch.export import export_results
+    from src.constants import EXPORT_FORMAT_PARQUET
+
+    if scenario == EXPORT_FORMAT_PARQUET:
+        # Keep the import of pyarrow out of the export's memory
+        import pyarrow.parquet  # noqa: F401
+    store = open_store(path)
+    baseline = peak_rss_mb()
+    if scenario == IN_MEMORY:
+        import time
+
+        started = time.perf_counter()
+        records = store.query(limit=-1, **filters)['results']
+        with open(output, 'w', newline='', encoding='utf-8') as output_file:
+            writer = csv.DictWriter(output_file, fieldnames=BATCH_RESULT_FIELDS)
+            writer.writeheader()
+            writer.writerows(records)
+        stats = {'exported': len(records), 'elapsed': time.perf_counter() - started,
+                 'bytes': os.path.getsize(output)}
+    else:
+        stats = export_results(store, output, file_format=scenario, chunk_size=chunk_size, **filters)
+    store.close()
+    return {**stats, 'baseline_mb': baseline, 'peak_mb': peak_rss_mb()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the streaming result export.")
+    parser.add_argument("--tickets", default="20000,200000", help="Comma-separated store sizes")
+    parser.add_argument("--chunk-size", type=int, default=1000, help="Results read and written at a time")
+    parser.add_argument("--band", choices=SCORE_BANDS, help="Only export results in this effectiveness band")
+    parser.add_argument("--since", help="Only export results evaluated at or after this date")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="JSONL file of response fixtures")
+    args = parser.parse_args()
+
+    filters = {'band': args.band, 'since': args.since}
+    scenarios: List[str] = [*EXPORT_FORMATS, IN_MEMORY]
+    directory = tempfile.mkdtemp(prefix='bench-export-')
+    try:
+        print(f"{'Results':>9}  {'Format':<12}{'exported':>10}{'results/s':>11}{'MB':>8}"
+              f"{'RSS before MB':>15}{'peak RSS MB':>13}")
+        for count in (int(value) for value in args.tickets.split(',')):
+            path = os.path.join(directory, f"results-{count}.sqlite3")
+            fill_store(path, count, args.fixtures)
+            for scenario in scenarios:
+                extension = 'csv' if scenario == IN_MEMORY else scenario
+                output = os.path.join(directory, f"export-{count}.{extension}")
+                with ProcessPoolExecutor(max_workers=1, mp_context=multiprocessing.get_context('spawn')) as pool:
+                    stats = pool.submit(run_scenario, path, output, scenario, args.chunk_size, filters).result()
+                os.remove(output)
+                rate = stats['exported'] / stats['elapsed'] if stats['elapsed'] else 0.0
+                print(f"{count:>9}  {scenario:<12}{stats['exported']:>10}{rate:>11.0f}"
+                      f"{stats['bytes'] / 1e6:>8.1f}{stats['baseline_mb']:>15.1f}{stats['peak_mb']:>13.1f}")
+    finally:
+        shutil.rmtree(directory)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,99 @@
+"""
+Benchmark of the template feedback fast path.
+
+Runs a batch of tickets on the offline backend once with the ``llm``
+feedback policy, where every ticket's feedback is written by the LLM, and
+once with the ``templates`` policy, where only the bands in ``llm_bands``
+are. Reports the share of tickets served by templates, the feedback
+latency per ticket, LLM calls per ticket, end-to-end tickets/sec and the
+total feedback latency saved.
+
+Usage:
+    python -m benchmarks.bench_feedback [--profile realistic] [--tickets 200] [--concurrency 16]
+                                        [--llm-bands average]
+"""
+
+import os
+import time
+import asyncio
+import argparse
+from typing import Any, Dict, List
+
+import yaml
+
+from benchmarks.bench_workflow import load_responses, write_benchmark_settings, DEFAULT_FIXTURES
+from src.constants import SETTINGS_PATH_ENV, FEEDBACK_POLICY_LLM, FEEDBACK_POLICY_TEMPLATES
+
+
+def write_scenario(path: str, policy: str, llm_bands: List[str]) -> None:
+    """Rewrite the benchmark settings with the feedback policy of one scenario."""
+    with open(path, 'r') as settings_file:
+        settings = yaml.safe_load(settings_file)
+    settings['feedback'] = {'policy': policy, 'llm_bands': llm_bands}
+    with open(path, 'w') as settings_file:
+        yaml.safe_dump(settings, settings_file)
+
+
+def run_scenario(responses: List[str], concurrency: int) -> Dict[str, Any]:
+    """Evaluate the responses on one event loop and collect the feedback figures."""
+    from src.evaluator.evaluator import feedback_stats
+    from src.evaluator.instrumentation import get_metrics
+    from src.evaluator.workflow import aevaluate_tickets
+
+    get_metrics().reset()
+    started = time.perf_counter()
+    results = asyncio.run(aevaluate_tickets(responses, concurrency=concurrency))
+    elapsed = time.perf_counter() - started
+    stats = feedback_stats()
+    count, seconds = get_metrics().summary('evaluator_feedback_seconds')
+    return {
+        **stats,
+        'failed': sum(1 for result in results if isinstance(result, Exception)),
+        'tickets_per_sec': len(responses) / elapsed,
+        'feedback_ms': seconds / count * 1000 if count else 0.0,
+        'feedback_seconds': seconds,
+        'calls_per_ticket': get_metrics().total('evaluator_llm_calls_total') / len(responses)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the template feedback fast path on the offline backend.")
+    parser.add_argument("--profile", default="realistic", help="Fake LLM profile from settings.yaml")
+    parser.add_argument("--tickets", type=int, default=200, help="Tickets per scenario")
+    parser.add_argument("--concurrency", type=int, default=16, help="Tickets evaluated at once")
+    parser.add_argument("--llm-bands", default="average",
+                        help="Comma-separated bands the LLM writes feedback for under the templates policy")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="JSONL file of response fixtures")
+    args = parser.parse_args()
+
+    settings_path = write_benchmark_settings(args.profile, {})
+    os.environ[SETTINGS_PATH_ENV] = settings_path
+    try:
+        from src.utils.config import get_config_store
+
+        llm_bands = [band for band in args.llm_bands.split(',') if band]
+        responses = load_responses(args.fixtures, args.tickets)
+
+        print(f"Profile: {args.profile}  tickets: {args.tickets}  concurrency: {args.concurrency}  "
+              f"LLM bands: {', '.join(llm_bands) or 'none'}")
+        print(f"{'Policy':<12}{'failed':>8}{'templates':>11}{'feedback ms':>13}{'calls/ticket':>14}"
+              f"{'tickets/s':>11}{'saved s':>9}")
+        baseline = None
+        for policy in (FEEDBACK_POLICY_LLM, FEEDBACK_POLICY_TEMPLATES):
+            write_scenario(settings_path, policy, llm_bands)
+            get_config_store().reload()
+            stats = run_scenario(responses, args.concurrency)
+            if baseline is None:
+                baseline = stats
+            # Measured against the LLM policy's feedback time, next to the running estimate
+            saved = baseline['feedback_seconds'] - stats['feedback_seconds']
+            print(f"{policy:<12}{stats['failed']:>8}{stats['template_share']:>11.1%}{stats['feedback_ms']:>13.1f}"
+                  f"{stats['calls_per_ticket']:>14.2f}{stats['tickets_per_sec']:>11.1f}{saved:>9.1f}")
+            if stats['latency_saved'] is not None and stats['templates']:
+                print(f"{'':<12}estimated saving from the LLM feedback latency: {stats['latency_saved']:.1f}s")
+    finally:
+        os.remove(settings_path)
+
+
+if __name__ == "__main__":
+    main()
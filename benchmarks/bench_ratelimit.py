@@ -0,0 +1,100 @@
+"""
+Benchmark of the LLM rate limiter against a rate-limited provider.
+
+Runs a batch of tickets on the offline backend's ``limited`` profile,
+which answers requests beyond its requests-per-minute limit with 429s,
+once without the rate limiter, once with only adaptive concurrency and
+retries, and once with the provider's limit configured as well. Reports
+tickets lost, tickets/sec, LLM calls/sec against the provider limit, and
+the retries and final concurrency limit of each run.
+
+Usage:
+    python -m benchmarks.bench_ratelimit [--profile limited] [--tickets 300] [--concurrency 32]
+"""
+
+import os
+import time
+import asyncio
+import argparse
+from typing import Any, Dict, List, Optional
+
+import yaml
+
+from benchmarks.bench_workflow import load_responses, write_benchmark_settings, DEFAULT_FIXTURES
+from src.constants import SETTINGS_PATH_ENV
+
+
+def write_scenario(path: str, enabled: bool, requests_per_minute: Optional[float], model: str) -> None:
+    """Rewrite the benchmark settings with the rate limiter options of one scenario."""
+    with open(path, 'r') as settings_file:
+        settings = yaml.safe_load(settings_file)
+    rate_settings = settings.setdefault('rate_limit', {})
+    rate_settings['enabled'] = enabled
+    rate_settings['models'] = {model: {'requests_per_minute': requests_per_minute}} if requests_per_minute else {}
+    rate_settings['seed'] = 0
+    with open(path, 'w') as settings_file:
+        yaml.safe_dump(settings, settings_file)
+
+
+def run_scenario(responses: List[str], concurrency: int) -> Dict[str, Any]:
+    """Evaluate the responses on one event loop and collect throughput and limiter figures."""
+    from src.evaluator.instrumentation import get_metrics
+    from src.evaluator.ratelimit import rate_limiter_stats
+    from src.evaluator.workflow import aevaluate_tickets
+
+    get_metrics().reset()
+    started = time.perf_counter()
+    results = asyncio.run(aevaluate_tickets(responses, concurrency=concurrency))
+    elapsed = time.perf_counter() - started
+    limiters = rate_limiter_stats()
+    calls = get_metrics().total('evaluator_llm_calls_total')
+    return {
+        'seconds': elapsed,
+        'failed': sum(1 for result in results if isinstance(result, Exception)),
+        'tickets_per_sec': len(responses) / elapsed,
+        'calls_per_minute': calls / elapsed * 60,
+        'retries': sum(limiter['retries'] for limiter in limiters),
+        'concurrency_limit': max((limiter['concurrency_limit'] for limiter in limiters), default=None)
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the LLM rate limiter on the offline backend.")
+    parser.add_argument("--profile", default="limited", help="Fake LLM profile from settings.yaml")
+    parser.add_argument("--tickets", type=int, default=300, help="Tickets per scenario")
+    parser.add_argument("--concurrency", type=int, default=32, help="Tickets evaluated at once")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="JSONL file of response fixtures")
+    args = parser.parse_args()
+
+    settings_path = write_benchmark_settings(args.profile, {})
+    os.environ[SETTINGS_PATH_ENV] = settings_path
+    try:
+        from src.evaluator.evaluator import _model_name, model_options
+        from src.utils.config import get_config_store
+
+        with open(settings_path, 'r') as settings_file:
+            settings = yaml.safe_load(settings_file)
+        rpm_limit = settings['llm']['fake']['profiles'][args.profile].get('rpm_limit')
+        model = _model_name(model_options())
+        responses = load_responses(args.fixtures, args.tickets)
+
+        print(f"Profile: {args.profile}  provider limit: {rpm_limit or 'none'} requests/min  "
+              f"tickets: {args.tickets}  concurrency: {args.concurrency}")
+        print(f"{'Scenario':<22}{'failed':>8}{'tickets/s':>11}{'calls/min':>11}{'retries':>9}{'limit':>8}")
+        for name, enabled, requests_per_minute in (("no limiter", False, None),
+                                                   ("adaptive", True, None),
+                                                   ("adaptive + bucket", True, rpm_limit)):
+            write_scenario(settings_path, enabled, requests_per_minute, model)
+            get_config_store().reload()
+            # Let the provider's allowance refill between scenarios
+            time.sleep(1.0)
+            stats = run_scenario(responses, args.concurrency)
+            limit = f"{stats['concurrency_limit']:.1f}" if stats['concurrency_limit'] is not None else "-"
+            print(f"{name:<22}{stats['failed']:>8}{stats['tickets_per_sec']:>11.1f}"
+                  f"{stats['calls_per_minute']:>11.0f}{stats['retries']:>9}{limit:>8}")
+    finally:
+        os.remove(settings_path)
+
+
+if __name__ == "__main__":
+    main()
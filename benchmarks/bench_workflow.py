@@ -0,0 +1,215 @@
+"""
+Latency and throughput benchmark for the evaluation workflow.
+
+Runs entirely against the offline fake LLM backend, so it measures our own
+overhead (graph execution, prompt formatting, parsing) on top of the
+profile's simulated provider latency. Reports per-node and end-to-end
+p50/p95/p99 latency, tickets/sec at several concurrency levels and peak
+memory, and saves the results as JSON for comparison between runs.
+
+Usage:
+    python -m benchmarks.bench_workflow [--profile default] [--concurrency 1,4,16,64]
+                                        [--baseline benchmarks/results/<previous>.json]
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import datetime
+import resource
+import tempfile
+import threading
+import statistics
+from typing import Any, Dict, List
+
+import yaml
+
+from src.constants import SETTINGS_PATH, SETTINGS_PATH_ENV, LLM_PROVIDER_FAKE
+
+DEFAULT_FIXTURES = "benchmarks/fixtures/responses.jsonl"
+RESULTS_DIR = "benchmarks/results"
+
+
+def percentiles(samples: List[float]) -> Dict[str, float]:
+    """Compute p50/p95/p99 of the samples, in milliseconds."""
+    if len(samples) < 2:
+        value = samples[0] * 1000 if samples else 0.0
+        return {'p50': value, 'p95': value, 'p99': value, 'count': len(samples)}
+    cuts = statistics.quantiles(samples, n=100, method='inclusive')
+    return {'p50': cuts[49] * 1000, 'p95': cuts[94] * 1000, 'p99': cuts[98] * 1000, 'count': len(samples)}
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process in MiB."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is reported in bytes on macOS and in KiB on Linux
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def write_benchmark_settings(profile: str, overrides: Dict[str, Any]) -> str:
+    """
+    Write a settings file that selects the fake backend and disables caching, checkpoints and rate limiting.
+
+    Args:
+        profile: The fake LLM profile
+        overrides: Extra ``evaluation`` settings (e.g. mode, scoring_engine)
+
+    Returns:
+        str: The path of the temporary settings file
+    """
+    with open(SETTINGS_PATH, 'r') as settings_file:
+        settings = yaml.safe_load(settings_file)
+    settings['llm']['provider'] = LLM_PROVIDER_FAKE
+    settings['llm']['fake']['profile'] = profile
+    settings.setdefault('cache', {})['enabled'] = False
+    settings.setdefault('rate_limit', {})['enabled'] = False
+    settings.setdefault('checkpoints', {})['enabled'] = False
+    settings['evaluation'].update(overrides)
+    handle, path = tempfile.mkstemp(suffix='.yaml', prefix='bench-settings-')
+    with os.fdopen(handle, 'w') as settings_file:
+        yaml.safe_dump(settings, settings_file)
+    return path
+
+
+def make_node_timer(nodes):
+    """Create a callback handler timing the outermost run of each graph node."""
+    from langchain_core.callbacks import BaseCallbackHandler
+
+    class NodeTimer(BaseCallbackHandler):
+        def __init__(self):
+            self.durations: Dict[str, List[float]] = {node: [] for node in nodes}
+            self._runs: Dict[Any, Any] = {}
+            self._lock = threading.Lock()
+
+        def on_chain_start(self, serialized, inputs, *, run_id, parent_run_id=None, metadata=None, **kwargs):
+            node = (metadata or {}).get('langgraph_node')
+            with self._lock:
+                if node in self.durations and kwargs.get('name') == node and parent_run_id not in self._runs:
+                    self._runs[run_id] = (node, time.perf_counter())
+
+        def on_chain_end(self, outputs, *, run_id, **kwargs):
+            with self._lock:
+                run = self._runs.pop(run_id, None)
+                if run is not None:
+                    self.durations[run[0]].append(time.perf_counter() - run[1])
+
+        on_chain_error = on_chain_end
+
+    return NodeTimer()
+
+
+def load_responses(path: str, count: int) -> List[str]:
+    """Load fixture responses, cycling and numbering them to reach ``count``."""
+    with open(path, 'r') as fixtures_file:
+        fixtures = [json.loads(line)['response'] for line in fixtures_file if line.strip()]
+    return [f"{fixtures[i % len(fixtures)]}\n\nRef #{i}" for i in range(count)]
+
+
+def run_benchmark(args: argparse.Namespace) -> Dict[str, Any]:
+    """Run the latency and throughput phases and collect the results."""
+    from src.evaluator.workflow import WORKFLOW_NODES, aevaluate_tickets, create_initial_state, get_workflow
+
+    app = get_workflow()
+    nodes = set(WORKFLOW_NODES) | {"score_rubric"}
+
+    # Latency: one ticket at a time so node timings are not skewed by contention
+    timer = make_node_timer(nodes)
+    end_to_end = []
+    for response in load_responses(args.fixtures, args.latency_samples):
+        started = time.perf_counter()
+        app.invoke(create_initial_state(response), config={'callbacks': [timer]})
+        end_to_end.append(time.perf_counter() - started)
+
+    # Throughput: many tickets on one event loop at each concurrency level
+    throughput = {}
+    responses = load_responses(args.fixtures, args.tickets)
+    for level in args.concurrency:
+        started = time.perf_counter()
+        results = asyncio.run(aevaluate_tickets(responses, concurrency=level))
+        elapsed = time.perf_counter() - started
+        errors = sum(1 for result in results if isinstance(result, Exception))
+        throughput[str(level)] = {
+            'tickets_per_sec': len(responses) / elapsed,
+            'seconds': elapsed,
+            'errors': errors,
+            'peak_rss_mb': peak_rss_mb()
+        }
+
+    return {
+        'timestamp': datetime.datetime.now().isoformat(timespec='seconds'),
+        'profile': args.profile,
+        'evaluation': args.overrides,
+        'tickets': args.tickets,
+        'latency_ms': {
+            'end_to_end': percentiles(end_to_end),
+            **{node: percentiles(samples) for node, samples in sorted(timer.durations.items()) if samples}
+        },
+        'throughput': throughput,
+        'peak_rss_mb': peak_rss_mb()
+    }
+
+
+def print_report(results: Dict[str, Any], baseline: Dict[str, Any] = None) -> None:
+    """Print the results, with the relative change against a baseline run if given."""
+    def delta(current: float, previous: float) -> str:
+        return f"{(current - previous) / previous:+.1%}" if previous else ""
+
+    print(f"Profile: {results['profile']}  evaluation: {results['evaluation'] or 'settings.yaml'}")
+    print(f"{'Latency (ms)':<26}{'p50':>10}{'p95':>10}{'p99':>10}")
+    for name, values in results['latency_ms'].items():
+        line = f"{name:<26}{values['p50']:>10.1f}{values['p95']:>10.1f}{values['p99']:>10.1f}"
+        if baseline and name in baseline['latency_ms']:
+            line += f"   p95 {delta(values['p95'], baseline['latency_ms'][name]['p95'])}"
+        print(line)
+
+    print(f"{'Concurrency':<26}{'tickets/s':>10}{'errors':>10}{'RSS MiB':>10}")
+    for level, values in results['throughput'].items():
+        line = f"{level:<26}{values['tickets_per_sec']:>10.1f}{values['errors']:>10}{values['peak_rss_mb']:>10.1f}"
+        if baseline and level in baseline['throughput']:
+            line += f"   {delta(values['tickets_per_sec'], baseline['throughput'][level]['tickets_per_sec'])}"
+        print(line)
+    print(f"Peak RSS: {results['peak_rss_mb']:.1f} MiB")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the evaluation workflow on the offline backend.")
+    parser.add_argument("--profile", default="default", help="Fake LLM profile from settings.yaml")
+    parser.add_argument("--mode", help="Override evaluation.mode (sequential/parallel)")
+    parser.add_argument("--engine", help="Override evaluation.scoring_engine (per_metric/fused)")
+    parser.add_argument("--tickets", type=int, default=200, help="Tickets per throughput level")
+    parser.add_argument("--latency-samples", type=int, default=50, help="Tickets for the latency phase")
+    parser.add_argument("--concurrency", default="1,4,16,64", help="Comma-separated concurrency levels")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="JSONL file of response fixtures")
+    parser.add_argument("--output", help="Result file (default: benchmarks/results/bench-<timestamp>.json)")
+    parser.add_argument("--baseline", help="Previous result file to compare against")
+    args = parser.parse_args()
+    args.concurrency = [int(level) for level in args.concurrency.split(',')]
+    args.overrides = {key: value for key, value in (('mode', args.mode), ('scoring_engine', args.engine)) if value}
+
+    settings_path = write_benchmark_settings(args.profile, args.overrides)
+    os.environ[SETTINGS_PATH_ENV] = settings_path
+    try:
+        results = run_benchmark(args)
+    finally:
+        os.remove(settings_path)
+
+    baseline = None
+    if args.baseline:
+        with open(args.baseline, 'r') as baseline_file:
+            baseline = json.load(baseline_file)
+    print_report(results, baseline)
+
+    output = args.output or os.path.join(
+        RESULTS_DIR, f"bench-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S')}.json"
+    )
+    os.makedirs(os.path.dirname(output) or '.', exist_ok=True)
+    with open(output, 'w') as output_file:
+        json.dump(results, output_file, indent=2)
+    print(f"Results saved to {output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,124 @@
+"""
+Comparison harness for the per-metric and fused scoring engines.
+
+Runs every fixture through both engines and reports how far the fused
+scores drift from the four-call scores, together with the tokens each
+engine spent.
+
+Usage:
+    python -m benchmarks.compare_engines [--fixtures PATH] [--output PATH]
+"""
+
+import copy
+import json
+import time
+import argparse
+from typing import Any, Dict, List
+
+from dotenv import load_dotenv
+
+from src.evaluator.llm import track_usage, total_tokens
+from src.evaluator.workflow import create_workflow, create_initial_state
+from src.utils.helpers import load_settings
+from src.constants import (
+    SCORING_ENGINE_PER_METRIC,
+    SCORING_ENGINE_FUSED,
+    METRIC_CLARITY,
+    METRIC_POLITENESS,
+    METRIC_PROFESSIONALISM,
+    METRIC_RESOLUTION,
+    METRIC_EFFECTIVENESS
+)
+
+DEFAULT_FIXTURES = "benchmarks/fixtures/responses.jsonl"
+SCORES = (METRIC_CLARITY, METRIC_POLITENESS, METRIC_PROFESSIONALISM, METRIC_RESOLUTION, METRIC_EFFECTIVENESS)
+
+
+def load_fixtures(path: str) -> List[Dict[str, Any]]:
+    """Load the fixture responses from a JSONL file."""
+    with open(path, 'r') as fixtures_file:
+        return [json.loads(line) for line in fixtures_file if line.strip()]
+
+
+def run_engine(engine: str, fixtures: List[Dict[str, Any]]) -> Dict[str, Any]:
+    """
+    Evaluate every fixture with the given scoring engine.
+
+    Args:
+        engine: The scoring engine name
+        fixtures: The fixture records
+
+    Returns:
+        Dict[str, Any]: Per-fixture scores, total tokens and elapsed time
+    """
+    settings = copy.deepcopy(load_settings())
+    settings['evaluation']['scoring_engine'] = engine
+    app = create_workflow(settings)
+
+    scores = []
+    started = time.perf_counter()
+    with track_usage() as usage:
+        for fixture in fixtures:
+            result = app.invoke(create_initial_state(fixture['response']))
+            scores.append({metric: result[metric] for metric in SCORES})
+    return {
+        'scores': scores,
+        'tokens': total_tokens(usage),
+        'seconds': time.perf_counter() - started
+    }
+
+
+def score_drift(baseline: List[Dict[str, float]], candidate: List[Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """
+    Compute the per-metric drift of the candidate scores from the baseline.
+
+    Args:
+        baseline: Scores from the reference engine
+        candidate: Scores from the engine under comparison
+
+    Returns:
+        Dict[str, Dict[str, float]]: Mean and max absolute difference, and mean signed bias, per metric
+    """
+    drift = {}
+    for metric in SCORES:
+        deltas = [c[metric] - b[metric] for b, c in zip(baseline, candidate)]
+        drift[metric] = {
+            'mean_abs': sum(abs(d) for d in deltas) / len(deltas),
+            'max_abs': max(abs(d) for d in deltas),
+            'bias': sum(deltas) / len(deltas)
+        }
+    return drift
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare fused and per-metric scoring engines.")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="JSONL file of {ticket_id, response} records")
+    parser.add_argument("--output", help="Optional path for the JSON comparison report")
+    args = parser.parse_args()
+
+    load_dotenv()
+    fixtures = load_fixtures(args.fixtures)
+    baseline = run_engine(SCORING_ENGINE_PER_METRIC, fixtures)
+    fused = run_engine(SCORING_ENGINE_FUSED, fixtures)
+    drift = score_drift(baseline['scores'], fused['scores'])
+
+    print(f"Fixtures: {len(fixtures)}")
+    print(f"{'Metric':<24}{'mean |d|':>10}{'max |d|':>10}{'bias':>10}")
+    for metric, values in drift.items():
+        print(f"{metric:<24}{values['mean_abs']:>10.3f}{values['max_abs']:>10.3f}{values['bias']:>+10.3f}")
+    print(f"Tokens: per_metric={baseline['tokens']} fused={fused['tokens']}")
+    print(f"Seconds: per_metric={baseline['seconds']:.2f} fused={fused['seconds']:.2f}")
+
+    if args.output:
+        report = {
+            'fixtures': [fixture.get('ticket_id') for fixture in fixtures],
+            'drift': drift,
+            SCORING_ENGINE_PER_METRIC: baseline,
+            SCORING_ENGINE_FUSED: fused
+        }
+        with open(args.output, 'w') as output_file:
+            json.dump(report, output_file, indent=2)
+
+
+if __name__ == "__main__":
+    main()
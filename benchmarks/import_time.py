@@ -0,0 +1,75 @@
+"""
+Import-time benchmark for the headless evaluation core.
+
+Each scenario runs in a fresh interpreter and is repeated several times;
+the report shows the median wall time and which heavy packages the
+scenario pulled in. The ``eager`` scenario reproduces the old behaviour of
+importing Streamlit, LangGraph and LangChain together with the core.
+
+Usage:
+    python -m benchmarks.import_time [--repeat N]
+"""
+
+import sys
+import json
+import argparse
+import statistics
+import subprocess
+
+HEAVY_MODULES = ("streamlit", "langgraph", "langchain_core", "langchain_openai", "openai")
+
+SCENARIOS = {
+    "core": "import src.evaluator.workflow",
+    "batch": "import src.batch.runner",
+    "core+compile": "import src.evaluator.workflow as w; w.create_workflow()",
+    "eager": "import streamlit, langgraph.graph, langchain_openai, src.evaluator.workflow",
+    "ui": "import src.ui.app",
+}
+
+_PROBE = """
+import sys, time, json
+started = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - started
+print(json.dumps({{"seconds": elapsed, "loaded": [m for m in {heavy!r} if m in sys.modules]}}))
+"""
+
+
+def measure(statement: str, repeat: int):
+    """
+    Time a statement in fresh interpreters.
+
+    Args:
+        statement: The Python statement to time
+        repeat: Number of fresh interpreters to run
+
+    Returns:
+        Tuple[float, list]: Median seconds and the heavy modules that were loaded
+    """
+    samples = []
+    loaded = []
+    for _ in range(repeat):
+        output = subprocess.run(
+            [sys.executable, "-c", _PROBE.format(statement=statement, heavy=HEAVY_MODULES)],
+            capture_output=True, text=True, check=True
+        ).stdout.strip().splitlines()[-1]
+        result = json.loads(output)
+        samples.append(result["seconds"])
+        loaded = result["loaded"]
+    return statistics.median(samples), loaded
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Measure headless import time of the evaluation core.")
+    parser.add_argument("--repeat", type=int, default=5, help="Fresh interpreters per scenario")
+    args = parser.parse_args()
+
+    results = {name: measure(statement, args.repeat) for name, statement in SCENARIOS.items()}
+    print(f"{'Scenario':<16}{'median s':>10}  heavy modules loaded")
+    for name, (seconds, loaded) in results.items():
+        print(f"{name:<16}{seconds:>10.3f}  {', '.join(loaded) or '-'}")
+    print(f"Headless speed-up over eager imports: {results['eager'][0] / results['core'][0]:.1f}x")
+
+
+if __name__ == "__main__":
+    main()
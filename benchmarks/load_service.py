@@ -0,0 +1,137 @@
+"""
+Load test for the evaluation HTTP service on the offline backend.
+
+Starts the service in-process on a free port with the fake LLM backend,
+then fires ``POST /evaluate`` requests from concurrent clients, which
+retry after the ``Retry-After`` delay of a 429, and finally runs one
+asynchronous job. Reports request
+latency percentiles, throughput, rejection rate and the mean dispatch
+batch size.
+
+Usage:
+    python -m benchmarks.load_service [--profile default] [--clients 32] [--requests 500]
+                                      [--workers 8] [--queue-size 64] [--job-tickets 200]
+"""
+
+import os
+import time
+import argparse
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List
+
+import httpx
+import yaml
+
+from benchmarks.bench_workflow import load_responses, percentiles, write_benchmark_settings, DEFAULT_FIXTURES
+from src.constants import SETTINGS_PATH_ENV
+
+
+def write_service_settings(args: argparse.Namespace) -> str:
+    """Write fake-backend settings with the service options under test."""
+    path = write_benchmark_settings(args.profile, {})
+    with open(path, 'r') as settings_file:
+        settings = yaml.safe_load(settings_file)
+    settings.setdefault('service', {}).update({'workers': args.workers, 'queue_size': args.queue_size})
+    settings.setdefault('results', {})['enabled'] = False
+    with open(path, 'w') as settings_file:
+        yaml.safe_dump(settings, settings_file)
+    return path
+
+
+def run_load(base_url: str, responses: List[str], clients: int) -> Dict[str, Any]:
+    """Send every response to ``POST /evaluate`` from ``clients`` concurrent connections, honouring 429s."""
+    latencies: List[float] = []
+    statuses: Dict[int, int] = {}
+    lock = threading.Lock()
+    local = threading.local()
+
+    def send(index: int) -> None:
+        client = getattr(local, 'client', None)
+        if client is None:
+            client = local.client = httpx.Client(base_url=base_url, timeout=300)
+        while True:
+            started = time.perf_counter()
+            reply = client.post('/evaluate', json={'ticket_id': f"LOAD-{index}", 'response': responses[index]})
+            elapsed = time.perf_counter() - started
+            with lock:
+                statuses[reply.status_code] = statuses.get(reply.status_code, 0) + 1
+                if reply.status_code == 200:
+                    latencies.append(elapsed)
+            if reply.status_code != 429:
+                return
+            time.sleep(float(reply.headers.get('Retry-After', 1)))
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=clients) as executor:
+        list(executor.map(send, range(len(responses))))
+    elapsed = time.perf_counter() - started
+    return {
+        'seconds': elapsed,
+        'evaluated_per_sec': statuses.get(200, 0) / elapsed,
+        'statuses': statuses,
+        'rejection_rate': statuses.get(429, 0) / sum(statuses.values()),
+        'latency_ms': percentiles(latencies)
+    }
+
+
+def run_job(base_url: str, responses: List[str]) -> Dict[str, Any]:
+    """Evaluate the responses as one asynchronous job and wait for it to finish."""
+    with httpx.Client(base_url=base_url, timeout=300) as client:
+        started = time.perf_counter()
+        reply = client.post('/jobs', json={'tickets': [
+            {'ticket_id': f"JOB-{index}", 'response': response} for index, response in enumerate(responses)
+        ]})
+        reply.raise_for_status()
+        status_url = reply.json()['status_url']
+        while True:
+            status = client.get(status_url).json()
+            if status['status'] == 'done':
+                break
+            time.sleep(0.2)
+    elapsed = time.perf_counter() - started
+    return {'seconds': elapsed, 'tickets_per_sec': len(responses) / elapsed, 'failed': status['failed']}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Load test the evaluation HTTP service on the offline backend.")
+    parser.add_argument("--profile", default="default", help="Fake LLM profile from settings.yaml")
+    parser.add_argument("--clients", type=int, default=32, help="Concurrent client connections")
+    parser.add_argument("--requests", type=int, default=500, help="Requests sent to POST /evaluate")
+    parser.add_argument("--workers", type=int, default=8, help="Service worker pool size")
+    parser.add_argument("--queue-size", type=int, default=64, help="Service request queue size")
+    parser.add_argument("--job-tickets", type=int, default=200, help="Tickets in the asynchronous job, 0 to skip")
+    parser.add_argument("--fixtures", default=DEFAULT_FIXTURES, help="JSONL file of response fixtures")
+    args = parser.parse_args()
+
+    settings_path = write_service_settings(args)
+    os.environ[SETTINGS_PATH_ENV] = settings_path
+    try:
+        from src.service.server import create_server
+
+        server = create_server('127.0.0.1', 0)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        try:
+            load = run_load(base_url, load_responses(args.fixtures, args.requests), args.clients)
+            job = run_job(base_url, load_responses(args.fixtures, args.job_tickets)) if args.job_tickets else None
+            stats = server.service.stats()
+        finally:
+            server.shutdown()
+            server.server_close()
+            server.service.stop()
+    finally:
+        os.remove(settings_path)
+
+    latency = load['latency_ms']
+    print(f"Profile: {args.profile}  clients: {args.clients}  workers: {args.workers}  queue: {args.queue_size}")
+    print(f"POST /evaluate: {load['evaluated_per_sec']:.1f} evaluated/s, "
+          f"429 rate {load['rejection_rate']:.1%}, statuses {load['statuses']}")
+    print(f"Latency (ms): p50 {latency['p50']:.1f}  p95 {latency['p95']:.1f}  p99 {latency['p99']:.1f}")
+    if job is not None:
+        print(f"Job of {args.job_tickets} tickets: {job['tickets_per_sec']:.1f} tickets/s ({job['failed']} failed)")
+    print(f"Mean dispatch batch size: {stats['mean_batch_size']:.2f}")
+
+
+if __name__ == "__main__":
+    main()
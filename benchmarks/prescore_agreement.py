@@ -0,0 +1,99 @@
+"""
+Agreement of the local pre-scorer with LLM scores.
+
+Re-scores the responses of a results file written by an LLM-scored run,
+such as ``python Batch.py`` with ``prescore.enabled: false``, with the
+pre-scorer and compares every metric it would have decided with the LLM's
+score: how many of the LLM-evaluated metrics it decides, how often it puts
+them on the same side of the threshold gate, and the mean absolute
+difference. Run it on a sample of real tickets before enabling the
+pre-scorer, and again after tuning its cutoffs.
+
+Usage:
+    python -m benchmarks.prescore_agreement results.jsonl [--min-agreement 0.95]
+"""
+
+import csv
+import json
+import argparse
+import dataclasses
+from typing import Any, Dict, Iterable, List
+
+import numpy as np
+
+from src.evaluator.preprocess import scoring_text
+from src.evaluator.prescore import PRESCORED_METRICS, prescore_batch
+from src.evaluator.rescore import inferred_evaluated
+from src.evaluator.store import SCORE_COLUMNS
+from src.utils.config import PrescoreSettings, get_settings
+
+
+def load_results(path: str) -> List[Dict[str, Any]]:
+    """Load EvaluationResult records from a JSONL or CSV results file."""
+    with open(path, 'r', newline='', encoding='utf-8') as results_file:
+        if path.endswith('.csv'):
+            return list(csv.DictReader(results_file))
+        return [json.loads(line) for line in results_file if line.strip()]
+
+
+def agreement(records: Iterable[Dict[str, Any]], prescore_settings: PrescoreSettings,
+              thresholds: Dict[str, float]) -> Dict[str, Dict[str, float]]:
+    """
+    Compare the pre-scorer's decisions with the LLM scores of the records.
+
+    Metrics the threshold gates kept the LLM from evaluating are left out.
+
+    Args:
+        records: EvaluationResult records scored by the LLM
+        prescore_settings: The pre-scorer settings to evaluate, used as if enabled
+        thresholds: The gating thresholds by metric name
+
+    Returns:
+        Dict[str, Dict[str, float]]: Per pre-scored metric, the LLM-evaluated and decided counts,
+        the share decided, the share of decisions on the LLM's side of the gate and the mean
+        absolute difference from the LLM score
+    """
+    records = list(records)
+    scores = np.array([[float(record[column]) for column in SCORE_COLUMNS] for record in records]).reshape(-1, 4)
+    evaluated = np.arange(len(SCORE_COLUMNS))[None, :] < inferred_evaluated(scores)[:, None]
+    decisions = prescore_batch([scoring_text(record['response']) for record in records],
+                               dataclasses.replace(prescore_settings, enabled=True))
+
+    report = {}
+    for metric in PRESCORED_METRICS:
+        column = SCORE_COLUMNS.index(metric)
+        threshold = thresholds[metric.replace('_score', '')]
+        pairs = [(decision[metric], scores[row, column]) for row, decision in enumerate(decisions)
+                 if evaluated[row, column] and metric in decision]
+        agreeing = sum(1 for local, llm in pairs if (local > threshold) == (llm > threshold))
+        total = int(evaluated[:, column].sum())
+        report[metric] = {
+            'evaluated': total,
+            'decided': len(pairs),
+            'coverage': len(pairs) / total if total else 0.0,
+            'gate_agreement': agreeing / len(pairs) if pairs else 1.0,
+            'mean_abs_diff': float(np.mean([abs(local - llm) for local, llm in pairs])) if pairs else 0.0
+        }
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare the local pre-scorer with LLM scores.")
+    parser.add_argument("results", help="JSONL or CSV results of a run with the pre-scorer disabled")
+    parser.add_argument("--min-agreement", type=float, default=None,
+                        help="Exit with status 1 if any metric's gate agreement is below this")
+    args = parser.parse_args()
+
+    settings = get_settings()
+    report = agreement(load_results(args.results), settings.prescore, settings.evaluation.thresholds)
+    print(f"{'Metric':<24}{'evaluated':>10}{'decided':>9}{'coverage':>10}{'gate agr.':>11}{'mean |diff|':>13}")
+    for metric, figures in report.items():
+        print(f"{metric:<24}{figures['evaluated']:>10}{figures['decided']:>9}{figures['coverage']:>10.1%}"
+              f"{figures['gate_agreement']:>11.1%}{figures['mean_abs_diff']:>13.3f}")
+    if args.min_agreement is not None and any(
+            figures['gate_agreement'] < args.min_agreement for figures in report.values()):
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
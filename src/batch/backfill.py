@@ -0,0 +1,536 @@
+"""
+Multi-process sharded backfill of support tickets.
+
+A single interpreter running the workflow becomes CPU-bound on prompt
+formatting, parsing and result serialisation long before the provider's
+rate limit. The backfill partitions the input by a hash of the ticket ID
+into shards evaluated by a pool of worker processes. Each worker compiles
+its workflow and creates its LLM clients once, and takes an equal share
+of the ``rate_limit`` budgets, so together the workers stay within them.
+
+Progress is kept in a SQLite manifest shared by the workers: every ticket
+written to a shard's output is recorded together with the output's new
+size. A stopped or crashed backfill is resumed by running it again with
+the same arguments: each shard's output is truncated back to the last
+recorded size and only the tickets not recorded as done are evaluated.
+Once every shard is done, the shard outputs are merged into one output.
+"""
+
+import io
+import os
+import csv
+import json
+import time
+import shutil
+import signal
+import hashlib
+import sqlite3
+import multiprocessing
+from dataclasses import dataclass
+from concurrent.futures import ProcessPoolExecutor, wait
+from typing import Any, Dict, Iterator, List, Optional
+
+from src.batch.io import ResultWriter, count_tickets, read_tickets
+from src.batch.runner import BatchProgress, run_batch, with_prescores
+from src.evaluator.checkpoint import thread_key
+from src.utils.config import get_settings
+from src.constants import BATCH_ERROR_FIELDS
+
+# Seconds a manifest write waits for another worker's transaction
+MANIFEST_TIMEOUT = 30.0
+
+SHARD_PENDING = "pending"
+SHARD_RUNNING = "running"
+SHARD_DONE = "done"
+TICKET_DONE = "done"
+TICKET_FAILED = "failed"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS backfill (
+    key TEXT PRIMARY KEY,
+    value TEXT NOT NULL
+);
+CREATE TABLE IF NOT EXISTS shards (
+    shard INTEGER PRIMARY KEY,
+    status TEXT NOT NULL,
+    output_size INTEGER NOT NULL DEFAULT 0,
+    errors_size INTEGER NOT NULL DEFAULT 0,
+    processed INTEGER NOT NULL DEFAULT 0,
+    errors INTEGER NOT NULL DEFAULT 0,
+    owner INTEGER
+);
+CREATE TABLE IF NOT EXISTS tickets (
+    ticket_key TEXT PRIMARY KEY,
+    shard INTEGER NOT NULL,
+    status TEXT NOT NULL
+);
+"""
+
+
+def shard_of(key: str, shards: int) -> int:
+    """
+    Assign a ticket to a shard by a stable hash of its key.
+
+    Args:
+        key: The ticket key, its ID or the hash of its response as in ``thread_key``
+        shards: The number of shards
+
+    Returns:
+        int: The shard number
+    """
+    return int.from_bytes(hashlib.sha256(key.encode('utf-8')).digest()[:8], 'big') % shards
+
+
+def _alive(pid: int) -> bool:
+    """Whether a process is still running."""
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def shard_path(path: str, shard: int) -> str:
+    """Get the path of a shard's part of an output file."""
+    root, extension = os.path.splitext(path)
+    return f"{root}.shard-{shard:04d}{extension}"
+
+
+class BackfillManifest:
+    """SQLite progress manifest shared by the backfill workers."""
+
+    def __init__(self, path: str):
+        """
+        Args:
+            path: The manifest database file
+        """
+        self.path = path
+        self._connection = sqlite3.connect(path, timeout=MANIFEST_TIMEOUT, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+    def start(self, run: Dict[str, Any]) -> None:
+        """
+        Record the backfill's arguments, or check that a resumed backfill was started with the same.
+
+        Args:
+            run: The input, output and shard count of the backfill
+
+        Raises:
+            ValueError: If the manifest belongs to a backfill with different arguments
+        """
+        encoded = json.dumps(run, sort_keys=True)
+        with self._transaction() as cursor:
+            cursor.execute("INSERT OR IGNORE INTO backfill (key, value) VALUES ('run', ?)", (encoded,))
+            cursor.execute("SELECT value FROM backfill WHERE key = 'run'")
+            recorded = cursor.fetchone()[0]
+            if recorded != encoded:
+                raise ValueError(f"The manifest {self.path} belongs to a backfill started with {recorded}; "
+                                 f"resume it with the same arguments or use another manifest")
+            cursor.executemany("INSERT OR IGNORE INTO shards (shard, status) VALUES (?, ?)",
+                               [(shard, SHARD_PENDING) for shard in range(run['shards'])])
+            cursor.execute("DELETE FROM backfill WHERE key = 'stop'")
+
+    def _transaction(self):
+        return _Transaction(self._connection)
+
+    def shard(self, shard: int) -> Dict[str, Any]:
+        """Get a shard's status and the sizes of its outputs."""
+        row = self._connection.execute(
+            "SELECT status, output_size, errors_size FROM shards WHERE shard = ?", (shard,)
+        ).fetchone()
+        return {'status': row[0], 'output_size': row[1], 'errors_size': row[2]}
+
+    def pending_shards(self) -> List[int]:
+        """Get the shards not done yet."""
+        rows = self._connection.execute("SELECT shard FROM shards WHERE status != ? ORDER BY shard", (SHARD_DONE,))
+        return [row[0] for row in rows]
+
+    def claim(self, shard: int, timeout: float = MANIFEST_TIMEOUT) -> Dict[str, Any]:
+        """
+        Claim a shard for this process.
+
+        A worker of a stopped backfill may still be finishing its in-flight
+        tickets, so a shard owned by a live process is waited for.
+
+        Args:
+            shard: The shard number
+            timeout: Seconds to wait for the previous owner to exit
+
+        Returns:
+            Dict[str, Any]: The shard's status and the sizes of its outputs
+
+        Raises:
+            RuntimeError: If the shard is still owned by another process after the timeout
+        """
+        deadline = time.monotonic() + timeout
+        while True:
+            with self._transaction() as cursor:
+                owner = cursor.execute("SELECT owner FROM shards WHERE shard = ?", (shard,)).fetchone()[0]
+                if owner is None or owner == os.getpid() or not _alive(owner):
+                    cursor.execute("UPDATE shards SET status = ?, owner = ? WHERE shard = ?",
+                                   (SHARD_RUNNING, os.getpid(), shard))
+                    return self.shard(shard)
+            if time.monotonic() >= deadline:
+                raise RuntimeError(f"Shard {shard} is still being evaluated by process {owner}")
+            time.sleep(0.5)
+
+    def finish(self, shard: int) -> None:
+        """Mark a shard as done and release it."""
+        with self._transaction() as cursor:
+            cursor.execute("UPDATE shards SET status = ?, owner = NULL WHERE shard = ?", (SHARD_DONE, shard))
+
+    def is_done(self, key: str) -> bool:
+        """Whether a ticket's result has already been written."""
+        row = self._connection.execute("SELECT status FROM tickets WHERE ticket_key = ?", (key,)).fetchone()
+        return row is not None and row[0] == TICKET_DONE
+
+    def status(self, key: str) -> Optional[str]:
+        """Get a ticket's status, None if it has not been evaluated."""
+        row = self._connection.execute("SELECT status FROM tickets WHERE ticket_key = ?", (key,)).fetchone()
+        return row[0] if row is not None else None
+
+    def record(self, shard: int, key: Optional[str], status: str, output_size: int, errors_size: int) -> None:
+        """
+        Record a ticket written to a shard's output or errors, with the new sizes of both.
+
+        Args:
+            shard: The shard number
+            key: The ticket key, None for a failed ticket without an ID
+            status: ``done`` or ``failed``
+            output_size: The size of the shard's output in bytes
+            errors_size: The size of the shard's errors output in bytes
+        """
+        with self._transaction() as cursor:
+            if key is not None:
+                cursor.execute("INSERT OR REPLACE INTO tickets (ticket_key, shard, status) VALUES (?, ?, ?)",
+                               (key, shard, status))
+            cursor.execute(
+                "UPDATE shards SET output_size = ?, errors_size = ?, processed = processed + 1, "
+                "errors = errors + ? WHERE shard = ?",
+                (output_size, errors_size, int(status == TICKET_FAILED), shard)
+            )
+
+    def progress(self) -> Dict[str, int]:
+        """
+        Get the tickets processed across all shards.
+
+        Returns:
+            Dict[str, int]: Tickets processed and failed, counting every attempt, and shards done
+        """
+        processed, errors, done = self._connection.execute(
+            "SELECT COALESCE(SUM(processed), 0), COALESCE(SUM(errors), 0), "
+            "COALESCE(SUM(status = ?), 0) FROM shards", (SHARD_DONE,)
+        ).fetchone()
+        return {'processed': processed, 'errors': errors, 'shards_done': done}
+
+    def totals(self) -> Dict[str, int]:
+        """
+        Get the final status of the tickets.
+
+        Returns:
+            Dict[str, int]: Tickets done and tickets whose last attempt failed
+        """
+        counts = dict(self._connection.execute("SELECT status, COUNT(*) FROM tickets GROUP BY status"))
+        return {'done': counts.get(TICKET_DONE, 0), 'failed': counts.get(TICKET_FAILED, 0)}
+
+    def request_stop(self) -> None:
+        """Ask the workers to stop reading tickets, once the ones in flight are written."""
+        with self._transaction() as cursor:
+            cursor.execute("INSERT OR REPLACE INTO backfill (key, value) VALUES ('stop', ?)", (str(time.time()),))
+
+    @property
+    def stop_requested(self) -> bool:
+        return self._connection.execute("SELECT 1 FROM backfill WHERE key = 'stop'").fetchone() is not None
+
+    @property
+    def merged(self) -> bool:
+        """Whether the shard outputs have been merged."""
+        return self._connection.execute("SELECT 1 FROM backfill WHERE key = 'merged'").fetchone() is not None
+
+    def set_merged(self) -> None:
+        """Record that the shard outputs have been merged."""
+        with self._transaction() as cursor:
+            cursor.execute("INSERT OR REPLACE INTO backfill (key, value) VALUES ('merged', ?)", (str(time.time()),))
+
+    def close(self) -> None:
+        self._connection.close()
+
+
+class _Transaction:
+    """An immediate transaction on an autocommit connection, so concurrent workers queue up for the lock."""
+
+    def __init__(self, connection: sqlite3.Connection):
+        self._connection = connection
+
+    def __enter__(self) -> sqlite3.Cursor:
+        self._cursor = self._connection.cursor()
+        self._cursor.execute("BEGIN IMMEDIATE")
+        return self._cursor
+
+    def __exit__(self, exc_type, exc, traceback):
+        self._cursor.execute("ROLLBACK" if exc_type is not None else "COMMIT")
+        self._cursor.close()
+
+
+class _RecordingWriter:
+    """Writes a shard's results or errors and records each one in the manifest."""
+
+    def __init__(self, manifest: BackfillManifest, shard: int, writer: ResultWriter,
+                 error_writer: ResultWriter, status: str):
+        self._manifest = manifest
+        self._shard = shard
+        self._writer = writer
+        self._error_writer = error_writer
+        self._status = status
+
+    def write(self, record: Dict[str, Any]) -> None:
+        if self._status == TICKET_DONE:
+            self._writer.write(record)
+            key = thread_key(record['response'], record['ticket_id'])
+        else:
+            self._error_writer.write(record)
+            key = str(record['ticket_id']) if record['ticket_id'] else None
+        self._manifest.record(self._shard, key, self._status, self._writer.tell(), self._error_writer.tell())
+
+
+@dataclass(frozen=True)
+class ShardJob:
+    """The work of one backfill shard, sent to a worker process."""
+    shard: int
+    shards: int
+    input: str
+    output: str
+    errors: str
+    manifest: str
+    id_field: str
+    response_field: str
+    concurrency: int
+    store: bool
+    report_interval: float
+
+
+def _truncate(path: str, size: int) -> None:
+    """Cut a shard output back to the size last recorded in the manifest."""
+    if os.path.exists(path) and os.path.getsize(path) > size:
+        with open(path, 'r+b') as output_file:
+            output_file.truncate(size)
+
+
+def _init_worker(share: float) -> None:
+    """Give a worker process its share of the rate budgets, and warm its workflow and LLM clients."""
+    from src.evaluator.evaluator import get_llm
+    from src.evaluator.ratelimit import set_rate_share
+    from src.evaluator.workflow import get_workflow
+    from src.utils.config import get_app_config
+
+    # Interrupts are handled by the parent, which stops the workers through the manifest
+    signal.signal(signal.SIGINT, signal.SIG_IGN)
+    set_rate_share(share)
+    get_workflow()
+    for prompt_name in get_app_config().templates:
+        get_llm(prompt_name)
+
+
+def run_shard(job: ShardJob) -> Dict[str, Any]:
+    """
+    Evaluate the tickets of one shard not yet done, in a worker process.
+
+    Args:
+        job: The shard to evaluate
+
+    Returns:
+        Dict[str, Any]: The shard's progress figures and LLM calls
+    """
+    from src.evaluator.instrumentation import get_metrics
+    from src.evaluator.store import get_result_store
+
+    manifest = BackfillManifest(job.manifest)
+    try:
+        shard = manifest.claim(job.shard)
+        _truncate(job.output, shard['output_size'])
+        _truncate(job.errors, shard['errors_size'])
+        parent = os.getppid()
+
+        def pending() -> Iterator[Dict[str, Any]]:
+            for ticket in read_tickets(job.input, job.id_field, job.response_field):
+                key = thread_key(ticket['response'], ticket['ticket_id'])
+                if shard_of(key, job.shards) == job.shard and not manifest.is_done(key):
+                    yield ticket
+
+        def until_stopped(tickets: Iterator[Dict[str, Any]]) -> Iterator[Dict[str, Any]]:
+            for ticket in tickets:
+                if os.getppid() != parent or manifest.stop_requested:
+                    # The backfill was stopped; finish the tickets in flight and leave the rest for a resume
+                    return
+                yield ticket
+
+        tickets = pending()
+        prescore_settings = get_settings().prescore
+        if prescore_settings.enabled:
+            tickets = with_prescores(tickets, prescore_settings.batch_size)
+        tickets = until_stopped(tickets)
+
+        calls = get_metrics().total('evaluator_llm_calls_total')
+        with ResultWriter(job.output, append=True) as writer, \
+                ResultWriter(job.errors, fields=BATCH_ERROR_FIELDS, append=True) as error_writer:
+            progress = run_batch(
+                tickets,
+                _RecordingWriter(manifest, job.shard, writer, error_writer, TICKET_DONE),
+                concurrency=job.concurrency,
+                error_writer=_RecordingWriter(manifest, job.shard, writer, error_writer, TICKET_FAILED),
+                # The parent process reports the progress of all shards from the manifest
+                progress=BatchProgress(stream=io.StringIO()),
+                report_interval=job.report_interval,
+                store=get_result_store() if job.store else None
+            )
+        if os.getppid() == parent and not manifest.stop_requested:
+            manifest.finish(job.shard)
+        return {**progress.snapshot(), 'llm_calls': get_metrics().total('evaluator_llm_calls_total') - calls}
+    finally:
+        manifest.close()
+
+
+def merge_outputs(paths: List[str], output: str) -> None:
+    """
+    Concatenate shard outputs into one file, keeping only the first CSV header.
+
+    Args:
+        paths: The shard outputs, in shard order
+        output: The merged output file
+    """
+    header_written = False
+    with open(output, 'wb') as merged:
+        for path in paths:
+            if not os.path.exists(path) or not os.path.getsize(path):
+                continue
+            with open(path, 'rb') as shard_file:
+                if output.lower().endswith('.csv'):
+                    header = shard_file.readline()
+                    if not header_written:
+                        merged.write(header)
+                        header_written = True
+                shutil.copyfileobj(shard_file, merged)
+
+
+def merge_errors(paths: List[str], output: str, manifest: BackfillManifest) -> int:
+    """
+    Merge the shard error outputs, keeping one record per ticket whose last attempt failed.
+
+    Args:
+        paths: The shard error outputs, in shard order
+        output: The merged errors file
+        manifest: The backfill manifest
+
+    Returns:
+        int: The number of error records written
+    """
+    seen = set()
+    written = 0
+    with ResultWriter(output, fields=BATCH_ERROR_FIELDS) as writer:
+        for path in paths:
+            if not os.path.exists(path):
+                continue
+            with open(path, 'r', newline='', encoding='utf-8') as errors_file:
+                if path.lower().endswith('.csv'):
+                    records = csv.DictReader(errors_file)
+                else:
+                    records = (json.loads(line) for line in errors_file if line.strip())
+                for record in records:
+                    ticket_id = record.get('ticket_id')
+                    if ticket_id:
+                        if ticket_id in seen or manifest.status(str(ticket_id)) != TICKET_FAILED:
+                            continue
+                        seen.add(ticket_id)
+                    writer.write(record)
+                    written += 1
+    return written
+
+
+def run_backfill(input_path: str, output: str, workers: int = 4, shards: Optional[int] = None,
+                 concurrency: int = 8, errors: Optional[str] = None, manifest_path: Optional[str] = None,
+                 id_field: str = 'ticket_id', response_field: str = 'response', store: bool = True,
+                 report_interval: float = 5.0, count: bool = True) -> Dict[str, Any]:
+    """
+    Evaluate an input file in shards across worker processes and merge the results.
+
+    Running it again with the same arguments resumes a stopped backfill.
+
+    Args:
+        input_path: Input tickets (.jsonl or .csv)
+        output: Output EvaluationResult records (.jsonl or .csv)
+        workers: Number of worker processes, which split the rate budgets equally
+        shards: Number of shards the input is partitioned into, defaults to ``workers``
+        concurrency: Tickets evaluated at once per worker
+        errors: Output for failed tickets, defaults to ``<output>.errors.jsonl``
+        manifest_path: The progress manifest, defaults to ``<output>.manifest.sqlite3``
+        id_field: The name of the ticket ID field
+        response_field: The name of the response text field
+        store: Whether to add the results to the persistent result store
+        report_interval: Seconds between progress reports
+        count: Whether to count the input tickets for the ETA
+
+    Returns:
+        Dict[str, Any]: Tickets done and failed, tickets evaluated by this run, its elapsed time
+        and LLM calls, and whether the outputs were already merged by an earlier run
+    """
+    shards = shards or workers
+    errors = errors or f"{output}.errors.jsonl"
+    manifest = BackfillManifest(manifest_path or f"{output}.manifest.sqlite3")
+    try:
+        manifest.start({'input': os.path.abspath(input_path), 'output': os.path.abspath(output), 'shards': shards,
+                        'id_field': id_field, 'response_field': response_field})
+        if manifest.merged:
+            return {**manifest.totals(), 'evaluated': 0, 'elapsed': 0.0, 'llm_calls': 0, 'already_merged': True}
+
+        started = manifest.progress()
+        total = count_tickets(input_path) - manifest.totals()['done'] if count else None
+        progress = BatchProgress(total)
+        jobs = [
+            ShardJob(shard, shards, input_path, shard_path(output, shard), shard_path(errors, shard),
+                     manifest.path, id_field, response_field, concurrency, store, report_interval)
+            for shard in manifest.pending_shards()
+        ]
+        pool_size = max(1, min(workers, len(jobs)))
+        results = []
+        if jobs:
+            # Spawned workers start clean instead of inheriting the parent's clients and threads
+            with ProcessPoolExecutor(max_workers=pool_size, mp_context=multiprocessing.get_context('spawn'),
+                                     initializer=_init_worker, initargs=(1.0 / pool_size,)) as pool:
+                futures = [pool.submit(run_shard, job) for job in jobs]
+                pending = set(futures)
+                try:
+                    while pending:
+                        _, pending = wait(pending, timeout=report_interval)
+                        current = manifest.progress()
+                        progress.update(current['processed'] - started['processed'],
+                                        current['errors'] - started['errors'])
+                        progress.report()
+                except KeyboardInterrupt:
+                    # Let the workers write their tickets in flight, so the outputs and the manifest agree
+                    manifest.request_stop()
+                    wait(futures)
+                    raise
+                # A failed shard leaves the outputs unmerged, so the backfill can be resumed
+                results = [future.result() for future in futures]
+
+        merge_outputs([shard_path(output, shard) for shard in range(shards)], output)
+        merge_errors([shard_path(errors, shard) for shard in range(shards)], errors, manifest)
+        manifest.set_merged()
+        for shard in range(shards):
+            for path in (shard_path(output, shard), shard_path(errors, shard)):
+                if os.path.exists(path):
+                    os.remove(path)
+
+        return {
+            **manifest.totals(),
+            'evaluated': sum(result['completed'] for result in results),
+            'elapsed': progress.snapshot()['elapsed'],
+            'llm_calls': sum(result['llm_calls'] for result in results),
+            'already_merged': False
+        }
+    finally:
+        manifest.close()
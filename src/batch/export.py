@@ -0,0 +1,248 @@
+"""
+Streaming bulk export of stored evaluation results.
+
+Results are read from the result store one chunk at a time and written as
+CSV, JSONL, Parquet or a ZIP of markdown reports as they are read, so an
+export of any size holds at most one chunk of results, or one Parquet row
+group, in memory. The CSV and JSONL generators yield the export text chunk
+by chunk and can also be served directly by a streaming response.
+"""
+
+import io
+import os
+import csv
+import json
+import time
+import zipfile
+from typing import Any, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.evaluator.models import EvaluationResult
+from src.evaluator.store import ResultStore
+from src.utils.helpers import generate_report, report_file_name
+from src.constants import (
+    BATCH_RESULT_FIELDS,
+    EXPORT_FORMAT_CSV,
+    EXPORT_FORMAT_JSONL,
+    EXPORT_FORMAT_PARQUET,
+    EXPORT_FORMAT_ZIP,
+    EXPORT_FORMATS
+)
+
+_EXTENSIONS = {
+    '.csv': EXPORT_FORMAT_CSV,
+    '.jsonl': EXPORT_FORMAT_JSONL,
+    '.ndjson': EXPORT_FORMAT_JSONL,
+    '.parquet': EXPORT_FORMAT_PARQUET,
+    '.zip': EXPORT_FORMAT_ZIP
+}
+
+_SCORE_FIELDS = {'clarity_score', 'politeness_score', 'professionalism_score', 'resolution_score',
+                 'effectiveness_score'}
+
+
+def export_format(path: str) -> str:
+    """
+    Infer the export format from the output file extension.
+
+    Args:
+        path: The output file path
+
+    Returns:
+        str: One of ``EXPORT_FORMATS``
+
+    Raises:
+        ValueError: If the extension is not a supported format
+    """
+    extension = os.path.splitext(path)[1].lower()
+    if extension not in _EXTENSIONS:
+        raise ValueError(f"Unsupported export format '{extension}', expected one of "
+                         f"{', '.join(sorted(_EXTENSIONS))}")
+    return _EXTENSIONS[extension]
+
+
+def _chunks(records: Iterable[EvaluationResult], chunk_size: int) -> Iterator[List[EvaluationResult]]:
+    chunk: List[EvaluationResult] = []
+    for record in records:
+        chunk.append(record)
+        if len(chunk) >= chunk_size:
+            yield chunk
+            chunk = []
+    if chunk:
+        yield chunk
+
+
+def iter_csv(records: Iterable[EvaluationResult], chunk_size: int = 1000) -> Iterator[str]:
+    """
+    Render records as CSV, one chunk of rows at a time.
+
+    Args:
+        records: The EvaluationResult records
+        chunk_size: Number of rows rendered per yielded chunk
+
+    Yields:
+        str: The header, then the rows of each chunk
+    """
+    buffer = io.StringIO()
+    writer = csv.DictWriter(buffer, fieldnames=BATCH_RESULT_FIELDS, extrasaction='ignore')
+    writer.writeheader()
+    yield buffer.getvalue()
+    for chunk in _chunks(records, chunk_size):
+        buffer.seek(0)
+        buffer.truncate()
+        writer.writerows(chunk)
+        yield buffer.getvalue()
+
+
+def iter_jsonl(records: Iterable[EvaluationResult], chunk_size: int = 1000) -> Iterator[str]:
+    """
+    Render records as JSON lines, one chunk of lines at a time.
+
+    Args:
+        records: The EvaluationResult records
+        chunk_size: Number of lines rendered per yielded chunk
+
+    Yields:
+        str: The lines of each chunk
+    """
+    for chunk in _chunks(records, chunk_size):
+        yield ''.join(json.dumps({field: record.get(field) for field in BATCH_RESULT_FIELDS}) + '\n'
+                      for record in chunk)
+
+
+def iter_reports(records: Iterable[EvaluationResult]) -> Iterator[Tuple[str, str]]:
+    """
+    Render each record as a markdown report.
+
+    Reports are numbered so that repeated evaluations of a ticket get distinct file names.
+
+    Args:
+        records: The EvaluationResult records
+
+    Yields:
+        Tuple[str, str]: The report file name and its markdown content
+    """
+    for index, record in enumerate(records, 1):
+        name = f"{index:06d}_{report_file_name(record['ticket_id'], record['timestamp'])}"
+        yield name, generate_report(record, record['ticket_id'], record['response'])
+
+
+def _parquet_schema():
+    import pyarrow as pa
+
+    return pa.schema([
+        (field, pa.float64() if field in _SCORE_FIELDS else pa.string()) for field in BATCH_RESULT_FIELDS
+    ])
+
+
+def iter_parquet_batches(records: Iterable[EvaluationResult], chunk_size: int = 1000) -> Iterator[Any]:
+    """
+    Convert records into Arrow record batches, one chunk at a time.
+
+    Args:
+        records: The EvaluationResult records
+        chunk_size: Number of rows per record batch
+
+    Yields:
+        pyarrow.RecordBatch: The rows of each chunk, in the schema of ``BATCH_RESULT_FIELDS``
+    """
+    import pyarrow as pa
+
+    schema = _parquet_schema()
+    for chunk in _chunks(records, chunk_size):
+        yield pa.RecordBatch.from_pydict(
+            {field: [record.get(field) for record in chunk] for field in BATCH_RESULT_FIELDS}, schema=schema
+        )
+
+
+def _write_text(chunks: Iterator[str], path: str) -> None:
+    with open(path, 'w', newline='', encoding='utf-8') as output_file:
+        for chunk in chunks:
+            output_file.write(chunk)
+
+
+def _write_parquet(records: Iterable[EvaluationResult], path: str, chunk_size: int, row_group_size: int) -> None:
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise ImportError("Parquet export requires pyarrow; install it with "
+                          "'pip install -r requirements-parquet.txt'") from None
+
+    schema = _parquet_schema()
+    with pq.ParquetWriter(path, schema) as writer:
+        # Batches are held until they fill a row group, so row groups are not cut to chunk_size rows
+        pending: List[Any] = []
+        pending_rows = 0
+        for batch in iter_parquet_batches(records, chunk_size):
+            pending.append(batch)
+            pending_rows += batch.num_rows
+            if pending_rows >= row_group_size:
+                writer.write_table(pa.Table.from_batches(pending, schema=schema), row_group_size=row_group_size)
+                pending, pending_rows = [], 0
+        if pending:
+            writer.write_table(pa.Table.from_batches(pending, schema=schema), row_group_size=row_group_size)
+
+
+def _write_zip(records: Iterable[EvaluationResult], path: str) -> None:
+    # Reports are compressed into the archive one at a time; only the archive's central directory,
+    # about half a kilobyte per report, is kept until the end
+    with zipfile.ZipFile(path, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+        for name, report in iter_reports(records):
+            archive.writestr(name, report)
+
+
+class _Counter:
+    """Passes records through while counting them."""
+
+    def __init__(self, records: Iterable[EvaluationResult]):
+        self._records = records
+        self.count = 0
+
+    def __iter__(self) -> Iterator[EvaluationResult]:
+        for record in self._records:
+            self.count += 1
+            yield record
+
+
+def export_results(store: ResultStore, output: str, file_format: Optional[str] = None,
+                   chunk_size: int = 1000, row_group_size: int = 10000, **filters: Any) -> Dict[str, Any]:
+    """
+    Stream the stored results matching the filters into one export file, newest first.
+
+    Args:
+        store: The result store
+        output: The output file path
+        file_format: One of ``EXPORT_FORMATS``, inferred from the output extension by default
+        chunk_size: Number of results read from the store and rendered at a time
+        row_group_size: Number of rows per Parquet row group
+        **filters: ``ticket_id``, ``band``, ``since``, ``until``, ``min_score`` and ``max_score``,
+            as in ``ResultStore.query``
+
+    Returns:
+        Dict[str, Any]: ``exported``, the number of results written, ``elapsed`` seconds and the
+        output ``bytes``
+
+    Raises:
+        ValueError: If the format or the score band is unknown
+        ImportError: If a Parquet export is requested without pyarrow installed
+    """
+    if file_format is None:
+        file_format = export_format(output)
+    if file_format not in EXPORT_FORMATS:
+        raise ValueError(f"Unknown export format '{file_format}', expected one of {', '.join(EXPORT_FORMATS)}")
+
+    started = time.perf_counter()
+    records = _Counter(store.iter_results(chunk_size=chunk_size, **filters))
+    if file_format == EXPORT_FORMAT_CSV:
+        _write_text(iter_csv(records, chunk_size), output)
+    elif file_format == EXPORT_FORMAT_JSONL:
+        _write_text(iter_jsonl(records, chunk_size), output)
+    elif file_format == EXPORT_FORMAT_PARQUET:
+        _write_parquet(records, output, chunk_size, row_group_size)
+    else:
+        _write_zip(records, output)
+    return {
+        'exported': records.count,
+        'elapsed': time.perf_counter() - started,
+        'bytes': os.path.getsize(output)
+    }
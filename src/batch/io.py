@@ -0,0 +1,97 @@
+"""
+Streaming ticket readers and result writers for batch evaluation.
+"""
+
+import os
+import csv
+import json
+from typing import Any, Dict, Iterator, Optional
+
+from src.constants import BATCH_RESULT_FIELDS
+
+
+def _format(path: str) -> str:
+    """Infer the file format from the extension."""
+    extension = os.path.splitext(path)[1].lower()
+    if extension in ('.jsonl', '.ndjson'):
+        return 'jsonl'
+    if extension == '.csv':
+        return 'csv'
+    raise ValueError(f"Unsupported file format '{extension}', expected .jsonl or .csv")
+
+
+def read_tickets(path: str, id_field: str = 'ticket_id',
+                 response_field: str = 'response') -> Iterator[Dict[str, Any]]:
+    """
+    Stream tickets from a JSONL or CSV file one record at a time.
+
+    Args:
+        path: The input file path
+        id_field: The name of the ticket ID field
+        response_field: The name of the response text field
+
+    Yields:
+        Dict[str, Any]: Records with ``ticket_id`` and ``response`` keys
+    """
+    with open(path, 'r', newline='', encoding='utf-8') as input_file:
+        if _format(path) == 'jsonl':
+            records = (json.loads(line) for line in input_file if line.strip())
+        else:
+            records = csv.DictReader(input_file)
+        for record in records:
+            yield {'ticket_id': record.get(id_field), 'response': record.get(response_field) or ''}
+
+
+def count_tickets(path: str) -> int:
+    """
+    Count the tickets in an input file without holding them in memory.
+
+    Args:
+        path: The input file path
+
+    Returns:
+        int: The number of records
+    """
+    return sum(1 for _ in read_tickets(path))
+
+
+class ResultWriter:
+    """Incrementally writes EvaluationResult records to a JSONL or CSV file."""
+
+    def __init__(self, path: str, fields=BATCH_RESULT_FIELDS, flush_every: int = 1, append: bool = False):
+        self._format = _format(path)
+        self._fields = fields
+        self._flush_every = flush_every
+        self._pending = 0
+        self._file = open(path, 'a' if append else 'w', newline='', encoding='utf-8')
+        self._csv: Optional[csv.DictWriter] = None
+        if self._format == 'csv':
+            self._csv = csv.DictWriter(self._file, fieldnames=fields, extrasaction='ignore')
+            if not self._file.tell():
+                self._csv.writeheader()
+
+    def write(self, record: Dict[str, Any]) -> None:
+        """Append one record, flushing to disk every ``flush_every`` records."""
+        if self._csv is not None:
+            self._csv.writerow(record)
+        else:
+            self._file.write(json.dumps({field: record.get(field) for field in self._fields}) + '\n')
+        self._pending += 1
+        if self._pending >= self._flush_every:
+            self._file.flush()
+            self._pending = 0
+
+    def tell(self) -> int:
+        """Flush the records written so far and get the file size in bytes."""
+        self._file.flush()
+        self._pending = 0
+        return self._file.tell()
+
+    def close(self) -> None:
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
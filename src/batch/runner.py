@@ -0,0 +1,171 @@
+"""
+Bounded-concurrency batch evaluation of support tickets.
+"""
+
+import sys
+import time
+import threading
+from itertools import islice
+from concurrent.futures import FIRST_COMPLETED, Future, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, TextIO
+
+from src.batch.io import ResultWriter
+from src.evaluator.preprocess import scoring_text
+from src.evaluator.prescore import prescore_batch
+from src.evaluator.store import ResultStore
+from src.evaluator.workflow import run_evaluation
+from src.utils.helpers import to_evaluation_result
+
+
+class BatchProgress:
+    """Tracks throughput, ETA and error rate of a batch run."""
+
+    def __init__(self, total: Optional[int] = None, stream: TextIO = sys.stderr):
+        self.total = total
+        self.completed = 0
+        self.failed = 0
+        self._stream = stream
+        self._started = time.monotonic()
+        self._lock = threading.Lock()
+
+    def record(self, success: bool) -> None:
+        with self._lock:
+            self.completed += 1
+            if not success:
+                self.failed += 1
+
+    def update(self, completed: int, failed: int) -> None:
+        """Set the counts of tickets evaluated elsewhere, e.g. by worker processes."""
+        with self._lock:
+            self.completed = completed
+            self.failed = failed
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Get the current progress figures.
+
+        Returns:
+            Dict[str, Any]: Completed and failed counts, throughput, error rate and ETA
+        """
+        with self._lock:
+            elapsed = time.monotonic() - self._started
+            throughput = self.completed / elapsed if elapsed > 0 else 0.0
+            remaining = self.total - self.completed if self.total is not None else None
+            return {
+                'completed': self.completed,
+                'failed': self.failed,
+                'total': self.total,
+                'elapsed': elapsed,
+                'throughput': throughput,
+                'error_rate': self.failed / self.completed if self.completed else 0.0,
+                'eta': remaining / throughput if remaining is not None and throughput > 0 else None
+            }
+
+    def report(self) -> None:
+        """Print a single progress line."""
+        stats = self.snapshot()
+        total = f"/{stats['total']}" if stats['total'] is not None else ""
+        eta = f"{stats['eta']:.0f}s" if stats['eta'] is not None else "?"
+        print(
+            f"{stats['completed']}{total} tickets | {stats['throughput']:.2f} tickets/s | "
+            f"ETA {eta} | errors {stats['failed']} ({stats['error_rate']:.1%})",
+            file=self._stream,
+            flush=True
+        )
+
+
+def with_prescores(tickets: Iterable[Dict[str, Any]], batch_size: int = 256) -> Iterator[Dict[str, Any]]:
+    """
+    Run the local pre-scorer over chunks of tickets, attaching its decisions as ``prescores``.
+
+    Scoring a chunk at once keeps the feature computation vectorized, while
+    only ``batch_size`` tickets are held in memory.
+
+    Args:
+        tickets: Iterable of ``{ticket_id, response}`` records
+        batch_size: Number of tickets pre-scored together
+
+    Yields:
+        Dict[str, Any]: The tickets with their ``prescores``
+    """
+    tickets = iter(tickets)
+    while True:
+        chunk = list(islice(tickets, batch_size))
+        if not chunk:
+            return
+        decisions = prescore_batch([scoring_text(ticket['response']) for ticket in chunk])
+        for ticket, prescores in zip(chunk, decisions):
+            yield {**ticket, 'prescores': prescores}
+
+
+def _evaluate(ticket: Dict[str, Any]) -> Dict[str, Any]:
+    """Evaluate one ticket and convert the result into an EvaluationResult record."""
+    result = run_evaluation(ticket['response'], ticket['ticket_id'], ticket.get('prescores'))
+    return to_evaluation_result(result, ticket['ticket_id'], ticket['response'])
+
+
+def run_batch(tickets: Iterable[Dict[str, Any]], writer: ResultWriter, concurrency: int = 8,
+              error_writer: Optional[ResultWriter] = None, progress: Optional[BatchProgress] = None,
+              report_interval: float = 5.0, store: Optional[ResultStore] = None,
+              evaluate: Callable[[Dict[str, Any]], Dict[str, Any]] = _evaluate) -> BatchProgress:
+    """
+    Evaluate a stream of tickets with a bounded number in flight.
+
+    At most ``concurrency`` tickets are read ahead of the writer, so memory
+    stays flat regardless of the input size. Results are written as they
+    complete, which is not necessarily input order.
+
+    Args:
+        tickets: Iterable of ``{ticket_id, response}`` records
+        writer: Destination for EvaluationResult records
+        concurrency: Maximum number of tickets evaluated at once
+        error_writer: Optional destination for ``{ticket_id, error}`` records
+        progress: Progress tracker, created if not provided
+        report_interval: Seconds between progress reports
+        store: Optional result store also receiving the EvaluationResult records
+        evaluate: Function evaluating one ticket into a result record
+
+    Returns:
+        BatchProgress: The final progress figures
+    """
+    progress = progress or BatchProgress()
+    last_report = time.monotonic()
+
+    def maybe_report() -> None:
+        nonlocal last_report
+        if time.monotonic() - last_report >= report_interval:
+            progress.report()
+            last_report = time.monotonic()
+
+    def collect(done: Iterable[Future]) -> None:
+        for future in done:
+            ticket = futures.pop(future)
+            try:
+                record = future.result()
+                writer.write(record)
+                if store is not None:
+                    store.add(record)
+                progress.record(True)
+            except Exception as e:
+                progress.record(False)
+                if error_writer is not None:
+                    error_writer.write({'ticket_id': ticket['ticket_id'], 'error': str(e)})
+
+    futures: Dict[Future, Dict[str, Any]] = {}
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for ticket in tickets:
+            if len(futures) >= concurrency:
+                done, _ = wait(futures, return_when=FIRST_COMPLETED)
+                collect(done)
+            futures[executor.submit(evaluate, ticket)] = ticket
+            maybe_report()
+
+        while futures:
+            done, _ = wait(futures, timeout=report_interval, return_when=FIRST_COMPLETED)
+            collect(done)
+            maybe_report()
+
+    if store is not None:
+        store.flush()
+    progress.report()
+    return progress
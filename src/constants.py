@@ -7,9 +7,79 @@ CONFIG_DIR = "config"
 SETTINGS_PATH = f"{CONFIG_DIR}/settings.yaml"
 CONFIG_PATH = f"{CONFIG_DIR}/config.json"
 
+# Environment variables overriding the configuration file locations
+CONFIG_PATH_ENV = "EVALUATOR_CONFIG_PATH"
+SETTINGS_PATH_ENV = "EVALUATOR_SETTINGS_PATH"
+
+# Minimum number of seconds between checks for configuration file changes
+CONFIG_RELOAD_INTERVAL = 2.0
+
+# LLM providers
+LLM_PROVIDER_OPENAI = "openai"
+LLM_PROVIDER_FAKE = "fake"
+
+# Workflow modes
+WORKFLOW_MODE_SEQUENTIAL = "sequential"
+WORKFLOW_MODE_PARALLEL = "parallel"
+
+# Scoring engines
+SCORING_ENGINE_PER_METRIC = "per_metric"
+SCORING_ENGINE_FUSED = "fused"
+
 # Regular expressions
 RATING_PATTERN = r'Rating:\s*(\d+(\.\d+)?)'
 
+# Structured output schema for the fused rubric scoring call
+RUBRIC_FIELDS = ("clarity", "politeness", "professionalism", "resolution")
+RUBRIC_SCHEMA = {
+    "type": "object",
+    "properties": {
+        **{field: {"type": "number", "minimum": 0, "maximum": 1} for field in RUBRIC_FIELDS},
+        "explanation": {"type": "string"}
+    },
+    "required": [*RUBRIC_FIELDS, "explanation"],
+    "additionalProperties": False
+}
+RUBRIC_RESPONSE_FORMAT = {
+    "type": "json_schema",
+    "json_schema": {"name": "rubric_scores", "schema": RUBRIC_SCHEMA, "strict": True}
+}
+
+# Batch evaluation
+BATCH_RESULT_FIELDS = (
+    "ticket_id",
+    "response",
+    "clarity_score",
+    "politeness_score",
+    "professionalism_score",
+    "resolution_score",
+    "effectiveness_score",
+    "feedback",
+    "timestamp"
+)
+BATCH_ERROR_FIELDS = ("ticket_id", "error")
+
+# Effectiveness score bands, bounded by the color thresholds in settings.yaml
+SCORE_BAND_GOOD = "good"
+SCORE_BAND_AVERAGE = "average"
+SCORE_BAND_POOR = "poor"
+SCORE_BANDS = (SCORE_BAND_GOOD, SCORE_BAND_AVERAGE, SCORE_BAND_POOR)
+
+# Bulk export formats, by file extension
+EXPORT_FORMAT_CSV = "csv"
+EXPORT_FORMAT_JSONL = "jsonl"
+EXPORT_FORMAT_PARQUET = "parquet"
+EXPORT_FORMAT_ZIP = "zip"
+EXPORT_FORMATS = (EXPORT_FORMAT_CSV, EXPORT_FORMAT_JSONL, EXPORT_FORMAT_PARQUET, EXPORT_FORMAT_ZIP)
+
+# Feedback policies, and where a ticket's feedback came from
+FEEDBACK_POLICY_LLM = "llm"
+FEEDBACK_POLICY_TEMPLATES = "templates"
+FEEDBACK_SOURCE_LLM = "llm"
+FEEDBACK_SOURCE_TEMPLATE = "template"
+# Feedback template for tickets cut short by a failing threshold gate
+FEEDBACK_TEMPLATE_GATED = "gated"
+
 # UI labels
 APP_TITLE = "Customer Support Response Evaluator"
 FORM_TICKET_ID_LABEL = "Ticket ID"
@@ -21,12 +91,20 @@ FORM_CUSTOMER_QUERY_PLACEHOLDER = "Enter the original customer query for additio
 FORM_SAMPLE_RESPONSE_LABEL = "Use sample response"
 FORM_SUBMIT_LABEL = "Evaluate Response"
 FORM_DOWNLOAD_LABEL = "Download Report"
+FORM_DETAILED_FEEDBACK_LABEL = "Write detailed feedback"
 
 # UI section titles
 SECTION_FEEDBACK_TITLE = "Feedback"
 SECTION_SCORES_TITLE = "Scores"
 SECTION_EFFECTIVENESS_TITLE = "Overall Effectiveness"
 SECTION_METRICS_TITLE = "Individual Metrics"
+SECTION_HISTORY_TITLE = "Evaluation History"
+
+# UI history labels
+HISTORY_TICKET_FILTER_LABEL = "Filter by ticket ID"
+HISTORY_BAND_LABEL = "Effectiveness band"
+HISTORY_PAGE_LABEL = "Page (of {pages})"
+HISTORY_EMPTY = "No stored evaluations match these filters."
 
 # Metric names
 METRIC_EFFECTIVENESS = "effectiveness_score"
@@ -44,10 +122,27 @@ METRIC_FRIENDLY_NAMES = {
     METRIC_EFFECTIVENESS: "Overall Effectiveness"
 }
 
+# Progress bar labels shown as each workflow node finishes
+NODE_PROGRESS_LABELS = {
+    "preprocess_response": "Response cleaned",
+    "match_near_duplicate": "Checked for similar responses",
+    "evaluate_clarity": "Clarity scored",
+    "assess_politeness": "Politeness scored",
+    "examine_professionalism": "Professionalism scored",
+    "verify_resolution": "Resolution scored",
+    "score_rubric": "Rubric scored",
+    "compute_effectiveness": "Writing feedback...",
+    "generate_feedback": "Feedback ready"
+}
+
+# Minimum seconds between re-renders of the streamed feedback
+STREAM_RENDER_INTERVAL = 0.05
+
 # Error messages
 ERROR_NO_API_KEY = "No OpenAI API key found. Please set your OPENAI_API_KEY in the .env file."
 ERROR_EVALUATION = "An error occurred during evaluation: {}"
 ERROR_EXTRACT_RATING = "Could not extract rating from: {}"
+ERROR_PARSE_RUBRIC = "Could not parse rubric scores from: {}"
 
 # Success messages
 SUCCESS_EVALUATION = "Evaluation complete!"
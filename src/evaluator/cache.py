@@ -0,0 +1,265 @@
+"""
+Persistent, content-addressed cache of LLM outputs for the evaluator nodes.
+
+Entries are keyed by a hash of the normalized response text, the prompt
+template, any other prompt variables, the model name, the temperature and
+the token limit, so each metric node and the feedback node are cached
+separately and a changed prompt in ``config.json`` or a raised token limit
+never serves stale results.
+"""
+
+import os
+import re
+import json
+import atexit
+import time
+import sqlite3
+import hashlib
+import threading
+import unicodedata
+from typing import Any, Dict, List, Optional
+
+from src.utils.helpers import load_settings
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    prompt TEXT NOT NULL,
+    template_hash TEXT NOT NULL,
+    content TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_prompt ON llm_cache (prompt, template_hash);
+CREATE INDEX IF NOT EXISTS idx_llm_cache_last_used ON llm_cache (last_used_at);
+"""
+
+
+def normalize_response(text: str) -> str:
+    """
+    Normalize response text so trivially different copies share a cache entry.
+
+    Args:
+        text: The support response
+
+    Returns:
+        str: NFC-normalized text with whitespace collapsed
+    """
+    return re.sub(r'\s+', ' ', unicodedata.normalize('NFC', text)).strip()
+
+
+def _hash(text: str) -> str:
+    return hashlib.sha256(text.encode('utf-8')).hexdigest()
+
+
+class EvaluationCache:
+    """SQLite-backed LLM output cache with size and age based eviction."""
+
+    def __init__(self, path: str, max_entries: int = 100000, max_age_days: Optional[float] = 30,
+                 evict_every: int = 100):
+        """
+        Args:
+            path: The SQLite database file
+            max_entries: Maximum number of entries kept, least recently used are evicted first
+            max_age_days: Entries older than this are evicted, ``None`` to keep them forever
+            evict_every: Number of writes between eviction passes
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._max_entries = max_entries
+        self._max_age = max_age_days * 86400 if max_age_days is not None else None
+        self._evict_every = evict_every
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+        self._template_hashes: Dict[str, str] = {}
+        self._writes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self.invalidations = 0
+
+    def make_key(self, prompt: str, template: str, variables: Dict[str, Any],
+                 model: str, temperature: float, max_tokens: Optional[int] = None) -> str:
+        """
+        Build the cache key for one LLM call.
+
+        Args:
+            prompt: The prompt name (e.g. ``clarity``)
+            template: The prompt template text
+            variables: The prompt variables, including ``response``
+            model: The model name
+            temperature: The sampling temperature
+            max_tokens: The completion token limit, None for the model's limit
+
+        Returns:
+            str: Hex digest identifying the call
+        """
+        variables = dict(variables)
+        variables['response'] = normalize_response(variables.get('response', ''))
+        payload = {
+            'prompt': prompt,
+            'template': _hash(template),
+            'variables': variables,
+            'model': model,
+            'temperature': temperature,
+            'max_tokens': max_tokens
+        }
+        return _hash(json.dumps(payload, sort_keys=True, default=str))
+
+    def _check_template(self, prompt: str, template_hash: str) -> None:
+        """Purge entries produced by an older version of a prompt template."""
+        if self._template_hashes.get(prompt) == template_hash:
+            return
+        cursor = self._connection.execute(
+            "DELETE FROM llm_cache WHERE prompt = ? AND template_hash != ?",
+            (prompt, template_hash)
+        )
+        self.invalidations += cursor.rowcount
+        self._template_hashes[prompt] = template_hash
+
+    def get(self, key: str, prompt: str, template: str) -> Optional[str]:
+        """
+        Look up a cached LLM output.
+
+        Args:
+            key: The key from ``make_key``
+            prompt: The prompt name
+            template: The current prompt template text
+
+        Returns:
+            Optional[str]: The cached output, or None on a miss
+        """
+        now = time.time()
+        with self._lock:
+            self._check_template(prompt, _hash(template))
+            row = self._connection.execute(
+                "SELECT content, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row is None or (self._max_age is not None and now - row[1] > self._max_age):
+                self.misses += 1
+                return None
+            self._connection.execute("UPDATE llm_cache SET last_used_at = ? WHERE key = ?", (now, key))
+            self.hits += 1
+            return row[0]
+
+    def put(self, key: str, prompt: str, template: str, content: str) -> None:
+        """
+        Store an LLM output.
+
+        Args:
+            key: The key from ``make_key``
+            prompt: The prompt name
+            template: The prompt template text
+            content: The LLM output
+        """
+        now = time.time()
+        with self._lock:
+            self._connection.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, prompt, template_hash, content, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (key, prompt, _hash(template), content, now, now)
+            )
+            self._writes += 1
+            if self._writes % self._evict_every == 0:
+                self._evict(now)
+
+    def _evict(self, now: float) -> None:
+        """Delete expired entries, then the least recently used ones beyond ``max_entries``."""
+        if self._max_age is not None:
+            cursor = self._connection.execute(
+                "DELETE FROM llm_cache WHERE created_at < ?", (now - self._max_age,)
+            )
+            self.evictions += cursor.rowcount
+        count = self._connection.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+        if count > self._max_entries:
+            cursor = self._connection.execute(
+                "DELETE FROM llm_cache WHERE key IN "
+                "(SELECT key FROM llm_cache ORDER BY last_used_at LIMIT ?)",
+                (count - self._max_entries,)
+            )
+            self.evictions += cursor.rowcount
+
+    def evict(self) -> None:
+        """Run an eviction pass now."""
+        with self._lock:
+            self._evict(time.time())
+
+    def clear(self) -> None:
+        """Delete every cached entry."""
+        with self._lock:
+            self._connection.execute("DELETE FROM llm_cache")
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get cache statistics.
+
+        Returns:
+            Dict[str, Any]: Entry count, hits, misses, hit ratio, evictions and invalidations
+        """
+        with self._lock:
+            entries = self._connection.execute("SELECT COUNT(*) FROM llm_cache").fetchone()[0]
+            lookups = self.hits + self.misses
+            return {
+                'entries': entries,
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_ratio': self.hits / lookups if lookups else 0.0,
+                'evictions': self.evictions,
+                'invalidations': self.invalidations
+            }
+
+    def close(self) -> None:
+        with self._lock:
+            self._connection.close()
+
+
+_cache: Optional[EvaluationCache] = None
+_cache_settings: Optional[Dict[str, Any]] = None
+# Caches replaced on a settings reload; nodes may still hold them, so they are only closed at exit
+_retired_caches: List[EvaluationCache] = []
+_cache_lock = threading.Lock()
+
+
+def get_evaluation_cache() -> Optional[EvaluationCache]:
+    """
+    Get the process-wide evaluation cache configured in ``settings.yaml``.
+
+    Returns:
+        Optional[EvaluationCache]: The cache, or None if caching is disabled
+    """
+    global _cache, _cache_settings
+    cache_settings = load_settings().get('cache', {})
+    if not cache_settings.get('enabled', False):
+        return None
+    with _cache_lock:
+        if _cache is None or cache_settings != _cache_settings:
+            if _cache is not None:
+                _retired_caches.append(_cache)
+            _cache = EvaluationCache(
+                cache_settings['path'],
+                max_entries=cache_settings.get('max_entries', 100000),
+                max_age_days=cache_settings.get('max_age_days', 30)
+            )
+            _cache_settings = cache_settings
+        return _cache
+
+
+def close_evaluation_cache() -> None:
+    """Close the cache and any it replaced, if open."""
+    global _cache, _cache_settings
+    with _cache_lock:
+        for cache in _retired_caches:
+            cache.close()
+        _retired_caches.clear()
+        if _cache is not None:
+            _cache.close()
+        _cache = None
+        _cache_settings = None
+
+
+atexit.register(close_evaluation_cache)
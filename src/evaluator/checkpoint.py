@@ -0,0 +1,432 @@
+"""
+Durable checkpoints of the evaluation workflow, keyed by ticket ID.
+
+The compiled workflow saves its state after every node to a local SQLite
+database, with the ticket ID as the LangGraph thread ID, or a hash of the
+response for evaluations without one. When an evaluation fails part way,
+for instance on a feedback timeout after the four metric nodes, the next
+attempt for the same ticket resumes after the last node that completed.
+An evaluation that already completed is returned from its final
+checkpoint, so a batch restarted after a crash skips the tickets it
+finished. A checkpoint is only reused for the same response text and the
+same workflow settings.
+
+Concurrent runs for the same ticket, such as an upstream retry arriving
+while the first attempt is still running, must not write into one thread.
+Each run claims its thread for as long as it runs; a run that finds the
+thread claimed by another live run evaluates in a private thread of its
+own, which is deleted when it ends.
+
+Compaction keeps the database bounded: a completed thread is trimmed to
+its final checkpoint at once, and every ``compact_every`` completions the
+threads completed longer than ``completed_ttl_days`` ago, the unfinished
+ones idle for ``max_age_days`` and the oldest beyond ``max_threads`` are
+deleted.
+"""
+
+import os
+import time
+import uuid
+import atexit
+import asyncio
+import hashlib
+import logging
+import sqlite3
+import threading
+from typing import Any, AsyncIterator, Dict, List, Optional, Sequence, Tuple
+
+from langgraph.checkpoint.sqlite import SqliteSaver
+
+from src.evaluator.instrumentation import get_metrics
+from src.evaluator.models import TicketState
+from src.utils.helpers import load_settings
+
+logger = logging.getLogger(__name__)
+
+# Milliseconds a connection waits for a lock held by another process before failing
+BUSY_TIMEOUT_MS = 5000
+
+CHECKPOINT_STARTED = "started"
+CHECKPOINT_RESUMED = "resumed"
+CHECKPOINT_RESTORED = "restored"
+
+# Seconds without a checkpoint after which a thread's claim is considered abandoned
+CLAIM_TIMEOUT = 600.0
+
+# Separates a ticket's thread ID from the run suffix of a private thread
+PRIVATE_THREAD_SEPARATOR = "#"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoint_threads (
+    thread_id TEXT PRIMARY KEY,
+    updated_at REAL NOT NULL,
+    completed_at REAL,
+    owner TEXT
+);
+CREATE INDEX IF NOT EXISTS idx_checkpoint_threads_updated ON checkpoint_threads (updated_at);
+CREATE INDEX IF NOT EXISTS idx_checkpoint_threads_completed ON checkpoint_threads (completed_at);
+"""
+
+_TOUCH = (
+    "INSERT INTO checkpoint_threads (thread_id, updated_at, completed_at) VALUES (?, ?, NULL) "
+    "ON CONFLICT (thread_id) DO UPDATE SET updated_at = excluded.updated_at, completed_at = NULL"
+)
+
+
+class TicketCheckpointer(SqliteSaver):
+    """
+    SQLite checkpoint saver for the evaluation workflow, with compaction.
+
+    One saver serves both ``invoke`` and ``ainvoke``; the async methods run
+    the sync ones in a worker thread, so a write waiting on the database
+    lock never blocks the event loop.
+    """
+
+    def __init__(self, path: str, durability: str = "sync", completed_ttl_days: Optional[float] = 1,
+                 max_age_days: Optional[float] = 7, max_threads: Optional[int] = 100000,
+                 compact_every: int = 1000):
+        """
+        Args:
+            path: The SQLite database file
+            durability: When checkpoints are written: ``sync`` before the next node starts, ``async``
+                while it runs
+            completed_ttl_days: Completed threads are kept this long, ``None`` to keep them until
+                ``max_threads`` evicts them
+            max_age_days: Unfinished threads idle this long are deleted, ``None`` to keep them
+            max_threads: Maximum number of threads kept, the least recently updated are deleted first
+            compact_every: Number of completed threads between compaction passes
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        connection = sqlite3.connect(path, check_same_thread=False)
+        connection.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.executescript(_SCHEMA)
+        columns = {row[1] for row in connection.execute("PRAGMA table_info(checkpoint_threads)")}
+        if 'owner' not in columns:
+            connection.execute("ALTER TABLE checkpoint_threads ADD COLUMN owner TEXT")
+        super().__init__(connection)
+        self.path = path
+        self.durability = durability
+        self._completed_ttl = completed_ttl_days * 86400 if completed_ttl_days is not None else None
+        self._max_age = max_age_days * 86400 if max_age_days is not None else None
+        self._max_threads = max_threads
+        self._compact_every = compact_every
+        self._completions = 0
+        self._completions_lock = threading.Lock()
+        # Owner of each thread claimed by a run of this process
+        self._claims: Dict[str, str] = {}
+        self.compacted = 0
+
+    def put(self, config: Dict[str, Any], checkpoint: Dict[str, Any], metadata: Dict[str, Any],
+            new_versions: Dict[str, Any]) -> Dict[str, Any]:
+        saved = super().put(config, checkpoint, metadata, new_versions)
+        with self.cursor() as cursor:
+            cursor.execute(_TOUCH, (str(config["configurable"]["thread_id"]), time.time()))
+        return saved
+
+    def delete_thread(self, thread_id: str) -> None:
+        super().delete_thread(thread_id)
+        with self.cursor() as cursor:
+            cursor.execute("DELETE FROM checkpoint_threads WHERE thread_id = ?", (str(thread_id),))
+
+    async def aget_tuple(self, config: Dict[str, Any]):
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config: Optional[Dict[str, Any]], *, filter: Optional[Dict[str, Any]] = None,
+                    before: Optional[Dict[str, Any]] = None, limit: Optional[int] = None) -> AsyncIterator:
+        checkpoint_tuples = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for checkpoint_tuple in checkpoint_tuples:
+            yield checkpoint_tuple
+
+    async def aput(self, config: Dict[str, Any], checkpoint: Dict[str, Any], metadata: Dict[str, Any],
+                   new_versions: Dict[str, Any]) -> Dict[str, Any]:
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config: Dict[str, Any], writes: Sequence[Tuple[str, Any]], task_id: str,
+                          task_path: str = "") -> None:
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    async def adelete_thread(self, thread_id: str) -> None:
+        await asyncio.to_thread(self.delete_thread, thread_id)
+
+    def _owner_alive(self, owner: str, updated_at: float) -> bool:
+        """Whether the run holding a claim may still be running."""
+        pid, _, _ = owner.partition(':')
+        if pid == str(os.getpid()):
+            return owner in self._claims.values()
+        if time.time() - updated_at > CLAIM_TIMEOUT:
+            return False
+        if os.name != 'posix' or not pid.isdigit():
+            return True
+        try:
+            os.kill(int(pid), 0)
+        except ProcessLookupError:
+            return False
+        except PermissionError:
+            pass
+        return True
+
+    def claim(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """
+        Claim a run's thread, so no other run writes into it until it is released.
+
+        Args:
+            config: The run config from ``checkpoint_config``
+
+        Returns:
+            Dict[str, Any]: The config to run with: the same thread if it was free or its owner is
+            gone, otherwise a private thread that starts from scratch
+        """
+        thread_id = str(config["configurable"]["thread_id"])
+        owner = f"{os.getpid()}:{uuid.uuid4().hex}"
+        now = time.time()
+        with self.cursor() as cursor:
+            cursor.execute("SELECT owner, updated_at FROM checkpoint_threads WHERE thread_id = ?", (thread_id,))
+            row = cursor.fetchone()
+            claimed = False
+            if row is None:
+                cursor.execute("INSERT INTO checkpoint_threads (thread_id, updated_at, owner) VALUES (?, ?, ?) "
+                               "ON CONFLICT (thread_id) DO NOTHING", (thread_id, now, owner))
+                claimed = cursor.rowcount == 1
+            elif row[0] is None or not self._owner_alive(row[0], row[1]):
+                # Compare-and-set, in case another process claimed the thread since it was read
+                cursor.execute("UPDATE checkpoint_threads SET owner = ? WHERE thread_id = ? AND owner IS ?",
+                               (owner, thread_id, row[0]))
+                claimed = cursor.rowcount == 1
+            if not claimed:
+                thread_id = f"{thread_id}{PRIVATE_THREAD_SEPARATOR}{owner.rpartition(':')[2][:12]}"
+            self._claims[thread_id] = owner
+        if not claimed:
+            get_metrics().inc('evaluator_checkpoint_runs_total', {'outcome': 'private'})
+        return {**config, 'configurable': {**config['configurable'], 'thread_id': thread_id}}
+
+    def release(self, config: Dict[str, Any]) -> None:
+        """
+        Release the thread claimed for a run; a private thread is deleted, as no later run can resume it.
+
+        Args:
+            config: The run config returned by ``claim``
+        """
+        thread_id = str(config["configurable"]["thread_id"])
+        with self.lock:
+            owner = self._claims.pop(thread_id, None)
+        if owner is None:
+            return
+        if PRIVATE_THREAD_SEPARATOR in thread_id:
+            self.delete_thread(thread_id)
+            return
+        with self.cursor() as cursor:
+            cursor.execute("UPDATE checkpoint_threads SET owner = NULL WHERE thread_id = ? AND owner = ?",
+                           (thread_id, owner))
+
+    async def aclaim(self, config: Dict[str, Any]) -> Dict[str, Any]:
+        """Async version of ``claim``."""
+        return await asyncio.to_thread(self.claim, config)
+
+    async def arelease(self, config: Dict[str, Any]) -> None:
+        """Async version of ``release``."""
+        await asyncio.to_thread(self.release, config)
+
+    async def acomplete(self, config: Dict[str, Any]) -> None:
+        """Async version of ``complete``."""
+        await asyncio.to_thread(self.complete, config)
+
+    def complete(self, config: Dict[str, Any]) -> None:
+        """
+        Mark a thread's evaluation as completed and trim it to its final checkpoint.
+
+        Args:
+            config: The run config holding the thread ID
+        """
+        thread_id = str(config["configurable"]["thread_id"])
+        with self.cursor() as cursor:
+            cursor.execute(
+                "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_id < "
+                "(SELECT MAX(checkpoint_id) FROM checkpoints WHERE thread_id = ?)",
+                (thread_id, thread_id)
+            )
+            cursor.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+            cursor.execute("UPDATE checkpoint_threads SET completed_at = ? WHERE thread_id = ?",
+                           (time.time(), thread_id))
+        with self._completions_lock:
+            self._completions += 1
+            due = self._completions % self._compact_every == 0
+        if due:
+            self.compact()
+
+    def compact(self) -> int:
+        """
+        Delete expired threads and the history of unfinished ones.
+
+        Unfinished threads keep their latest checkpoint and its pending
+        writes, which is all a resumed run needs.
+
+        Returns:
+            int: Number of threads deleted
+        """
+        now = time.time()
+        with self.cursor() as cursor:
+            expired: List[str] = []
+            if self._completed_ttl is not None:
+                cursor.execute("SELECT thread_id FROM checkpoint_threads WHERE completed_at < ?",
+                               (now - self._completed_ttl,))
+                expired.extend(row[0] for row in cursor.fetchall())
+            if self._max_age is not None:
+                cursor.execute("SELECT thread_id FROM checkpoint_threads WHERE updated_at < ?",
+                               (now - self._max_age,))
+                expired.extend(row[0] for row in cursor.fetchall())
+            if self._max_threads is not None:
+                cursor.execute("SELECT thread_id FROM checkpoint_threads ORDER BY updated_at DESC LIMIT -1 OFFSET ?",
+                               (self._max_threads,))
+                expired.extend(row[0] for row in cursor.fetchall())
+            expired = list(dict.fromkeys(expired))
+            for table in ("checkpoints", "writes", "checkpoint_threads"):
+                cursor.executemany(f"DELETE FROM {table} WHERE thread_id = ?", [(thread_id,) for thread_id in expired])
+
+            cursor.execute(
+                "DELETE FROM checkpoints WHERE checkpoint_id < (SELECT MAX(latest.checkpoint_id) FROM checkpoints "
+                "AS latest WHERE latest.thread_id = checkpoints.thread_id "
+                "AND latest.checkpoint_ns = checkpoints.checkpoint_ns)"
+            )
+            cursor.execute(
+                "DELETE FROM writes WHERE NOT EXISTS (SELECT 1 FROM checkpoints WHERE "
+                "checkpoints.thread_id = writes.thread_id AND checkpoints.checkpoint_ns = writes.checkpoint_ns "
+                "AND checkpoints.checkpoint_id = writes.checkpoint_id)"
+            )
+        self.compacted += len(expired)
+        if expired:
+            logger.info("Compacted %d checkpoint threads from %s", len(expired), self.path)
+        return len(expired)
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the number of threads and checkpoints stored.
+
+        Returns:
+            Dict[str, int]: Threads, completed threads, checkpoints and threads deleted by compaction
+        """
+        with self.cursor(transaction=False) as cursor:
+            cursor.execute("SELECT COUNT(*), COUNT(completed_at) FROM checkpoint_threads")
+            threads, completed = cursor.fetchone()
+            cursor.execute("SELECT COUNT(*) FROM checkpoints")
+            checkpoints = cursor.fetchone()[0]
+        return {'threads': threads, 'completed': completed, 'checkpoints': checkpoints, 'compacted': self.compacted}
+
+    def close(self) -> None:
+        """Compact the database and close the connection."""
+        self.compact()
+        with self.lock:
+            self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            self.conn.close()
+
+
+def thread_key(response: str, ticket_id: Optional[str] = None) -> str:
+    """
+    Get the checkpoint thread ID of an evaluation.
+
+    Args:
+        response: The support response
+        ticket_id: The ticket ID, if any
+
+    Returns:
+        str: The ticket ID, or a hash of the response for evaluations without one
+    """
+    if ticket_id:
+        return str(ticket_id)
+    return "response:" + hashlib.sha256(response.encode('utf-8')).hexdigest()[:32]
+
+
+def checkpoint_config(response: str, ticket_id: Optional[str], workflow: str) -> Dict[str, Any]:
+    """
+    Build the run config that checkpoints an evaluation.
+
+    Args:
+        response: The support response
+        ticket_id: The ticket ID, if any
+        workflow: The fingerprint of the compiled workflow, stored with every checkpoint
+
+    Returns:
+        Dict[str, Any]: The LangGraph run config
+    """
+    return {'configurable': {'thread_id': thread_key(response, ticket_id)}, 'metadata': {'workflow': workflow}}
+
+
+def resume_from(snapshot: Any, config: Dict[str, Any], initial: TicketState) -> Tuple[Optional[TicketState], Optional[TicketState]]:
+    """
+    Decide how a checkpointed evaluation continues from the thread's latest checkpoint.
+
+    Args:
+        snapshot: The thread's ``StateSnapshot``
+        config: The run config from ``checkpoint_config``
+        initial: The initial state of a fresh evaluation
+
+    Returns:
+        Tuple[Optional[TicketState], Optional[TicketState]]: The graph input, None to resume the
+        checkpoint, and the final state if the evaluation already completed
+    """
+    values = snapshot.values if snapshot is not None else None
+    reusable = bool(values) and values.get('original_response') == initial['original_response'] \
+        and (snapshot.metadata or {}).get('workflow') == config['metadata']['workflow']
+    if not reusable:
+        outcome, state, result = CHECKPOINT_STARTED, initial, None
+    elif snapshot.next:
+        outcome, state, result = CHECKPOINT_RESUMED, None, None
+    else:
+        outcome, state, result = CHECKPOINT_RESTORED, None, values
+    get_metrics().inc('evaluator_checkpoint_runs_total', {'outcome': outcome})
+    return state, result
+
+
+_checkpointer: Optional[TicketCheckpointer] = None
+_checkpointer_settings: Optional[Dict[str, Any]] = None
+# Checkpointers replaced on a settings reload; running evaluations may still hold them, so they are only closed at exit
+_retired_checkpointers: List[TicketCheckpointer] = []
+_checkpointer_lock = threading.Lock()
+
+
+def get_checkpointer() -> Optional[TicketCheckpointer]:
+    """
+    Get the process-wide checkpointer configured in ``settings.yaml``.
+
+    Returns:
+        Optional[TicketCheckpointer]: The checkpointer, or None if checkpoints are disabled
+    """
+    global _checkpointer, _checkpointer_settings
+    checkpoint_settings = load_settings().get('checkpoints', {})
+    if not checkpoint_settings.get('enabled', False):
+        return None
+    with _checkpointer_lock:
+        if _checkpointer is None or checkpoint_settings != _checkpointer_settings:
+            if _checkpointer is not None:
+                _retired_checkpointers.append(_checkpointer)
+            _checkpointer = TicketCheckpointer(
+                checkpoint_settings['path'],
+                durability=checkpoint_settings.get('durability', 'sync'),
+                completed_ttl_days=checkpoint_settings.get('completed_ttl_days', 1),
+                max_age_days=checkpoint_settings.get('max_age_days', 7),
+                max_threads=checkpoint_settings.get('max_threads', 100000),
+                compact_every=checkpoint_settings.get('compact_every', 1000)
+            )
+            _checkpointer_settings = checkpoint_settings
+        return _checkpointer
+
+
+def close_checkpointer() -> None:
+    """Compact and close the checkpointer and any it replaced, if open."""
+    global _checkpointer, _checkpointer_settings
+    with _checkpointer_lock:
+        for checkpointer in _retired_checkpointers:
+            checkpointer.close()
+        _retired_checkpointers.clear()
+        if _checkpointer is not None:
+            _checkpointer.close()
+        _checkpointer = None
+        _checkpointer_settings = None
+
+
+atexit.register(close_checkpointer)
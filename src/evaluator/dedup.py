@@ -0,0 +1,570 @@
+"""
+Near-duplicate index reusing the scores of previously evaluated responses.
+
+Agents mostly send lightly edited macros, which an exact cache key never
+matches. Each evaluated response is reduced to a MinHash signature over
+its word shingles; locality-sensitive hashing on bands of the signature
+finds candidate matches with a few dictionary lookups, and the estimated
+Jaccard similarity of a candidate decides whether its stored clarity,
+politeness, professionalism and resolution scores are reused.
+
+Only the metrics a response was actually scored on are stored. On a
+match, the metrics a threshold gate cut off take the skipped score of
+0.0 without an LLM call: the namespace covers the thresholds, so the
+same gate would cut them off again. Signatures live in
+memory for lookups and in SQLite for persistence, where new entries are
+written in batches. Entries are scoped to a namespace derived from every
+setting that changes the scores (model, routing, escalation, prompt
+templates, thresholds and pre-scorer), so scores produced under another
+configuration are never reused.
+"""
+
+import os
+import re
+import json
+import atexit
+import random
+import time
+import zlib
+import sqlite3
+import hashlib
+import threading
+from dataclasses import asdict
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import numpy as np
+
+from src.evaluator.instrumentation import get_metrics
+from src.evaluator.models import TicketState
+from src.utils.config import GATED_METRICS, Settings, get_app_config, get_settings
+from src.constants import METRIC_CLARITY, METRIC_POLITENESS, METRIC_PROFESSIONALISM, METRIC_RESOLUTION
+
+# Scores stored for each response
+REUSED_METRICS = (METRIC_CLARITY, METRIC_POLITENESS, METRIC_PROFESSIONALISM, METRIC_RESOLUTION)
+
+# Signature length, and how it is split into LSH bands (bands * rows must equal the signature length)
+NUM_PERMUTATIONS = 64
+LSH_BANDS = 16
+LSH_ROWS = NUM_PERMUTATIONS // LSH_BANDS
+
+# Words per shingle
+SHINGLE_SIZE = 2
+
+# Share of max_entries kept when the index overflows, so eviction passes stay infrequent
+EVICTION_LOW_WATER = 0.9
+
+# Seconds new entries and usage statistics may wait in memory before they are written to disk
+FLUSH_INTERVAL = 5.0
+
+_MERSENNE_PRIME = np.uint64((1 << 61) - 1)
+_MAX_HASH = np.uint64(0xFFFFFFFF)
+_permutation_rng = np.random.RandomState(1729)
+_PERM_A = _permutation_rng.randint(1, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+_PERM_B = _permutation_rng.randint(0, 1 << 32, size=NUM_PERMUTATIONS, dtype=np.uint64)
+
+_WORD = re.compile(r"\w+")
+_NUMBER = re.compile(r"\d+")
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS near_duplicates (
+    id INTEGER PRIMARY KEY,
+    namespace TEXT NOT NULL,
+    signature BLOB NOT NULL,
+    scores BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    hits INTEGER NOT NULL DEFAULT 0
+);
+CREATE INDEX IF NOT EXISTS idx_near_duplicates_namespace ON near_duplicates (namespace);
+CREATE INDEX IF NOT EXISTS idx_near_duplicates_last_used ON near_duplicates (last_used_at);
+"""
+
+
+def minhash_signature(text: str) -> np.ndarray:
+    """
+    Compute the MinHash signature of a response over its word shingles.
+
+    Numbers are masked so order numbers and dates do not break a match.
+
+    Args:
+        text: The (pre-processed) support response
+
+    Returns:
+        np.ndarray: ``NUM_PERMUTATIONS`` uint32 values
+    """
+    words = _WORD.findall(_NUMBER.sub('0', text.lower()))
+    shingles = {' '.join(words[i:i + SHINGLE_SIZE]) for i in range(max(1, len(words) - SHINGLE_SIZE + 1))}
+    hashes = np.fromiter((zlib.crc32(shingle.encode('utf-8')) for shingle in shingles),
+                         dtype=np.uint64, count=len(shingles))
+    permuted = ((hashes[:, None] * _PERM_A + _PERM_B) % _MERSENNE_PRIME) & _MAX_HASH
+    return permuted.min(axis=0).astype(np.uint32)
+
+
+_BAND_MIX = np.uint64(0x9E3779B97F4A7C15)
+
+
+def band_hashes(signatures: np.ndarray) -> np.ndarray:
+    """
+    Hash each LSH band of one or more signatures into a single integer.
+
+    Args:
+        signatures: Array of shape ``(n, NUM_PERMUTATIONS)`` or ``(NUM_PERMUTATIONS,)``
+
+    Returns:
+        np.ndarray: uint64 array of shape ``(n, LSH_BANDS)`` or ``(LSH_BANDS,)``
+    """
+    bands = signatures.reshape(signatures.shape[:-1] + (LSH_BANDS, LSH_ROWS)).astype(np.uint64)
+    hashes = np.zeros(bands.shape[:-1], dtype=np.uint64)
+    for column in range(LSH_ROWS):
+        hashes = (hashes ^ bands[..., column]) * _BAND_MIX
+    return hashes
+
+
+class NearDuplicateIndex:
+    """MinHash LSH index of evaluated responses and their scores, persisted in SQLite."""
+
+    def __init__(self, path: str, namespace: str, similarity: float = 0.8, max_entries: int = 500000,
+                 max_age_days: Optional[float] = 90, flush_every: int = 1000,
+                 flush_interval: float = FLUSH_INTERVAL):
+        """
+        Args:
+            path: The SQLite database file
+            namespace: Scope of the entries, derived from the model and prompts
+            similarity: Minimum estimated Jaccard similarity for scores to be reused
+            max_entries: Maximum number of entries kept, least recently used are evicted first
+            max_age_days: Entries older than this are evicted, ``None`` to keep them forever
+            flush_every: Number of new entries or reuses kept in memory before they are written to disk
+            flush_interval: Seconds after which pending entries are written even if fewer were added
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self.namespace = namespace
+        self.similarity = similarity
+        self._max_entries = max_entries
+        self._max_age = max_age_days * 86400 if max_age_days is not None else None
+        self._flush_every = flush_every
+        self._flush_interval = flush_interval
+        self._flushed_at = time.monotonic()
+        # Entry ids are drawn at random so several processes can share the database without colliding
+        self._random = random.Random()
+        self._lock = threading.Lock()
+        self._connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._connection.execute("PRAGMA journal_mode=WAL")
+        self._connection.execute("PRAGMA synchronous=NORMAL")
+        self._connection.executescript(_SCHEMA)
+
+        # One row per entry; rows of evicted entries are marked dead and reused
+        self._size = 0
+        self._signatures = np.zeros((0, NUM_PERMUTATIONS), dtype=np.uint32)
+        self._bands = np.zeros((0, LSH_BANDS), dtype=np.uint64)
+        self._scores = np.zeros((0, len(REUSED_METRICS)), dtype=np.float64)
+        self._ids = np.zeros(0, dtype=np.int64)
+        self._created = np.zeros(0, dtype=np.float64)
+        self._last_used = np.zeros(0, dtype=np.float64)
+        self._hits = np.zeros(0, dtype=np.int64)
+        self._live = np.zeros(0, dtype=bool)
+        self._free_rows: List[int] = []
+        # Per band, the band hashes sorted for binary search, plus a dict of rows added since the last sort
+        self._sorted_hashes: List[np.ndarray] = [np.zeros(0, dtype=np.uint64)] * LSH_BANDS
+        self._sorted_rows: List[np.ndarray] = [np.zeros(0, dtype=np.int64)] * LSH_BANDS
+        self._pending: List[Dict[int, List[int]]] = [{} for _ in range(LSH_BANDS)]
+        self._pending_count = 0
+        self._touched: Set[int] = set()
+        self._unsaved: Set[int] = set()
+        self.lookups = 0
+        self.reuses = 0
+        self.inserts = 0
+        self.evictions = 0
+        self.lookup_time = 0.0
+        self._load()
+
+    def __len__(self) -> int:
+        return int(self._live[:self._size].sum())
+
+    def _grow(self, capacity: int) -> None:
+        """Resize the row arrays to hold ``capacity`` entries."""
+        def resized(array: np.ndarray) -> np.ndarray:
+            grown = np.zeros((capacity,) + array.shape[1:], dtype=array.dtype)
+            grown[:len(array)] = array
+            return grown
+
+        self._signatures = resized(self._signatures)
+        self._bands = resized(self._bands)
+        self._scores = resized(self._scores)
+        self._ids = resized(self._ids)
+        self._created = resized(self._created)
+        self._last_used = resized(self._last_used)
+        self._hits = resized(self._hits)
+        self._live = resized(self._live)
+
+    def _load(self) -> None:
+        """Load the most recently used entries of the namespace into memory, dropping the rest from disk."""
+        oldest = time.time() - self._max_age if self._max_age is not None else 0.0
+        self._connection.execute("BEGIN")
+        self._connection.execute(
+            "DELETE FROM near_duplicates WHERE namespace = ? AND (created_at < ? OR id NOT IN "
+            "(SELECT id FROM near_duplicates WHERE namespace = ? ORDER BY last_used_at DESC LIMIT ?))",
+            (self.namespace, oldest, self.namespace, self._max_entries)
+        )
+        self._connection.execute("COMMIT")
+        rows = self._connection.execute(
+            "SELECT id, signature, scores, created_at, last_used_at, hits FROM near_duplicates WHERE namespace = ?",
+            (self.namespace,)
+        ).fetchall()
+
+        count = len(rows)
+        self._grow(max(1024, 1 << max(count - 1, 0).bit_length()))
+        if count:
+            self._signatures[:count] = np.frombuffer(b''.join(row[1] for row in rows),
+                                                     dtype=np.uint32).reshape(count, -1)
+            self._bands[:count] = band_hashes(self._signatures[:count])
+            self._scores[:count] = np.frombuffer(b''.join(row[2] for row in rows),
+                                                 dtype=np.float64).reshape(count, -1)
+            self._ids[:count] = [row[0] for row in rows]
+            self._created[:count] = [row[3] for row in rows]
+            self._last_used[:count] = [row[4] for row in rows]
+            self._hits[:count] = [row[5] for row in rows]
+            self._live[:count] = True
+        self._size = count
+        self._rebuild()
+
+    def _rebuild(self) -> None:
+        """Sort the band hashes of all live rows and empty the pending inserts."""
+        rows = np.flatnonzero(self._live[:self._size])
+        for band in range(LSH_BANDS):
+            hashes = self._bands[rows, band]
+            order = np.argsort(hashes, kind='stable')
+            self._sorted_hashes[band] = hashes[order]
+            self._sorted_rows[band] = rows[order]
+        self._pending = [{} for _ in range(LSH_BANDS)]
+        self._pending_count = 0
+
+    def _candidates(self, hashes: np.ndarray) -> np.ndarray:
+        """Rows sharing at least one band hash with a signature."""
+        found = []
+        for band in range(LSH_BANDS):
+            key = hashes[band]
+            sorted_hashes = self._sorted_hashes[band]
+            left = sorted_hashes.searchsorted(key)
+            if left < len(sorted_hashes) and sorted_hashes[left] == key:
+                right = sorted_hashes.searchsorted(key, side='right')
+                found.append(self._sorted_rows[band][left:right])
+            pending = self._pending[band].get(int(key))
+            if pending:
+                found.append(np.array(pending, dtype=np.int64))
+        if not found:
+            return np.zeros(0, dtype=np.int64)
+        rows = np.unique(np.concatenate(found))
+        return rows[self._live[rows]]
+
+    def lookup(self, signature: np.ndarray) -> Optional[Tuple[Dict[str, float], float]]:
+        """
+        Find the most similar indexed response above the similarity threshold.
+
+        Args:
+            signature: The MinHash signature of the response
+
+        Returns:
+            Optional[Tuple[Dict[str, float], float]]: Its scores and estimated similarity, or None.
+            Metrics the matched response was not scored on are left out of the scores.
+        """
+        started = time.perf_counter()
+        hashes = band_hashes(signature)
+        with self._lock:
+            self.lookups += 1
+            match = None
+            rows = self._candidates(hashes)
+            if len(rows):
+                similarities = (self._signatures[rows] == signature).mean(axis=1)
+                best = int(similarities.argmax())
+                if similarities[best] >= self.similarity:
+                    row = int(rows[best])
+                    self._last_used[row] = time.time()
+                    self._hits[row] += 1
+                    self._touched.add(row)
+                    self.reuses += 1
+                    scores = {metric: score for metric, score in zip(REUSED_METRICS, self._scores[row].tolist())
+                              if not np.isnan(score)}
+                    match = (scores, float(similarities[best]))
+                    self._maybe_flush()
+            self.lookup_time += time.perf_counter() - started
+            return match
+
+    def insert(self, signature: np.ndarray, scores: Dict[str, float]) -> None:
+        """
+        Add an evaluated response to the index.
+
+        The entry is searchable at once and written to disk with the next batch.
+
+        Args:
+            signature: The MinHash signature of the response
+            scores: Its scores by metric; metrics it was not scored on are omitted
+        """
+        now = time.time()
+        hashes = band_hashes(signature)
+        with self._lock:
+            if self._free_rows:
+                row = self._free_rows.pop()
+            else:
+                if self._size == len(self._live):
+                    self._grow(2 * len(self._live))
+                row = self._size
+                self._size += 1
+            self._signatures[row] = signature
+            self._bands[row] = hashes
+            self._scores[row] = [scores.get(metric, np.nan) for metric in REUSED_METRICS]
+            self._ids[row] = self._random.getrandbits(63)
+            self._created[row] = now
+            self._last_used[row] = now
+            self._hits[row] = 0
+            self._live[row] = True
+            for band, key in zip(self._pending, hashes.tolist()):
+                band.setdefault(key, []).append(row)
+            self._pending_count += 1
+            self._unsaved.add(row)
+            self.inserts += 1
+
+            if self.inserts % self._flush_every == 0 or len(self) > self._max_entries:
+                self._evict(now)
+            if self._pending_count > max(1024, self._size // 20):
+                self._rebuild()
+            self._maybe_flush()
+
+    def _maybe_flush(self) -> None:
+        """Flush once enough changes are pending or the oldest has waited ``flush_interval`` seconds."""
+        pending = len(self._unsaved) + len(self._touched)
+        if pending and (pending >= self._flush_every
+                        or time.monotonic() - self._flushed_at >= self._flush_interval):
+            self._flush()
+
+    def _flush(self) -> None:
+        """Write new entries and the usage statistics of recently reused ones to disk in one transaction."""
+        self._flushed_at = time.monotonic()
+        if not self._unsaved and not self._touched:
+            return
+        new_rows = sorted(self._unsaved)
+        rows = [row for row in self._touched - self._unsaved if self._live[row]]
+        self._connection.execute("BEGIN")
+        self._connection.executemany(
+            "INSERT OR REPLACE INTO near_duplicates (id, namespace, signature, scores, created_at, last_used_at, "
+            "hits) VALUES (?, ?, ?, ?, ?, ?, ?)",
+            [(int(self._ids[row]), self.namespace, self._signatures[row].tobytes(), self._scores[row].tobytes(),
+              float(self._created[row]), float(self._last_used[row]), int(self._hits[row])) for row in new_rows]
+        )
+        self._connection.executemany(
+            "UPDATE near_duplicates SET last_used_at = ?, hits = ? WHERE id = ?",
+            [(float(self._last_used[row]), int(self._hits[row]), int(self._ids[row])) for row in rows]
+        )
+        self._connection.execute("COMMIT")
+        self._touched.clear()
+        self._unsaved.clear()
+
+    def _evict(self, now: float) -> None:
+        """Delete expired entries, then the least recently used ones once there are more than ``max_entries``."""
+        live = np.flatnonzero(self._live[:self._size])
+        expired = np.zeros(0, dtype=np.int64)
+        if self._max_age is not None:
+            expired = live[now - self._created[live] > self._max_age]
+            live = live[now - self._created[live] <= self._max_age]
+        overflow = len(live) - int(self._max_entries * EVICTION_LOW_WATER) if len(live) > self._max_entries else 0
+        if overflow > 0:
+            expired = np.concatenate([expired, live[np.argsort(self._last_used[live], kind='stable')[:overflow]]])
+        if not len(expired):
+            return
+
+        self._live[expired] = False
+        self._free_rows.extend(expired.tolist())
+        self._touched.difference_update(expired.tolist())
+        self._unsaved.difference_update(expired.tolist())
+        self._connection.execute("BEGIN")
+        self._connection.executemany("DELETE FROM near_duplicates WHERE id = ?",
+                                     [(entry_id,) for entry_id in self._ids[expired].tolist()])
+        if self._max_age is not None:
+            # Entries of other namespaces are never loaded, so age them out on disk only
+            self._connection.execute("DELETE FROM near_duplicates WHERE created_at < ?", (now - self._max_age,))
+        self._connection.execute("COMMIT")
+        self.evictions += len(expired)
+        # Freed rows are reused, so their stale band hashes must leave the search structures
+        self._rebuild()
+
+    def evict(self) -> None:
+        """Run an eviction pass now."""
+        with self._lock:
+            self._evict(time.time())
+
+    def clear(self) -> None:
+        """Delete every entry of the namespace."""
+        with self._lock:
+            self._connection.execute("DELETE FROM near_duplicates WHERE namespace = ?", (self.namespace,))
+            self._live[:] = False
+            self._size = 0
+            self._free_rows.clear()
+            self._touched.clear()
+            self._unsaved.clear()
+            self._rebuild()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get index statistics.
+
+        Returns:
+            Dict[str, Any]: Entry count, lookups, reuses, reuse rate, inserts, evictions and mean lookup time
+        """
+        with self._lock:
+            return {
+                'entries': len(self),
+                'lookups': self.lookups,
+                'reuses': self.reuses,
+                'reuse_rate': self.reuses / self.lookups if self.lookups else 0.0,
+                'inserts': self.inserts,
+                'evictions': self.evictions,
+                'mean_lookup_ms': self.lookup_time / self.lookups * 1000 if self.lookups else 0.0
+            }
+
+    def flush(self) -> None:
+        """Write pending entries and usage statistics to disk now."""
+        with self._lock:
+            self._flush()
+
+    def close(self) -> None:
+        with self._lock:
+            self._flush()
+            self._connection.close()
+
+
+def index_namespace(settings: Settings, templates: Dict[str, str]) -> str:
+    """
+    Derive the namespace scores are valid in from every setting that changes them.
+
+    Besides the model, engine and prompt templates, the threshold gates
+    decide which metrics are scored at all, and the pre-scorer, routing and
+    escalation policies decide which model or heuristic produces a score.
+
+    Args:
+        settings: The validated application settings
+        templates: The prompt templates by name
+
+    Returns:
+        str: Hex digest identifying the scoring configuration
+    """
+    payload = {
+        'model': f"{settings.llm.provider}/{settings.llm.model}",
+        'temperature': settings.llm.temperature,
+        'routing': settings.llm.routing,
+        'escalation': [settings.llm.escalation, settings.llm.escalation_margin],
+        'scoring_engine': settings.evaluation.scoring_engine,
+        'thresholds': {metric: settings.evaluation.thresholds[metric] for metric in GATED_METRICS},
+        'prescore': asdict(settings.prescore) if settings.prescore.enabled else None,
+        'templates': {name: templates.get(name) for name in ('clarity', 'politeness', 'professionalism',
+                                                             'resolution', 'rubric')},
+        'signature': [NUM_PERMUTATIONS, LSH_BANDS, SHINGLE_SIZE]
+    }
+    return hashlib.sha256(json.dumps(payload, sort_keys=True).encode('utf-8')).hexdigest()[:16]
+
+
+_index: Optional[NearDuplicateIndex] = None
+_index_key: Optional[Tuple[Any, str]] = None
+# Indexes replaced on a settings reload; evaluations may still hold them, so they are only closed at exit
+_retired_indexes: List[NearDuplicateIndex] = []
+_index_lock = threading.Lock()
+
+
+def get_near_duplicate_index() -> Optional[NearDuplicateIndex]:
+    """
+    Get the process-wide near-duplicate index configured in ``settings.yaml``.
+
+    Returns:
+        Optional[NearDuplicateIndex]: The index, or None if score reuse is disabled
+    """
+    global _index, _index_key
+    settings = get_settings()
+    index_settings = settings.near_duplicates
+    if not index_settings.enabled:
+        return None
+
+    namespace = index_namespace(settings, get_app_config().templates)
+    key = (index_settings, namespace)
+    with _index_lock:
+        if _index is None or key != _index_key:
+            if _index is not None:
+                _retired_indexes.append(_index)
+            _index = NearDuplicateIndex(
+                index_settings.path,
+                namespace,
+                similarity=index_settings.similarity,
+                max_entries=index_settings.max_entries,
+                max_age_days=index_settings.max_age_days
+            )
+            _index_key = key
+        return _index
+
+
+def close_near_duplicate_index() -> None:
+    """Write pending entries to disk and close the index and any it replaced, if open."""
+    global _index, _index_key
+    with _index_lock:
+        for index in _retired_indexes:
+            index.close()
+        _retired_indexes.clear()
+        if _index is not None:
+            _index.close()
+        _index = None
+        _index_key = None
+
+
+atexit.register(close_near_duplicate_index)
+
+
+def match_near_duplicate(state: TicketState) -> TicketState:
+    """
+    Look up the response in the near-duplicate index before it is scored.
+
+    On a match the stored scores are put in ``reused_scores``, and the
+    metric nodes use them instead of calling the LLM.
+
+    Args:
+        state: The current evaluation state
+
+    Returns:
+        TicketState: Updated state with any reused scores
+    """
+    index = get_near_duplicate_index()
+    if index is None:
+        return state
+    match = index.lookup(minhash_signature(state["response"]))
+    get_metrics().inc('evaluator_near_duplicate_lookups_total', {'outcome': 'reuse' if match else 'miss'})
+    if match is not None:
+        scores, similarity = match
+        state["reused_scores"] = scores
+        state["node_metrics"] = {"near_duplicate": {"similarity": similarity}}
+    return state
+
+
+async def amatch_near_duplicate(state: TicketState) -> TicketState:
+    """Async version of ``match_near_duplicate``."""
+    return match_near_duplicate(state)
+
+
+def remember_scores(state: TicketState) -> None:
+    """
+    Add a freshly scored response to the near-duplicate index.
+
+    Metrics after the first failing threshold gate were never scored, so
+    their placeholder 0.0 is not stored.
+
+    Args:
+        state: The evaluation state holding the final metric scores
+    """
+    index = get_near_duplicate_index()
+    if index is None or state.get("reused_scores"):
+        return
+    thresholds = get_settings().evaluation.thresholds
+    scores = {}
+    for metric in REUSED_METRICS:
+        scores[metric] = state[metric]
+        gate = metric.replace('_score', '')
+        if gate in GATED_METRICS and not state[metric] > thresholds[gate]:
+            break
+    index.insert(minhash_signature(state["response"]), scores)
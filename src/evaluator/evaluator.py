@@ -3,61 +3,396 @@ Core evaluation functions for the Customer Support Response Evaluator.
 """
 
 import os
-import streamlit as st
-from langchain_openai import ChatOpenAI
-from langchain_core.prompts import ChatPromptTemplate
-
+import time
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.evaluator.cache import EvaluationCache, get_evaluation_cache
+from src.evaluator.dedup import remember_scores
+from src.evaluator.events import get_listener
+from src.evaluator.instrumentation import (
+    get_metrics,
+    record_escalation,
+    record_feedback,
+    record_llm_call,
+    record_llm_call_saved
+)
+from src.evaluator.llm import get_client_provider
 from src.evaluator.models import TicketState
-from src.utils.helpers import parse_rating, load_config, load_settings
-from src.constants import ERROR_NO_API_KEY
+from src.evaluator.ratelimit import estimate_tokens, get_rate_limiter
+from src.evaluator.singleflight import fingerprint, get_single_flight
+from src.utils.config import GATED_METRICS, METRICS, get_app_config, get_prompt, get_settings
+from src.utils.helpers import parse_rating, parse_rubric, score_band
+from src.constants import (
+    ERROR_NO_API_KEY,
+    FEEDBACK_POLICY_TEMPLATES,
+    FEEDBACK_SOURCE_LLM,
+    FEEDBACK_SOURCE_TEMPLATE,
+    FEEDBACK_TEMPLATE_GATED,
+    LLM_PROVIDER_FAKE,
+    METRIC_FRIENDLY_NAMES,
+    RUBRIC_FIELDS,
+    RUBRIC_RESPONSE_FORMAT
+)
+
+if TYPE_CHECKING:
+    from langchain_openai import ChatOpenAI
+
+
+def model_options(prompt_name: Optional[str] = None, escalated: bool = False) -> Dict[str, Any]:
+    """
+    Get the chat model options a prompt is routed to.
 
+    Args:
+        prompt_name: The prompt name in ``config.json``, or None for the ``llm`` defaults
+        escalated: Whether to use the larger model configured in ``llm.escalation``
 
-def get_llm() -> ChatOpenAI:
+    Returns:
+        Dict[str, Any]: The ``model``, ``temperature``, ``timeout`` and ``max_tokens`` to use
     """
-    Initialize the LLM with appropriate settings.
+    llm_settings = get_settings().llm
+    options = {
+        'model': llm_settings.model,
+        'temperature': llm_settings.temperature,
+        'timeout': llm_settings.timeout,
+        'max_tokens': llm_settings.max_tokens
+    }
+    if prompt_name is not None:
+        options.update(llm_settings.routing.get(prompt_name, {}))
+    if escalated and llm_settings.escalation is not None:
+        options.update(llm_settings.escalation)
+    return options
+
+
+def get_llm(prompt_name: Optional[str] = None, escalated: bool = False) -> "ChatOpenAI":
+    """
+    Get the shared LLM instance a prompt is routed to.
+
+    The model is reused across nodes and tickets, and every routed model
+    shares one pool of keep-alive HTTP connections.
+
+    Args:
+        prompt_name: The prompt name in ``config.json``, or None for the ``llm`` defaults
+        escalated: Whether to use the larger model configured in ``llm.escalation``
 
     Returns:
         ChatOpenAI: Configured LLM instance
 
     Raises:
-        SystemExit: If no API key is found
+        RuntimeError: If no API key is found
     """
+    llm_settings = get_settings().llm
+
     api_key = os.getenv('OPENAI_API_KEY')
-    if not api_key:
-        st.error(ERROR_NO_API_KEY)
-        st.stop()
-
-    settings = load_settings()
-    llm_settings = settings['llm']
-
-    return ChatOpenAI(
-        model=llm_settings['model'],
-        temperature=llm_settings['temperature'],
-        request_timeout=llm_settings['timeout'],
-        api_key=api_key
-    )
+    if not api_key and llm_settings.provider != LLM_PROVIDER_FAKE:
+        raise RuntimeError(ERROR_NO_API_KEY)
+
+    return get_client_provider().get_chat_model(llm_settings, api_key, model_options(prompt_name, escalated))
+
+
+def _model_name(options: Dict[str, Any]) -> str:
+    """Name of a routed model, as used for metrics and pricing."""
+    if get_settings().llm.provider == LLM_PROVIDER_FAKE:
+        return f"{LLM_PROVIDER_FAKE}/{options['model']}"
+    return options['model']
+
+
+def _cache_lookup(prompt_name: str, variables: Dict[str, Any],
+                  options: Dict[str, Any]) -> Tuple[Optional[EvaluationCache], str, Optional[str]]:
+    """Look up a prompt in the evaluation cache, returning the cache, its key and any cached output."""
+    cache = get_evaluation_cache()
+    if cache is None:
+        return None, "", None
+    template = get_app_config().templates[prompt_name]
+    model = f"{get_settings().llm.provider}/{options['model']}"
+    key = cache.make_key(prompt_name, template, variables, model, options['temperature'],
+                         options['max_tokens'])
+
+    started = time.perf_counter()
+    content = cache.get(key, prompt_name, template)
+    if content is not None:
+        record_llm_call(_model_name(options), time.perf_counter() - started, None, cached=True)
+    return cache, key, content
+
+
+def _cache_store(cache: Optional[EvaluationCache], key: str, prompt_name: str, content: str) -> None:
+    """Store an LLM output in the evaluation cache, if enabled."""
+    if cache is not None:
+        cache.put(key, prompt_name, get_app_config().templates[prompt_name], content)
+
+
+def _send(prompt: str, options: Dict[str, Any], call: Callable[[], Any],
+          can_retry: Optional[Callable[[], bool]] = None) -> Any:
+    """Send an LLM call through the rate limiter of its model, if enabled."""
+    limiter = get_rate_limiter(_model_name(options))
+    if limiter is None:
+        return call()
+    return limiter.call(call, estimate_tokens(prompt, options), can_retry)
+
+
+async def _asend(prompt: str, options: Dict[str, Any], acall: Callable[[], Awaitable[Any]],
+                 can_retry: Optional[Callable[[], bool]] = None) -> Any:
+    """Async version of ``_send``."""
+    limiter = get_rate_limiter(_model_name(options))
+    if limiter is None:
+        return await acall()
+    return await limiter.acall(acall, estimate_tokens(prompt, options), can_retry)
+
+
+def _coalesce(prompt_name: str, prompt: str, options: Dict[str, Any], llm_kwargs: Dict[str, Any],
+              call: Callable[[], str]) -> Tuple[str, bool]:
+    """Run an LLM call, sharing the pending result of an identical concurrent call when coalescing is enabled."""
+    flight = get_single_flight()
+    if flight is None:
+        return call(), False
+    content, shared = flight.do(fingerprint(prompt_name, prompt, options, llm_kwargs), call)
+    if shared:
+        record_llm_call_saved("coalesced")
+    return content, shared
+
+
+async def _acoalesce(prompt_name: str, prompt: str, options: Dict[str, Any], llm_kwargs: Dict[str, Any],
+                     acall: Callable[[], Awaitable[str]]) -> Tuple[str, bool]:
+    """Async version of ``_coalesce``."""
+    flight = get_single_flight()
+    if flight is None:
+        return await acall(), False
+    content, shared = await flight.ado(fingerprint(prompt_name, prompt, options, llm_kwargs), acall)
+    if shared:
+        record_llm_call_saved("coalesced")
+    return content, shared
+
+
+def _complete(prompt_name: str, variables: Dict[str, Any], escalated: bool = False, **llm_kwargs) -> str:
+    """
+    Run a prompt through the model it is routed to, serving repeated calls from the evaluation cache.
+
+    Concurrent identical calls share one pending LLM call.
+
+    Args:
+        prompt_name: The prompt name in ``config.json``
+        variables: The prompt variables, including ``response``
+        escalated: Whether to use the larger model configured in ``llm.escalation``
+        **llm_kwargs: Extra arguments for the LLM call
+
+    Returns:
+        str: The LLM output
+    """
+    options = model_options(prompt_name, escalated)
+    prompt = get_prompt(prompt_name).format(**variables)
+
+    def call() -> str:
+        cache, key, content = _cache_lookup(prompt_name, variables, options)
+        if content is None:
+            started = time.perf_counter()
+            result = _send(prompt, options, lambda: get_llm(prompt_name, escalated).invoke(prompt, **llm_kwargs))
+            record_llm_call(_model_name(options), time.perf_counter() - started, result.usage_metadata)
+            content = result.content
+            _cache_store(cache, key, prompt_name, content)
+        return content
+
+    return _coalesce(prompt_name, prompt, options, llm_kwargs, call)[0]
+
+
+async def _acomplete(prompt_name: str, variables: Dict[str, Any], escalated: bool = False, **llm_kwargs) -> str:
+    """Async version of ``_complete``."""
+    options = model_options(prompt_name, escalated)
+    prompt = get_prompt(prompt_name).format(**variables)
+
+    async def acall() -> str:
+        cache, key, content = _cache_lookup(prompt_name, variables, options)
+        if content is None:
+            started = time.perf_counter()
+            result = await _asend(prompt, options, lambda: get_llm(prompt_name, escalated).ainvoke(prompt, **llm_kwargs))
+            record_llm_call(_model_name(options), time.perf_counter() - started, result.usage_metadata)
+            content = result.content
+            _cache_store(cache, key, prompt_name, content)
+        return content
+
+    return (await _acoalesce(prompt_name, prompt, options, llm_kwargs, acall))[0]
+
+
+def _stream_complete(prompt_name: str, variables: Dict[str, Any]) -> str:
+    """
+    Run a prompt through the model it is routed to, passing each output chunk to the listener as it arrives.
+
+    Output served from the cache or shared from an identical concurrent
+    call is passed to the listener in one chunk.
+
+    Args:
+        prompt_name: The prompt name in ``config.json``
+        variables: The prompt variables, including ``response``
+
+    Returns:
+        str: The complete LLM output
+    """
+    events = get_listener()
+    options = model_options(prompt_name)
+    prompt = get_prompt(prompt_name).format(**variables)
+
+    def call() -> str:
+        cache, key, content = _cache_lookup(prompt_name, variables, options)
+        if content is None:
+            started = time.perf_counter()
+            streamed = False
+
+            def stream() -> Any:
+                nonlocal streamed
+                message = None
+                for chunk in get_llm(prompt_name).stream(prompt):
+                    events.on_feedback_token(chunk.content)
+                    streamed = True
+                    message = chunk if message is None else message + chunk
+                return message
+
+            # A stream that failed after passing chunks to the listener is not sent again
+            message = _send(prompt, options, stream, lambda: not streamed)
+            record_llm_call(_model_name(options), time.perf_counter() - started, message.usage_metadata)
+            content = message.content
+            _cache_store(cache, key, prompt_name, content)
+        else:
+            events.on_feedback_token(content)
+        return content
+
+    content, shared = _coalesce(prompt_name, prompt, options, {}, call)
+    if shared:
+        events.on_feedback_token(content)
+    return content
+
+
+async def _astream_complete(prompt_name: str, variables: Dict[str, Any]) -> str:
+    """Async version of ``_stream_complete``."""
+    events = get_listener()
+    options = model_options(prompt_name)
+    prompt = get_prompt(prompt_name).format(**variables)
+
+    async def acall() -> str:
+        cache, key, content = _cache_lookup(prompt_name, variables, options)
+        if content is None:
+            started = time.perf_counter()
+            streamed = False
+
+            async def astream() -> Any:
+                nonlocal streamed
+                message = None
+                async for chunk in get_llm(prompt_name).astream(prompt):
+                    events.on_feedback_token(chunk.content)
+                    streamed = True
+                    message = chunk if message is None else message + chunk
+                return message
+
+            message = await _asend(prompt, options, astream, lambda: not streamed)
+            record_llm_call(_model_name(options), time.perf_counter() - started, message.usage_metadata)
+            content = message.content
+            _cache_store(cache, key, prompt_name, content)
+        else:
+            events.on_feedback_token(content)
+        return content
+
+    content, shared = await _acoalesce(prompt_name, prompt, options, {}, acall)
+    if shared:
+        events.on_feedback_token(content)
+    return content
+
+
+def _apply_known_score(state: TicketState, metric: str) -> bool:
+    """
+    Use a score that is already known for a metric, saving the LLM call.
+
+    Scores reused from a near-duplicate response take precedence over the
+    local pre-scorer's decisions.
+    """
+    reused = state.get("reused_scores")
+    if reused:
+        state[metric] = _reused_score(reused, metric)
+        record_llm_call_saved('near_duplicate')
+        return True
+    score = (state.get("prescores") or {}).get(metric)
+    if score is not None:
+        state[metric] = score
+        record_llm_call_saved('prescore')
+        return True
+    return False
+
+
+def _reused_score(reused: Dict[str, float], metric: str) -> float:
+    """
+    A metric's score from a near-duplicate match.
+
+    Metrics missing from a match were cut off by a threshold gate when it
+    was scored; the index is scoped to the thresholds, so the same gate
+    cuts them off again and they take the skipped score of 0.0.
+    """
+    return reused.get(metric, 0.0)
+
+
+def _apply_rating(state: TicketState, metric: str, node: str, content: str) -> TicketState:
+    """Store the rating parsed from the LLM output, falling back to 0.0 if it cannot be parsed."""
+    try:
+        state[metric] = parse_rating(content)
+    except ValueError as e:
+        get_listener().on_error(f"Error in {node}: {e}")
+        state[metric] = 0.0
+    return state
+
+
+def _near_threshold(metric: str, rating: float) -> bool:
+    """Whether the escalation policy re-asks a rating this close to its metric's threshold gate."""
+    settings = get_settings()
+    threshold = settings.evaluation.thresholds.get(metric.replace('_score', ''))
+    return (settings.llm.escalation is not None and threshold is not None
+            and abs(rating - threshold) <= settings.llm.escalation_margin)
+
+
+def _rate(state: TicketState, prompt_name: str, metric: str, node: str) -> TicketState:
+    """
+    Rate a metric with the model its prompt is routed to.
+
+    When escalation is enabled and the rating falls within the margin of
+    the metric's threshold gate, the larger escalation model is asked
+    again and its rating decides the gate.
+    """
+    variables = {"response": state["response"]}
+    state = _apply_rating(state, metric, node, _complete(prompt_name, variables))
+    if _near_threshold(metric, state[metric]):
+        record_escalation()
+        state = _apply_rating(state, metric, node, _complete(prompt_name, variables, escalated=True))
+    return state
+
+
+async def _arate(state: TicketState, prompt_name: str, metric: str, node: str) -> TicketState:
+    """Async version of ``_rate``."""
+    variables = {"response": state["response"]}
+    state = _apply_rating(state, metric, node, await _acomplete(prompt_name, variables))
+    if _near_threshold(metric, state[metric]):
+        record_escalation()
+        state = _apply_rating(state, metric, node, await _acomplete(prompt_name, variables, escalated=True))
+    return state
 
 
 def evaluate_clarity(state: TicketState) -> TicketState:
     """
     Evaluate the clarity of the support response.
 
+    The LLM call is skipped when the score is reused from a near-duplicate
+    response or decided by the local pre-scorer; the same applies to the
+    other metric nodes.
+
     Args:
         state: The current evaluation state
 
     Returns:
         TicketState: Updated state with clarity score
     """
-    config = load_config()
-    prompt = ChatPromptTemplate.from_template(config['prompts']['clarity']['template'])
+    if _apply_known_score(state, "clarity_score"):
+        return state
+    return _rate(state, 'clarity', "clarity_score", "evaluate_clarity")
 
-    result = get_llm().invoke(prompt.format(response=state["response"]))
-    try:
-        state["clarity_score"] = parse_rating(result.content)
-    except ValueError as e:
-        st.error(f"Error in evaluate_clarity: {e}")
-        state["clarity_score"] = 0.0
-    return state
+
+async def aevaluate_clarity(state: TicketState) -> TicketState:
+    """Async version of ``evaluate_clarity``."""
+    if _apply_known_score(state, "clarity_score"):
+        return state
+    return await _arate(state, 'clarity', "clarity_score", "evaluate_clarity")
 
 
 def assess_politeness(state: TicketState) -> TicketState:
@@ -70,16 +405,16 @@ def assess_politeness(state: TicketState) -> TicketState:
     Returns:
         TicketState: Updated state with politeness score
     """
-    config = load_config()
-    prompt = ChatPromptTemplate.from_template(config['prompts']['politeness']['template'])
+    if _apply_known_score(state, "politeness_score"):
+        return state
+    return _rate(state, 'politeness', "politeness_score", "assess_politeness")
 
-    result = get_llm().invoke(prompt.format(response=state["response"]))
-    try:
-        state["politeness_score"] = parse_rating(result.content)
-    except ValueError as e:
-        st.error(f"Error in assess_politeness: {e}")
-        state["politeness_score"] = 0.0
-    return state
+
+async def aassess_politeness(state: TicketState) -> TicketState:
+    """Async version of ``assess_politeness``."""
+    if _apply_known_score(state, "politeness_score"):
+        return state
+    return await _arate(state, 'politeness', "politeness_score", "assess_politeness")
 
 
 def examine_professionalism(state: TicketState) -> TicketState:
@@ -92,16 +427,16 @@ def examine_professionalism(state: TicketState) -> TicketState:
     Returns:
         TicketState: Updated state with professionalism score
     """
-    config = load_config()
-    prompt = ChatPromptTemplate.from_template(config['prompts']['professionalism']['template'])
+    if _apply_known_score(state, "professionalism_score"):
+        return state
+    return _rate(state, 'professionalism', "professionalism_score", "examine_professionalism")
 
-    result = get_llm().invoke(prompt.format(response=state["response"]))
-    try:
-        state["professionalism_score"] = parse_rating(result.content)
-    except ValueError as e:
-        st.error(f"Error in examine_professionalism: {e}")
-        state["professionalism_score"] = 0.0
-    return state
+
+async def aexamine_professionalism(state: TicketState) -> TicketState:
+    """Async version of ``examine_professionalism``."""
+    if _apply_known_score(state, "professionalism_score"):
+        return state
+    return await _arate(state, 'professionalism', "professionalism_score", "examine_professionalism")
 
 
 def verify_resolution(state: TicketState) -> TicketState:
@@ -114,15 +449,89 @@ def verify_resolution(state: TicketState) -> TicketState:
     Returns:
         TicketState: Updated state with resolution score
     """
-    config = load_config()
-    prompt = ChatPromptTemplate.from_template(config['prompts']['resolution']['template'])
+    if _apply_known_score(state, "resolution_score"):
+        return state
+    return _rate(state, 'resolution', "resolution_score", "verify_resolution")
+
+
+async def averify_resolution(state: TicketState) -> TicketState:
+    """Async version of ``verify_resolution``."""
+    if _apply_known_score(state, "resolution_score"):
+        return state
+    return await _arate(state, 'resolution', "resolution_score", "verify_resolution")
+
 
-    result = get_llm().invoke(prompt.format(response=state["response"]))
+def _apply_rubric(state: TicketState, content: str) -> TicketState:
+    """Store the ratings parsed from the rubric output, falling back to 0.0 if they are invalid."""
     try:
-        state["resolution_score"] = parse_rating(result.content)
+        ratings = parse_rubric(content)
     except ValueError as e:
-        st.error(f"Error in verify_resolution: {e}")
-        state["resolution_score"] = 0.0
+        get_listener().on_error(f"Error in score_rubric: {e}")
+        ratings = {field: 0.0 for field in RUBRIC_FIELDS}
+    for field in RUBRIC_FIELDS:
+        state[f"{field}_score"] = ratings[field]
+    # Metrics decided by the local pre-scorer keep its score, as with the per-metric engine
+    state.update(state.get("prescores") or {})
+    return state
+
+
+def _apply_reused_rubric(state: TicketState) -> bool:
+    """Use the scores reused from a near-duplicate response, saving the rubric call."""
+    reused = state.get("reused_scores")
+    if not reused:
+        return False
+    for field in RUBRIC_FIELDS:
+        state[f"{field}_score"] = _reused_score(reused, f"{field}_score")
+    record_llm_call_saved('near_duplicate')
+    return True
+
+
+def _rubric_near_threshold(state: TicketState) -> bool:
+    """Whether any rubric rating the LLM decided falls near its threshold gate."""
+    prescores = state.get("prescores") or {}
+    return any(
+        _near_threshold(f"{field}_score", state[f"{field}_score"])
+        for field in RUBRIC_FIELDS if f"{field}_score" not in prescores
+    )
+
+
+def score_rubric(state: TicketState) -> TicketState:
+    """
+    Score clarity, politeness, professionalism and resolution in a single call.
+
+    The model returns the four ratings as JSON validated against
+    ``RUBRIC_SCHEMA``, so the response text is only sent once. If a rating
+    falls near its threshold gate, the escalation model re-scores the rubric.
+
+    Args:
+        state: The current evaluation state
+
+    Returns:
+        TicketState: Updated state with all four component scores
+    """
+    if _apply_reused_rubric(state):
+        return state
+    variables = {"response": state["response"]}
+    state = _apply_rubric(state, _complete('rubric', variables, response_format=RUBRIC_RESPONSE_FORMAT))
+    if _rubric_near_threshold(state):
+        record_escalation()
+        state = _apply_rubric(
+            state, _complete('rubric', variables, escalated=True, response_format=RUBRIC_RESPONSE_FORMAT)
+        )
+    return state
+
+
+async def ascore_rubric(state: TicketState) -> TicketState:
+    """Async version of ``score_rubric``."""
+    if _apply_reused_rubric(state):
+        return state
+    variables = {"response": state["response"]}
+    state = _apply_rubric(state, await _acomplete('rubric', variables, response_format=RUBRIC_RESPONSE_FORMAT))
+    if _rubric_near_threshold(state):
+        record_escalation()
+        state = _apply_rubric(
+            state, await _acomplete('rubric', variables, escalated=True, response_format=RUBRIC_RESPONSE_FORMAT)
+        )
     return state
 
 
@@ -136,8 +545,7 @@ def compute_effectiveness(state: TicketState) -> TicketState:
     Returns:
         TicketState: Updated state with effectiveness score
     """
-    settings = load_settings()
-    weights = settings['evaluation']['weights']
+    weights = get_settings().evaluation.weights
 
     state["effectiveness_score"] = (
             state["clarity_score"] * weights['clarity'] +
@@ -145,6 +553,99 @@ def compute_effectiveness(state: TicketState) -> TicketState:
             state["professionalism_score"] * weights['professionalism'] +
             state["resolution_score"] * weights['resolution']
     )
+    remember_scores(state)
+    return state
+
+
+def _feedback_variables(state: TicketState) -> Dict[str, Any]:
+    """Collect the feedback prompt variables from the state."""
+    return {
+        "clarity_score": state["clarity_score"],
+        "politeness_score": state["politeness_score"],
+        "professionalism_score": state["professionalism_score"],
+        "resolution_score": state["resolution_score"],
+        "effectiveness_score": state["effectiveness_score"],
+        "response": state["response"]
+    }
+
+
+def _failed_gate(state: TicketState) -> Optional[str]:
+    """The first gated metric at or below its threshold, which cut the sequential evaluation short."""
+    thresholds = get_settings().evaluation.thresholds
+    for metric in GATED_METRICS:
+        if not state[f"{metric}_score"] > thresholds[metric]:
+            return metric
+    return None
+
+
+def feedback_template(state: TicketState) -> Optional[str]:
+    """
+    Pick the feedback template the ``feedback`` policy serves a ticket from.
+
+    Tickets cut short by a threshold gate get the ``gated`` template, the
+    others the template of their effectiveness band, unless the band is
+    one the LLM writes feedback for.
+
+    Args:
+        state: The evaluation state with the effectiveness score computed
+
+    Returns:
+        Optional[str]: The template name in ``config.json``, or None if the LLM writes the feedback
+    """
+    settings = get_settings()
+    if settings.feedback.policy != FEEDBACK_POLICY_TEMPLATES:
+        return None
+    templates = get_app_config().feedback_templates
+    if FEEDBACK_TEMPLATE_GATED in templates and _failed_gate(state) is not None:
+        return FEEDBACK_TEMPLATE_GATED
+    band = score_band(state["effectiveness_score"], settings.evaluation)
+    if band in settings.feedback.llm_bands or band not in templates:
+        return None
+    return band
+
+
+def render_feedback(name: str, state: TicketState) -> str:
+    """
+    Fill in a feedback template with a ticket's scores.
+
+    Args:
+        name: The template name in ``config.json``
+        state: The evaluation state with the effectiveness score computed
+
+    Returns:
+        str: The feedback markdown
+    """
+    evaluation = get_settings().evaluation
+    ranked = sorted(METRICS, key=lambda metric: state[f"{metric}_score"])
+    gate = _failed_gate(state)
+    variables = {
+        **{f"{metric}_score": state[f"{metric}_score"] for metric in METRICS},
+        "effectiveness_score": state["effectiveness_score"],
+        "band": score_band(state["effectiveness_score"], evaluation),
+        "strongest": METRIC_FRIENDLY_NAMES[f"{ranked[-1]}_score"],
+        "strongest_score": state[f"{ranked[-1]}_score"],
+        "weakest": METRIC_FRIENDLY_NAMES[f"{ranked[0]}_score"],
+        "weakest_score": state[f"{ranked[0]}_score"],
+        "failed_gate": METRIC_FRIENDLY_NAMES[f"{gate}_score"] if gate else "",
+        "failed_gate_score": state[f"{gate}_score"] if gate else 0.0,
+        "failed_gate_threshold": evaluation.thresholds[gate] if gate else 0.0
+    }
+    return get_app_config().feedback_templates[name].format_map(variables)
+
+
+def _template_feedback(state: TicketState, template: str, started: float) -> TicketState:
+    """Serve a ticket's feedback from a template, saving the feedback LLM call."""
+    state["feedback"] = render_feedback(template, state)
+    get_listener().on_feedback_token(state["feedback"])
+    record_llm_call_saved("template")
+    return _feedback_written(state, FEEDBACK_SOURCE_TEMPLATE, started)
+
+
+def _feedback_written(state: TicketState, source: str, started: float) -> TicketState:
+    """Record where a ticket's feedback came from and how long it took."""
+    state["feedback_source"] = source
+    record_feedback(score_band(state["effectiveness_score"], get_settings().evaluation), source,
+                    time.perf_counter() - started)
     return state
 
 
@@ -152,22 +653,74 @@ def generate_feedback(state: TicketState) -> TicketState:
     """
     Generate actionable feedback for the support agent.
 
+    Bands the ``feedback`` policy serves from templates get their feedback
+    without an LLM call. Otherwise the feedback is streamed to the listener
+    when it asks for it, so front ends can render the text while it is
+    being generated.
+
     Args:
         state: The current evaluation state
 
     Returns:
         TicketState: Updated state with feedback
     """
-    config = load_config()
-    prompt = ChatPromptTemplate.from_template(config['prompts']['feedback']['template'])
-
-    result = get_llm().invoke(prompt.format(
-        clarity_score=state["clarity_score"],
-        politeness_score=state["politeness_score"],
-        professionalism_score=state["professionalism_score"],
-        resolution_score=state["resolution_score"],
-        effectiveness_score=state["effectiveness_score"],
-        response=state["response"]
-    ))
-    state["feedback"] = result.content
-    return state
\ No newline at end of file
+    started = time.perf_counter()
+    template = feedback_template(state)
+    if template is not None:
+        return _template_feedback(state, template, started)
+    return generate_llm_feedback(state)
+
+
+async def agenerate_feedback(state: TicketState) -> TicketState:
+    """Async version of ``generate_feedback``."""
+    started = time.perf_counter()
+    template = feedback_template(state)
+    if template is not None:
+        return _template_feedback(state, template, started)
+    if get_listener().streams_feedback:
+        state["feedback"] = await _astream_complete('feedback', _feedback_variables(state))
+    else:
+        state["feedback"] = await _acomplete('feedback', _feedback_variables(state))
+    return _feedback_written(state, FEEDBACK_SOURCE_LLM, started)
+
+
+def generate_llm_feedback(state: TicketState) -> TicketState:
+    """
+    Have the LLM write a ticket's feedback whatever the ``feedback`` policy,
+    e.g. when asked for from the UI.
+
+    Args:
+        state: The evaluation state with the effectiveness score computed
+
+    Returns:
+        TicketState: Updated state with feedback
+    """
+    started = time.perf_counter()
+    if get_listener().streams_feedback:
+        state["feedback"] = _stream_complete('feedback', _feedback_variables(state))
+    else:
+        state["feedback"] = _complete('feedback', _feedback_variables(state))
+    return _feedback_written(state, FEEDBACK_SOURCE_LLM, started)
+
+
+def feedback_stats() -> Dict[str, Any]:
+    """
+    Get the share of tickets whose feedback came from templates and the latency they saved.
+
+    The latency saved is estimated from the mean time the LLM took to
+    write the feedback of the other tickets.
+
+    Returns:
+        Dict[str, Any]: Tickets, template-served tickets, their share, and the estimated
+        seconds saved, None until the LLM has written any feedback
+    """
+    metrics = get_metrics()
+    templates, template_seconds = metrics.summary('evaluator_feedback_seconds', {'source': FEEDBACK_SOURCE_TEMPLATE})
+    llm, llm_seconds = metrics.summary('evaluator_feedback_seconds', {'source': FEEDBACK_SOURCE_LLM})
+    tickets = templates + llm
+    return {
+        'tickets': int(tickets),
+        'templates': int(templates),
+        'template_share': templates / tickets if tickets else 0.0,
+        'latency_saved': templates * llm_seconds / llm - template_seconds if llm else None
+    }
@@ -0,0 +1,77 @@
+"""
+Progress and error reporting interface between the evaluation core and its front ends.
+
+The evaluation core never talks to a UI directly. It reports to the
+listener installed for the current context with ``use_listener``; front
+ends such as the Streamlit app provide their own listener, and headless
+callers get the logging listener by default.
+"""
+
+import logging
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class EvaluationListener:
+    """Receives events from an evaluation. The default implementation logs them."""
+
+    # Whether the feedback node should stream its output through ``on_feedback_token``
+    streams_feedback = False
+
+    def on_start(self, response: str) -> None:
+        """Called before the workflow starts."""
+        logger.debug("Evaluating response (%d characters)", len(response))
+
+    def on_progress(self, fraction: float, message: str = "") -> None:
+        """Called as the workflow advances, with ``fraction`` between 0 and 1."""
+        logger.debug("Evaluation progress %.0f%% %s", fraction * 100, message)
+
+    def on_node_complete(self, node: str, scores: Dict[str, float]) -> None:
+        """Called after each workflow node finishes, with the scores known so far."""
+        logger.debug("Node %s complete: %s", node, scores)
+
+    def on_feedback_token(self, token: str) -> None:
+        """Called with each chunk of feedback text as it is generated, if ``streams_feedback`` is set."""
+
+    def on_error(self, message: str) -> None:
+        """Called for recoverable node errors and for failed evaluations."""
+        logger.error(message)
+
+    def on_complete(self, result: Dict[str, Any]) -> None:
+        """Called with the final state once the workflow has finished."""
+        logger.debug("Evaluation complete: effectiveness %.2f", result['effectiveness_score'])
+
+
+_default_listener = EvaluationListener()
+_listener: ContextVar[Optional[EvaluationListener]] = ContextVar("evaluation_listener", default=None)
+
+
+def get_listener() -> EvaluationListener:
+    """
+    Get the listener for the current context.
+
+    Returns:
+        EvaluationListener: The installed listener, or the logging listener
+    """
+    return _listener.get() or _default_listener
+
+
+@contextmanager
+def use_listener(listener: Optional[EvaluationListener]) -> Iterator[EvaluationListener]:
+    """
+    Install a listener for the evaluations run inside the block.
+
+    Args:
+        listener: The listener, or None for the logging listener
+
+    Yields:
+        EvaluationListener: The active listener
+    """
+    token = _listener.set(listener)
+    try:
+        yield get_listener()
+    finally:
+        _listener.reset(token)
@@ -0,0 +1,232 @@
+"""
+Offline, deterministic chat model for exercising the evaluator without OpenAI.
+
+Selected with ``llm.provider: "fake"`` in ``settings.yaml``. Ratings are
+derived from a hash of the prompt, so the same response always gets the
+same scores, while latency and injected errors follow the configured
+profile to mimic a real provider under load.
+"""
+
+import time
+import random
+import asyncio
+import hashlib
+import threading
+from typing import Any, AsyncIterator, Dict, Iterator, List, Optional
+
+from langchain_core.language_models.chat_models import BaseChatModel
+from langchain_core.messages import AIMessage, AIMessageChunk, BaseMessage
+from langchain_core.outputs import ChatGeneration, ChatGenerationChunk, ChatResult
+from pydantic import PrivateAttr
+
+from src.constants import RUBRIC_FIELDS
+
+# Characters per token used to estimate usage, matching OpenAI's rule of thumb
+CHARS_PER_TOKEN = 4
+
+# Number of output tokens per streamed chunk, and the fraction of the latency spent before the first chunk
+STREAM_CHUNK_TOKENS = 4
+STREAM_FIRST_CHUNK_SHARE = 0.3
+
+FEEDBACK_TEXT = (
+    "### Strengths\n"
+    "- The response acknowledges the customer's issue and keeps a courteous tone.\n\n"
+    "### Areas for Improvement\n"
+    "- State the concrete next step and when the customer should expect it.\n"
+    "- Trim repeated phrases so the key information stands out.\n"
+)
+
+
+class FakeRateLimitError(RuntimeError):
+    """Injected provider rate-limit error, carrying an HTTP status and Retry-After hint."""
+
+    def __init__(self, retry_after: float):
+        super().__init__(f"Rate limit reached (fake provider), retry after {retry_after:.1f}s")
+        self.status_code = 429
+        self.retry_after = retry_after
+
+
+class FakeServerError(RuntimeError):
+    """Injected provider server error."""
+
+    def __init__(self):
+        super().__init__("Internal server error (fake provider)")
+        self.status_code = 500
+
+
+def _stable_fraction(*parts: str) -> float:
+    """Map the given strings to a stable number in [0, 1)."""
+    digest = hashlib.sha256("\x1f".join(parts).encode('utf-8')).digest()
+    return int.from_bytes(digest[:8], 'big') / 2 ** 64
+
+
+def fake_rating(prompt: str, field: str = "") -> float:
+    """
+    Get the deterministic rating the fake backend gives a prompt.
+
+    Args:
+        prompt: The full prompt text
+        field: Optional rubric field, so fused ratings differ per metric
+
+    Returns:
+        float: A rating between 0.3 and 1.0, rounded to two decimals
+    """
+    return round(0.3 + 0.7 * _stable_fraction(prompt, field), 2)
+
+
+class FakeChatModel(BaseChatModel):
+    """Deterministic chat model with configurable latency and error injection."""
+
+    profile: str = "default"
+    latency: float = 0.05
+    jitter: float = 0.0
+    rate_limit_rate: float = 0.0
+    timeout_rate: float = 0.0
+    server_error_rate: float = 0.0
+    retry_after: float = 1.0
+    rpm_limit: float = 0.0
+    feedback_repeat: int = 1
+    seed: int = 0
+
+    _rng: random.Random = PrivateAttr()
+    _rng_lock: threading.Lock = PrivateAttr()
+    _allowance: float = PrivateAttr()
+    _allowance_at: float = PrivateAttr()
+
+    def model_post_init(self, __context: Any) -> None:
+        self._rng = random.Random(self.seed)
+        self._rng_lock = threading.Lock()
+        self._allowance = self.rpm_limit / 60
+        self._allowance_at = time.monotonic()
+
+    @property
+    def _llm_type(self) -> str:
+        return "fake-evaluator"
+
+    @property
+    def model_name(self) -> str:
+        return f"fake-{self.profile}"
+
+    def _draw(self) -> float:
+        with self._rng_lock:
+            return self._rng.random()
+
+    def _delay(self) -> float:
+        return self.latency + self.jitter * self._draw()
+
+    def _check_rpm_limit(self) -> None:
+        """Reject requests beyond ``rpm_limit``, allowing bursts of one second's worth like a provider would."""
+        rate = self.rpm_limit / 60
+        with self._rng_lock:
+            now = time.monotonic()
+            self._allowance = min(rate, self._allowance + (now - self._allowance_at) * rate)
+            self._allowance_at = now
+            if self._allowance < 1:
+                raise FakeRateLimitError((1 - self._allowance) / rate)
+            self._allowance -= 1
+
+    def _maybe_fail(self) -> None:
+        """Raise an injected error according to the profile's request limit and error rates."""
+        if self.rpm_limit:
+            self._check_rpm_limit()
+        draw = self._draw()
+        if draw < self.rate_limit_rate:
+            raise FakeRateLimitError(self.retry_after)
+        draw -= self.rate_limit_rate
+        if draw < self.timeout_rate:
+            raise TimeoutError("Request timed out (fake provider)")
+        draw -= self.timeout_rate
+        if draw < self.server_error_rate:
+            raise FakeServerError()
+
+    def _reply(self, prompt: str, **kwargs: Any) -> str:
+        """Build the deterministic reply for a prompt."""
+        if kwargs.get('response_format') is not None:
+            ratings = {field: fake_rating(prompt, field) for field in RUBRIC_FIELDS}
+            fields = ", ".join(f'"{field}": {rating}' for field, rating in ratings.items())
+            return "{" + fields + ', "explanation": "Deterministic offline rubric."}'
+        if "Rating:" in prompt:
+            return f"Rating: {fake_rating(prompt)}\nDeterministic offline evaluation."
+        return FEEDBACK_TEXT * self.feedback_repeat
+
+    @staticmethod
+    def _usage(prompt: str, content: str) -> Dict[str, int]:
+        input_tokens = max(1, len(prompt) // CHARS_PER_TOKEN)
+        output_tokens = max(1, len(content) // CHARS_PER_TOKEN)
+        return {
+            'input_tokens': input_tokens,
+            'output_tokens': output_tokens,
+            'total_tokens': input_tokens + output_tokens
+        }
+
+    def _result(self, messages: List[BaseMessage], **kwargs: Any) -> ChatResult:
+        prompt = "\n".join(str(message.content) for message in messages)
+        content = self._reply(prompt, **kwargs)
+        message = AIMessage(
+            content=content,
+            usage_metadata=self._usage(prompt, content),
+            response_metadata={'model_name': self.model_name}
+        )
+        return ChatResult(generations=[ChatGeneration(message=message)])
+
+    def _chunks(self, messages: List[BaseMessage], **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        """Split the reply into chunks, with the usage attached to the last one like OpenAI does."""
+        prompt = "\n".join(str(message.content) for message in messages)
+        content = self._reply(prompt, **kwargs)
+        size = STREAM_CHUNK_TOKENS * CHARS_PER_TOKEN
+        for start in range(0, len(content), size):
+            yield ChatGenerationChunk(message=AIMessageChunk(content=content[start:start + size]))
+        yield ChatGenerationChunk(message=AIMessageChunk(
+            content="",
+            usage_metadata=self._usage(prompt, content),
+            response_metadata={'model_name': self.model_name}
+        ))
+
+    def _generate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                  run_manager=None, **kwargs: Any) -> ChatResult:
+        time.sleep(self._delay())
+        self._maybe_fail()
+        return self._result(messages, **kwargs)
+
+    async def _agenerate(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                         run_manager=None, **kwargs: Any) -> ChatResult:
+        await asyncio.sleep(self._delay())
+        self._maybe_fail()
+        return self._result(messages, **kwargs)
+
+    def _stream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                run_manager=None, **kwargs: Any) -> Iterator[ChatGenerationChunk]:
+        delay = self._delay()
+        time.sleep(delay * STREAM_FIRST_CHUNK_SHARE)
+        self._maybe_fail()
+        chunks = list(self._chunks(messages, **kwargs))
+        for chunk in chunks:
+            time.sleep(delay * (1 - STREAM_FIRST_CHUNK_SHARE) / len(chunks))
+            yield chunk
+
+    async def _astream(self, messages: List[BaseMessage], stop: Optional[List[str]] = None,
+                       run_manager=None, **kwargs: Any) -> AsyncIterator[ChatGenerationChunk]:
+        delay = self._delay()
+        await asyncio.sleep(delay * STREAM_FIRST_CHUNK_SHARE)
+        self._maybe_fail()
+        chunks = list(self._chunks(messages, **kwargs))
+        for chunk in chunks:
+            await asyncio.sleep(delay * (1 - STREAM_FIRST_CHUNK_SHARE) / len(chunks))
+            yield chunk
+
+
+def create_fake_model(fake_settings: Dict[str, Any]) -> FakeChatModel:
+    """
+    Create the fake chat model for the active profile in the ``llm.fake`` settings.
+
+    Args:
+        fake_settings: The ``llm.fake`` section of the settings
+
+    Returns:
+        FakeChatModel: The configured fake model
+    """
+    profile = fake_settings.get('profile', 'default')
+    options = fake_settings.get('profiles', {}).get(profile)
+    if options is None:
+        raise ValueError(f"Unknown fake LLM profile '{profile}'")
+    return FakeChatModel(profile=profile, seed=fake_settings.get('seed', 0), **options)
@@ -0,0 +1,545 @@
+"""
+Per-node instrumentation for the evaluation workflow.
+
+Every graph node is wrapped to record its wall time, and every LLM call
+made inside a node adds its latency, token usage and estimated cost. The
+threshold branches taken are recorded as well. Each ticket produces one
+structured JSON log record, and all figures are aggregated into
+Prometheus-style metrics that can be written to a file or served over HTTP.
+"""
+
+import os
+import json
+import time
+import random
+import logging
+import cProfile
+import datetime
+import threading
+import functools
+from contextlib import contextmanager
+from contextvars import ContextVar
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+from src.utils.helpers import load_settings
+
+logger = logging.getLogger(__name__)
+
+HISTOGRAM_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+METRIC_DEFINITIONS = {
+    'evaluator_tickets_total': ('counter', 'Tickets evaluated, by outcome'),
+    'evaluator_ticket_duration_seconds': ('histogram', 'End-to-end wall time per ticket'),
+    'evaluator_node_duration_seconds': ('histogram', 'Wall time per graph node'),
+    'evaluator_llm_latency_seconds': ('histogram', 'LLM call latency per node and model'),
+    'evaluator_llm_calls_total': ('counter', 'LLM calls per node and model, by cache status'),
+    'evaluator_llm_tokens_total': ('counter', 'LLM tokens per node and model, by token type'),
+    'evaluator_llm_cost_usd_total': ('counter', 'Estimated LLM cost in USD per model'),
+    'evaluator_gate_total': ('counter', 'Threshold gate decisions, by gate and outcome'),
+    'evaluator_llm_calls_saved_total': ('counter', 'LLM calls avoided per node, by reason'),
+    'evaluator_llm_escalations_total': ('counter', 'Near-threshold ratings re-asked of the escalation model per node'),
+    'evaluator_llm_retries_total': ('counter', 'LLM calls retried per node and model, by reason'),
+    'evaluator_llm_throttle_seconds': ('histogram', 'Time LLM calls wait for the rate limits per model'),
+    'evaluator_feedback_total': ('counter', 'Feedback written per effectiveness band, by source'),
+    'evaluator_feedback_seconds': ('histogram', 'Time to write the feedback of a ticket, by source'),
+    'evaluator_near_duplicate_lookups_total': ('counter', 'Near-duplicate index lookups, by outcome'),
+    'evaluator_preprocess_tokens_saved_total': ('counter', 'Response tokens removed by pre-processing'),
+    'evaluator_checkpoint_runs_total': ('counter', 'Checkpointed evaluations, by whether they started, resumed or '
+                                                   'were restored complete'),
+    'evaluator_service_requests_total': ('counter', 'HTTP service responses, by endpoint and status'),
+    'evaluator_service_queue_wait_seconds': ('histogram', 'Time tickets wait in the service queue'),
+}
+
+LabelSet = Tuple[Tuple[str, str], ...]
+
+
+class MetricsRegistry:
+    """Thread-safe store of counters and histograms rendered in Prometheus text format."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._counters: Dict[Tuple[str, LabelSet], float] = {}
+        self._histograms: Dict[Tuple[str, LabelSet], List[float]] = {}
+
+    @staticmethod
+    def _labels(labels: Dict[str, Any]) -> LabelSet:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    def inc(self, name: str, labels: Dict[str, Any], value: float = 1.0) -> None:
+        """Increase a counter."""
+        key = (name, self._labels(labels))
+        with self._lock:
+            self._counters[key] = self._counters.get(key, 0.0) + value
+
+    def observe(self, name: str, labels: Dict[str, Any], value: float) -> None:
+        """Record a histogram observation."""
+        key = (name, self._labels(labels))
+        with self._lock:
+            # Layout: one count per bucket, then +Inf count, then sum
+            histogram = self._histograms.setdefault(key, [0.0] * (len(HISTOGRAM_BUCKETS) + 2))
+            for index, bound in enumerate(HISTOGRAM_BUCKETS):
+                if value <= bound:
+                    histogram[index] += 1
+            histogram[-2] += 1
+            histogram[-1] += value
+
+    def total(self, name: str, labels: Optional[Dict[str, Any]] = None) -> float:
+        """Sum a counter over all label sets matching ``labels``."""
+        wanted = set(self._labels(labels or {}))
+        with self._lock:
+            return sum(value for (counter, label_set), value in self._counters.items()
+                       if counter == name and wanted.issubset(label_set))
+
+    def summary(self, name: str, labels: Optional[Dict[str, Any]] = None) -> Tuple[float, float]:
+        """Sum the count and total of a histogram over all label sets matching ``labels``."""
+        wanted = set(self._labels(labels or {}))
+        count = total = 0.0
+        with self._lock:
+            for (histogram_name, label_set), histogram in self._histograms.items():
+                if histogram_name == name and wanted.issubset(label_set):
+                    count += histogram[-2]
+                    total += histogram[-1]
+        return count, total
+
+    def reset(self) -> None:
+        with self._lock:
+            self._counters.clear()
+            self._histograms.clear()
+
+    def render(self) -> str:
+        """
+        Render all metrics in the Prometheus text exposition format.
+
+        Returns:
+            str: The metrics text
+        """
+        def format_labels(labels: LabelSet, extra: Tuple[Tuple[str, str], ...] = ()) -> str:
+            pairs = labels + extra
+            if not pairs:
+                return ""
+            escaped = (f'{key}="{value}"'.replace('\n', ' ') for key, value in pairs)
+            return "{" + ",".join(escaped) + "}"
+
+        lines = []
+        with self._lock:
+            for name, (metric_type, help_text) in METRIC_DEFINITIONS.items():
+                lines.append(f"# HELP {name} {help_text}")
+                lines.append(f"# TYPE {name} {metric_type}")
+                if metric_type == 'counter':
+                    for (metric, labels), value in sorted(self._counters.items()):
+                        if metric == name:
+                            lines.append(f"{name}{format_labels(labels)} {value:g}")
+                    continue
+                for (metric, labels), histogram in sorted(self._histograms.items()):
+                    if metric != name:
+                        continue
+                    for bound, count in zip(HISTOGRAM_BUCKETS, histogram):
+                        lines.append(f"{name}_bucket{format_labels(labels, (('le', f'{bound:g}'),))} {count:g}")
+                    lines.append(f"{name}_bucket{format_labels(labels, (('le', '+Inf'),))} {histogram[-2]:g}")
+                    lines.append(f"{name}_sum{format_labels(labels)} {histogram[-1]:.6f}")
+                    lines.append(f"{name}_count{format_labels(labels)} {histogram[-2]:g}")
+        return "\n".join(lines) + "\n"
+
+
+class TicketTrace:
+    """Collects the node, LLM call and gate records of one ticket evaluation."""
+
+    def __init__(self, ticket_id: Optional[str] = None):
+        self.ticket_id = ticket_id
+        self.started = time.perf_counter()
+        self.nodes: List[Dict[str, Any]] = []
+        self.gates: List[Dict[str, Any]] = []
+        self._lock = threading.Lock()
+
+    def add_node(self, record: Dict[str, Any]) -> None:
+        with self._lock:
+            self.nodes.append(record)
+
+    def add_gate(self, gate: str, passed: bool) -> None:
+        with self._lock:
+            self.gates.append({'gate': gate, 'passed': passed})
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summarize the trace as a JSON-serializable record."""
+        with self._lock:
+            nodes = list(self.nodes)
+            gates = list(self.gates)
+        return {
+            'event': 'ticket_evaluated',
+            'timestamp': datetime.datetime.now().isoformat(timespec='milliseconds'),
+            'ticket_id': self.ticket_id,
+            'duration': time.perf_counter() - self.started,
+            'llm_latency': sum(node['llm_latency'] for node in nodes),
+            'llm_calls_saved': sum(node['llm_calls_saved'] for node in nodes),
+            'escalations': sum(node['escalations'] for node in nodes),
+            'retries': sum(node['retries'] for node in nodes),
+            'prompt_tokens': sum(node['prompt_tokens'] for node in nodes),
+            'completion_tokens': sum(node['completion_tokens'] for node in nodes),
+            'cost_usd': sum(node['cost_usd'] for node in nodes),
+            'models': _merge_model_usage(node['models'] for node in nodes),
+            'nodes': nodes,
+            'gates': gates
+        }
+
+
+def _merge_model_usage(usages: Iterable[Dict[str, Dict[str, float]]]) -> Dict[str, Dict[str, float]]:
+    """Sum per-model usage records across nodes."""
+    merged: Dict[str, Dict[str, float]] = {}
+    for usage in usages:
+        for model, figures in usage.items():
+            totals = merged.setdefault(model, dict.fromkeys(figures, 0))
+            for name, value in figures.items():
+                totals[name] += value
+    return merged
+
+
+_metrics = MetricsRegistry()
+_current_trace: ContextVar[Optional[TicketTrace]] = ContextVar("evaluator_trace", default=None)
+_current_node: ContextVar[Optional[Dict[str, Any]]] = ContextVar("evaluator_node", default=None)
+_log_lock = threading.Lock()
+
+
+def get_metrics() -> MetricsRegistry:
+    """
+    Get the process-wide metrics registry.
+
+    Returns:
+        MetricsRegistry: The shared registry
+    """
+    return _metrics
+
+
+def _settings() -> Dict[str, Any]:
+    return load_settings().get('instrumentation', {})
+
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int) -> float:
+    """
+    Estimate the cost of an LLM call from the ``instrumentation.pricing`` table.
+
+    Args:
+        model: The model name
+        prompt_tokens: Prompt token count
+        completion_tokens: Completion token count
+
+    Returns:
+        float: Estimated cost in USD, 0.0 for models without a price
+    """
+    price = _settings().get('pricing', {}).get(model)
+    if not price:
+        return 0.0
+    return (prompt_tokens * price.get('prompt', 0.0) + completion_tokens * price.get('completion', 0.0)) / 1_000_000
+
+
+def _start_node(name: str) -> Dict[str, Any]:
+    return {
+        'node': name,
+        'wall': 0.0,
+        'llm_latency': 0.0,
+        'llm_calls': 0,
+        'llm_calls_saved': 0,
+        'escalations': 0,
+        'retries': 0,
+        'cache_hits': 0,
+        'prompt_tokens': 0,
+        'completion_tokens': 0,
+        'cost_usd': 0.0,
+        'models': {}
+    }
+
+
+def _finish_node(record: Dict[str, Any], started: float) -> None:
+    record['wall'] = time.perf_counter() - started
+    _metrics.observe('evaluator_node_duration_seconds', {'node': record['node']}, record['wall'])
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_node(record)
+
+
+def instrument_node(name: str, func: Callable) -> Callable:
+    """
+    Wrap a sync graph node so its wall time and LLM usage are recorded.
+
+    Args:
+        name: The node name
+        func: The node function
+
+    Returns:
+        Callable: The instrumented node function
+    """
+    @functools.wraps(func)
+    def wrapper(state):
+        record = _start_node(name)
+        token = _current_node.set(record)
+        started = time.perf_counter()
+        try:
+            return func(state)
+        finally:
+            _current_node.reset(token)
+            _finish_node(record, started)
+    return wrapper
+
+
+def ainstrument_node(name: str, afunc: Callable) -> Callable:
+    """Async version of ``instrument_node``."""
+    @functools.wraps(afunc)
+    async def wrapper(state):
+        record = _start_node(name)
+        token = _current_node.set(record)
+        started = time.perf_counter()
+        try:
+            return await afunc(state)
+        finally:
+            _current_node.reset(token)
+            _finish_node(record, started)
+    return wrapper
+
+
+def record_llm_call(model: str, latency: float, usage: Optional[Dict[str, Any]], cached: bool = False) -> None:
+    """
+    Record one LLM call made by the current node.
+
+    Args:
+        model: The model name
+        latency: Seconds spent waiting for the LLM (or the cache)
+        usage: The ``usage_metadata`` of the reply, if any
+        cached: Whether the output was served from the evaluation cache
+    """
+    record = _current_node.get()
+    node = record['node'] if record is not None else 'unknown'
+    prompt_tokens = (usage or {}).get('input_tokens', 0)
+    completion_tokens = (usage or {}).get('output_tokens', 0)
+    cost = 0.0 if cached else estimate_cost(model, prompt_tokens, completion_tokens)
+
+    labels = {'node': node, 'model': model}
+    _metrics.inc('evaluator_llm_calls_total', {**labels, 'cache': 'hit' if cached else 'miss'})
+    if not cached:
+        _metrics.observe('evaluator_llm_latency_seconds', labels, latency)
+        _metrics.inc('evaluator_llm_tokens_total', {**labels, 'type': 'prompt'}, prompt_tokens)
+        _metrics.inc('evaluator_llm_tokens_total', {**labels, 'type': 'completion'}, completion_tokens)
+        _metrics.inc('evaluator_llm_cost_usd_total', {'model': model}, cost)
+
+    if record is not None:
+        record['llm_calls'] += 1
+        record['cache_hits'] += int(cached)
+        record['llm_latency'] += latency
+        record['prompt_tokens'] += prompt_tokens
+        record['completion_tokens'] += completion_tokens
+        record['cost_usd'] += cost
+        usage_by_model = record['models'].setdefault(model, {
+            'llm_calls': 0, 'cache_hits': 0, 'llm_latency': 0.0, 'prompt_tokens': 0, 'completion_tokens': 0,
+            'cost_usd': 0.0
+        })
+        usage_by_model['llm_calls'] += 1
+        usage_by_model['cache_hits'] += int(cached)
+        usage_by_model['llm_latency'] += latency
+        usage_by_model['prompt_tokens'] += prompt_tokens
+        usage_by_model['completion_tokens'] += completion_tokens
+        usage_by_model['cost_usd'] += cost
+
+
+def record_llm_call_saved(reason: str) -> None:
+    """
+    Record an LLM call the current node did not need to make.
+
+    Args:
+        reason: What made the call unnecessary (e.g. ``prescore``)
+    """
+    record = _current_node.get()
+    node = record['node'] if record is not None else 'unknown'
+    _metrics.inc('evaluator_llm_calls_saved_total', {'node': node, 'reason': reason})
+    if record is not None:
+        record['llm_calls_saved'] += 1
+
+
+def record_feedback(band: str, source: str, seconds: float) -> None:
+    """
+    Record how a ticket's feedback was written.
+
+    Args:
+        band: The ticket's effectiveness band
+        source: ``template`` or ``llm``
+        seconds: Time taken to write the feedback
+    """
+    _metrics.inc('evaluator_feedback_total', {'band': band, 'source': source})
+    _metrics.observe('evaluator_feedback_seconds', {'source': source}, seconds)
+
+
+def record_escalation() -> None:
+    """Record that the current node re-asked a near-threshold rating of the escalation model."""
+    record = _current_node.get()
+    node = record['node'] if record is not None else 'unknown'
+    _metrics.inc('evaluator_llm_escalations_total', {'node': node})
+    if record is not None:
+        record['escalations'] += 1
+
+
+def record_llm_retry(model: str, reason: str) -> None:
+    """
+    Record that the current node is retrying a failed LLM call.
+
+    Args:
+        model: The model name
+        reason: Why the call failed (e.g. ``rate_limit``)
+    """
+    record = _current_node.get()
+    node = record['node'] if record is not None else 'unknown'
+    _metrics.inc('evaluator_llm_retries_total', {'node': node, 'model': model, 'reason': reason})
+    if record is not None:
+        record['retries'] += 1
+
+
+def node_retries() -> Tuple[str, int]:
+    """
+    Get the node running in the current context and the LLM calls it has retried.
+
+    Returns:
+        Tuple[str, int]: The node name, or ``unknown`` outside a node, and its retry count
+    """
+    record = _current_node.get()
+    if record is None:
+        return 'unknown', 0
+    return record['node'], record['retries']
+
+
+def record_gate(gate: str, passed: bool) -> None:
+    """
+    Record a threshold gate decision.
+
+    Args:
+        gate: The threshold name (e.g. ``clarity``)
+        passed: Whether the score passed the threshold
+    """
+    _metrics.inc('evaluator_gate_total', {'gate': gate, 'outcome': 'pass' if passed else 'stop'})
+    trace = _current_trace.get()
+    if trace is not None:
+        trace.add_gate(gate, passed)
+
+
+def _emit(record: Dict[str, Any]) -> None:
+    """Write a structured log record to the configured JSON log file, or the logger."""
+    settings = _settings()
+    line = json.dumps(record, default=str)
+    log_path = settings.get('json_log_path')
+    if log_path:
+        os.makedirs(os.path.dirname(log_path) or '.', exist_ok=True)
+        with _log_lock, open(log_path, 'a') as log_file:
+            log_file.write(line + '\n')
+    elif settings.get('json_logs', False):
+        logger.info(line)
+
+
+@contextmanager
+def trace_ticket(ticket_id: Optional[str] = None) -> Iterator[TicketTrace]:
+    """
+    Trace one ticket evaluation, emitting its JSON log record and metrics on exit.
+
+    Args:
+        ticket_id: Optional ticket ID included in the log record
+
+    Yields:
+        TicketTrace: The trace collecting node and gate records
+    """
+    trace = TicketTrace(ticket_id)
+    token = _current_trace.set(trace)
+    outcome = 'error'
+    try:
+        yield trace
+        outcome = 'success'
+    finally:
+        _current_trace.reset(token)
+        record = trace.to_dict()
+        record['outcome'] = outcome
+        _metrics.inc('evaluator_tickets_total', {'outcome': outcome})
+        _metrics.observe('evaluator_ticket_duration_seconds', {}, record['duration'])
+        _emit(record)
+        metrics_file = _settings().get('metrics_file')
+        if metrics_file:
+            write_metrics_file(metrics_file)
+
+
+@contextmanager
+def maybe_profile() -> Iterator[Optional[cProfile.Profile]]:
+    """
+    Capture a cProfile of the block for a sampled fraction of tickets.
+
+    The fraction is ``instrumentation.profile_sample_rate``; profiles are
+    written to ``instrumentation.profile_dir`` and can be opened with pstats
+    or snakeviz.
+
+    Yields:
+        Optional[cProfile.Profile]: The active profiler, or None if not sampled
+    """
+    settings = _settings()
+    if random.random() >= settings.get('profile_sample_rate', 0.0):
+        yield None
+        return
+
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield profiler
+    finally:
+        profiler.disable()
+        profile_dir = settings.get('profile_dir', '.cache/profiles')
+        os.makedirs(profile_dir, exist_ok=True)
+        path = os.path.join(profile_dir, f"ticket-{datetime.datetime.now().strftime('%Y%m%d-%H%M%S-%f')}.prof")
+        profiler.dump_stats(path)
+        _emit({'event': 'profile_captured', 'path': path})
+
+
+def render_prometheus() -> str:
+    """
+    Render the metrics in Prometheus text format.
+
+    Returns:
+        str: The metrics text
+    """
+    return _metrics.render()
+
+
+def write_metrics_file(path: str) -> None:
+    """
+    Atomically write the metrics in Prometheus text format, e.g. for the node exporter textfile collector.
+
+    Args:
+        path: The destination file
+    """
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    with open(temporary, 'w') as metrics_file:
+        metrics_file.write(render_prometheus())
+    os.replace(temporary, path)
+
+
+class _MetricsHandler(BaseHTTPRequestHandler):
+    def do_GET(self):
+        if self.path.split('?')[0] != '/metrics':
+            self.send_error(404)
+            return
+        body = render_prometheus().encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', 'text/plain; version=0.0.4')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+def start_metrics_server(port: int, host: str = '127.0.0.1') -> ThreadingHTTPServer:
+    """
+    Serve the metrics at ``/metrics`` from a background thread.
+
+    Args:
+        port: The port to listen on
+        host: The interface to bind
+
+    Returns:
+        ThreadingHTTPServer: The running server; call ``shutdown()`` to stop it
+    """
+    server = ThreadingHTTPServer((host, port), _MetricsHandler)
+    threading.Thread(target=server.serve_forever, name="metrics-server", daemon=True).start()
+    return server
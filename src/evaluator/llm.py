@@ -0,0 +1,383 @@
+"""
+Shared LLM client provider for the Customer Support Response Evaluator.
+
+Every evaluator node asks this module for its chat model so a batch run
+reuses one pool of keep-alive HTTP connections instead of opening a new
+client (and a new TLS session) per node.
+"""
+
+import json
+import time
+import atexit
+import asyncio
+import weakref
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import TYPE_CHECKING, Any, Dict, Iterator, List, Optional, Tuple
+
+import httpx
+
+from src.constants import LLM_PROVIDER_FAKE
+from src.utils.config import LLMSettings, get_settings
+
+if TYPE_CHECKING:
+    from langchain_core.callbacks import UsageMetadataCallbackHandler
+    from langchain_openai import ChatOpenAI
+
+_usage_handler: ContextVar[Optional["UsageMetadataCallbackHandler"]] = ContextVar(
+    "evaluator_usage_handler", default=None
+)
+_usage_hook_registered = False
+_usage_hook_lock = threading.Lock()
+
+
+class _PoolStats:
+    """Thread-safe counters shared by the sync and async transports."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.requests = 0
+        self.in_flight = 0
+        self.peak_in_flight = 0
+
+    def enter(self) -> None:
+        with self._lock:
+            self.requests += 1
+            self.in_flight += 1
+            self.peak_in_flight = max(self.peak_in_flight, self.in_flight)
+
+    def exit(self) -> None:
+        with self._lock:
+            self.in_flight -= 1
+
+
+class _CountingTransport(httpx.HTTPTransport):
+    """HTTP transport that records request counts for pool metrics."""
+
+    def __init__(self, *stats: _PoolStats, **kwargs):
+        super().__init__(**kwargs)
+        self._stats = stats
+
+    def open_connections(self) -> int:
+        return len(getattr(self._pool, 'connections', ()))
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        for stats in self._stats:
+            stats.enter()
+        try:
+            return super().handle_request(request)
+        finally:
+            for stats in self._stats:
+                stats.exit()
+
+
+class _AsyncCountingTransport(httpx.AsyncHTTPTransport):
+    """Async HTTP transport that records request counts for pool metrics."""
+
+    def __init__(self, *stats: _PoolStats, **kwargs):
+        super().__init__(**kwargs)
+        self._stats = stats
+
+    def open_connections(self) -> int:
+        return len(getattr(self._pool, 'connections', ()))
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        for stats in self._stats:
+            stats.enter()
+        try:
+            return await super().handle_async_request(request)
+        finally:
+            for stats in self._stats:
+                stats.exit()
+
+
+def _close_async_client(loop: asyncio.AbstractEventLoop, client: httpx.AsyncClient) -> None:
+    """Close an async client on the event loop its connections are bound to."""
+    if loop.is_closed():
+        # The connections were closed with their event loop
+        return
+    try:
+        running = asyncio.get_running_loop()
+    except RuntimeError:
+        running = None
+    if running is loop:
+        loop.create_task(client.aclose())
+    elif loop.is_running():
+        asyncio.run_coroutine_threadsafe(client.aclose(), loop)
+    elif running is None:
+        loop.run_until_complete(client.aclose())
+
+
+class _ClientSet:
+    """
+    The pooled HTTP clients and chat models built for one set of pool settings.
+
+    httpx async clients are bound to the event loop they first run on, so
+    every event loop gets its own async client and chat models, dropped
+    when the loop is garbage collected.
+    """
+
+    def __init__(self, pool_settings: Dict[str, Any], stats: _PoolStats):
+        self.pool_settings = pool_settings
+        self.stats = _PoolStats()
+        self._shared_stats = stats
+        self._limits = httpx.Limits(
+            max_connections=pool_settings.get('max_connections', 20),
+            max_keepalive_connections=pool_settings.get('max_keepalive_connections', 10),
+            keepalive_expiry=pool_settings.get('keepalive_expiry', 30)
+        )
+        self._timeout = httpx.Timeout(pool_settings['timeout'], connect=pool_settings.get('connect_timeout', 10))
+        self.http_client = httpx.Client(
+            transport=_CountingTransport(stats, self.stats, limits=self._limits),
+            limits=self._limits,
+            timeout=self._timeout
+        )
+        self.async_clients: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, httpx.AsyncClient]" = \
+            weakref.WeakKeyDictionary()
+        self.models: Dict[Tuple, "ChatOpenAI"] = {}
+        self.loop_models: "weakref.WeakKeyDictionary[asyncio.AbstractEventLoop, Dict[Tuple, ChatOpenAI]]" = \
+            weakref.WeakKeyDictionary()
+
+    def async_client(self, loop: asyncio.AbstractEventLoop) -> httpx.AsyncClient:
+        """Get the async client of an event loop, creating it on first use."""
+        client = self.async_clients.get(loop)
+        if client is None:
+            client = self.async_clients[loop] = httpx.AsyncClient(
+                transport=_AsyncCountingTransport(self._shared_stats, self.stats, limits=self._limits),
+                limits=self._limits,
+                timeout=self._timeout
+            )
+        return client
+
+    def model_cache(self, loop: Optional[asyncio.AbstractEventLoop]) -> Dict[Tuple, "ChatOpenAI"]:
+        """Get the chat models created for an event loop, or outside any event loop."""
+        if loop is None:
+            return self.models
+        return self.loop_models.setdefault(loop, {})
+
+    def open_connections(self) -> int:
+        clients = [self.http_client, *self.async_clients.values()]
+        return sum(client._transport.open_connections() for client in clients)
+
+    def close(self) -> None:
+        self.http_client.close()
+        for loop, client in list(self.async_clients.items()):
+            try:
+                _close_async_client(loop, client)
+            except RuntimeError:
+                # Another event loop is running in this thread; the connections close with their loop
+                pass
+        self.async_clients.clear()
+        self.models.clear()
+        self.loop_models.clear()
+
+
+class LLMClientProvider:
+    """
+    Process-wide provider of chat models backed by pooled HTTP clients.
+
+    The sync client is shared across threads, and each event loop gets its
+    own async client shared across its tasks, so a second ``asyncio.run``
+    never reuses connections bound to a closed loop. Chat models are cached
+    per event loop and (model, temperature, timeout, max tokens, retries,
+    key). When the pool settings change, new clients are swapped in and the
+    old ones are only closed once their requests have finished.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._stats = _PoolStats()
+        self._clients: Optional[_ClientSet] = None
+        self._retired: List[Tuple[float, _ClientSet]] = []
+        self._fake_models: Dict[Tuple, Any] = {}
+        self._created = 0
+
+    def _ensure_clients(self, llm_settings: LLMSettings) -> _ClientSet:
+        """Get the pooled HTTP clients, swapping in new ones if the pool settings changed."""
+        self._close_retired()
+        pool_settings = {**llm_settings.pool, 'timeout': llm_settings.timeout}
+        if self._clients is not None and pool_settings == self._clients.pool_settings:
+            return self._clients
+
+        if self._clients is not None:
+            # Models handed out before the swap may still be sending requests on the old clients
+            self._retired.append((time.monotonic() + self._clients.pool_settings['timeout'], self._clients))
+        self._clients = _ClientSet(pool_settings, self._stats)
+        return self._clients
+
+    def _close_retired(self) -> None:
+        """Close the replaced clients whose requests have all finished. Must be called with the lock held."""
+        now = time.monotonic()
+        remaining = []
+        for deadline, clients in self._retired:
+            if now >= deadline and clients.stats.in_flight == 0:
+                clients.close()
+            else:
+                remaining.append((deadline, clients))
+        self._retired = remaining
+
+    def get_chat_model(self, llm_settings: LLMSettings, api_key: Optional[str],
+                       model_options: Optional[Dict[str, Any]] = None) -> "ChatOpenAI":
+        """
+        Get a chat model that shares the process-wide connection pool.
+
+        Every model routed to gets its own chat model instance, while all of
+        them share the pooled HTTP clients configured by ``llm_settings``.
+        Called from a coroutine, the model uses the running event loop's
+        async client. With ``provider: fake`` the offline deterministic model
+        is returned instead and no HTTP clients are created.
+
+        Args:
+            llm_settings: The validated ``llm`` settings
+            api_key: The OpenAI API key
+            model_options: The ``model``, ``temperature``, ``timeout`` and ``max_tokens`` to use
+                instead of the ``llm`` defaults
+
+        Returns:
+            ChatOpenAI: Configured LLM instance
+        """
+        if llm_settings.provider == LLM_PROVIDER_FAKE:
+            return self._get_fake_model(llm_settings.fake)
+
+        options = {
+            'model': llm_settings.model,
+            'temperature': llm_settings.temperature,
+            'timeout': llm_settings.timeout,
+            'max_tokens': llm_settings.max_tokens,
+            **(model_options or {})
+        }
+        # The rate limiter retries failed calls itself, so the client must not retry them as well
+        max_retries = 0 if get_settings().rate_limit.enabled else 2
+        key = (options['model'], options['temperature'], options['timeout'], options['max_tokens'], max_retries,
+               api_key)
+        try:
+            loop = asyncio.get_running_loop()
+        except RuntimeError:
+            loop = None
+        with self._lock:
+            clients = self._ensure_clients(llm_settings)
+            models = clients.model_cache(loop)
+            model = models.get(key)
+            if model is None:
+                from langchain_openai import ChatOpenAI
+
+                model = ChatOpenAI(
+                    model=options['model'],
+                    temperature=options['temperature'],
+                    request_timeout=options['timeout'],
+                    max_tokens=options['max_tokens'],
+                    max_retries=max_retries,
+                    api_key=api_key,
+                    stream_usage=True,
+                    http_client=clients.http_client,
+                    # Outside an event loop the model is only used synchronously
+                    http_async_client=clients.async_client(loop) if loop is not None else None
+                )
+                models[key] = model
+                self._created += 1
+            return model
+
+    def _get_fake_model(self, fake_settings: Dict[str, Any]):
+        """Get the cached offline model for the ``llm.fake`` settings."""
+        key = (LLM_PROVIDER_FAKE, json.dumps(fake_settings, sort_keys=True))
+        with self._lock:
+            model = self._fake_models.get(key)
+            if model is None:
+                from src.evaluator.fake_llm import create_fake_model
+
+                model = create_fake_model(fake_settings)
+                self._fake_models[key] = model
+                self._created += 1
+            return model
+
+    def close(self) -> None:
+        """Close the pooled connections; the next request reopens them."""
+        with self._lock:
+            for _, clients in self._retired:
+                clients.close()
+            if self._clients is not None:
+                self._clients.close()
+            self._retired = []
+            self._clients = None
+            self._fake_models.clear()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get connection pool utilisation metrics.
+
+        Returns:
+            Dict[str, Any]: Request counts, in-flight requests and open connections
+        """
+        with self._lock:
+            clients = [clients for _, clients in self._retired]
+            if self._clients is not None:
+                clients.append(self._clients)
+            max_connections = (self._clients.pool_settings if self._clients else {}).get('max_connections', 20)
+            return {
+                'models_created': self._created,
+                'requests': self._stats.requests,
+                'in_flight': self._stats.in_flight,
+                'peak_in_flight': self._stats.peak_in_flight,
+                'open_connections': sum(client_set.open_connections() for client_set in clients),
+                'retired_clients': len(self._retired),
+                'max_connections': max_connections,
+                'utilisation': self._stats.in_flight / max_connections if max_connections else 0.0
+            }
+
+
+_provider = LLMClientProvider()
+atexit.register(_provider.close)
+
+
+def get_client_provider() -> LLMClientProvider:
+    """
+    Get the process-wide LLM client provider.
+
+    Returns:
+        LLMClientProvider: The shared provider
+    """
+    return _provider
+
+
+@contextmanager
+def track_usage() -> Iterator["UsageMetadataCallbackHandler"]:
+    """
+    Collect the token usage of every LLM call made inside the block.
+
+    Yields:
+        UsageMetadataCallbackHandler: Handler whose ``usage_metadata`` maps model names to token counts
+    """
+    global _usage_hook_registered
+    from langchain_core.callbacks import UsageMetadataCallbackHandler
+
+    with _usage_hook_lock:
+        if not _usage_hook_registered:
+            from langchain_core.tracers.context import register_configure_hook
+
+            register_configure_hook(_usage_handler, inheritable=True)
+            _usage_hook_registered = True
+    handler = UsageMetadataCallbackHandler()
+    token = _usage_handler.set(handler)
+    try:
+        yield handler
+    finally:
+        _usage_handler.reset(token)
+
+
+def total_tokens(handler: "UsageMetadataCallbackHandler") -> int:
+    """
+    Sum the tokens recorded by a usage handler across all models.
+
+    Args:
+        handler: The handler returned by ``track_usage``
+
+    Returns:
+        int: Total prompt and completion tokens
+    """
+    return sum(usage.get('total_tokens', 0) for usage in handler.usage_metadata.values())
+
+
+def shutdown_clients() -> None:
+    """Close all pooled LLM connections."""
+    _provider.close()
@@ -2,18 +2,28 @@
 Data models for the Customer Support Response Evaluator.
 """
 
-from typing import TypedDict, Optional
+from typing import Annotated, Any, Dict, TypedDict, Optional
+
+
+def merge_metrics(left: Dict[str, Any], right: Dict[str, Any]) -> Dict[str, Any]:
+    """Merge per-node metrics written by (possibly concurrent) graph nodes."""
+    return {**(left or {}), **(right or {})}
 
 
 class TicketState(TypedDict):
     """Represents the state of the support ticket evaluation process."""
     response: str
+    original_response: str
     clarity_score: float
     politeness_score: float
     professionalism_score: float
     resolution_score: float
     effectiveness_score: float
     feedback: str
+    feedback_source: Optional[str]
+    prescores: Optional[Dict[str, float]]
+    reused_scores: Optional[Dict[str, float]]
+    node_metrics: Annotated[Dict[str, Any], merge_metrics]
 
 
 class EvaluationResult(TypedDict):
@@ -0,0 +1,296 @@
+"""
+Pre-processing of support responses before they are sent to the model.
+
+Agent replies pasted from an email client often carry the quoted thread,
+a signature block, a legal disclaimer and HTML markup. None of it is part
+of the reply being evaluated, yet every metric node would send it to the
+model again. ``clean_response`` strips that noise and ``enforce_budget``
+caps what is left to a counted token budget.
+"""
+
+import re
+import html
+import logging
+import threading
+from typing import Any, Dict, Optional, Tuple
+
+from src.evaluator.instrumentation import get_metrics
+from src.evaluator.models import TicketState
+from src.evaluator.prescore import prescore
+from src.utils.helpers import load_settings
+
+logger = logging.getLogger(__name__)
+
+# Characters per token used when no tokenizer is available for the model
+CHARS_PER_TOKEN = 4
+
+# Encoding used for models tiktoken does not know
+DEFAULT_ENCODING = "o200k_base"
+
+# Marker inserted where an over-budget response was shortened
+TRUNCATION_MARKER = "\n[...]\n"
+
+# Share of the token budget kept from the start of an over-budget response, the rest comes from the end
+BUDGET_HEAD_SHARE = 0.7
+
+_HTML_TAG = re.compile(r'<[a-zA-Z/!][^>]*>')
+_HTML_DROP = re.compile(r'<(script|style|head)\b.*?</\1\s*>', re.IGNORECASE | re.DOTALL)
+_HTML_COMMENT = re.compile(r'<!--.*?-->', re.DOTALL)
+_HTML_BREAK = re.compile(r'<br\s*/?>|</(p|div|li|tr|h[1-6])\s*>', re.IGNORECASE)
+_HTML_QUOTE = re.compile(r'<blockquote\b.*?</blockquote\s*>', re.IGNORECASE | re.DOTALL)
+
+# Lines that start the quoted thread; everything from them on is dropped
+_QUOTE_HEADER = re.compile(
+    r'^\s*(?:'
+    r'On\s.{1,200}\swrote:\s*$'
+    r'|-{2,}\s*(?:Original|Forwarded) Message\s*-{2,}'
+    r'|From:\s.+$(?=\n\s*(?:Sent|Date|To|Subject):)'
+    r'|_{20,}\s*$'
+    r')',
+    re.IGNORECASE | re.MULTILINE
+)
+_QUOTED_LINE = re.compile(r'^\s*>.*$\n?', re.MULTILINE)
+
+# Signature delimiters and client footers; everything from them on is dropped
+_SIGNATURE = re.compile(
+    r'^(?:--\s*$|Sent from my \w+|Get Outlook for \w+)',
+    re.IGNORECASE | re.MULTILINE
+)
+
+# Sign-offs after which only the name line is kept, dropping contact details and titles
+_SIGN_OFF = re.compile(
+    r'^\s*(?:best|kind|warm)?\s*regards,?\s*$|^\s*(?:sincerely|cheers|thanks|thank you|best),?\s*$',
+    re.IGNORECASE | re.MULTILINE
+)
+_SIGN_OFF_MAX_TAIL = 8
+
+# Lines of a signature block: contact details, or a name, title or company that is not a sentence
+_CONTACT_LINE = re.compile(r'\S+@\S+\.\w+|https?://|www\.|^[+(]?\d[\d\s().-]{6,}$|^(?:tel|phone|mobile|fax)\b',
+                           re.IGNORECASE)
+_SENTENCE_LINE = re.compile(r'[.?!:;,]$|\.\s')
+_ABBREVIATION_END = re.compile(r'\b(?:inc|ltd|llc|co|corp|jr|sr)\.$', re.IGNORECASE)
+_SIGNATURE_LINE_WORDS = 6
+
+# Paragraphs that open a legal footer; everything from them on is dropped
+_DISCLAIMER = re.compile(
+    r'^\s*(?:\**\s*)?(?:confidential(?:ity)?\s+notice|disclaimer|this (?:e-?mail|message)(?: and any attachments?)?'
+    r' (?:is|are|may) (?:confidential|intended|privileged))',
+    re.IGNORECASE | re.MULTILINE
+)
+
+_SPACES = re.compile('[ \t\u00a0]+')
+_BLANK_LINES = re.compile(r'\n{3,}')
+
+
+def _strip_html(text: str) -> str:
+    """Convert HTML markup to plain text, keeping paragraph and line breaks."""
+    if not _HTML_TAG.search(text):
+        return text
+    text = _HTML_COMMENT.sub('', text)
+    text = _HTML_DROP.sub('', text)
+    text = _HTML_QUOTE.sub('', text)
+    text = _HTML_BREAK.sub('\n', text)
+    return html.unescape(_HTML_TAG.sub('', text))
+
+
+def _cut(text: str, pattern: re.Pattern) -> str:
+    """Drop everything from the first match of ``pattern`` on."""
+    match = pattern.search(text)
+    return text[:match.start()] if match else text
+
+
+def _is_signature_line(line: str) -> bool:
+    """Whether a line after a sign-off belongs to the signature block rather than the reply."""
+    if _CONTACT_LINE.search(line):
+        return True
+    if _ABBREVIATION_END.search(line):
+        line = line[:-1]
+    return len(line.split()) <= _SIGNATURE_LINE_WORDS and not _SENTENCE_LINE.search(line)
+
+
+def _trim_sign_off(text: str) -> str:
+    """
+    Keep the closing sign-off and the name after it, dropping the contact block that follows.
+
+    A "Thanks" or "Best" line only counts as the sign-off when everything
+    after it is a short signature block, so a mid-reply "Thank you" followed
+    by more of the reply is left alone.
+    """
+    matches = list(_SIGN_OFF.finditer(text))
+    if not matches:
+        return text
+    sign_off = matches[-1]
+    tail = [line for line in text[sign_off.end():].split('\n') if line.strip()]
+    if len(tail) > _SIGN_OFF_MAX_TAIL or not all(_is_signature_line(line) for line in tail):
+        return text
+    return text[:sign_off.end()] + ('\n' + tail[0] if tail else '')
+
+
+def clean_response(text: str) -> str:
+    """
+    Strip quoted history, signatures, disclaimers and markup from a response.
+
+    Args:
+        text: The support response as pasted
+
+    Returns:
+        str: The reply itself with whitespace collapsed
+    """
+    text = _strip_html(text.replace('\r\n', '\n').replace('\r', '\n'))
+    text = _cut(text, _QUOTE_HEADER)
+    text = _QUOTED_LINE.sub('', text)
+    text = _cut(text, _SIGNATURE)
+    text = _cut(text, _DISCLAIMER)
+    text = _SPACES.sub(' ', text)
+    text = '\n'.join(line.strip() for line in text.split('\n'))
+    text = _trim_sign_off(_BLANK_LINES.sub('\n\n', text).strip())
+    return text
+
+
+_encodings: Dict[str, Any] = {}
+_encodings_lock = threading.Lock()
+
+
+def get_encoding(model: str):
+    """
+    Get the tiktoken encoding for a model.
+
+    Args:
+        model: The model name
+
+    Returns:
+        The encoding, or None if tiktoken or its encoding files are unavailable
+    """
+    with _encodings_lock:
+        if model not in _encodings:
+            try:
+                import tiktoken
+
+                try:
+                    _encodings[model] = tiktoken.encoding_for_model(model)
+                except KeyError:
+                    _encodings[model] = tiktoken.get_encoding(DEFAULT_ENCODING)
+            except Exception as e:
+                logger.warning("No tokenizer for model %s, estimating token counts: %s", model, e)
+                _encodings[model] = None
+        return _encodings[model]
+
+
+def count_tokens(text: str, model: str) -> int:
+    """
+    Count the tokens of a text with the model's tokenizer.
+
+    Args:
+        text: The text to count
+        model: The model name
+
+    Returns:
+        int: The token count, estimated from the length if no tokenizer is available
+    """
+    encoding = get_encoding(model)
+    if encoding is None:
+        return -(-len(text) // CHARS_PER_TOKEN)
+    return len(encoding.encode(text, disallowed_special=()))
+
+
+def enforce_budget(text: str, budget: int, model: str) -> Tuple[str, int]:
+    """
+    Shorten a text to a token budget, keeping its start and its end.
+
+    The end of a reply usually holds the resolution and next steps, so
+    the middle is dropped rather than the tail.
+
+    Args:
+        text: The text to shorten
+        budget: Maximum number of tokens
+        model: The model name
+
+    Returns:
+        Tuple[str, int]: The text within the budget and its token count
+    """
+    encoding = get_encoding(model)
+    if encoding is None:
+        tokens = None
+        length = -(-len(text) // CHARS_PER_TOKEN)
+    else:
+        tokens = encoding.encode(text, disallowed_special=())
+        length = len(tokens)
+    if length <= budget:
+        return text, length
+
+    available = max(budget - count_tokens(TRUNCATION_MARKER, model), 2)
+    head = int(available * BUDGET_HEAD_SHARE)
+    tail = available - head
+    if tokens is None:
+        shortened = text[:head * CHARS_PER_TOKEN] + TRUNCATION_MARKER + text[-tail * CHARS_PER_TOKEN:]
+    else:
+        shortened = encoding.decode(tokens[:head]) + TRUNCATION_MARKER + encoding.decode(tokens[-tail:])
+    return shortened, count_tokens(shortened, model)
+
+
+def _preprocessing_settings() -> Tuple[Dict[str, Any], str]:
+    settings = load_settings()
+    return settings.get('preprocessing', {}), settings['llm']['model']
+
+
+def scoring_text(text: str) -> str:
+    """
+    Get the text the evaluation scores for a response, before the token budget is applied.
+
+    Args:
+        text: The support response as pasted
+
+    Returns:
+        str: The cleaned response, or the response itself if pre-processing is disabled
+    """
+    preprocessing, _ = _preprocessing_settings()
+    if not preprocessing.get('enabled', True):
+        return text
+    return clean_response(text) or text
+
+
+def preprocess_response(state: TicketState) -> TicketState:
+    """
+    Clean the response and enforce the token budget before it is scored.
+
+    The pasted text is kept in ``original_response`` for the report, and
+    the tokens saved are recorded in ``node_metrics``. Unless the caller
+    already did it for a whole batch, the local pre-scorer runs here on the
+    cleaned text.
+
+    Args:
+        state: The current evaluation state
+
+    Returns:
+        TicketState: Updated state with the cleaned response
+    """
+    preprocessing, model = _preprocessing_settings()
+    original = state["original_response"]
+    cleaned = scoring_text(original)
+    if state.get("prescores") is None:
+        state["prescores"] = prescore(cleaned)
+    if not preprocessing.get('enabled', True):
+        return state
+
+    budget: Optional[int] = preprocessing.get('token_budget')
+    if budget:
+        response, tokens = enforce_budget(cleaned, budget, model)
+    else:
+        response, tokens = cleaned, count_tokens(cleaned, model)
+    original_tokens = count_tokens(original, model)
+    saved = max(0, original_tokens - tokens)
+
+    state["response"] = response
+    state["node_metrics"] = {"preprocess": {
+        "original_tokens": original_tokens,
+        "tokens": tokens,
+        "tokens_saved": saved,
+        "truncated": response != cleaned
+    }}
+    get_metrics().inc('evaluator_preprocess_tokens_saved_total', {}, saved)
+    return state
+
+
+async def apreprocess_response(state: TicketState) -> TicketState:
+    """Async version of ``preprocess_response``."""
+    return preprocess_response(state)
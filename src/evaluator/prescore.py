@@ -0,0 +1,178 @@
+"""
+Local pre-scorer deciding obvious cases before any LLM call is made.
+
+Lexical and heuristic features (greetings, thanks, apologies, profanity,
+slang, shouting, next-step phrases and readability) are extracted for a
+batch of responses and turned into heuristic clarity, politeness and
+professionalism scores with numpy. A metric is decided locally only when
+its score, widened by an uncertainty margin, lies entirely below the
+``fail_below`` cutoff or above the ``pass_above`` cutoff configured in the
+``prescore`` section of ``settings.yaml``; every other metric is left to
+its LLM node.
+"""
+
+import re
+from typing import Dict, List, Optional, Sequence
+
+import numpy as np
+
+from src.utils.config import PrescoreSettings, get_settings
+from src.constants import METRIC_CLARITY, METRIC_POLITENESS, METRIC_PROFESSIONALISM
+
+# Metrics the pre-scorer can decide, in column order of the score matrix
+PRESCORED_METRICS = (METRIC_CLARITY, METRIC_POLITENESS, METRIC_PROFESSIONALISM)
+
+_GREETING = re.compile(r'^\W*(?:hi|hello|hey there|dear|good (?:morning|afternoon|evening)|greetings)\b',
+                       re.IGNORECASE)
+_THANKS = re.compile(r'\b(?:thank(?:s| you)|appreciate|grateful)\b', re.IGNORECASE)
+_APOLOGY = re.compile(r'\b(?:sorry|apologi[sz]e|apologies|regret)\b', re.IGNORECASE)
+_PLEASE = re.compile(r'\bplease\b', re.IGNORECASE)
+_PROFANITY = re.compile(
+    r'\b(?:damn|hell|crap|shit\w*|f+u+c+k\w*|wtf|stfu|idiot\w*|stupid|dumb|moron\w*|shut up|pathetic)\b',
+    re.IGNORECASE
+)
+_SLANG = re.compile(
+    r'\b(?:lol|lmao|omg|gonna|wanna|gotta|dunno|ya|yep|nope|u|ur|thx|pls|plz|btw|idk|imo|k|kinda|sorta|dude|'
+    r'bro|cuz|coz)\b',
+    re.IGNORECASE
+)
+_NEXT_STEP = re.compile(
+    r"\b(?:(?:i|we)(?:'ll| will| have| 've)|next step|please (?:try|click|follow|reply|let (?:me|us) know|"
+    r"contact|check)|you (?:can|should|will)|within \d+|by (?:monday|tuesday|wednesday|thursday|friday|"
+    r"tomorrow|end of))\b",
+    re.IGNORECASE
+)
+_WORD = re.compile(r"[A-Za-z][A-Za-z']*")
+_SENTENCE_END = re.compile(r'[.!?]+(?:\s|$)')
+_EXCLAMATION = re.compile(r'!')
+_SHOUTED_WORD = re.compile(r'\b[A-Z]{3,}\b')
+_VOWEL_GROUP = re.compile(r'[aeiouy]+', re.IGNORECASE)
+
+# Feature columns produced by extract_features
+FEATURES = (
+    'words', 'sentences', 'letters', 'syllables', 'greeting', 'thanks', 'apology', 'please',
+    'profanity', 'slang', 'next_steps', 'exclamations', 'shouted_words'
+)
+_F = {name: index for index, name in enumerate(FEATURES)}
+
+
+def extract_features(texts: Sequence[str]) -> np.ndarray:
+    """
+    Extract the raw lexical feature counts of a batch of responses.
+
+    Args:
+        texts: The (pre-processed) support responses
+
+    Returns:
+        np.ndarray: Matrix of shape ``(len(texts), len(FEATURES))``
+    """
+    features = np.zeros((len(texts), len(FEATURES)), dtype=np.float64)
+    for row, text in enumerate(texts):
+        words = _WORD.findall(text)
+        features[row] = (
+            len(words),
+            len(_SENTENCE_END.findall(text)),
+            sum(len(word) for word in words),
+            len(_VOWEL_GROUP.findall(text)),
+            _GREETING.search(text) is not None,
+            len(_THANKS.findall(text)),
+            len(_APOLOGY.findall(text)),
+            len(_PLEASE.findall(text)),
+            len(_PROFANITY.findall(text)),
+            len(_SLANG.findall(text)),
+            len(_NEXT_STEP.findall(text)),
+            len(_EXCLAMATION.findall(text)),
+            len(_SHOUTED_WORD.findall(text))
+        )
+    return features
+
+
+def heuristic_scores(features: np.ndarray) -> np.ndarray:
+    """
+    Turn feature counts into heuristic clarity, politeness and professionalism scores.
+
+    Args:
+        features: Matrix from ``extract_features``
+
+    Returns:
+        np.ndarray: Scores between 0 and 1, one column per metric in ``PRESCORED_METRICS``
+    """
+    f = features.T
+    words = np.maximum(f[_F['words']], 1.0)
+    sentences = np.maximum(f[_F['sentences']], 1.0)
+    words_per_sentence = words / sentences
+
+    # Flesch reading ease, scaled to 0-1
+    reading_ease = 206.835 - 1.015 * words_per_sentence - 84.6 * (f[_F['syllables']] / words)
+    readability = np.clip(reading_ease, 0.0, 100.0) / 100.0
+    profanity = np.minimum(f[_F['profanity']], 2.0)
+    slang_rate = np.minimum(f[_F['slang']] / words * 10.0, 1.0)
+    shouting_rate = np.minimum(f[_F['shouted_words']] / words * 10.0, 1.0)
+    exclamation_rate = np.minimum(f[_F['exclamations']] / sentences, 1.0)
+    too_short = np.clip(1.0 - words / 12.0, 0.0, 1.0)
+    run_on = np.clip((words_per_sentence - 30.0) / 30.0, 0.0, 1.0)
+
+    clarity = (
+        0.35 + 0.3 * readability + 0.25 * np.minimum(f[_F['next_steps']], 2.0) / 2.0
+        + 0.1 * (sentences > 1) - 0.4 * too_short - 0.25 * run_on - 0.15 * shouting_rate
+    )
+    politeness = (
+        0.45 + 0.15 * f[_F['greeting']] + 0.15 * np.minimum(f[_F['thanks']], 1.0)
+        + 0.1 * np.minimum(f[_F['apology']], 1.0) + 0.1 * np.minimum(f[_F['please']], 2.0) / 2.0
+        - 0.35 * profanity - 0.2 * shouting_rate - 0.1 * exclamation_rate
+    )
+    professionalism = (
+        0.6 + 0.1 * f[_F['greeting']] + 0.1 * np.minimum(f[_F['next_steps']], 1.0) + 0.1 * readability
+        - 0.35 * profanity - 0.3 * slang_rate - 0.25 * shouting_rate - 0.15 * exclamation_rate - 0.2 * too_short
+    )
+    return np.clip(np.stack([clarity, politeness, professionalism], axis=1), 0.0, 1.0)
+
+
+def prescore_batch(texts: Sequence[str], settings: Optional[PrescoreSettings] = None) -> List[Dict[str, float]]:
+    """
+    Decide the obvious metrics of a batch of responses locally.
+
+    Args:
+        texts: The (pre-processed) support responses
+        settings: The validated ``prescore`` settings, the current ones if not provided
+
+    Returns:
+        List[Dict[str, float]]: Per response, the scores of the metrics decided locally
+    """
+    if settings is None:
+        settings = get_settings().prescore
+    if not texts or not settings.enabled:
+        return [{} for _ in texts]
+
+    features = extract_features(texts)
+    scores = heuristic_scores(features)
+
+    # Short responses give the heuristics little to go on, so their margin is wider
+    words = features[:, _F['words']]
+    shortness = np.clip(1.0 - words / 40.0, 0.0, 1.0)
+    margin = settings.margin + settings.short_text_margin * shortness
+    cutoffs = settings.cutoffs
+    fail_below = np.array([cutoffs.get(metric.replace('_score', ''), {}).get('fail_below', 0.0)
+                           for metric in PRESCORED_METRICS])
+    pass_above = np.array([cutoffs.get(metric.replace('_score', ''), {}).get('pass_above', 1.0)
+                           for metric in PRESCORED_METRICS])
+    decided = ((scores + margin[:, None]) <= fail_below) | ((scores - margin[:, None]) >= pass_above)
+
+    return [
+        {metric: round(float(scores[row, column]), 2)
+         for column, metric in enumerate(PRESCORED_METRICS) if decided[row, column]}
+        for row in range(len(texts))
+    ]
+
+
+def prescore(text: str) -> Dict[str, float]:
+    """
+    Decide the obvious metrics of one response locally.
+
+    Args:
+        text: The (pre-processed) support response
+
+    Returns:
+        Dict[str, float]: The scores of the metrics decided locally
+    """
+    return prescore_batch([text])[0]
@@ -0,0 +1,520 @@
+"""
+Adaptive rate limiting and retries for the LLM calls of the evaluator nodes.
+
+Every LLM call goes through the ``RateLimiter`` of the model it is routed
+to. Before a call is sent, it reserves one request and its estimated
+tokens from token buckets refilled at the provider's requests-per-minute
+and tokens-per-minute limits. It then waits for one of the concurrency
+slots, whose number is tuned AIMD-style: every successful call widens the
+limit a little, and every rate-limit or timeout error halves it.
+
+Rate limits, timeouts and server errors are retried with exponential
+backoff and full jitter. A Retry-After hint from the provider pauses all
+calls to the model for that long. Each node execution may retry up to
+its budget; after that the last error is raised to the workflow as
+before.
+"""
+
+import math
+import time
+import random
+import asyncio
+import logging
+import threading
+from typing import Any, Awaitable, Callable, Dict, List, Optional, Tuple
+
+from src.evaluator.instrumentation import get_metrics, node_retries, record_llm_retry
+from src.evaluator.preprocess import count_tokens
+from src.utils.config import RateLimitSettings, get_settings
+from src.constants import LLM_PROVIDER_FAKE
+
+logger = logging.getLogger(__name__)
+
+# Seconds of a bucket's per-minute allowance that can be spent in one burst
+BURST_SECONDS = 1.0
+
+# Fraction of a Retry-After hint added as jitter, so paused callers do not resume at once
+RETRY_AFTER_JITTER = 0.1
+
+RETRY_RATE_LIMIT = "rate_limit"
+RETRY_TIMEOUT = "timeout"
+RETRY_SERVER_ERROR = "server_error"
+
+
+class TokenBucket:
+    """Thread-safe token bucket handing out reservations, usable from threads and event loops alike."""
+
+    def __init__(self, per_minute: float, burst_seconds: float = BURST_SECONDS):
+        """
+        Args:
+            per_minute: Tokens added per minute
+            burst_seconds: Seconds of refill the bucket holds at most
+        """
+        self.rate = per_minute / 60.0
+        self.capacity = max(1.0, self.rate * burst_seconds)
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        """
+        Take tokens from the bucket, going into debt if it runs short.
+
+        Args:
+            amount: The number of tokens to take
+
+        Returns:
+            float: Seconds to wait before the reservation is covered
+        """
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.capacity, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            self._tokens -= amount
+            return max(0.0, -self._tokens / self.rate)
+
+    def adjust(self, amount: float) -> None:
+        """Return tokens to the bucket, or take more, once the actual cost is known."""
+        with self._lock:
+            self._tokens = min(self.capacity, self._tokens + amount)
+
+
+class AIMDLimiter:
+    """Concurrency limit with additive increase and multiplicative decrease, for threads and tasks."""
+
+    def __init__(self, initial: float, minimum: float, maximum: float, increase: float = 1.0,
+                 decrease: float = 0.5, cooldown: float = 1.0):
+        """
+        Args:
+            initial: The starting concurrency limit
+            minimum: The limit is never decreased below this
+            maximum: The limit is never increased above this
+            increase: Added to the limit for every limit's worth of successful calls
+            decrease: Factor the limit is multiplied by on overload
+            cooldown: Seconds after a decrease in which further overload errors are not counted again,
+                since they were caused by calls sent before it
+        """
+        self.limit = float(initial)
+        self._minimum = float(minimum)
+        self._maximum = float(maximum)
+        self._increase = increase
+        self._decrease = decrease
+        self._cooldown = cooldown
+        self._decreased_at = float('-inf')
+        self._in_flight = 0
+        self._condition = threading.Condition()
+        self._waiters: List[Tuple[asyncio.AbstractEventLoop, asyncio.Future]] = []
+
+    def _free(self) -> bool:
+        return self._in_flight < max(1, int(self.limit))
+
+    def acquire(self) -> None:
+        """Wait for a free slot."""
+        with self._condition:
+            while not self._free():
+                self._condition.wait()
+            self._in_flight += 1
+
+    async def aacquire(self) -> None:
+        """Async version of ``acquire``."""
+        loop = asyncio.get_running_loop()
+        while True:
+            with self._condition:
+                if self._free():
+                    self._in_flight += 1
+                    return
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+            try:
+                await waiter
+            except asyncio.CancelledError:
+                with self._condition:
+                    if (loop, waiter) in self._waiters:
+                        self._waiters.remove((loop, waiter))
+                raise
+
+    def release(self, overloaded: Optional[bool]) -> None:
+        """
+        Free a slot and adapt the limit to the call's outcome.
+
+        Args:
+            overloaded: True for rate-limit and timeout errors, False for successful calls,
+                None for outcomes that say nothing about the provider's load
+        """
+        with self._condition:
+            self._in_flight -= 1
+            now = time.monotonic()
+            if overloaded:
+                if now - self._decreased_at >= self._cooldown:
+                    self.limit = max(self._minimum, self.limit * self._decrease)
+                    self._decreased_at = now
+            elif overloaded is not None:
+                self.limit = min(self._maximum, self.limit + self._increase / max(1.0, self.limit))
+            self._condition.notify_all()
+            waiters, self._waiters = self._waiters, []
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+
+    @property
+    def in_flight(self) -> int:
+        with self._condition:
+            return self._in_flight
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+def _status_code(error: BaseException) -> Optional[int]:
+    status = getattr(error, 'status_code', None)
+    if status is None:
+        status = getattr(getattr(error, 'response', None), 'status_code', None)
+    return status if isinstance(status, int) else None
+
+
+def retry_after(error: BaseException) -> Optional[float]:
+    """
+    Get the Retry-After hint of a provider error.
+
+    Args:
+        error: The error raised by the LLM call
+
+    Returns:
+        Optional[float]: Seconds to wait, or None if the error carries no hint
+    """
+    hint = getattr(error, 'retry_after', None)
+    if hint is None:
+        headers = getattr(getattr(error, 'response', None), 'headers', None) or {}
+        try:
+            if headers.get('retry-after-ms') is not None:
+                hint = float(headers['retry-after-ms']) / 1000
+            elif headers.get('retry-after') is not None:
+                hint = float(headers['retry-after'])
+        except ValueError:
+            # An HTTP date; fall back to exponential backoff
+            hint = None
+    return float(hint) if hint is not None else None
+
+
+def classify_error(error: BaseException) -> Optional[str]:
+    """
+    Decide whether an LLM call error is worth retrying.
+
+    Args:
+        error: The error raised by the LLM call
+
+    Returns:
+        Optional[str]: The retry reason, or None if the error is not transient
+    """
+    status = _status_code(error)
+    if status == 429:
+        return RETRY_RATE_LIMIT
+    if status in (408, 409) or isinstance(error, TimeoutError):
+        return RETRY_TIMEOUT
+    if status is not None and status >= 500:
+        return RETRY_SERVER_ERROR
+    try:
+        import httpx
+        from openai import APIConnectionError, APITimeoutError
+    except ImportError:
+        return None
+    if isinstance(error, (APITimeoutError, httpx.TimeoutException)):
+        return RETRY_TIMEOUT
+    if isinstance(error, (APIConnectionError, httpx.TransportError)):
+        return RETRY_SERVER_ERROR
+    return None
+
+
+class RateLimiter:
+    """Token-bucket rate limits, adaptive concurrency and retries for the calls to one model."""
+
+    def __init__(self, model: str, requests_per_minute: Optional[float] = None,
+                 tokens_per_minute: Optional[float] = None, concurrency: Optional[Dict[str, Any]] = None,
+                 retry: Optional[Dict[str, Any]] = None, seed: Optional[int] = None):
+        """
+        Args:
+            model: The model name, as used for metrics
+            requests_per_minute: The provider's request limit, None for no limit
+            tokens_per_minute: The provider's token limit, None for no limit
+            concurrency: The ``initial``, ``min``, ``max``, ``increase``, ``decrease`` and ``cooldown``
+                of the AIMD concurrency limit
+            retry: The ``budget``, per-node ``nodes`` budgets, ``base_delay`` and ``max_delay`` of retries
+            seed: Seed of the backoff jitter, for reproducible runs
+        """
+        concurrency = concurrency or {}
+        retry = retry or {}
+        self.model = model
+        self._requests = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self._tokens = TokenBucket(tokens_per_minute) if tokens_per_minute else None
+        self._concurrency = AIMDLimiter(
+            initial=concurrency.get('initial', 16),
+            minimum=concurrency.get('min', 1),
+            maximum=concurrency.get('max', 64),
+            increase=concurrency.get('increase', 1.0),
+            decrease=concurrency.get('decrease', 0.5),
+            cooldown=concurrency.get('cooldown', 1.0)
+        )
+        self._budget = retry.get('budget', 4)
+        self._node_budgets: Dict[str, int] = retry.get('nodes') or {}
+        self._base_delay = retry.get('base_delay', 0.5)
+        self._max_delay = retry.get('max_delay', 30.0)
+        self._rng = random.Random(seed)
+        self._lock = threading.Lock()
+        self._paused_until = 0.0
+        self.calls = 0
+        self.retries = 0
+        self.failures = 0
+        self.throttled = 0.0
+
+    def _admission_delay(self, tokens: int) -> float:
+        """Reserve a request and its tokens, returning how long to wait before sending it."""
+        with self._lock:
+            self.calls += 1
+            delay = max(0.0, self._paused_until - time.monotonic())
+        if self._requests is not None:
+            delay = max(delay, self._requests.reserve(1))
+        if self._tokens is not None:
+            delay = max(delay, self._tokens.reserve(tokens))
+        if delay > 0:
+            with self._lock:
+                self.throttled += delay
+            get_metrics().observe('evaluator_llm_throttle_seconds', {'model': self.model}, delay)
+        return delay
+
+    def _settle(self, tokens: int, result: Any) -> None:
+        """Correct the token bucket with the usage the provider reported."""
+        usage = getattr(result, 'usage_metadata', None)
+        if self._tokens is not None and usage:
+            self._tokens.adjust(tokens - usage.get('total_tokens', tokens))
+
+    def _retry_delay(self, error: BaseException, reason: Optional[str], attempt: int,
+                     can_retry: Optional[Callable[[], bool]]) -> Optional[float]:
+        """
+        Decide whether to retry a failed call and how long to wait first.
+
+        Returns:
+            Optional[float]: Seconds to wait, or None to raise the error
+        """
+        node, retries = node_retries()
+        # Calls made outside an instrumented node only count their own attempts
+        retries = max(retries, attempt)
+        if reason is None or (can_retry is not None and not can_retry()) \
+                or retries >= self._node_budgets.get(node, self._budget):
+            with self._lock:
+                self.failures += 1
+            return None
+
+        hint = retry_after(error) if reason == RETRY_RATE_LIMIT else None
+        with self._lock:
+            self.retries += 1
+            if hint is not None:
+                delay = hint * (1 + RETRY_AFTER_JITTER * self._rng.random())
+                self._paused_until = max(self._paused_until, time.monotonic() + hint)
+            else:
+                delay = self._rng.uniform(0, min(self._max_delay, self._base_delay * 2 ** attempt))
+        record_llm_retry(self.model, reason)
+        logger.info("Retrying %s call in %s after %s (attempt %d): %s", self.model, node, reason,
+                    attempt + 1, error)
+        return delay
+
+    def call(self, func: Callable[[], Any], tokens: int = 0, can_retry: Optional[Callable[[], bool]] = None) -> Any:
+        """
+        Send an LLM call within the rate limits, retrying transient errors.
+
+        Args:
+            func: Makes the call, returning the model's message
+            tokens: Estimated prompt and completion tokens of the call
+            can_retry: Whether a failed call may be sent again, e.g. not once streamed output was used
+
+        Returns:
+            Any: The result of ``func``
+
+        Raises:
+            Exception: The error of the last attempt, once it is not transient or the node's
+                retry budget is spent
+        """
+        attempt = 0
+        while True:
+            delay = self._admission_delay(tokens)
+            if delay > 0:
+                time.sleep(delay)
+            self._concurrency.acquire()
+            try:
+                result = func()
+            except BaseException as e:
+                if not isinstance(e, Exception):
+                    self._concurrency.release(None)
+                    raise
+                reason = classify_error(e)
+                self._concurrency.release(reason in (RETRY_RATE_LIMIT, RETRY_TIMEOUT) or None)
+                delay = self._retry_delay(e, reason, attempt, can_retry)
+                if delay is None:
+                    raise
+                time.sleep(delay)
+                attempt += 1
+                continue
+            self._concurrency.release(False)
+            self._settle(tokens, result)
+            return result
+
+    async def acall(self, afunc: Callable[[], Awaitable[Any]], tokens: int = 0,
+                    can_retry: Optional[Callable[[], bool]] = None) -> Any:
+        """Async version of ``call``."""
+        attempt = 0
+        while True:
+            delay = self._admission_delay(tokens)
+            if delay > 0:
+                await asyncio.sleep(delay)
+            await self._concurrency.aacquire()
+            try:
+                result = await afunc()
+            except BaseException as e:
+                if not isinstance(e, Exception):
+                    # Cancelled while waiting for the provider
+                    self._concurrency.release(None)
+                    raise
+                reason = classify_error(e)
+                self._concurrency.release(reason in (RETRY_RATE_LIMIT, RETRY_TIMEOUT) or None)
+                delay = self._retry_delay(e, reason, attempt, can_retry)
+                if delay is None:
+                    raise
+                await asyncio.sleep(delay)
+                attempt += 1
+                continue
+            self._concurrency.release(False)
+            self._settle(tokens, result)
+            return result
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the limiter's counters and current concurrency limit.
+
+        Returns:
+            Dict[str, Any]: Calls, retries, failures, seconds throttled, the concurrency limit and
+            calls in flight
+        """
+        with self._lock:
+            return {
+                'model': self.model,
+                'calls': self.calls,
+                'retries': self.retries,
+                'failures': self.failures,
+                'throttled': self.throttled,
+                'concurrency_limit': self._concurrency.limit,
+                'in_flight': self._concurrency.in_flight
+            }
+
+
+def estimate_tokens(prompt: str, options: Dict[str, Any]) -> int:
+    """
+    Estimate the tokens an LLM call counts against the tokens-per-minute limit.
+
+    Args:
+        prompt: The formatted prompt
+        options: The chat model options the prompt is routed to
+
+    Returns:
+        int: Prompt tokens plus the completion limit, or ``rate_limit.completion_tokens`` without one
+    """
+    completion = options.get('max_tokens') or get_settings().rate_limit.completion_tokens
+    return count_tokens(prompt, options['model']) + completion
+
+
+_limiters: Dict[str, RateLimiter] = {}
+# The settings and rate share the limiters were built with
+_limiters_settings: Optional[RateLimitSettings] = None
+_limiters_share: Optional[float] = None
+_limiters_lock = threading.Lock()
+# Fraction of the ``rate_limit`` budgets this process may use
+_rate_share = 1.0
+
+
+def set_rate_share(share: float) -> None:
+    """
+    Limit this process to a fraction of the ``rate_limit`` budgets.
+
+    Processes evaluating against the same provider account, such as the
+    backfill workers, each take their share of the requests and tokens per
+    minute and of the concurrency limits, so together they stay within the
+    configured budgets.
+
+    Args:
+        share: The fraction of the budgets, between 0 and 1
+    """
+    global _rate_share
+    if not 0 < share <= 1:
+        raise ValueError(f"Rate share must be between 0 and 1, got {share}")
+    _rate_share = share
+
+
+def _shared(limit: Optional[float]) -> Optional[float]:
+    return limit * _rate_share if limit else limit
+
+
+def _shared_concurrency(concurrency: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Scale the initial and maximum concurrency limits by the process's rate share."""
+    concurrency = dict(concurrency or {})
+    minimum = concurrency.get('min', 1)
+    for option, default in (('initial', 16), ('max', 64)):
+        concurrency[option] = max(minimum, math.ceil(concurrency.get(option, default) * _rate_share))
+    return concurrency
+
+
+def _model_limits(rate_settings: RateLimitSettings, model: str) -> Dict[str, Any]:
+    """The ``rate_limit.models`` entry of a model; the offline backend's models use the real models' limits."""
+    limits = rate_settings.models.get(model)
+    if limits is None and model.startswith(f"{LLM_PROVIDER_FAKE}/"):
+        limits = rate_settings.models.get(model[len(LLM_PROVIDER_FAKE) + 1:])
+    return limits or {}
+
+
+def get_rate_limiter(model: str) -> Optional[RateLimiter]:
+    """
+    Get the shared rate limiter of a model, if enabled in the ``rate_limit`` settings.
+
+    Models without an entry in ``rate_limit.models`` are not throttled, but
+    still get adaptive concurrency and retries. The limiters are rebuilt when
+    a settings reload changes the ``rate_limit`` section.
+
+    Args:
+        model: The model name, as used for metrics
+
+    Returns:
+        Optional[RateLimiter]: The limiter, or None if rate limiting is disabled
+    """
+    global _limiters_settings, _limiters_share
+    rate_settings = get_settings().rate_limit
+    if not rate_settings.enabled:
+        return None
+    with _limiters_lock:
+        # The validated settings are only replaced on a reload, so the equality check rarely runs
+        if rate_settings is not _limiters_settings or _rate_share != _limiters_share:
+            if rate_settings != _limiters_settings or _rate_share != _limiters_share:
+                _limiters.clear()
+            _limiters_settings = rate_settings
+            _limiters_share = _rate_share
+        limiter = _limiters.get(model)
+        if limiter is None:
+            limits = _model_limits(rate_settings, model)
+            limiter = _limiters[model] = RateLimiter(
+                model,
+                requests_per_minute=_shared(limits.get('requests_per_minute')),
+                tokens_per_minute=_shared(limits.get('tokens_per_minute')),
+                concurrency=_shared_concurrency(rate_settings.concurrency),
+                retry=rate_settings.retry,
+                seed=rate_settings.seed
+            )
+        return limiter
+
+
+def rate_limiter_stats() -> List[Dict[str, Any]]:
+    """
+    Get the stats of every model's rate limiter.
+
+    Returns:
+        List[Dict[str, Any]]: One ``RateLimiter.stats`` record per model called so far
+    """
+    with _limiters_lock:
+        limiters = list(_limiters.values())
+    return [limiter.stats() for limiter in limiters]
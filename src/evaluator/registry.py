@@ -0,0 +1,102 @@
+"""
+Registry of compiled evaluation workflows for the Customer Support Response Evaluator.
+"""
+
+import json
+import hashlib
+import threading
+from typing import Any, Callable, Dict, Iterable, Optional
+
+
+def settings_fingerprint(settings: Dict[str, Any], nodes: Iterable[str]) -> str:
+    """
+    Compute a stable fingerprint of the settings that shape a compiled workflow.
+
+    Args:
+        settings: The application settings
+        nodes: The names of the nodes in the workflow
+
+    Returns:
+        str: Hex digest identifying the workflow configuration
+    """
+    evaluation = settings['evaluation']
+    payload = {
+        'mode': evaluation.get('mode'),
+        'scoring_engine': evaluation.get('scoring_engine'),
+        'thresholds': evaluation['thresholds'],
+        'weights': evaluation['weights'],
+        'nodes': list(nodes),
+        'checkpoints': settings.get('checkpoints', {}),
+        'feedback': settings.get('feedback', {})
+    }
+    encoded = json.dumps(payload, sort_keys=True, default=str).encode('utf-8')
+    return hashlib.sha256(encoded).hexdigest()
+
+
+class WorkflowRegistry:
+    """Thread-safe cache holding the compiled workflow for the active settings."""
+
+    def __init__(self, builder: Callable[[Dict[str, Any]], Any], nodes: Iterable[str]):
+        """
+        Args:
+            builder: Callable that compiles a workflow from the settings
+            nodes: The names of the nodes the builder adds to the graph
+        """
+        self._builder = builder
+        self._nodes = tuple(nodes)
+        self._lock = threading.Lock()
+        self._fingerprint: Optional[str] = None
+        self._compiled = None
+        self._hits = 0
+        self._misses = 0
+        self._rebuilds = 0
+
+    def get(self, settings: Dict[str, Any]):
+        """
+        Return the compiled workflow for the settings, building it only if they changed.
+
+        Args:
+            settings: The application settings
+
+        Returns:
+            The compiled workflow graph
+        """
+        fingerprint = settings_fingerprint(settings, self._nodes)
+        with self._lock:
+            if self._compiled is not None and fingerprint == self._fingerprint:
+                self._hits += 1
+                return self._compiled
+
+            self._misses += 1
+            if self._compiled is not None:
+                self._rebuilds += 1
+            self._compiled = self._builder(settings)
+            self._fingerprint = fingerprint
+            return self._compiled
+
+    @property
+    def fingerprint(self) -> Optional[str]:
+        """The settings fingerprint of the compiled workflow."""
+        with self._lock:
+            return self._fingerprint
+
+    def clear(self) -> None:
+        """Drop the cached workflow so the next lookup recompiles it."""
+        with self._lock:
+            self._compiled = None
+            self._fingerprint = None
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get the registry counters.
+
+        Returns:
+            Dict[str, Any]: Hit, miss and rebuild counts and the active fingerprint
+        """
+        with self._lock:
+            return {
+                'hits': self._hits,
+                'misses': self._misses,
+                'rebuilds': self._rebuilds,
+                'fingerprint': self._fingerprint
+            }
@@ -0,0 +1,223 @@
+"""
+Incremental re-scoring of stored results after the weights or thresholds change.
+
+Effectiveness is a weighted sum of the component scores and the threshold
+gates only decide which metric nodes run, so a settings change rarely
+needs the LLM. For every chunk of stored results the new threshold gates
+are replayed over the stored component scores with numpy:
+
+* results whose gates only reach metrics that were already scored get
+  their effectiveness recomputed locally, and the metrics a raised
+  threshold now cuts off are zeroed;
+* results a lowered threshold now lets past a gate are completed by
+  running only the metric nodes that were never evaluated, followed by
+  the feedback node.
+
+The full workflow graph is never run.
+"""
+
+import logging
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from src.evaluator.evaluator import compute_effectiveness, generate_feedback
+from src.evaluator.instrumentation import instrument_node, trace_ticket
+from src.evaluator.models import TicketState
+from src.evaluator.preprocess import preprocess_response
+from src.evaluator.store import SCORE_COLUMNS, ResultStore
+from src.evaluator.workflow import METRIC_NODES, create_initial_state
+from src.utils.config import GATED_METRICS, METRICS
+from src.utils.helpers import load_settings
+
+logger = logging.getLogger(__name__)
+
+# Effectiveness changes smaller than this are not written back
+EFFECTIVENESS_TOLERANCE = 1e-9
+
+
+def inferred_evaluated(scores: np.ndarray) -> np.ndarray:
+    """
+    Infer how many metrics were evaluated for results stored before this was tracked.
+
+    The gates cut off a suffix of the metrics and zero it, so a trailing run
+    of zero scores is treated as never evaluated. A genuine zero at the end
+    is re-scored, which costs a node call but never keeps a wrong score.
+
+    Args:
+        scores: Component scores of shape ``(n, 4)``, in ``SCORE_COLUMNS`` order
+
+    Returns:
+        np.ndarray: Number of leading metrics evaluated, between 1 and 4
+    """
+    nonzero = scores != 0.0
+    last = np.where(nonzero.any(axis=1), scores.shape[1] - np.argmax(nonzero[:, ::-1], axis=1), 1)
+    return np.maximum(last, 1)
+
+
+def plan_rescore(scores: np.ndarray, evaluated: np.ndarray,
+                 thresholds: Dict[str, float]) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Replay the sequential threshold gates over stored component scores.
+
+    Args:
+        scores: Component scores of shape ``(n, 4)``, in ``SCORE_COLUMNS`` order
+        evaluated: Number of leading metrics evaluated per result
+        thresholds: The new gating thresholds
+
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: Per result, the number of metrics the new gates
+        reach, and whether the last of them was never evaluated. For those results the
+        count is the index of the first metric node that has to run.
+    """
+    n, metrics = scores.shape
+    known = np.arange(metrics)[None, :] < evaluated[:, None]
+    passed = scores[:, :len(GATED_METRICS)] > np.array([thresholds[metric] for metric in GATED_METRICS])
+
+    reached = np.full(n, metrics)
+    pending = np.zeros(n, dtype=bool)
+    open_ = np.ones(n, dtype=bool)
+    for index in range(metrics):
+        missing = open_ & ~known[:, index]
+        pending |= missing
+        reached[missing] = index
+        open_ &= known[:, index]
+        if index < len(GATED_METRICS):
+            stopped = open_ & ~passed[:, index]
+            reached[stopped] = index + 1
+            open_ &= passed[:, index]
+    return reached, pending
+
+
+def _prepare_state(record: Dict[str, Any], scores: np.ndarray) -> TicketState:
+    """
+    Rebuild the workflow state of a stored result up to its scoring nodes.
+
+    The metric nodes run here exist to score what the old gates never let
+    through, so no score is taken from the near-duplicate index or the
+    pre-scorer: a near duplicate was stored under the old gates, with the
+    metrics it skipped missing, and would cut the result short again.
+    """
+    state = preprocess_response(create_initial_state(record['response'], prescores={}))
+    for column, score in zip(SCORE_COLUMNS, scores):
+        state[column] = float(score)
+    return state
+
+
+def _complete(record: Dict[str, Any], scores: np.ndarray, start: int,
+              thresholds: Dict[str, float]) -> Tuple[TicketState, int, int]:
+    """
+    Run the metric nodes a lowered threshold un-gated, then effectiveness and feedback.
+
+    Returns:
+        Tuple[TicketState, int, int]: The final state, the number of metrics evaluated
+        and the number of metric nodes run
+    """
+    state = _prepare_state(record, np.where(np.arange(len(SCORE_COLUMNS)) < start, scores, 0.0))
+    evaluated = start
+    for index in range(start, len(METRIC_NODES)):
+        if index and not state[SCORE_COLUMNS[index - 1]] > thresholds[GATED_METRICS[index - 1]]:
+            break
+        _, name, (func, _) = METRIC_NODES[index]
+        state = instrument_node(name, func)(state)
+        evaluated += 1
+    state = compute_effectiveness(state)
+    return instrument_node("generate_feedback", generate_feedback)(state), evaluated, evaluated - start
+
+
+def _refresh_feedback(record: Dict[str, Any], scores: np.ndarray, effectiveness: float) -> TicketState:
+    """Regenerate the feedback of a result whose component scores were changed locally."""
+    state = _prepare_state(record, scores)
+    state["effectiveness_score"] = float(effectiveness)
+    return instrument_node("generate_feedback", generate_feedback)(state)
+
+
+def rescore_results(store: ResultStore, concurrency: int = 8, chunk_size: int = 5000,
+                    refresh_feedback: bool = True, dry_run: bool = False,
+                    settings: Optional[Dict[str, Any]] = None, **filters: Any) -> Dict[str, int]:
+    """
+    Bring stored results up to date with the current weights and thresholds.
+
+    Args:
+        store: The result store to update in place
+        concurrency: Maximum number of results sent to the LLM at once
+        chunk_size: Number of results planned and written together
+        refresh_feedback: Regenerate the feedback of results whose component scores
+            a raised threshold zeroed; un-gated results always get new feedback
+        dry_run: Only count what would change, without calling the LLM or writing
+        settings: The application settings, loaded from disk if not provided
+        **filters: Filters of ``ResultStore.query`` selecting the results to re-score
+
+    Returns:
+        Dict[str, int]: Counts of results checked, updated locally, gated, un-gated and
+        failed, and of metric and feedback node calls
+    """
+    evaluation = (settings or load_settings())['evaluation']
+    thresholds = evaluation['thresholds']
+    weights = np.array([evaluation['weights'][metric] for metric in METRICS])
+    stats = {'checked': 0, 'updated': 0, 'gated': 0, 'ungated': 0, 'failed': 0,
+             'metric_calls': 0, 'feedback_calls': 0}
+
+    with ThreadPoolExecutor(max_workers=concurrency) as executor:
+        for rows in store.iter_scores(chunk_size, **filters):
+            ids = np.array([row[0] for row in rows])
+            scores = np.array([row[1:5] for row in rows], dtype=np.float64)
+            stored_effectiveness = np.array([row[5] for row in rows], dtype=np.float64)
+            evaluated = np.array([row[6] if row[6] is not None else 0 for row in rows])
+            legacy = np.array([row[6] is None for row in rows])
+            if legacy.any():
+                evaluated[legacy] = inferred_evaluated(scores[legacy])
+
+            reached, pending = plan_rescore(scores, evaluated, thresholds)
+            new_scores = np.where(np.arange(len(SCORE_COLUMNS))[None, :] < reached[:, None], scores, 0.0)
+            effectiveness = new_scores @ weights
+            gated = ~pending & (reached < evaluated)
+            changed = ~pending & (gated | legacy
+                                  | (np.abs(effectiveness - stored_effectiveness) > EFFECTIVENESS_TOLERANCE))
+
+            stats['checked'] += len(rows)
+            stats['ungated'] += int(pending.sum())
+            stats['gated'] += int(gated.sum())
+            stats['updated'] += int(changed.sum())
+            if dry_run:
+                continue
+
+            feedback_rows = np.flatnonzero(gated) if refresh_feedback else np.array([], dtype=int)
+            remote_rows = np.concatenate([np.flatnonzero(pending), feedback_rows])
+            records = store.fetch([int(ids[row]) for row in remote_rows])
+            feedback: Dict[int, str] = {}
+
+            def run(row: int) -> Tuple[int, Optional[Tuple], int, int]:
+                record = records[int(ids[row])]
+                try:
+                    with trace_ticket(record['ticket_id']):
+                        if pending[row]:
+                            state, metrics_evaluated, calls = _complete(record, scores[row], int(reached[row]),
+                                                                        thresholds)
+                            update = (*(state[column] for column in SCORE_COLUMNS), state["effectiveness_score"],
+                                      metrics_evaluated, state["feedback"], int(ids[row]))
+                            return row, update, calls, 1
+                        state = _refresh_feedback(record, new_scores[row], effectiveness[row])
+                        feedback[row] = state["feedback"]
+                        return row, None, 0, 1
+                except Exception as e:
+                    logger.warning("Re-scoring ticket %s failed: %s", record['ticket_id'], e)
+                    return row, None, 0, 0
+
+            updates: List[Tuple] = []
+            for row, update, metric_calls, feedback_calls in executor.map(run, remote_rows.tolist()):
+                stats['metric_calls'] += metric_calls
+                stats['feedback_calls'] += feedback_calls
+                if update is not None:
+                    updates.append(update)
+                elif pending[row] or row not in feedback:
+                    stats['failed'] += 1
+            updates.extend(
+                (*new_scores[row].tolist(), float(effectiveness[row]), int(reached[row]), feedback.get(row),
+                 int(ids[row]))
+                for row in np.flatnonzero(changed).tolist()
+            )
+            store.update_scores(updates)
+
+    return stats
@@ -0,0 +1,187 @@
+"""
+Single-flight coalescing of identical in-flight LLM calls.
+
+When the same ticket response is evaluated several times at once, by
+concurrent reviewers or an upstream retry, every node sends the same
+prompt to the same model. Calls are keyed by a fingerprint of the model
+options and the formatted prompt: the first caller runs the call and
+every caller arriving while it is pending waits for and shares its
+result, or its exception. Nothing is kept once the call completes, so a
+failed call is retried by the next caller and completed calls are left
+to the evaluation cache.
+
+Threads and asyncio tasks are coalesced separately, asyncio tasks per
+event loop. An asyncio call runs as its own task, so cancelling one
+waiter leaves the call running for the others; it is only cancelled
+once every waiter has been cancelled.
+"""
+
+import json
+import asyncio
+import hashlib
+import threading
+from concurrent.futures import Future
+from typing import Any, Awaitable, Callable, Dict, Optional, Tuple
+
+from src.utils.config import get_settings
+
+
+def fingerprint(prompt_name: str, prompt: str, options: Dict[str, Any], llm_kwargs: Dict[str, Any]) -> str:
+    """
+    Fingerprint an LLM call, so only calls sure to get the same output are coalesced.
+
+    Args:
+        prompt_name: The prompt name in ``config.json``
+        prompt: The formatted prompt text
+        options: The chat model options the prompt is routed to
+        llm_kwargs: Extra arguments for the LLM call
+
+    Returns:
+        str: A hex digest of the model, options and prompt
+    """
+    payload = json.dumps(
+        [get_settings().llm.provider, prompt_name, options, llm_kwargs, prompt],
+        sort_keys=True, default=repr
+    )
+    return hashlib.sha256(payload.encode('utf-8')).hexdigest()
+
+
+class _AsyncCall:
+    """A pending asyncio call and the number of tasks waiting for it."""
+
+    def __init__(self, task: "asyncio.Task"):
+        self.task = task
+        self.waiters = 0
+
+
+class SingleFlight:
+    """Coalesces concurrent calls with the same key into one call."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._calls: Dict[str, Future] = {}
+        self._tasks: Dict[Tuple[asyncio.AbstractEventLoop, str], _AsyncCall] = {}
+        self.calls = 0
+        self.coalesced = 0
+
+    def do(self, key: str, func: Callable[[], Any]) -> Tuple[Any, bool]:
+        """
+        Run a call, or wait for the identical call another thread is running.
+
+        Args:
+            key: The call fingerprint
+            func: Makes the call
+
+        Returns:
+            Tuple[Any, bool]: The result, and whether it was shared from another caller
+
+        Raises:
+            Exception: Whatever the call raised, in every caller waiting for it
+        """
+        with self._lock:
+            future = self._calls.get(key)
+            shared = future is not None
+            if shared:
+                self.coalesced += 1
+            else:
+                future = self._calls[key] = Future()
+                self.calls += 1
+        if shared:
+            return future.result(), True
+
+        try:
+            result = func()
+        except BaseException as e:
+            self._forget(key, future)
+            future.set_exception(e)
+            raise
+        self._forget(key, future)
+        future.set_result(result)
+        return result, False
+
+    def _forget(self, key: str, future: Future) -> None:
+        with self._lock:
+            if self._calls.get(key) is future:
+                del self._calls[key]
+
+    async def ado(self, key: str, afunc: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Async version of ``do``, coalescing the calls of tasks on the same event loop.
+
+        A cancelled waiter stops waiting at once; the call itself is only
+        cancelled when no task is waiting for it any more.
+
+        Args:
+            key: The call fingerprint
+            afunc: Makes the call
+
+        Returns:
+            Tuple[Any, bool]: The result, and whether it was shared from another caller
+
+        Raises:
+            Exception: Whatever the call raised, in every task waiting for it
+            asyncio.CancelledError: If the waiting task was cancelled
+        """
+        loop = asyncio.get_running_loop()
+        flight = (loop, key)
+        with self._lock:
+            call = self._tasks.get(flight)
+            shared = call is not None
+            if shared:
+                self.coalesced += 1
+            else:
+                call = self._tasks[flight] = _AsyncCall(loop.create_task(afunc()))
+                call.task.add_done_callback(lambda _: self._forget_task(flight, call))
+                self.calls += 1
+            call.waiters += 1
+
+        try:
+            return await asyncio.shield(call.task), shared
+        finally:
+            with self._lock:
+                call.waiters -= 1
+                abandoned = call.waiters == 0 and not call.task.done()
+            if abandoned:
+                # Later callers must not join a call that is being cancelled
+                self._forget_task(flight, call)
+                call.task.cancel()
+
+    def _forget_task(self, flight: Tuple[asyncio.AbstractEventLoop, str], call: _AsyncCall) -> None:
+        with self._lock:
+            if self._tasks.get(flight) is call:
+                del self._tasks[flight]
+
+    def stats(self) -> Dict[str, int]:
+        """
+        Get the number of calls made and coalesced.
+
+        Returns:
+            Dict[str, int]: Calls made, calls coalesced and calls pending
+        """
+        with self._lock:
+            return {
+                'calls': self.calls,
+                'coalesced': self.coalesced,
+                'pending': len(self._calls) + len(self._tasks)
+            }
+
+
+_single_flight: Optional[SingleFlight] = None
+_single_flight_lock = threading.Lock()
+
+
+def get_single_flight() -> Optional[SingleFlight]:
+    """
+    Get the shared single-flight group for LLM calls, if enabled in ``llm.coalesce``.
+
+    Returns:
+        Optional[SingleFlight]: The shared group, or None if coalescing is disabled
+    """
+    global _single_flight
+    if not get_settings().llm.coalesce:
+        return None
+    if _single_flight is None:
+        with _single_flight_lock:
+            if _single_flight is None:
+                _single_flight = SingleFlight()
+    return _single_flight
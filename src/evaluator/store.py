@@ -0,0 +1,492 @@
+"""
+Persistent, indexed store of EvaluationResult records.
+
+Every evaluation from the UI and from batch runs is kept in one SQLite
+database in WAL mode. Batch runs buffer their records and write them in
+one transaction per ``batch_size`` records, or once the oldest has waited
+``flush_interval`` seconds, whichever comes first. Reads borrow one of a
+small pool of read connections, so a batch writing and the UI paging
+through the history never wait on each other. Indexes cover the ticket ID, the
+timestamp and the effectiveness score. A score band filter becomes a range
+over the effectiveness score, so the bands always follow the current color
+thresholds.
+
+Each record also keeps how many metrics the threshold gates let through
+(``evaluated_metrics``), so results can be re-scored locally when the
+weights or thresholds change (see ``src.evaluator.rescore``).
+"""
+
+import os
+import time
+import atexit
+import sqlite3
+import threading
+from contextlib import contextmanager
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from src.evaluator.models import EvaluationResult
+from src.utils.config import GATED_METRICS
+from src.utils.helpers import load_settings
+from src.constants import (
+    BATCH_RESULT_FIELDS,
+    SCORE_BAND_GOOD,
+    SCORE_BAND_AVERAGE,
+    SCORE_BAND_POOR
+)
+
+# Milliseconds a connection waits for a lock held by another process before failing
+BUSY_TIMEOUT_MS = 5000
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS evaluation_results (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    ticket_id TEXT,
+    response TEXT NOT NULL,
+    clarity_score REAL NOT NULL,
+    politeness_score REAL NOT NULL,
+    professionalism_score REAL NOT NULL,
+    resolution_score REAL NOT NULL,
+    effectiveness_score REAL NOT NULL,
+    feedback TEXT NOT NULL,
+    timestamp TEXT NOT NULL,
+    evaluated_metrics INTEGER
+);
+CREATE INDEX IF NOT EXISTS idx_evaluation_results_ticket ON evaluation_results (ticket_id, id);
+CREATE INDEX IF NOT EXISTS idx_evaluation_results_timestamp ON evaluation_results (timestamp, id);
+CREATE INDEX IF NOT EXISTS idx_evaluation_results_effectiveness ON evaluation_results (effectiveness_score, id);
+"""
+
+# Component scores in the order the sequential workflow evaluates them
+SCORE_COLUMNS = ('clarity_score', 'politeness_score', 'professionalism_score', 'resolution_score')
+
+_COLUMNS = ', '.join(BATCH_RESULT_FIELDS)
+_INSERT = (
+    f"INSERT INTO evaluation_results ({_COLUMNS}, evaluated_metrics) "
+    f"VALUES ({', '.join('?' for _ in BATCH_RESULT_FIELDS)}, ?)"
+)
+_UPDATE_SCORES = (
+    f"UPDATE evaluation_results SET {', '.join(f'{column} = ?' for column in SCORE_COLUMNS)}, "
+    "effectiveness_score = ?, evaluated_metrics = ?, feedback = COALESCE(?, feedback) WHERE id = ?"
+)
+_UPDATE_FEEDBACK = "UPDATE evaluation_results SET feedback = ? WHERE id = ?"
+
+
+def _connect(path: str) -> sqlite3.Connection:
+    connection = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+    connection.execute(f"PRAGMA busy_timeout={BUSY_TIMEOUT_MS}")
+    connection.execute("PRAGMA journal_mode=WAL")
+    connection.execute("PRAGMA synchronous=NORMAL")
+    return connection
+
+
+class ResultStore:
+    """SQLite-backed EvaluationResult store with batched writes and paged queries."""
+
+    def __init__(self, path: str, band_thresholds: Dict[str, float], gate_thresholds: Dict[str, float],
+                 batch_size: int = 500, flush_interval: float = 1.0, read_connections: int = 4):
+        """
+        Args:
+            path: The SQLite database file
+            band_thresholds: The ``good`` and ``average`` effectiveness thresholds bounding the bands
+            gate_thresholds: The threshold gates the stored results were evaluated with
+            batch_size: Number of buffered records written per transaction
+            flush_interval: Seconds a buffered record waits at most before it is written
+            read_connections: Maximum number of read connections, shared by all threads
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.path = path
+        self._bands = {
+            SCORE_BAND_GOOD: (band_thresholds['good'], None),
+            SCORE_BAND_AVERAGE: (band_thresholds['average'], band_thresholds['good']),
+            SCORE_BAND_POOR: (None, band_thresholds['average'])
+        }
+        self._gates = [(f'{metric}_score', gate_thresholds[metric]) for metric in GATED_METRICS]
+        self._batch_size = batch_size
+        self._flush_interval = flush_interval
+        self._lock = threading.Lock()
+        self._connection = _connect(path)
+        self._connection.executescript(_SCHEMA)
+        self._migrate()
+        self._reader_slots = threading.BoundedSemaphore(read_connections)
+        self._idle_readers: List[sqlite3.Connection] = []
+        self._readers_lock = threading.Lock()
+        self._buffer: List[Tuple] = []
+        self._oldest_buffered = 0.0
+        self.written = 0
+        self.transactions = 0
+        self._closed = threading.Event()
+        self._flusher = threading.Thread(target=self._flush_periodically, name="result-store-flush", daemon=True)
+        self._flusher.start()
+
+    def _migrate(self) -> None:
+        """Add the columns introduced after a database was created."""
+        columns = {row[1] for row in self._connection.execute("PRAGMA table_info(evaluation_results)")}
+        if 'evaluated_metrics' not in columns:
+            self._connection.execute("ALTER TABLE evaluation_results ADD COLUMN evaluated_metrics INTEGER")
+
+    def _row(self, record: Dict[str, Any]) -> Tuple:
+        """Convert a record into an insert row, counting the metrics its threshold gates let through."""
+        evaluated = 1
+        for metric, threshold in self._gates:
+            if not record[metric] > threshold:
+                break
+            evaluated += 1
+        return (*(record.get(field) for field in BATCH_RESULT_FIELDS), evaluated)
+
+    @contextmanager
+    def _reader(self) -> Iterator[sqlite3.Connection]:
+        """
+        Borrow a read connection, which sees the last committed snapshot without locking.
+
+        At most ``read_connections`` are open; further readers wait for one to be returned.
+        """
+        self._reader_slots.acquire()
+        try:
+            with self._readers_lock:
+                connection = self._idle_readers.pop() if self._idle_readers else None
+            if connection is None:
+                connection = _connect(self.path)
+            try:
+                yield connection
+            finally:
+                with self._readers_lock:
+                    self._idle_readers.append(connection)
+        finally:
+            self._reader_slots.release()
+
+    def _flush_periodically(self) -> None:
+        """Write buffered records that are due, so a slow trickle of ``add`` calls is not held back."""
+        while not self._closed.wait(self._flush_interval / 2):
+            with self._lock:
+                if self._buffer and time.monotonic() - self._oldest_buffered >= self._flush_interval:
+                    self._flush()
+
+    def _flush(self) -> None:
+        if not self._buffer:
+            return
+        self._connection.execute("BEGIN IMMEDIATE")
+        try:
+            self._connection.executemany(_INSERT, self._buffer)
+            self._connection.execute("COMMIT")
+        except Exception:
+            self._connection.execute("ROLLBACK")
+            raise
+        self.written += len(self._buffer)
+        self.transactions += 1
+        self._buffer = []
+
+    def add(self, record: EvaluationResult) -> None:
+        """
+        Buffer a record, writing the buffer once it is full or its oldest record is due.
+
+        Args:
+            record: The EvaluationResult record
+        """
+        with self._lock:
+            if not self._buffer:
+                self._oldest_buffered = time.monotonic()
+            self._buffer.append(self._row(record))
+            if (len(self._buffer) >= self._batch_size
+                    or time.monotonic() - self._oldest_buffered >= self._flush_interval):
+                self._flush()
+
+    def write(self, record: EvaluationResult) -> None:
+        """Alias of ``add``, so the store can stand in for a ``ResultWriter``."""
+        self.add(record)
+
+    def save(self, record: EvaluationResult) -> int:
+        """
+        Write a record, and anything buffered before it, immediately.
+
+        Args:
+            record: The EvaluationResult record
+
+        Returns:
+            int: The ID of the stored record
+        """
+        with self._lock:
+            self._flush()
+            cursor = self._connection.execute(_INSERT, self._row(record))
+            self.written += 1
+            self.transactions += 1
+            return cursor.lastrowid
+
+    def update_feedback(self, record_id: int, feedback: str) -> None:
+        """
+        Replace the feedback of a stored record, e.g. once the LLM rewrote template feedback.
+
+        Args:
+            record_id: The ID returned by ``save``
+            feedback: The new feedback text
+        """
+        with self._lock:
+            self._connection.execute(_UPDATE_FEEDBACK, (feedback, record_id))
+
+    def flush(self) -> None:
+        """Write the buffered records now."""
+        with self._lock:
+            self._flush()
+
+    def _where(self, ticket_id: Optional[str] = None, band: Optional[str] = None,
+               since: Optional[str] = None, until: Optional[str] = None,
+               min_score: Optional[float] = None, max_score: Optional[float] = None) -> Tuple[str, List[Any]]:
+        """Build the WHERE clause of a filtered query."""
+        clauses: List[str] = []
+        params: List[Any] = []
+        if ticket_id is not None:
+            clauses.append("ticket_id = ?")
+            params.append(ticket_id)
+        if band is not None:
+            if band not in self._bands:
+                raise ValueError(f"Unknown score band '{band}', expected one of {', '.join(self._bands)}")
+            lower, upper = self._bands[band]
+            if lower is not None:
+                clauses.append("effectiveness_score >= ?")
+                params.append(lower)
+            if upper is not None:
+                clauses.append("effectiveness_score < ?")
+                params.append(upper)
+        if since is not None:
+            clauses.append("timestamp >= ?")
+            params.append(since)
+        if until is not None:
+            clauses.append("timestamp < ?")
+            params.append(until)
+        if min_score is not None:
+            clauses.append("effectiveness_score >= ?")
+            params.append(min_score)
+        if max_score is not None:
+            clauses.append("effectiveness_score <= ?")
+            params.append(max_score)
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def query(self, limit: int = 50, offset: int = 0, before: Optional[int] = None,
+              **filters: Any) -> Dict[str, Any]:
+        """
+        Get one page of records, newest first.
+
+        Args:
+            limit: Maximum number of records returned
+            offset: Number of matching records skipped, for numbered pages
+            before: Cursor from a previous page; only older records are returned
+            **filters: ``ticket_id``, ``band`` (``good``, ``average`` or ``poor``), ``since`` and
+                ``until`` timestamps, ``min_score`` and ``max_score`` on the effectiveness score
+
+        Returns:
+            Dict[str, Any]: ``results``, the EvaluationResult records, and ``next_cursor``,
+            passed as ``before`` to get the next page, or None on the last page
+
+        Raises:
+            ValueError: If the score band is unknown
+        """
+        where, params = self._where(**filters)
+        if before is not None:
+            where += (" AND " if where else " WHERE ") + "id < ?"
+            params.append(before)
+        with self._reader() as reader:
+            rows = reader.execute(
+                f"SELECT id, {_COLUMNS} FROM evaluation_results{where} ORDER BY id DESC LIMIT ? OFFSET ?",
+                (*params, limit, offset)
+            ).fetchall()
+        return {
+            'results': [dict(zip(BATCH_RESULT_FIELDS, row[1:])) for row in rows],
+            'next_cursor': rows[-1][0] if len(rows) == limit else None
+        }
+
+    def count(self, **filters: Any) -> int:
+        """
+        Count the records matching the filters of ``query``.
+
+        Returns:
+            int: The number of matching records
+        """
+        where, params = self._where(**filters)
+        with self._reader() as reader:
+            return reader.execute(f"SELECT COUNT(*) FROM evaluation_results{where}", params).fetchone()[0]
+
+    def iter_results(self, chunk_size: int = 1000, **filters: Any) -> Iterator[EvaluationResult]:
+        """
+        Stream every record matching the filters of ``query``, newest first.
+
+        Only ``chunk_size`` records are held in memory at a time.
+
+        Args:
+            chunk_size: Number of records fetched per query
+
+        Yields:
+            EvaluationResult: The matching records
+        """
+        cursor: Optional[int] = None
+        while True:
+            page = self.query(limit=chunk_size, before=cursor, **filters)
+            yield from page['results']
+            cursor = page['next_cursor']
+            if cursor is None:
+                return
+
+    def latest(self, ticket_id: str) -> Optional[EvaluationResult]:
+        """
+        Get the most recent evaluation of a ticket.
+
+        Args:
+            ticket_id: The ticket ID
+
+        Returns:
+            Optional[EvaluationResult]: The record, or None if the ticket was never evaluated
+        """
+        results = self.query(limit=1, ticket_id=ticket_id)['results']
+        return results[0] if results else None
+
+    def iter_scores(self, chunk_size: int = 5000, **filters: Any) -> Iterator[List[Tuple]]:
+        """
+        Stream the scores of every record matching the filters of ``query`` in chunks, newest first.
+
+        Args:
+            chunk_size: Number of records per chunk
+
+        Yields:
+            List[Tuple]: ``(id, *SCORE_COLUMNS, effectiveness_score, evaluated_metrics)`` rows;
+            ``evaluated_metrics`` is None for records stored before it was tracked
+        """
+        where, params = self._where(**filters)
+        cursor: Optional[int] = None
+        while True:
+            page_where, page_params = where, list(params)
+            if cursor is not None:
+                page_where += (" AND " if where else " WHERE ") + "id < ?"
+                page_params.append(cursor)
+            with self._reader() as reader:
+                rows = reader.execute(
+                    f"SELECT id, {', '.join(SCORE_COLUMNS)}, effectiveness_score, evaluated_metrics "
+                    f"FROM evaluation_results{page_where} ORDER BY id DESC LIMIT ?",
+                    (*page_params, chunk_size)
+                ).fetchall()
+            if not rows:
+                return
+            yield rows
+            cursor = rows[-1][0]
+
+    def fetch(self, ids: List[int]) -> Dict[int, EvaluationResult]:
+        """
+        Get records by their row IDs.
+
+        Args:
+            ids: Row IDs from ``iter_scores``
+
+        Returns:
+            Dict[int, EvaluationResult]: The records found, by row ID
+        """
+        records: Dict[int, EvaluationResult] = {}
+        for start in range(0, len(ids), 500):
+            chunk = ids[start:start + 500]
+            with self._reader() as reader:
+                rows = reader.execute(
+                    f"SELECT id, {_COLUMNS} FROM evaluation_results WHERE id IN ({', '.join('?' for _ in chunk)})",
+                    chunk
+                ).fetchall()
+            records.update((row[0], dict(zip(BATCH_RESULT_FIELDS, row[1:]))) for row in rows)
+        return records
+
+    def update_scores(self, updates: List[Tuple]) -> None:
+        """
+        Overwrite the scores of stored records in one transaction.
+
+        Args:
+            updates: ``(*SCORE_COLUMNS, effectiveness_score, evaluated_metrics, feedback, id)`` rows;
+                a None feedback keeps the stored one
+        """
+        if not updates:
+            return
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                self._connection.executemany(_UPDATE_SCORES, updates)
+                self._connection.execute("COMMIT")
+            except Exception:
+                self._connection.execute("ROLLBACK")
+                raise
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get store statistics.
+
+        Returns:
+            Dict[str, Any]: Stored and buffered record counts, records written and transactions used
+        """
+        with self._lock:
+            buffered = len(self._buffer)
+        return {
+            'records': self.count(),
+            'buffered': buffered,
+            'written': self.written,
+            'transactions': self.transactions
+        }
+
+    def close(self) -> None:
+        if self._closed.is_set():
+            return
+        self._closed.set()
+        self._flusher.join()
+        with self._lock:
+            self._flush()
+            self._connection.execute("PRAGMA optimize")
+            self._connection.close()
+        with self._readers_lock:
+            for connection in self._idle_readers:
+                connection.close()
+            self._idle_readers = []
+
+
+_store: Optional[ResultStore] = None
+_store_settings: Optional[Tuple[Dict[str, Any], Dict[str, Any]]] = None
+# Stores replaced on a settings reload; callers may still hold them, so they are only closed at exit
+_retired_stores: List[ResultStore] = []
+_store_lock = threading.Lock()
+
+
+def get_result_store() -> Optional[ResultStore]:
+    """
+    Get the process-wide result store configured in ``settings.yaml``.
+
+    Returns:
+        Optional[ResultStore]: The store, or None if it is disabled
+    """
+    global _store, _store_settings
+    settings = load_settings()
+    store_settings = settings.get('results', {})
+    if not store_settings.get('enabled', False):
+        return None
+    thresholds = settings['evaluation']['thresholds']
+    key = (store_settings, thresholds)
+    with _store_lock:
+        if _store is None or key != _store_settings:
+            if _store is not None:
+                _retired_stores.append(_store)
+            _store = ResultStore(
+                store_settings['path'],
+                thresholds['color'],
+                thresholds,
+                batch_size=store_settings.get('batch_size', 500),
+                flush_interval=store_settings.get('flush_interval', 1.0),
+                read_connections=store_settings.get('read_connections', 4)
+            )
+            _store_settings = key
+        return _store
+
+
+def close_result_store() -> None:
+    """Write buffered records to disk and close the store and any it replaced, if open."""
+    global _store, _store_settings
+    with _store_lock:
+        for store in _retired_stores:
+            store.close()
+        _retired_stores.clear()
+        if _store is not None:
+            _store.close()
+        _store = None
+        _store_settings = None
+
+
+atexit.register(close_result_store)
@@ -2,67 +2,322 @@
 Workflow definition for the customer support evaluation process.
 """
 
-import streamlit as st
-from langgraph.graph import StateGraph, END
+import time
+import asyncio
+import logging
+from typing import TYPE_CHECKING, Any, Dict, Iterable, List, Optional, Union
 
+from src.evaluator.events import EvaluationListener, use_listener
 from src.evaluator.models import TicketState
 from src.evaluator.evaluator import (
     evaluate_clarity,
+    aevaluate_clarity,
     assess_politeness,
+    aassess_politeness,
     examine_professionalism,
+    aexamine_professionalism,
     verify_resolution,
+    averify_resolution,
+    score_rubric,
+    ascore_rubric,
     compute_effectiveness,
-    generate_feedback
+    generate_feedback,
+    agenerate_feedback,
+    generate_llm_feedback
 )
+from src.evaluator.dedup import amatch_near_duplicate, match_near_duplicate
+from src.evaluator.instrumentation import (
+    ainstrument_node,
+    instrument_node,
+    maybe_profile,
+    record_gate,
+    trace_ticket
+)
+from src.evaluator.llm import track_usage, total_tokens
+from src.evaluator.preprocess import apreprocess_response, preprocess_response
+from src.evaluator.registry import WorkflowRegistry
 from src.utils.helpers import load_settings
 from src.constants import (
     ERROR_EVALUATION,
-    SUCCESS_EVALUATION,
     METRIC_CLARITY,
     METRIC_POLITENESS,
     METRIC_PROFESSIONALISM,
     METRIC_RESOLUTION,
-    METRIC_EFFECTIVENESS
+    METRIC_EFFECTIVENESS,
+    WORKFLOW_MODE_SEQUENTIAL,
+    WORKFLOW_MODE_PARALLEL,
+    SCORING_ENGINE_PER_METRIC,
+    SCORING_ENGINE_FUSED
+)
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import RunnableLambda
+    from langgraph.graph import StateGraph
+
+logger = logging.getLogger(__name__)
+
+WORKFLOW_NODES = (
+    "preprocess_response",
+    "match_near_duplicate",
+    "evaluate_clarity",
+    "assess_politeness",
+    "examine_professionalism",
+    "verify_resolution",
+    "compute_effectiveness",
+    "generate_feedback"
 )
 
 
-def create_workflow() -> StateGraph:
+# Metric nodes in the order the sequential workflow runs them, with their sync and async implementations
+METRIC_NODES = (
+    (METRIC_CLARITY, "evaluate_clarity", (evaluate_clarity, aevaluate_clarity)),
+    (METRIC_POLITENESS, "assess_politeness", (assess_politeness, aassess_politeness)),
+    (METRIC_PROFESSIONALISM, "examine_professionalism", (examine_professionalism, aexamine_professionalism)),
+    (METRIC_RESOLUTION, "verify_resolution", (verify_resolution, averify_resolution))
+)
+
+# Scores each node makes final, reported to the listener as soon as the node finishes
+NODE_SCORES = {
+    **{name: (metric,) for metric, name, _ in METRIC_NODES},
+    "score_rubric": (METRIC_CLARITY, METRIC_POLITENESS, METRIC_PROFESSIONALISM, METRIC_RESOLUTION),
+    "compute_effectiveness": (METRIC_CLARITY, METRIC_POLITENESS, METRIC_PROFESSIONALISM, METRIC_RESOLUTION,
+                              METRIC_EFFECTIVENESS)
+}
+
+# Threshold setting gating the nodes that follow each metric
+METRIC_GATES = (
+    (METRIC_CLARITY, 'clarity'),
+    (METRIC_POLITENESS, 'politeness'),
+    (METRIC_PROFESSIONALISM, 'professionalism')
+)
+
+
+def skipped_metrics(state: TicketState, thresholds: Dict[str, Any]) -> List[str]:
+    """
+    Determine which metrics the sequential workflow would not have evaluated.
+
+    Args:
+        state: The evaluation state holding the metric scores
+        thresholds: The gating thresholds from the settings
+
+    Returns:
+        List[str]: The metric keys cut off by the first failing threshold gate
+    """
+    metrics = [metric for metric, _, _ in METRIC_NODES]
+    for index, (metric, threshold) in enumerate(METRIC_GATES):
+        if not state[metric] > thresholds[threshold]:
+            return metrics[index + 1:]
+    return []
+
+
+def apply_threshold_gates(state: TicketState, thresholds: Dict[str, Any]) -> List[str]:
+    """
+    Zero the scores of the metrics the sequential workflow would not have evaluated.
+
+    Args:
+        state: The evaluation state, updated in place
+        thresholds: The gating thresholds from the settings
+
+    Returns:
+        List[str]: The metric keys that were zeroed
+    """
+    for metric, threshold in METRIC_GATES:
+        passed = state[metric] > thresholds[threshold]
+        record_gate(threshold, passed)
+        if not passed:
+            break
+    skipped = skipped_metrics(state, thresholds)
+    for metric in skipped:
+        state[metric] = 0.0
+    return skipped
+
+
+def _node(func, afunc) -> "RunnableLambda":
+    """
+    Combine the instrumented sync and async implementations of a node so the
+    graph supports invoke and ainvoke.
+    """
+    from langchain_core.runnables import RunnableLambda
+
+    name = func.__name__
+    return RunnableLambda(instrument_node(name, func), afunc=ainstrument_node(name, afunc), name=name)
+
+
+def _threshold_router(metric: str, threshold: float, gate: str, next_node: str):
+    """Build a router that continues to ``next_node`` when the metric passes its threshold."""
+    def route(state: TicketState) -> str:
+        passed = state[metric] > threshold
+        record_gate(gate, passed)
+        return next_node if passed else "compute_effectiveness"
+    return route
+
+
+def _speculative_branch(node: "RunnableLambda", name: str, metric: str) -> "RunnableLambda":
+    """Wrap a metric node so it only writes its own score and timings when run as a branch."""
+    def update(result: TicketState, started: float, usage) -> Dict[str, Any]:
+        return {
+            metric: result[metric],
+            "node_metrics": {name: {
+                "duration": time.perf_counter() - started,
+                "tokens": total_tokens(usage)
+            }}
+        }
+
+    def branch(state: TicketState) -> Dict[str, Any]:
+        started = time.perf_counter()
+        with track_usage() as usage:
+            result = node.invoke(dict(state))
+        return update(result, started, usage)
+
+    async def abranch(state: TicketState) -> Dict[str, Any]:
+        started = time.perf_counter()
+        with track_usage() as usage:
+            result = await node.ainvoke(dict(state))
+        return update(result, started, usage)
+
+    from langchain_core.runnables import RunnableLambda
+
+    return RunnableLambda(branch, afunc=abranch, name=name)
+
+
+def _gated_effectiveness(thresholds: Dict[str, Any]):
+    """Build the join node that applies the threshold gates before computing effectiveness."""
+    def join(state: TicketState) -> TicketState:
+        state = dict(state)
+        skipped = apply_threshold_gates(state, thresholds)
+
+        branches = state["node_metrics"]
+        durations = {metric: branches[name]["duration"] for metric, name, _ in METRIC_NODES}
+        sequential_latency = sum(duration for metric, duration in durations.items() if metric not in skipped)
+        parallel_latency = max(durations.values())
+        state["node_metrics"] = {"speculation": {
+            "skipped": skipped,
+            "sequential_latency": sequential_latency,
+            "parallel_latency": parallel_latency,
+            "latency_saved": sequential_latency - parallel_latency,
+            "speculative_tokens": sum(branches[name]["tokens"] for metric, name, _ in METRIC_NODES
+                                      if metric in skipped)
+        }}
+        return compute_effectiveness(state)
+    return join
+
+
+def _create_parallel_workflow(thresholds: Dict[str, Any], checkpointer: Any = None) -> "StateGraph":
+    """
+    Create the workflow that scores all metrics concurrently.
+
+    Every metric node runs as its own branch once the response has been
+    pre-processed, and the branches join at ``compute_effectiveness``,
+    which zeroes the scores the threshold gates would have skipped so the
+    result matches the sequential workflow.
+    """
+    from langgraph.graph import StateGraph, START, END
+
+    workflow = StateGraph(TicketState)
+
+    workflow.add_node("preprocess_response", _node(preprocess_response, apreprocess_response))
+    workflow.add_node("match_near_duplicate", _node(match_near_duplicate, amatch_near_duplicate))
+    workflow.add_edge(START, "preprocess_response")
+    workflow.add_edge("preprocess_response", "match_near_duplicate")
+    for metric, name, implementations in METRIC_NODES:
+        workflow.add_node(name, _speculative_branch(_node(*implementations), name, metric))
+        workflow.add_edge("match_near_duplicate", name)
+    workflow.add_node("compute_effectiveness", instrument_node("compute_effectiveness", _gated_effectiveness(thresholds)))
+    workflow.add_node("generate_feedback", _node(generate_feedback, agenerate_feedback))
+
+    workflow.add_edge([name for _, name, _ in METRIC_NODES], "compute_effectiveness")
+    workflow.add_edge("compute_effectiveness", "generate_feedback")
+    workflow.add_edge("generate_feedback", END)
+
+    return workflow.compile(checkpointer=checkpointer)
+
+
+def _create_fused_workflow(thresholds: Dict[str, Any], checkpointer: Any = None) -> "StateGraph":
+    """
+    Create the workflow that scores all metrics with one rubric call.
+
+    The threshold gates are applied to the fused scores before computing
+    effectiveness, so results stay comparable with the per-metric engine.
+    """
+    from langgraph.graph import StateGraph, START, END
+
+    workflow = StateGraph(TicketState)
+
+    def gated_effectiveness(state: TicketState) -> TicketState:
+        apply_threshold_gates(state, thresholds)
+        return compute_effectiveness(state)
+
+    workflow.add_node("preprocess_response", _node(preprocess_response, apreprocess_response))
+    workflow.add_node("match_near_duplicate", _node(match_near_duplicate, amatch_near_duplicate))
+    workflow.add_node("score_rubric", _node(score_rubric, ascore_rubric))
+    workflow.add_node("compute_effectiveness", instrument_node("compute_effectiveness", gated_effectiveness))
+    workflow.add_node("generate_feedback", _node(generate_feedback, agenerate_feedback))
+
+    workflow.add_edge(START, "preprocess_response")
+    workflow.add_edge("preprocess_response", "match_near_duplicate")
+    workflow.add_edge("match_near_duplicate", "score_rubric")
+    workflow.add_edge("score_rubric", "compute_effectiveness")
+    workflow.add_edge("compute_effectiveness", "generate_feedback")
+    workflow.add_edge("generate_feedback", END)
+
+    return workflow.compile(checkpointer=checkpointer)
+
+
+def create_workflow(settings: Optional[Dict[str, Any]] = None, checkpointer: Any = None) -> "StateGraph":
     """
     Create the LangGraph workflow for ticket evaluation.
 
+    The ``evaluation.scoring_engine`` setting selects between one prompt per
+    metric and a single fused rubric call. For the per-metric engine,
+    ``evaluation.mode`` selects between the sequential workflow, which stops
+    scoring at the first failing threshold, and the parallel workflow, which
+    scores every metric speculatively.
+
+    Args:
+        settings: The application settings, loaded from disk if not provided
+        checkpointer: Checkpoint saver the graph is compiled with; runs then need a thread ID
+
     Returns:
         StateGraph: Compiled workflow graph
     """
+    if settings is None:
+        settings = load_settings()
+    evaluation = settings['evaluation']
+    thresholds = evaluation['thresholds']
+    if evaluation.get('scoring_engine', SCORING_ENGINE_PER_METRIC) == SCORING_ENGINE_FUSED:
+        return _create_fused_workflow(thresholds, checkpointer)
+    if evaluation.get('mode', WORKFLOW_MODE_SEQUENTIAL) == WORKFLOW_MODE_PARALLEL:
+        return _create_parallel_workflow(thresholds, checkpointer)
+
+    from langgraph.graph import StateGraph, END
+
     workflow = StateGraph(TicketState)
-    settings = load_settings()
-    thresholds = settings['evaluation']['thresholds']
 
     # Add nodes to the graph
-    workflow.add_node("evaluate_clarity", evaluate_clarity)
-    workflow.add_node("assess_politeness", assess_politeness)
-    workflow.add_node("examine_professionalism", examine_professionalism)
-    workflow.add_node("verify_resolution", verify_resolution)
-    workflow.add_node("compute_effectiveness", compute_effectiveness)
-    workflow.add_node("generate_feedback", generate_feedback)
+    workflow.add_node("preprocess_response", _node(preprocess_response, apreprocess_response))
+    workflow.add_node("match_near_duplicate", _node(match_near_duplicate, amatch_near_duplicate))
+    workflow.add_node("evaluate_clarity", _node(evaluate_clarity, aevaluate_clarity))
+    workflow.add_node("assess_politeness", _node(assess_politeness, aassess_politeness))
+    workflow.add_node("examine_professionalism", _node(examine_professionalism, aexamine_professionalism))
+    workflow.add_node("verify_resolution", _node(verify_resolution, averify_resolution))
+    workflow.add_node("compute_effectiveness", instrument_node("compute_effectiveness", compute_effectiveness))
+    workflow.add_node("generate_feedback", _node(generate_feedback, agenerate_feedback))
 
     # Define and add conditional edges
+    workflow.add_edge("preprocess_response", "match_near_duplicate")
+    workflow.add_edge("match_near_duplicate", "evaluate_clarity")
     workflow.add_conditional_edges(
         "evaluate_clarity",
-        lambda x: "assess_politeness"
-        if x[METRIC_CLARITY] > thresholds['clarity']
-        else "compute_effectiveness"
+        _threshold_router(METRIC_CLARITY, thresholds['clarity'], 'clarity', "assess_politeness")
     )
     workflow.add_conditional_edges(
         "assess_politeness",
-        lambda x: "examine_professionalism"
-        if x[METRIC_POLITENESS] > thresholds['politeness']
-        else "compute_effectiveness"
+        _threshold_router(METRIC_POLITENESS, thresholds['politeness'], 'politeness', "examine_professionalism")
     )
     workflow.add_conditional_edges(
         "examine_professionalism",
-        lambda x: "verify_resolution"
-        if x[METRIC_PROFESSIONALISM] > thresholds['professionalism']
-        else "compute_effectiveness"
+        _threshold_router(METRIC_PROFESSIONALISM, thresholds['professionalism'], 'professionalism',
+                          "verify_resolution")
     )
     workflow.add_conditional_edges(
         "verify_resolution",
@@ -74,56 +329,273 @@ def create_workflow() -> StateGraph:
     )
 
     # Set the entry point
-    workflow.set_entry_point("evaluate_clarity")
+    workflow.set_entry_point("preprocess_response")
 
     # Set the exit point
     workflow.add_edge("generate_feedback", END)
 
     # Compile the graph
-    return workflow.compile()
+    return workflow.compile(checkpointer=checkpointer)
+
+
+def _build_workflow(settings: Dict[str, Any]) -> "StateGraph":
+    """Compile the shared workflow, with the durable checkpointer if enabled."""
+    from src.evaluator.checkpoint import get_checkpointer
+
+    return create_workflow(settings, get_checkpointer())
+
+
+_registry = WorkflowRegistry(_build_workflow, WORKFLOW_NODES)
 
 
-def evaluate_ticket(response: str):
+def get_workflow():
     """
-    Evaluate a customer support response using the workflow.
+    Get the compiled workflow for the current settings.
+
+    The graph is compiled once and reused across tickets until the
+    scoring engine, workflow mode, thresholds, weights or node set change.
+
+    Returns:
+        StateGraph: Compiled workflow graph
+    """
+    return _registry.get(load_settings())
+
+
+def get_workflow_stats() -> Dict[str, Any]:
+    """
+    Get the hit, miss and rebuild counters of the workflow registry.
+
+    Returns:
+        Dict[str, Any]: The registry counters
+    """
+    return _registry.stats()
+
+
+def create_initial_state(response: str, prescores: Optional[Dict[str, float]] = None) -> TicketState:
+    """
+    Create the initial workflow state for a response.
 
     Args:
         response: The support response to evaluate
+        prescores: Metrics already decided by the local pre-scorer, computed by the workflow if None
 
     Returns:
-        dict: The evaluation result or None if an error occurred
+        TicketState: State with all scores reset
     """
-    app = create_workflow()
-    initial_state = TicketState(
+    return TicketState(
         response=response,
+        original_response=response,
         clarity_score=0.0,
         politeness_score=0.0,
         professionalism_score=0.0,
         resolution_score=0.0,
         effectiveness_score=0.0,
-        feedback=""
+        feedback="",
+        feedback_source=None,
+        prescores=prescores,
+        reused_scores=None,
+        node_metrics={}
     )
 
-    with st.spinner("Evaluating response..."):
-        # Create progress bar
-        progress_bar = st.progress(0)
 
+def run_evaluation(response: str, ticket_id: Optional[str] = None,
+                   prescores: Optional[Dict[str, float]] = None) -> TicketState:
+    """
+    Evaluate a response with the compiled workflow, without any UI reporting.
+
+    With checkpoints enabled, an evaluation of the same ticket and response
+    that failed part way resumes after its last completed node, and one that
+    already completed is returned without running any node.
+
+    Args:
+        response: The support response to evaluate
+        ticket_id: Optional ticket ID attached to the instrumentation record, and keying its checkpoints
+        prescores: Metrics already decided by the local pre-scorer for a batch
+
+    Returns:
+        TicketState: The final evaluation state
+
+    Raises:
+        Exception: Any error raised by the workflow nodes
+    """
+    app = get_workflow()
+    initial = create_initial_state(response, prescores)
+    with trace_ticket(ticket_id), maybe_profile():
+        if app.checkpointer is None:
+            return app.invoke(initial)
+
+        from src.evaluator.checkpoint import checkpoint_config, resume_from
+
+        config = app.checkpointer.claim(checkpoint_config(response, ticket_id, _registry.fingerprint))
         try:
-            # Evaluate the response
-            result = app.invoke(initial_state)
+            state, result = resume_from(app.get_state(config), config, initial)
+            if result is None:
+                result = app.invoke(state, config, durability=app.checkpointer.durability)
+                app.checkpointer.complete(config)
+        finally:
+            app.checkpointer.release(config)
+        return result
+
+
+async def _ainvoke(response: str, ticket_id: Optional[str]) -> TicketState:
+    """Run the compiled workflow asynchronously, resuming from the ticket's checkpoint if enabled."""
+    app = get_workflow()
+    initial = create_initial_state(response)
+    if app.checkpointer is None:
+        return await app.ainvoke(initial)
 
-            # Log results for debugging
-            print(f"Final Effectiveness Score: {result[METRIC_EFFECTIVENESS]:.2f}")
-            print(f"Clarity Score: {result[METRIC_CLARITY]:.2f}")
-            print(f"Politeness Score: {result[METRIC_POLITENESS]:.2f}")
-            print(f"Professionalism Score: {result[METRIC_PROFESSIONALISM]:.2f}")
-            print(f"Resolution Score: {result[METRIC_RESOLUTION]:.2f}")
-            print(f"Feedback:\n{result['feedback']}")
+    from src.evaluator.checkpoint import checkpoint_config, resume_from
+
+    config = await app.checkpointer.aclaim(checkpoint_config(response, ticket_id, _registry.fingerprint))
+    try:
+        state, result = resume_from(await app.aget_state(config), config, initial)
+        if result is None:
+            result = await app.ainvoke(state, config, durability=app.checkpointer.durability)
+            await app.checkpointer.acomplete(config)
+    finally:
+        await app.checkpointer.arelease(config)
+    return result
+
+
+async def aevaluate_ticket(response: str, semaphore: Optional[asyncio.Semaphore] = None,
+                           ticket_id: Optional[str] = None) -> TicketState:
+    """
+    Evaluate a response asynchronously with the compiled workflow.
+
+    Args:
+        response: The support response to evaluate
+        semaphore: Optional semaphore bounding the number of concurrent evaluations
+        ticket_id: Optional ticket ID attached to the instrumentation record, and keying its checkpoints
+
+    Returns:
+        TicketState: The final evaluation state
+
+    Raises:
+        Exception: Any error raised by the workflow nodes
+    """
+    if semaphore is None:
+        with trace_ticket(ticket_id):
+            return await _ainvoke(response, ticket_id)
+    async with semaphore:
+        with trace_ticket(ticket_id):
+            return await _ainvoke(response, ticket_id)
+
+
+async def aevaluate_tickets(responses: Iterable[str],
+                            concurrency: Optional[int] = None) -> List[Union[TicketState, Exception]]:
+    """
+    Evaluate many responses on the current event loop.
+
+    Args:
+        responses: The support responses to evaluate
+        concurrency: Maximum number of evaluations in flight, defaults to ``batch.concurrency``
+
+    Returns:
+        List[Union[TicketState, Exception]]: The result or the raised error for each response, in input order
+    """
+    if concurrency is None:
+        concurrency = load_settings().get('batch', {}).get('concurrency', 8)
+    semaphore = asyncio.Semaphore(concurrency)
+    return await asyncio.gather(
+        *(aevaluate_ticket(response, semaphore) for response in responses),
+        return_exceptions=True
+    )
+
+
+def evaluate_ticket(response: str, listener: Optional[EvaluationListener] = None, ticket_id: Optional[str] = None):
+    """
+    Evaluate a customer support response using the workflow.
+
+    The workflow is streamed, so progress and the scores known so far are
+    reported to the listener as each node finishes, and the feedback text
+    as it is generated when the listener asks for it. Nothing is rendered
+    directly, so the function works in any front end.
+
+    Args:
+        response: The support response to evaluate
+        listener: Receives progress and error events, defaults to logging them
+        ticket_id: Optional ticket ID attached to the instrumentation record
+
+    Returns:
+        dict: The evaluation result or None if an error occurred
+    """
+    with use_listener(listener) as events:
+        events.on_start(response)
+        events.on_progress(0.0)
+
+        try:
+            workflow = get_workflow()
+            # Nodes skipped by a failing threshold gate count as done once effectiveness is computed
+            total = len(workflow.nodes) - 1
+            completed = set()
+            done = 0
+            scores: Dict[str, float] = {}
+            with trace_ticket(ticket_id), maybe_profile():
+                state, config, result = create_initial_state(response), None, None
+                if workflow.checkpointer is not None:
+                    from src.evaluator.checkpoint import checkpoint_config, resume_from
+
+                    config = workflow.checkpointer.claim(
+                        checkpoint_config(response, ticket_id, _registry.fingerprint)
+                    )
+                try:
+                    if config is not None:
+                        state, result = resume_from(workflow.get_state(config), config, state)
+                    if result is None:
+                        durability = getattr(workflow.checkpointer, 'durability', None)
+                        for mode, chunk in workflow.stream(state, config, stream_mode=["updates", "values"],
+                                                           durability=durability):
+                            if mode == "values":
+                                result = chunk
+                                continue
+                            for node, update in chunk.items():
+                                completed.add(node)
+                                done = max(done, total - 1 if node == "compute_effectiveness" else len(completed))
+                                scores.update({metric: update[metric] for metric in NODE_SCORES.get(node, ())})
+                                events.on_progress(done / total, node)
+                                events.on_node_complete(node, dict(scores))
+                        if config is not None:
+                            workflow.checkpointer.complete(config)
+                finally:
+                    if config is not None:
+                        workflow.checkpointer.release(config)
+
+            logger.debug("Scores: effectiveness %.2f, clarity %.2f, politeness %.2f, professionalism %.2f, "
+                         "resolution %.2f", result[METRIC_EFFECTIVENESS], result[METRIC_CLARITY],
+                         result[METRIC_POLITENESS], result[METRIC_PROFESSIONALISM], result[METRIC_RESOLUTION])
+            speculation = result["node_metrics"].get("speculation")
+            if speculation:
+                logger.debug("Parallel latency saved: %.2fs, speculative tokens: %d",
+                             speculation['latency_saved'], speculation['speculative_tokens'])
 
             # Update progress
-            progress_bar.progress(100)
-            st.success(SUCCESS_EVALUATION)
+            events.on_progress(1.0)
+            events.on_complete(result)
             return result
         except Exception as e:
-            st.error(ERROR_EVALUATION.format(str(e)))
-            return None
\ No newline at end of file
+            events.on_error(ERROR_EVALUATION.format(str(e)))
+            return None
+
+
+def write_feedback(result: Dict[str, Any], listener: Optional[EvaluationListener] = None):
+    """
+    Have the LLM write the feedback of an evaluated ticket, e.g. one served a template.
+
+    Args:
+        result: The evaluation result from ``evaluate_ticket``
+        listener: Receives the streamed feedback and error events, defaults to logging them
+
+    Returns:
+        dict: The evaluation result with the new feedback, or None if an error occurred
+    """
+    with use_listener(listener) as events:
+        events.on_start(result["original_response"])
+        events.on_progress(0.0)
+        try:
+            state = instrument_node("generate_feedback", generate_llm_feedback)(dict(result))
+            events.on_progress(1.0)
+            events.on_complete(state)
+            return state
+        except Exception as e:
+            events.on_error(ERROR_EVALUATION.format(str(e)))
+            return None
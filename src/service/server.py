@@ -0,0 +1,522 @@
+"""
+HTTP service exposing the evaluator to other systems.
+
+Requests are put on a bounded priority queue and evaluated by a fixed
+pool of workers; when the queue is full the service answers 429 with a
+``Retry-After`` estimate instead of piling up work. A dispatcher thread
+hands queued requests to free workers in micro-batches, running the
+vectorized local pre-scorer once for the whole batch. Large payloads go
+through asynchronous jobs whose tickets share the queue with interactive
+requests, but never take more than half of it.
+
+Endpoints:
+    POST /evaluate       ``{ticket_id, response}``, answers with the EvaluationResult
+    POST /jobs           ``{tickets: [{ticket_id, response}, ...]}``, answers 202 with a job ID
+    GET  /jobs/<job_id>  Job status, with the results once it is done
+    GET  /health         Queue depth, worker utilisation and job counts
+    GET  /metrics        Prometheus metrics
+"""
+
+import json
+import math
+import time
+import uuid
+import queue
+import logging
+import threading
+import itertools
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, List, Optional, Tuple
+
+from src.evaluator.instrumentation import get_metrics, render_prometheus
+from src.evaluator.preprocess import scoring_text
+from src.evaluator.prescore import prescore_batch
+from src.evaluator.store import get_result_store
+from src.evaluator.workflow import run_evaluation
+from src.utils.helpers import load_settings, to_evaluation_result
+
+logger = logging.getLogger(__name__)
+
+# Queue priorities; interactive requests are always dispatched before job tickets
+PRIORITY_INTERACTIVE = 0
+PRIORITY_JOB = 1
+
+# Smoothing factor of the moving average of evaluation time used for Retry-After
+LATENCY_SMOOTHING = 0.1
+
+# Seconds a job feeder waits for room on the queue before checking whether the service is stopping
+FEED_POLL_INTERVAL = 0.1
+
+SHUTTING_DOWN = "The service is shutting down"
+
+
+class QueueFull(Exception):
+    """Raised when the request queue cannot take more work."""
+
+    def __init__(self, retry_after: int):
+        super().__init__(f"Request queue is full, retry after {retry_after}s")
+        self.retry_after = retry_after
+
+
+class _WorkItem:
+    """One ticket waiting for, or going through, evaluation."""
+
+    def __init__(self, ticket_id: Optional[str], response: str, job: Optional["Job"] = None, index: int = 0):
+        self.ticket_id = ticket_id
+        self.response = response
+        self.job = job
+        self.index = index
+        self.enqueued = time.monotonic()
+        self.result: Optional[Dict[str, Any]] = None
+        self.error: Optional[str] = None
+        self.done = threading.Event()
+
+
+class Job:
+    """An asynchronous evaluation of many tickets."""
+
+    def __init__(self, tickets: List[Dict[str, Any]]):
+        self.id = uuid.uuid4().hex
+        self.tickets = tickets
+        self.results: List[Optional[Dict[str, Any]]] = [None] * len(tickets)
+        self.completed = 0
+        self.failed = 0
+        self.created = time.time()
+        self.finished: Optional[float] = None
+        self._lock = threading.Lock()
+
+    def record(self, item: _WorkItem) -> None:
+        with self._lock:
+            if item.error is None:
+                self.results[item.index] = item.result
+            else:
+                self.results[item.index] = {'ticket_id': item.ticket_id, 'error': item.error}
+                self.failed += 1
+            self.completed += 1
+            if self.completed == len(self.results):
+                self.finished = time.time()
+                self.tickets = []
+
+    def to_dict(self, include_results: bool = True) -> Dict[str, Any]:
+        """
+        Summarize the job for the status endpoint.
+
+        Args:
+            include_results: Whether to include the results of a finished job
+
+        Returns:
+            Dict[str, Any]: Job ID, status, progress counts and, once done, the results
+        """
+        with self._lock:
+            total = len(self.results)
+            status = 'done' if self.finished is not None else ('running' if self.completed else 'queued')
+            summary = {
+                'job_id': self.id,
+                'status': status,
+                'total': total,
+                'completed': self.completed,
+                'failed': self.failed
+            }
+            if include_results and self.finished is not None:
+                summary['results'] = list(self.results)
+            return summary
+
+
+class EvaluationService:
+    """Bounded-queue evaluation service with a worker pool and micro-batched dispatch."""
+
+    def __init__(self, workers: int = 8, queue_size: int = 64, batch_size: int = 16,
+                 batch_window: float = 0.01, request_timeout: float = 120.0, max_jobs: int = 8,
+                 max_job_tickets: int = 10000, job_ttl: float = 3600.0):
+        """
+        Args:
+            workers: Number of tickets evaluated at once
+            queue_size: Maximum number of queued tickets before requests are refused with 429
+            batch_size: Maximum number of queued tickets dispatched together
+            batch_window: Seconds the dispatcher waits for more tickets to join a batch
+            request_timeout: Seconds ``POST /evaluate`` waits for its result
+            max_jobs: Maximum number of unfinished jobs
+            max_job_tickets: Maximum number of tickets in one job
+            job_ttl: Seconds a finished job's results are kept
+        """
+        self.workers = workers
+        self.queue_size = queue_size
+        self.request_timeout = request_timeout
+        self.max_job_tickets = max_job_tickets
+        self._batch_size = batch_size
+        self._batch_window = batch_window
+        self._max_jobs = max_jobs
+        self._job_ttl = job_ttl
+        self._queue: "queue.PriorityQueue[Tuple[int, int, _WorkItem]]" = queue.PriorityQueue(maxsize=queue_size)
+        self._sequence = itertools.count()
+        self._slots = threading.Semaphore(workers)
+        self._job_slots = threading.Semaphore(max(1, queue_size // 2))
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="evaluator-worker")
+        self._jobs: Dict[str, Job] = {}
+        self._lock = threading.Lock()
+        self._stopping = threading.Event()
+        self._dispatcher: Optional[threading.Thread] = None
+        self._feeders: List[threading.Thread] = []
+        self._busy = 0
+        self._average_seconds = 1.0
+        self.batches = 0
+        self.batched_tickets = 0
+
+    def start(self) -> None:
+        """Start dispatching queued tickets to the workers."""
+        self._dispatcher = threading.Thread(target=self._dispatch, name="evaluator-dispatcher", daemon=True)
+        self._dispatcher.start()
+
+    def stop(self) -> None:
+        """
+        Stop dispatching, wait for the tickets in flight, fail the queued ones and flush the result store.
+
+        Job tickets not yet fed to the queue are failed too, so every job finishes.
+        """
+        self._stopping.set()
+        if self._dispatcher is not None:
+            self._dispatcher.join()
+        with self._lock:
+            feeders = list(self._feeders)
+        for feeder in feeders:
+            feeder.join()
+        self._executor.shutdown(wait=True)
+        while True:
+            try:
+                _, _, item = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            self._fail(item)
+        store = get_result_store()
+        if store is not None:
+            store.flush()
+
+    def retry_after(self) -> int:
+        """Estimate the seconds until the queue has room again."""
+        return max(1, math.ceil(self._queue.qsize() * self._average_seconds / self.workers))
+
+    def submit(self, ticket_id: Optional[str], response: str) -> _WorkItem:
+        """
+        Queue one ticket for evaluation ahead of any job tickets.
+
+        Args:
+            ticket_id: The ticket ID
+            response: The support response
+
+        Returns:
+            _WorkItem: The queued ticket; wait on its ``done`` event
+
+        Raises:
+            QueueFull: If the queue has no room
+        """
+        item = _WorkItem(ticket_id, response)
+        try:
+            self._queue.put_nowait((PRIORITY_INTERACTIVE, next(self._sequence), item))
+        except queue.Full:
+            raise QueueFull(self.retry_after())
+        return item
+
+    def submit_job(self, tickets: List[Dict[str, Any]]) -> Job:
+        """
+        Start an asynchronous job evaluating many tickets.
+
+        Args:
+            tickets: ``{ticket_id, response}`` records
+
+        Returns:
+            Job: The job, whose tickets are fed to the queue in the background
+
+        Raises:
+            QueueFull: If too many jobs are unfinished
+        """
+        with self._lock:
+            self._expire_jobs()
+            if sum(1 for job in self._jobs.values() if job.finished is None) >= self._max_jobs:
+                raise QueueFull(self.retry_after())
+            job = Job(tickets)
+            self._jobs[job.id] = job
+            feeder = threading.Thread(target=self._feed, args=(job,), name=f"job-{job.id[:8]}", daemon=True)
+            self._feeders = [thread for thread in self._feeders if thread.is_alive()] + [feeder]
+        feeder.start()
+        return job
+
+    def get_job(self, job_id: str) -> Optional[Job]:
+        with self._lock:
+            self._expire_jobs()
+            return self._jobs.get(job_id)
+
+    def _expire_jobs(self) -> None:
+        """Forget finished jobs older than the TTL. Must be called with the lock held."""
+        cutoff = time.time() - self._job_ttl
+        for job_id in [job_id for job_id, job in self._jobs.items() if job.finished and job.finished < cutoff]:
+            del self._jobs[job_id]
+
+    def _feed(self, job: Job) -> None:
+        """
+        Put a job's tickets on the queue, keeping half of it free for interactive requests.
+
+        Once the service is stopping, the tickets not yet queued are failed instead.
+        """
+        items = [_WorkItem(ticket.get('ticket_id'), ticket.get('response') or '', job, index)
+                 for index, ticket in enumerate(list(job.tickets))]
+        for position, item in enumerate(items):
+            if not self._put_job_item(item):
+                for remaining in items[position:]:
+                    self._fail(remaining)
+                return
+
+    def _put_job_item(self, item: _WorkItem) -> bool:
+        """Queue a job ticket once a job slot and queue room are free; False if the service stops first."""
+        while not self._job_slots.acquire(timeout=FEED_POLL_INTERVAL):
+            if self._stopping.is_set():
+                return False
+        while not self._stopping.is_set():
+            try:
+                self._queue.put((PRIORITY_JOB, next(self._sequence), item), timeout=FEED_POLL_INTERVAL)
+                return True
+            except queue.Full:
+                continue
+        self._job_slots.release()
+        return False
+
+    @staticmethod
+    def _fail(item: _WorkItem) -> None:
+        """Fail a ticket that will not be evaluated because the service is stopping."""
+        item.error = SHUTTING_DOWN
+        if item.job is not None:
+            item.job.record(item)
+        item.done.set()
+
+    def _next_batch(self) -> List[_WorkItem]:
+        """Take the next tickets off the queue, at most one per free worker."""
+        if not self._slots.acquire(timeout=0.1):
+            return []
+        try:
+            _, _, first = self._queue.get(timeout=0.1)
+        except queue.Empty:
+            self._slots.release()
+            return []
+        batch = [first]
+        deadline = time.monotonic() + self._batch_window
+        while len(batch) < self._batch_size and self._slots.acquire(blocking=False):
+            try:
+                _, _, item = self._queue.get(timeout=max(0.0, deadline - time.monotonic()))
+            except queue.Empty:
+                self._slots.release()
+                break
+            batch.append(item)
+        for item in batch:
+            if item.job is not None:
+                self._job_slots.release()
+        return batch
+
+    def _dispatch(self) -> None:
+        while not self._stopping.is_set():
+            batch = self._next_batch()
+            if not batch:
+                continue
+            metrics = get_metrics()
+            for item in batch:
+                metrics.observe('evaluator_service_queue_wait_seconds', {}, time.monotonic() - item.enqueued)
+            try:
+                decisions = prescore_batch([scoring_text(item.response) for item in batch])
+            except Exception as e:
+                logger.warning("Pre-scoring a batch of %d tickets failed: %s", len(batch), e)
+                decisions = [None] * len(batch)
+            self.batches += 1
+            self.batched_tickets += len(batch)
+            for item, prescores in zip(batch, decisions):
+                self._executor.submit(self._evaluate, item, prescores)
+
+    def _evaluate(self, item: _WorkItem, prescores: Optional[Dict[str, float]]) -> None:
+        with self._lock:
+            self._busy += 1
+        started = time.monotonic()
+        try:
+            result = run_evaluation(item.response, item.ticket_id, prescores)
+            item.result = to_evaluation_result(result, item.ticket_id, item.response)
+            store = get_result_store()
+            if store is not None:
+                store.add(item.result)
+        except Exception as e:
+            logger.warning("Evaluating ticket %s failed: %s", item.ticket_id, e)
+            item.error = str(e)
+        finally:
+            elapsed = time.monotonic() - started
+            with self._lock:
+                self._busy -= 1
+                self._average_seconds += LATENCY_SMOOTHING * (elapsed - self._average_seconds)
+            self._slots.release()
+            if item.job is not None:
+                item.job.record(item)
+            item.done.set()
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get service statistics.
+
+        Returns:
+            Dict[str, Any]: Queue depth and capacity, busy workers, mean batch size and job counts
+        """
+        with self._lock:
+            jobs = list(self._jobs.values())
+            busy = self._busy
+        return {
+            'queued': self._queue.qsize(),
+            'queue_size': self.queue_size,
+            'workers': self.workers,
+            'busy_workers': busy,
+            'mean_batch_size': self.batched_tickets / self.batches if self.batches else 0.0,
+            'average_seconds': self._average_seconds,
+            'jobs_running': sum(1 for job in jobs if job.finished is None),
+            'jobs_done': sum(1 for job in jobs if job.finished is not None)
+        }
+
+
+def _ticket(payload: Any) -> Dict[str, Any]:
+    """Validate a ``{ticket_id, response}`` payload."""
+    if not isinstance(payload, dict) or not isinstance(payload.get('response'), str) or not payload['response']:
+        raise ValueError("Each ticket must be an object with a non-empty 'response' string")
+    ticket_id = payload.get('ticket_id')
+    return {'ticket_id': str(ticket_id) if ticket_id is not None else None, 'response': payload['response']}
+
+
+class _EvaluationHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+    server: "EvaluationHTTPServer"
+
+    def _send_json(self, status: int, body: Any, headers: Optional[Dict[str, str]] = None) -> None:
+        data = json.dumps(body).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(data)))
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+        self.wfile.write(data)
+        get_metrics().inc('evaluator_service_requests_total',
+                          {'endpoint': self.path.split('/')[1].split('?')[0], 'status': str(status)})
+
+    def _read_json(self, limit: int) -> Any:
+        length = int(self.headers.get('Content-Length') or 0)
+        if length > limit:
+            self.close_connection = True
+            raise OverflowError(f"Request body exceeds {limit} bytes")
+        return json.loads(self.rfile.read(length) or b'null')
+
+    def do_GET(self):
+        service = self.server.service
+        path = self.path.split('?')[0].rstrip('/')
+        if path == '/health':
+            self._send_json(200, {'status': 'ok', **service.stats()})
+        elif path == '/metrics':
+            data = render_prometheus().encode('utf-8')
+            self.send_response(200)
+            self.send_header('Content-Type', 'text/plain; version=0.0.4')
+            self.send_header('Content-Length', str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+        elif path.startswith('/jobs/'):
+            job = service.get_job(path[len('/jobs/'):])
+            if job is None:
+                self._send_json(404, {'error': 'Unknown job'})
+            else:
+                self._send_json(200, job.to_dict())
+        else:
+            self._send_json(404, {'error': 'Not found'})
+
+    def do_POST(self):
+        service = self.server.service
+        path = self.path.split('?')[0].rstrip('/')
+        if path not in ('/evaluate', '/jobs'):
+            self._send_json(404, {'error': 'Not found'})
+            return
+        try:
+            if path == '/evaluate':
+                ticket = _ticket(self._read_json(self.server.max_request_bytes))
+            else:
+                payload = self._read_json(self.server.max_job_bytes)
+                tickets = payload.get('tickets') if isinstance(payload, dict) else None
+                if not isinstance(tickets, list) or not tickets:
+                    raise ValueError("Expected a non-empty 'tickets' list")
+                if len(tickets) > service.max_job_tickets:
+                    raise OverflowError(f"A job holds at most {service.max_job_tickets} tickets")
+                tickets = [_ticket(ticket) for ticket in tickets]
+        except OverflowError as e:
+            self._send_json(413, {'error': str(e)})
+            return
+        except ValueError as e:
+            self._send_json(400, {'error': str(e)})
+            return
+
+        try:
+            if path == '/jobs':
+                job = service.submit_job(tickets)
+                self._send_json(202, {**job.to_dict(include_results=False), 'status_url': f"/jobs/{job.id}"},
+                                {'Location': f"/jobs/{job.id}"})
+                return
+            item = service.submit(ticket['ticket_id'], ticket['response'])
+        except QueueFull as e:
+            self._send_json(429, {'error': str(e)}, {'Retry-After': str(e.retry_after)})
+            return
+
+        if not item.done.wait(service.request_timeout):
+            self._send_json(504, {'error': f"Evaluation did not finish within {service.request_timeout}s"})
+        elif item.error is not None:
+            self._send_json(500, {'error': item.error})
+        else:
+            self._send_json(200, item.result)
+
+    def log_message(self, format, *args):
+        logger.debug(format, *args)
+
+
+class EvaluationHTTPServer(ThreadingHTTPServer):
+    """Threaded HTTP server bound to an ``EvaluationService``."""
+
+    daemon_threads = True
+    # Listen backlog; the default of 5 resets connections from bursts of clients
+    request_queue_size = 1024
+
+    def __init__(self, address: Tuple[str, int], service: EvaluationService,
+                 max_request_bytes: int = 1_000_000, max_job_bytes: int = 100_000_000):
+        super().__init__(address, _EvaluationHandler)
+        self.service = service
+        self.max_request_bytes = max_request_bytes
+        self.max_job_bytes = max_job_bytes
+
+
+def create_server(host: Optional[str] = None, port: Optional[int] = None) -> EvaluationHTTPServer:
+    """
+    Create the evaluation service and its HTTP server from the ``service`` settings.
+
+    The service is started; call ``serve_forever()`` on the server to
+    accept requests, then ``shutdown()`` and ``service.stop()`` to stop.
+
+    Args:
+        host: The interface to bind, overriding the settings
+        port: The port to listen on, overriding the settings; 0 picks a free port
+
+    Returns:
+        EvaluationHTTPServer: The server
+    """
+    settings = load_settings().get('service', {})
+    service = EvaluationService(
+        workers=settings.get('workers', 8),
+        queue_size=settings.get('queue_size', 64),
+        batch_size=settings.get('batch_size', 16),
+        batch_window=settings.get('batch_window', 0.01),
+        request_timeout=settings.get('request_timeout', 120),
+        max_jobs=settings.get('max_jobs', 8),
+        max_job_tickets=settings.get('max_job_tickets', 10000),
+        job_ttl=settings.get('job_ttl', 3600)
+    )
+    server = EvaluationHTTPServer(
+        (host or settings.get('host', '127.0.0.1'), settings.get('port', 8600) if port is None else port),
+        service,
+        max_request_bytes=settings.get('max_request_bytes', 1_000_000),
+        max_job_bytes=settings.get('max_job_bytes', 100_000_000)
+    )
+    service.start()
+    return server
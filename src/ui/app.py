@@ -2,10 +2,26 @@
 Streamlit UI implementation for the Customer Support Response Evaluator.
 """
 
-import streamlit as st
+import time
+import threading
 
-from src.evaluator.workflow import evaluate_ticket
-from src.utils.helpers import load_config, load_settings, get_score_color, generate_report, get_timestamp
+import streamlit as st
+from streamlit.runtime.scriptrunner import add_script_run_ctx, get_script_run_ctx
+
+from src.evaluator.events import EvaluationListener
+from src.evaluator.store import get_result_store
+from src.evaluator.workflow import evaluate_ticket, write_feedback
+from src.utils.config import get_settings
+from src.utils.helpers import (
+    load_config,
+    load_settings,
+    get_score_color,
+    score_band,
+    generate_report,
+    report_file_name,
+    get_timestamp,
+    to_evaluation_result
+)
 from src.constants import (
     FORM_TICKET_ID_LABEL,
     FORM_TICKET_ID_PLACEHOLDER,
@@ -16,20 +32,83 @@ from src.constants import (
     FORM_SAMPLE_RESPONSE_LABEL,
     FORM_SUBMIT_LABEL,
     FORM_DOWNLOAD_LABEL,
+    FORM_DETAILED_FEEDBACK_LABEL,
+    FEEDBACK_SOURCE_TEMPLATE,
     SECTION_FEEDBACK_TITLE,
     SECTION_SCORES_TITLE,
     SECTION_EFFECTIVENESS_TITLE,
     SECTION_METRICS_TITLE,
+    SECTION_HISTORY_TITLE,
+    HISTORY_BAND_LABEL,
+    HISTORY_TICKET_FILTER_LABEL,
+    HISTORY_PAGE_LABEL,
+    HISTORY_EMPTY,
+    SCORE_BANDS,
     METRIC_FRIENDLY_NAMES,
+    NODE_PROGRESS_LABELS,
+    STREAM_RENDER_INTERVAL,
     FOOTER_CONTENT,
     METRIC_CLARITY,
     METRIC_POLITENESS,
     METRIC_PROFESSIONALISM,
     METRIC_RESOLUTION,
-    METRIC_EFFECTIVENESS
+    METRIC_EFFECTIVENESS,
+    SUCCESS_EVALUATION
 )
 
 
+class StreamlitListener(EvaluationListener):
+    """Renders evaluation progress, partial scores, streamed feedback and errors in the Streamlit page."""
+
+    streams_feedback = True
+
+    def __init__(self):
+        self._ctx = get_script_run_ctx()
+        self._progress_bar = None
+        self._scores = None
+        self._feedback = None
+        self._feedback_text = ""
+        self._last_render = 0.0
+
+    def _attach(self) -> None:
+        """Allow Streamlit calls from the worker threads the workflow runs nodes on."""
+        if self._ctx is not None and get_script_run_ctx(suppress_warning=True) is None:
+            add_script_run_ctx(threading.current_thread(), self._ctx)
+
+    def on_start(self, response):
+        self._progress_bar = st.progress(0)
+        self._scores = st.empty()
+        self._feedback = st.empty()
+
+    def on_progress(self, fraction, message=""):
+        self._attach()
+        self._progress_bar.progress(fraction, text=NODE_PROGRESS_LABELS.get(message))
+
+    def on_node_complete(self, node, scores):
+        self._attach()
+        self._scores.markdown(" · ".join(
+            f"**{METRIC_FRIENDLY_NAMES[metric]}:** {score:.2f}" for metric, score in scores.items()
+        ))
+
+    def on_feedback_token(self, token):
+        self._attach()
+        self._feedback_text += token
+        now = time.monotonic()
+        if now - self._last_render >= STREAM_RENDER_INTERVAL:
+            self._feedback.markdown(self._feedback_text)
+            self._last_render = now
+
+    def on_error(self, message):
+        self._attach()
+        st.error(message)
+
+    def on_complete(self, result):
+        # The final results are rendered by display_results
+        self._scores.empty()
+        self._feedback.empty()
+        st.success(SUCCESS_EVALUATION)
+
+
 def setup_page():
     """Configure the Streamlit page settings."""
     settings = load_settings()
@@ -55,6 +134,8 @@ def initialize_session_state():
         st.session_state.ticket_id = ""
     if 'response_text' not in st.session_state:
         st.session_state.response_text = ""
+    if 'result_id' not in st.session_state:
+        st.session_state.result_id = None
 
 
 def render_input_form():
@@ -106,6 +187,15 @@ def display_results(result, ticket_id, response_text):
     with col1:
         st.subheader(SECTION_FEEDBACK_TITLE)
         st.markdown(result["feedback"])
+        # Feedback served from a template can be rewritten by the LLM on request
+        if result.get("feedback_source") == FEEDBACK_SOURCE_TEMPLATE and st.button(FORM_DETAILED_FEEDBACK_LABEL):
+            updated = write_feedback(result, StreamlitListener())
+            if updated:
+                st.session_state.result = updated
+                store = get_result_store()
+                if store is not None and st.session_state.result_id is not None:
+                    store.update_feedback(st.session_state.result_id, updated["feedback"])
+                st.rerun()
 
     with col2:
         st.subheader(SECTION_SCORES_TITLE)
@@ -135,11 +225,56 @@ def display_results(result, ticket_id, response_text):
     st.download_button(
         label=FORM_DOWNLOAD_LABEL,
         data=generate_report(result, ticket_id, response_text),
-        file_name=f"evaluation_report_{ticket_id}_{get_timestamp().replace(':', '-').replace(' ', '_')}.md",
+        file_name=report_file_name(ticket_id, get_timestamp()),
         mime="text/markdown",
     )
 
 
+def render_history():
+    """Render a paged, filterable view of the stored evaluation results."""
+    store = get_result_store()
+    if store is None:
+        return
+    settings = load_settings()
+    page_size = settings['results'].get('page_size', 20)
+    evaluation = get_settings().evaluation
+
+    with st.expander(SECTION_HISTORY_TITLE):
+        col1, col2 = st.columns(2)
+        with col1:
+            ticket_id = st.text_input(HISTORY_TICKET_FILTER_LABEL, key="history_ticket_id").strip()
+        with col2:
+            band = st.selectbox(HISTORY_BAND_LABEL, ("all",) + SCORE_BANDS, key="history_band")
+        filters = {
+            'ticket_id': ticket_id or None,
+            'band': None if band == "all" else band
+        }
+
+        total = store.count(**filters)
+        if not total:
+            st.markdown(HISTORY_EMPTY)
+            return
+        pages = -(-total // page_size)
+        page = st.number_input(HISTORY_PAGE_LABEL.format(pages=pages), min_value=1, max_value=pages,
+                               value=1, key="history_page")
+        results = store.query(limit=page_size, offset=(page - 1) * page_size, **filters)['results']
+        st.dataframe(
+            [
+                {
+                    'Ticket ID': record['ticket_id'],
+                    'Evaluated': record['timestamp'],
+                    'Band': score_band(record[METRIC_EFFECTIVENESS], evaluation),
+                    **{METRIC_FRIENDLY_NAMES[metric]: round(record[metric], 2) for metric in (
+                        METRIC_EFFECTIVENESS, METRIC_CLARITY, METRIC_POLITENESS,
+                        METRIC_PROFESSIONALISM, METRIC_RESOLUTION
+                    )}
+                }
+                for record in results
+            ],
+            hide_index=True
+        )
+
+
 def render_footer():
     """Render the application footer."""
     st.markdown("---")
@@ -156,12 +291,17 @@ def run_app():
 
     # Process the evaluation when submit button is clicked
     if submit_button and response_text:
-        result = evaluate_ticket(response_text)
+        with st.spinner("Evaluating response..."):
+            result = evaluate_ticket(response_text, StreamlitListener(), ticket_id=ticket_id or None)
         if result:
             st.session_state.result = result
             st.session_state.ticket_id = ticket_id
             st.session_state.response_text = response_text
             st.session_state.evaluated = True
+            store = get_result_store()
+            st.session_state.result_id = None if store is None else store.save(
+                to_evaluation_result(result, ticket_id or None, response_text)
+            )
 
     # Display results if evaluation has been performed
     if st.session_state.evaluated and st.session_state.result:
@@ -171,4 +311,5 @@ def run_app():
             st.session_state.response_text
         )
 
+    render_history()
     render_footer()
\ No newline at end of file
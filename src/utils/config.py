@@ -0,0 +1,565 @@
+"""
+Cached, validated configuration for the Customer Support Response Evaluator.
+
+``config.json`` and ``settings.yaml`` are parsed once, validated into typed
+objects and kept in memory together with precompiled prompt templates.
+A file is only re-read when its modification time or size changes, and is
+only re-parsed when its content hash changes as well.
+"""
+
+import os
+import json
+import time
+import string
+import hashlib
+import threading
+from dataclasses import dataclass, field
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Tuple
+
+import yaml
+
+from src.constants import (
+    CONFIG_PATH,
+    SETTINGS_PATH,
+    CONFIG_PATH_ENV,
+    SETTINGS_PATH_ENV,
+    CONFIG_RELOAD_INTERVAL,
+    WORKFLOW_MODE_SEQUENTIAL,
+    WORKFLOW_MODE_PARALLEL,
+    SCORING_ENGINE_PER_METRIC,
+    SCORING_ENGINE_FUSED,
+    LLM_PROVIDER_OPENAI,
+    LLM_PROVIDER_FAKE,
+    FEEDBACK_POLICY_LLM,
+    FEEDBACK_POLICY_TEMPLATES,
+    SCORE_BANDS
+)
+
+if TYPE_CHECKING:
+    from langchain_core.prompts import ChatPromptTemplate
+
+METRICS = ("clarity", "politeness", "professionalism", "resolution")
+GATED_METRICS = ("clarity", "politeness", "professionalism")
+PROMPTS = METRICS + ("feedback",)
+
+# Variables the feedback templates in ``config.json`` can reference, with sample values used to check them
+FEEDBACK_TEMPLATE_FIELDS = {
+    **{f"{metric}_score": 0.5 for metric in METRICS},
+    "effectiveness_score": 0.5,
+    "band": "average",
+    "strongest": "Clarity",
+    "strongest_score": 0.5,
+    "weakest": "Resolution",
+    "weakest_score": 0.5,
+    "failed_gate": "Clarity",
+    "failed_gate_score": 0.5,
+    "failed_gate_threshold": 0.5
+}
+
+# Chat model options that can be set per prompt in ``llm.routing`` and for ``llm.escalation``
+MODEL_OPTIONS = ("model", "temperature", "max_tokens", "timeout")
+
+# Connection pool options of ``llm.pool``, the limits of ``rate_limit.models`` and the adaptive
+# concurrency options of ``rate_limit.concurrency``
+POOL_OPTIONS = ("max_connections", "max_keepalive_connections", "keepalive_expiry", "connect_timeout")
+RATE_LIMIT_OPTIONS = ("requests_per_minute", "tokens_per_minute")
+CONCURRENCY_OPTIONS = ("initial", "min", "max", "increase", "decrease", "cooldown")
+
+
+@dataclass(frozen=True)
+class LLMSettings:
+    """Validated ``llm`` section of the settings."""
+    provider: str
+    model: str
+    temperature: float
+    timeout: float
+    max_tokens: Optional[int] = None
+    routing: Dict[str, Dict[str, Any]] = field(default_factory=dict)
+    escalation: Optional[Dict[str, Any]] = None
+    escalation_margin: float = 0.0
+    coalesce: bool = True
+    pool: Dict[str, float] = field(default_factory=dict)
+    fake: Dict[str, Any] = field(default_factory=dict)
+
+
+@dataclass(frozen=True)
+class EvaluationSettings:
+    """Validated ``evaluation`` section of the settings."""
+    mode: str
+    scoring_engine: str
+    weights: Dict[str, float]
+    thresholds: Dict[str, float]
+    color_good: float
+    color_average: float
+
+
+@dataclass(frozen=True)
+class FeedbackSettings:
+    """Validated ``feedback`` section of the settings."""
+    policy: str = FEEDBACK_POLICY_LLM
+    llm_bands: Tuple[str, ...] = ()
+
+
+@dataclass(frozen=True)
+class PrescoreSettings:
+    """Validated ``prescore`` section of the settings."""
+    enabled: bool = False
+    margin: float = 0.1
+    short_text_margin: float = 0.15
+    cutoffs: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    batch_size: int = 256
+
+
+@dataclass(frozen=True)
+class NearDuplicateSettings:
+    """Validated ``near_duplicates`` section of the settings."""
+    enabled: bool = False
+    path: str = ".cache/near_duplicates.sqlite3"
+    similarity: float = 0.8
+    max_entries: int = 500000
+    max_age_days: float = 90.0
+
+
+@dataclass(frozen=True)
+class RateLimitSettings:
+    """Validated ``rate_limit`` section of the settings."""
+    enabled: bool = False
+    models: Dict[str, Dict[str, float]] = field(default_factory=dict)
+    completion_tokens: int = 256
+    concurrency: Dict[str, float] = field(default_factory=dict)
+    retry: Dict[str, Any] = field(default_factory=dict)
+    seed: Optional[int] = None
+
+
+@dataclass(frozen=True)
+class Settings:
+    """Validated application settings, keeping the parsed document in ``raw``."""
+    llm: LLMSettings
+    evaluation: EvaluationSettings
+    raw: Dict[str, Any]
+    feedback: FeedbackSettings = field(default_factory=FeedbackSettings)
+    prescore: PrescoreSettings = field(default_factory=PrescoreSettings)
+    near_duplicates: NearDuplicateSettings = field(default_factory=NearDuplicateSettings)
+    rate_limit: RateLimitSettings = field(default_factory=RateLimitSettings)
+
+
+@dataclass(frozen=True)
+class AppConfig:
+    """Validated application configuration with precompiled prompt templates."""
+    templates: Dict[str, str]
+    prompts: Dict[str, "ChatPromptTemplate"]
+    sample_response: str
+    feedback_templates: Dict[str, str]
+    raw: Dict[str, Any]
+
+
+def _number(value: Any, name: str, low: Optional[float] = None, high: Optional[float] = None) -> float:
+    """Validate that a setting is a number within the given bounds."""
+    if isinstance(value, bool) or not isinstance(value, (int, float)):
+        raise ValueError(f"Setting '{name}' must be a number, got {value!r}")
+    if (low is not None and value < low) or (high is not None and value > high):
+        raise ValueError(f"Setting '{name}' must be between {low} and {high}, got {value}")
+    return float(value)
+
+
+def _model_options(raw: Any, name: str) -> Dict[str, Any]:
+    """Validate a set of chat model options overriding the ``llm`` defaults."""
+    if not isinstance(raw, dict):
+        raise ValueError(f"Setting '{name}' must be a mapping of model options")
+    unknown = set(raw) - set(MODEL_OPTIONS)
+    if unknown:
+        raise ValueError(f"Setting '{name}' has unknown options {sorted(unknown)}, "
+                         f"expected {', '.join(MODEL_OPTIONS)}")
+    options: Dict[str, Any] = {}
+    if 'model' in raw:
+        if not isinstance(raw['model'], str):
+            raise ValueError(f"Setting '{name}.model' must be a string")
+        options['model'] = raw['model']
+    if 'temperature' in raw:
+        options['temperature'] = _number(raw['temperature'], f'{name}.temperature', 0.0, 2.0)
+    if 'timeout' in raw:
+        options['timeout'] = _number(raw['timeout'], f'{name}.timeout', 0.0)
+    if raw.get('max_tokens') is not None:
+        options['max_tokens'] = int(_number(raw['max_tokens'], f'{name}.max_tokens', 1))
+    return options
+
+
+def _section(raw: Dict[str, Any], name: str) -> Dict[str, Any]:
+    """Get an optional settings section, which must be a mapping if present."""
+    section = raw.get(name)
+    if section is None:
+        return {}
+    if not isinstance(section, dict):
+        raise ValueError(f"Settings section '{name}' must be a mapping")
+    return section
+
+
+def _numbers(raw: Any, name: str, options: Tuple[str, ...], low: float = 0.0) -> Dict[str, float]:
+    """Validate a mapping of numeric options, rejecting unknown ones."""
+    if raw is None:
+        return {}
+    if not isinstance(raw, dict):
+        raise ValueError(f"Setting '{name}' must be a mapping")
+    unknown = set(raw) - set(options)
+    if unknown:
+        raise ValueError(f"Setting '{name}' has unknown options {sorted(unknown)}, expected {', '.join(options)}")
+    for option, value in raw.items():
+        _number(value, f'{name}.{option}', low)
+    # Integer options such as connection counts keep their type
+    return dict(raw)
+
+
+def _validate_fake(raw: Any, provider: str) -> Dict[str, Any]:
+    """Validate the ``llm.fake`` section, whose active profile must exist when the fake provider is used."""
+    if raw is None:
+        raw = {}
+    if not isinstance(raw, dict):
+        raise ValueError("Setting 'llm.fake' must be a mapping")
+    if provider == LLM_PROVIDER_FAKE:
+        profile = raw.get('profile', 'default')
+        if not isinstance((raw.get('profiles') or {}).get(profile), dict):
+            raise ValueError(f"Setting 'llm.fake.profile' names an unknown profile {profile!r}")
+    return raw
+
+
+def _validate_feedback(raw: Dict[str, Any]) -> FeedbackSettings:
+    policy = raw.get('policy', FEEDBACK_POLICY_LLM)
+    if policy not in (FEEDBACK_POLICY_LLM, FEEDBACK_POLICY_TEMPLATES):
+        raise ValueError(f"Setting 'feedback.policy' must be '{FEEDBACK_POLICY_LLM}' "
+                         f"or '{FEEDBACK_POLICY_TEMPLATES}', got {policy!r}")
+    llm_bands = raw.get('llm_bands') or []
+    if not isinstance(llm_bands, list) or any(band not in SCORE_BANDS for band in llm_bands):
+        raise ValueError(f"Setting 'feedback.llm_bands' must be a list of {', '.join(SCORE_BANDS)}")
+    return FeedbackSettings(policy=policy, llm_bands=tuple(llm_bands))
+
+
+def _validate_prescore(raw: Dict[str, Any]) -> PrescoreSettings:
+    cutoffs = raw.get('cutoffs') or {}
+    if not isinstance(cutoffs, dict) or set(cutoffs) - set(GATED_METRICS):
+        raise ValueError(f"Setting 'prescore.cutoffs' must map {', '.join(GATED_METRICS)} to their cutoffs")
+    return PrescoreSettings(
+        enabled=bool(raw.get('enabled', False)),
+        margin=_number(raw.get('margin', 0.1), 'prescore.margin', 0.0, 1.0),
+        short_text_margin=_number(raw.get('short_text_margin', 0.15), 'prescore.short_text_margin', 0.0, 1.0),
+        cutoffs={
+            metric: {
+                option: _number(value, f'prescore.cutoffs.{metric}.{option}', 0.0, 1.0)
+                for option, value in _numbers(metric_cutoffs, f'prescore.cutoffs.{metric}',
+                                              ('fail_below', 'pass_above')).items()
+            }
+            for metric, metric_cutoffs in cutoffs.items()
+        },
+        batch_size=int(_number(raw.get('batch_size', 256), 'prescore.batch_size', 1))
+    )
+
+
+def _validate_near_duplicates(raw: Dict[str, Any]) -> NearDuplicateSettings:
+    path = raw.get('path', NearDuplicateSettings.path)
+    if not isinstance(path, str):
+        raise ValueError("Setting 'near_duplicates.path' must be a string")
+    return NearDuplicateSettings(
+        enabled=bool(raw.get('enabled', False)),
+        path=path,
+        similarity=_number(raw.get('similarity', 0.8), 'near_duplicates.similarity', 0.0, 1.0),
+        max_entries=int(_number(raw.get('max_entries', 500000), 'near_duplicates.max_entries', 1)),
+        max_age_days=_number(raw.get('max_age_days', 90), 'near_duplicates.max_age_days', 0.0)
+    )
+
+
+def _validate_rate_limit(raw: Dict[str, Any]) -> RateLimitSettings:
+    models = raw.get('models') or {}
+    if not isinstance(models, dict):
+        raise ValueError("Setting 'rate_limit.models' must be a mapping of model names to limits")
+    retry = raw.get('retry') or {}
+    if not isinstance(retry, dict):
+        raise ValueError("Setting 'rate_limit.retry' must be a mapping")
+    retry_nodes = retry.get('nodes') or {}
+    if not isinstance(retry_nodes, dict):
+        raise ValueError("Setting 'rate_limit.retry.nodes' must map node names to retry budgets")
+    seed = raw.get('seed')
+    return RateLimitSettings(
+        enabled=bool(raw.get('enabled', False)),
+        models={
+            model: _numbers(limits, f'rate_limit.models.{model}', RATE_LIMIT_OPTIONS)
+            for model, limits in models.items()
+        },
+        completion_tokens=int(_number(raw.get('completion_tokens', 256), 'rate_limit.completion_tokens', 1)),
+        concurrency=_numbers(raw.get('concurrency'), 'rate_limit.concurrency', CONCURRENCY_OPTIONS),
+        retry={
+            **_numbers({option: value for option, value in retry.items() if option != 'nodes'},
+                       'rate_limit.retry', ('budget', 'base_delay', 'max_delay')),
+            'nodes': {node: int(_number(budget, f'rate_limit.retry.nodes.{node}', 0))
+                      for node, budget in retry_nodes.items()}
+        },
+        seed=None if seed is None else int(_number(seed, 'rate_limit.seed'))
+    )
+
+
+def validate_settings(raw: Dict[str, Any]) -> Settings:
+    """
+    Validate the parsed settings document.
+
+    Args:
+        raw: The parsed ``settings.yaml`` document
+
+    Returns:
+        Settings: The typed settings
+
+    Raises:
+        ValueError: If a required setting is missing or invalid
+    """
+    try:
+        llm = raw['llm']
+        evaluation = raw['evaluation']
+        weights = evaluation['weights']
+        thresholds = evaluation['thresholds']
+        color = thresholds['color']
+    except (KeyError, TypeError) as e:
+        raise ValueError(f"Missing settings section: {e}") from e
+
+    if not isinstance(llm.get('model'), str):
+        raise ValueError("Setting 'llm.model' must be a string")
+    provider = llm.get('provider', LLM_PROVIDER_OPENAI)
+    if provider not in (LLM_PROVIDER_OPENAI, LLM_PROVIDER_FAKE):
+        raise ValueError(f"Setting 'llm.provider' must be '{LLM_PROVIDER_OPENAI}' "
+                         f"or '{LLM_PROVIDER_FAKE}', got {provider!r}")
+    mode = evaluation.get('mode', WORKFLOW_MODE_SEQUENTIAL)
+    if mode not in (WORKFLOW_MODE_SEQUENTIAL, WORKFLOW_MODE_PARALLEL):
+        raise ValueError(f"Setting 'evaluation.mode' must be '{WORKFLOW_MODE_SEQUENTIAL}' "
+                         f"or '{WORKFLOW_MODE_PARALLEL}', got {mode!r}")
+    routing = {
+        prompt: _model_options(options, f'llm.routing.{prompt}')
+        for prompt, options in (llm.get('routing') or {}).items()
+    }
+    escalation = llm.get('escalation') or {}
+    if escalation.get('enabled', False) and not isinstance(escalation.get('model'), str):
+        raise ValueError("Setting 'llm.escalation.model' must be a string when escalation is enabled")
+    scoring_engine = evaluation.get('scoring_engine', SCORING_ENGINE_PER_METRIC)
+    if scoring_engine not in (SCORING_ENGINE_PER_METRIC, SCORING_ENGINE_FUSED):
+        raise ValueError(f"Setting 'evaluation.scoring_engine' must be '{SCORING_ENGINE_PER_METRIC}' "
+                         f"or '{SCORING_ENGINE_FUSED}', got {scoring_engine!r}")
+
+    return Settings(
+        llm=LLMSettings(
+            provider=provider,
+            model=llm['model'],
+            temperature=_number(llm.get('temperature'), 'llm.temperature', 0.0, 2.0),
+            timeout=_number(llm.get('timeout'), 'llm.timeout', 0.0),
+            max_tokens=_model_options({'max_tokens': llm.get('max_tokens')}, 'llm').get('max_tokens'),
+            routing=routing,
+            escalation=_model_options(
+                {key: value for key, value in escalation.items() if key in MODEL_OPTIONS}, 'llm.escalation'
+            ) if escalation.get('enabled', False) else None,
+            escalation_margin=_number(escalation.get('margin', 0.05), 'llm.escalation.margin', 0.0, 1.0),
+            coalesce=bool(llm.get('coalesce', True)),
+            pool=_numbers(llm.get('pool'), 'llm.pool', POOL_OPTIONS),
+            fake=_validate_fake(llm.get('fake'), provider)
+        ),
+        evaluation=EvaluationSettings(
+            mode=mode,
+            scoring_engine=scoring_engine,
+            weights={
+                metric: _number(weights.get(metric), f'evaluation.weights.{metric}', 0.0)
+                for metric in METRICS
+            },
+            thresholds={
+                metric: _number(thresholds.get(metric), f'evaluation.thresholds.{metric}', 0.0, 1.0)
+                for metric in GATED_METRICS
+            },
+            color_good=_number(color.get('good'), 'evaluation.thresholds.color.good', 0.0, 1.0),
+            color_average=_number(color.get('average'), 'evaluation.thresholds.color.average', 0.0, 1.0)
+        ),
+        raw=raw,
+        feedback=_validate_feedback(_section(raw, 'feedback')),
+        prescore=_validate_prescore(_section(raw, 'prescore')),
+        near_duplicates=_validate_near_duplicates(_section(raw, 'near_duplicates')),
+        rate_limit=_validate_rate_limit(_section(raw, 'rate_limit'))
+    )
+
+
+def _feedback_template(template: Any, name: str) -> str:
+    """Validate a feedback template against the variables it can reference."""
+    if not isinstance(template, str):
+        raise ValueError(f"Feedback template '{name}' must be a string")
+    try:
+        fields = {field_name for _, field_name, _, _ in string.Formatter().parse(template) if field_name is not None}
+        unknown = fields - set(FEEDBACK_TEMPLATE_FIELDS)
+        if unknown:
+            raise ValueError(f"unknown variables {sorted(unknown)}, expected {', '.join(FEEDBACK_TEMPLATE_FIELDS)}")
+        template.format_map(FEEDBACK_TEMPLATE_FIELDS)
+    except (ValueError, IndexError) as e:
+        raise ValueError(f"Feedback template '{name}' is invalid: {e}") from e
+    return template
+
+
+def validate_config(raw: Dict[str, Any]) -> AppConfig:
+    """
+    Validate the parsed configuration document and precompile its prompts.
+
+    Args:
+        raw: The parsed ``config.json`` document
+
+    Returns:
+        AppConfig: The typed configuration
+
+    Raises:
+        ValueError: If a prompt template is missing or invalid, or a feedback template is invalid
+    """
+    from langchain_core.prompts import ChatPromptTemplate
+
+    prompts = raw.get('prompts')
+    if not isinstance(prompts, dict):
+        raise ValueError("Missing configuration section: 'prompts'")
+
+    templates = {}
+    for name in PROMPTS:
+        template = prompts.get(name, {}).get('template')
+        if not isinstance(template, str):
+            raise ValueError(f"Prompt '{name}' must define a template string")
+        if '{response}' not in template:
+            raise ValueError(f"Prompt '{name}' must reference {{response}}")
+        templates[name] = template
+
+    # Keep any additional prompts (e.g. optional engines) available as well
+    for name, prompt in prompts.items():
+        if name not in templates and isinstance(prompt, dict) and isinstance(prompt.get('template'), str):
+            templates[name] = prompt['template']
+
+    return AppConfig(
+        templates=templates,
+        prompts={name: ChatPromptTemplate.from_template(template) for name, template in templates.items()},
+        sample_response=raw.get('sample_response', ''),
+        feedback_templates={
+            name: _feedback_template(template, name)
+            for name, template in (raw.get('feedback_templates') or {}).items()
+        },
+        raw=raw
+    )
+
+
+class _CachedFile:
+    """A parsed and validated file that is refreshed only when it changes on disk."""
+
+    def __init__(self, path: str, parser: Callable[[str], Any], validator: Callable[[Any], Any]):
+        self.path = path
+        self._parser = parser
+        self._validator = validator
+        self._value = None
+        self._stat = None
+        self._digest = None
+        self._checked_at = 0.0
+
+    def get(self, interval: float, force: bool = False):
+        """Return the validated value, re-checking the file at most once per interval."""
+        now = time.monotonic()
+        if self._value is not None and not force and now - self._checked_at < interval:
+            return self._value
+        self._checked_at = now
+
+        stat = os.stat(self.path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+        if self._value is not None and not force and signature == self._stat:
+            return self._value
+
+        with open(self.path, 'rb') as f:
+            content = f.read()
+        digest = hashlib.sha256(content).hexdigest()
+        if self._value is None or force or digest != self._digest:
+            self._value = self._validator(self._parser(content.decode('utf-8')))
+            self._digest = digest
+        self._stat = signature
+        return self._value
+
+    @property
+    def digest(self) -> Optional[str]:
+        return self._digest
+
+
+class ConfigStore:
+    """Thread-safe in-memory store for the application configuration and settings."""
+
+    def __init__(self, config_path: Optional[str] = None, settings_path: Optional[str] = None,
+                 reload_interval: float = CONFIG_RELOAD_INTERVAL):
+        """
+        Args:
+            config_path: Path of ``config.json``, defaults to ``$EVALUATOR_CONFIG_PATH`` or ``CONFIG_PATH``
+            settings_path: Path of ``settings.yaml``, defaults to ``$EVALUATOR_SETTINGS_PATH`` or ``SETTINGS_PATH``
+            reload_interval: Minimum seconds between checks for file changes
+        """
+        config_path = config_path or os.getenv(CONFIG_PATH_ENV, CONFIG_PATH)
+        settings_path = settings_path or os.getenv(SETTINGS_PATH_ENV, SETTINGS_PATH)
+        self._lock = threading.Lock()
+        self._reload_interval = reload_interval
+        self._config = _CachedFile(config_path, json.loads, validate_config)
+        self._settings = _CachedFile(settings_path, yaml.safe_load, validate_settings)
+
+    def config(self) -> AppConfig:
+        """Get the validated configuration."""
+        with self._lock:
+            return self._config.get(self._reload_interval)
+
+    def settings(self) -> Settings:
+        """Get the validated settings."""
+        with self._lock:
+            return self._settings.get(self._reload_interval)
+
+    def prompt(self, name: str) -> "ChatPromptTemplate":
+        """Get a precompiled prompt template by name."""
+        return self.config().prompts[name]
+
+    def reload(self) -> None:
+        """Force both files to be re-read and re-validated."""
+        with self._lock:
+            self._config.get(self._reload_interval, force=True)
+            self._settings.get(self._reload_interval, force=True)
+
+    def digests(self) -> Dict[str, Optional[str]]:
+        """Get the content hashes of the currently loaded files."""
+        with self._lock:
+            return {'config': self._config.digest, 'settings': self._settings.digest}
+
+
+_store = ConfigStore()
+
+
+def get_config_store() -> ConfigStore:
+    """
+    Get the process-wide configuration store.
+
+    Returns:
+        ConfigStore: The shared store
+    """
+    return _store
+
+
+def get_settings() -> Settings:
+    """
+    Get the validated application settings.
+
+    Returns:
+        Settings: The typed settings
+    """
+    return _store.settings()
+
+
+def get_app_config() -> AppConfig:
+    """
+    Get the validated application configuration.
+
+    Returns:
+        AppConfig: The typed configuration
+    """
+    return _store.config()
+
+
+def get_prompt(name: str) -> "ChatPromptTemplate":
+    """
+    Get a precompiled prompt template.
+
+    Args:
+        name: The prompt name in ``config.json`` (e.g. ``clarity``)
+
+    Returns:
+        ChatPromptTemplate: The compiled template
+    """
+    return _store.prompt(name)
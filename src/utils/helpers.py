@@ -4,14 +4,23 @@ Utility functions for the Customer Support Response Evaluator.
 
 import os
 import re
+import sys
 import json
-import yaml
 import datetime
-from typing import Dict, Any
-
-import streamlit as st
-
-from src.constants import RATING_PATTERN, CONFIG_PATH, SETTINGS_PATH, ERROR_EXTRACT_RATING
+from typing import Dict, Any, Optional
+
+from src.constants import (
+    RATING_PATTERN,
+    LLM_PROVIDER_FAKE,
+    ERROR_NO_API_KEY,
+    RUBRIC_FIELDS,
+    ERROR_EXTRACT_RATING,
+    ERROR_PARSE_RUBRIC,
+    SCORE_BAND_GOOD,
+    SCORE_BAND_AVERAGE,
+    SCORE_BAND_POOR
+)
+from src.utils.config import EvaluationSettings, get_config_store
 
 
 def parse_rating(content: str) -> float:
@@ -33,26 +42,70 @@ def parse_rating(content: str) -> float:
     raise ValueError(ERROR_EXTRACT_RATING.format(content))
 
 
+def parse_rubric(content: str) -> Dict[str, float]:
+    """
+    Parse and validate the JSON ratings returned by the fused rubric call.
+
+    Args:
+        content: The response content from the LLM
+
+    Returns:
+        Dict[str, float]: The rating for each rubric field
+
+    Raises:
+        ValueError: If the content is not valid JSON or a rating is missing or out of range
+    """
+    try:
+        data = json.loads(content)
+    except json.JSONDecodeError:
+        raise ValueError(ERROR_PARSE_RUBRIC.format(content))
+    if not isinstance(data, dict):
+        raise ValueError(ERROR_PARSE_RUBRIC.format(content))
+
+    ratings = {}
+    for field in RUBRIC_FIELDS:
+        value = data.get(field)
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not 0 <= value <= 1:
+            raise ValueError(ERROR_PARSE_RUBRIC.format(content))
+        ratings[field] = float(value)
+    return ratings
+
+
 def load_config() -> Dict[str, Any]:
     """
     Load the application configuration from the config file.
 
+    The file is parsed once and cached; the returned dictionary is shared
+    and must be treated as read-only.
+
     Returns:
         Dict[str, Any]: The configuration dictionary
     """
-    with open(CONFIG_PATH, 'r') as config_file:
-        return json.load(config_file)
+    return get_config_store().config().raw
 
 
 def load_settings() -> Dict[str, Any]:
     """
     Load the application settings from the settings file.
 
+    The file is parsed once and cached; the returned dictionary is shared
+    and must be treated as read-only.
+
     Returns:
         Dict[str, Any]: The settings dictionary
     """
-    with open(SETTINGS_PATH, 'r') as settings_file:
-        return yaml.safe_load(settings_file)
+    return get_config_store().settings().raw
+
+
+def require_api_key() -> None:
+    """
+    Exit with an error unless an OpenAI API key is set or the offline fake provider is configured.
+
+    Called by the entry points before they build the workflow.
+    """
+    if not os.getenv('OPENAI_API_KEY') and load_settings()['llm'].get('provider') != LLM_PROVIDER_FAKE:
+        print(f"ERROR: {ERROR_NO_API_KEY}")
+        sys.exit(1)
 
 
 def get_score_color(score: float, settings: Dict[str, Any]) -> str:
@@ -75,6 +128,24 @@ def get_score_color(score: float, settings: Dict[str, Any]) -> str:
         return "red"
 
 
+def score_band(score: float, evaluation: EvaluationSettings) -> str:
+    """
+    Get the band of a score from the validated color thresholds.
+
+    Args:
+        score: The score value
+        evaluation: The validated ``evaluation`` settings
+
+    Returns:
+        str: The band name ('good', 'average', or 'poor')
+    """
+    if score >= evaluation.color_good:
+        return SCORE_BAND_GOOD
+    if score >= evaluation.color_average:
+        return SCORE_BAND_AVERAGE
+    return SCORE_BAND_POOR
+
+
 def generate_report(result: Dict[str, Any], ticket_id: str, response_text: str) -> str:
     """
     Generate a markdown report from the evaluation results.
@@ -101,6 +172,48 @@ def generate_report(result: Dict[str, Any], ticket_id: str, response_text: str)
     )
 
 
+def report_file_name(ticket_id: Optional[str], timestamp: str) -> str:
+    """
+    Get the file name of a ticket's markdown report.
+
+    Args:
+        ticket_id: The ID of the ticket being evaluated
+        timestamp: The evaluation timestamp
+
+    Returns:
+        str: The file name, with characters unsafe in file names replaced
+    """
+    name = f"evaluation_report_{ticket_id or 'unknown'}_{timestamp.replace(':', '-').replace(' ', '_')}"
+    return re.sub(r'[^\w.-]', '_', name) + ".md"
+
+
+def to_evaluation_result(result: Dict[str, Any], ticket_id: Optional[str], response_text: str,
+                         timestamp: Optional[str] = None) -> Dict[str, Any]:
+    """
+    Build an EvaluationResult record from the evaluation results.
+
+    Args:
+        result: The evaluation result dictionary
+        ticket_id: The ID of the ticket being evaluated
+        response_text: The original response text
+        timestamp: The evaluation timestamp, defaults to now
+
+    Returns:
+        Dict[str, Any]: The EvaluationResult record
+    """
+    return {
+        'ticket_id': ticket_id,
+        'response': response_text,
+        'clarity_score': result['clarity_score'],
+        'politeness_score': result['politeness_score'],
+        'professionalism_score': result['professionalism_score'],
+        'resolution_score': result['resolution_score'],
+        'effectiveness_score': result['effectiveness_score'],
+        'feedback': result['feedback'],
+        'timestamp': timestamp or get_timestamp()
+    }
+
+
 def get_timestamp() -> str:
     """
     Get the current timestamp in a formatted string.
@@ -0,0 +1,65 @@
+"""
+Shared fixtures for the test suite.
+
+Every test runs against the offline fake LLM backend, with its caches,
+stores and checkpoints under the test's temporary directory. The optional
+stages (cache, near-duplicate index, result store, checkpoints, pre-scorer,
+rate limiter, template feedback) are off unless a test enables them.
+"""
+
+import copy
+from typing import Any, Callable, Dict
+
+import pytest
+import yaml
+
+from src.constants import SETTINGS_PATH, LLM_PROVIDER_FAKE
+from src.utils import config
+
+
+def _merge(base: Dict[str, Any], overrides: Dict[str, Any]) -> Dict[str, Any]:
+    """Recursively merge ``overrides`` into a copy of ``base``."""
+    merged = copy.deepcopy(base)
+    for key, value in overrides.items():
+        if isinstance(value, dict) and isinstance(merged.get(key), dict):
+            merged[key] = _merge(merged[key], value)
+        else:
+            merged[key] = value
+    return merged
+
+
+@pytest.fixture(autouse=True)
+def settings(tmp_path, monkeypatch) -> Callable[..., config.Settings]:
+    """
+    Point the configuration store at an offline settings file for the test.
+
+    Returns a function that rewrites the settings with the given overrides,
+    merged section by section into the offline defaults, and returns them.
+    """
+    with open(SETTINGS_PATH, 'r') as settings_file:
+        base = yaml.safe_load(settings_file)
+    base = _merge(base, {
+        'llm': {
+            'provider': LLM_PROVIDER_FAKE,
+            'fake': {'profile': 'default', 'profiles': {'default': {'latency': 0.0, 'jitter': 0.0}}}
+        },
+        'prescore': {'enabled': False},
+        'cache': {'enabled': False, 'path': str(tmp_path / 'evaluations.sqlite3')},
+        'near_duplicates': {'enabled': False, 'path': str(tmp_path / 'near_duplicates.sqlite3')},
+        'results': {'enabled': False, 'path': str(tmp_path / 'results.sqlite3')},
+        'checkpoints': {'enabled': False, 'path': str(tmp_path / 'checkpoints.sqlite3')},
+        'feedback': {'policy': 'llm'},
+        'rate_limit': {'enabled': False}
+    })
+    path = tmp_path / 'settings.yaml'
+
+    def configure(**overrides: Any) -> config.Settings:
+        with open(path, 'w') as settings_file:
+            yaml.safe_dump(_merge(base, overrides), settings_file)
+        store.reload()
+        return store.settings()
+
+    store = config.ConfigStore(settings_path=str(path), reload_interval=0.0)
+    configure()
+    monkeypatch.setattr(config, '_store', store)
+    return configure
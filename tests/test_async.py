@@ -0,0 +1,29 @@
+import asyncio
+import json
+
+from src.evaluator.workflow import aevaluate_tickets, run_evaluation
+
+FIXTURES = "benchmarks/fixtures/responses.jsonl"
+
+
+def test_async_path_matches_the_sync_scores():
+    with open(FIXTURES, 'r') as fixtures_file:
+        responses = [json.loads(line)['response'] for line in fixtures_file if line.strip()]
+    results = asyncio.run(aevaluate_tickets(responses, concurrency=4))
+    for response, result in zip(responses, results):
+        assert not isinstance(result, Exception)
+        assert result['effectiveness_score'] == run_evaluation(response)['effectiveness_score']
+
+
+def test_async_errors_are_returned_per_ticket(monkeypatch):
+    from src.evaluator import workflow
+
+    async def failing(response, ticket_id):
+        if response == "bad":
+            raise RuntimeError("boom")
+        return {'response': response}
+
+    monkeypatch.setattr(workflow, '_ainvoke', failing)
+    results = asyncio.run(aevaluate_tickets(["good", "bad"], concurrency=2))
+    assert results[0] == {'response': "good"}
+    assert isinstance(results[1], RuntimeError)
@@ -0,0 +1,101 @@
+import json
+import os
+import sqlite3
+
+import pytest
+
+from src.batch.backfill import (BackfillManifest, ShardJob, TICKET_DONE, run_backfill, run_shard, shard_of,
+                                shard_path)
+from src.constants import SETTINGS_PATH_ENV
+
+TICKETS = [{'ticket_id': f"T-{index}", 'response': f"Hello, I have refunded order {index}. Regards, Sam"}
+           for index in range(6)]
+
+
+def _write_input(path):
+    with open(path, 'w') as input_file:
+        for ticket in TICKETS:
+            input_file.write(json.dumps(ticket) + '\n')
+
+
+def _ticket_ids(path):
+    with open(path) as output_file:
+        return [json.loads(line)['ticket_id'] for line in output_file]
+
+
+def _job(tmp_path, shard=0, shards=1):
+    return ShardJob(shard, shards, str(tmp_path / 'tickets.jsonl'), shard_path(str(tmp_path / 'out.jsonl'), shard),
+                    shard_path(str(tmp_path / 'errors.jsonl'), shard), str(tmp_path / 'manifest.sqlite3'),
+                    'ticket_id', 'response', 2, False, 60.0)
+
+
+@pytest.fixture
+def manifest(tmp_path):
+    _write_input(tmp_path / 'tickets.jsonl')
+    manifest = BackfillManifest(str(tmp_path / 'manifest.sqlite3'))
+    manifest.start({'input': 'tickets.jsonl', 'output': 'out.jsonl', 'shards': 1})
+    yield manifest
+    manifest.close()
+
+
+def test_tickets_are_spread_over_the_shards_stably():
+    shards = [shard_of(f"T-{index}", 4) for index in range(200)]
+    assert shards == [shard_of(f"T-{index}", 4) for index in range(200)]
+    assert set(shards) == {0, 1, 2, 3}
+
+
+def test_a_manifest_only_resumes_the_backfill_it_was_started_for(manifest):
+    manifest.start({'input': 'tickets.jsonl', 'output': 'out.jsonl', 'shards': 1})
+    with pytest.raises(ValueError):
+        manifest.start({'input': 'tickets.jsonl', 'output': 'out.jsonl', 'shards': 2})
+
+
+def test_a_resumed_shard_truncates_unrecorded_output_and_skips_done_tickets(tmp_path, manifest):
+    job = _job(tmp_path)
+    first = run_shard(job)
+    assert first['completed'] == len(TICKETS)
+    assert all(manifest.is_done(ticket['ticket_id']) for ticket in TICKETS)
+
+    # A crash after the last ticket was written but before it was recorded, in the middle of the next write
+    with open(job.output, 'rb') as output_file:
+        lines = output_file.readlines()
+    with sqlite3.connect(manifest.path) as connection:
+        connection.execute("DELETE FROM tickets WHERE ticket_key = ?", (json.loads(lines[-1])['ticket_id'],))
+        connection.execute("UPDATE shards SET status = 'running', output_size = ?",
+                           (sum(len(line) for line in lines[:-1]),))
+    with open(job.output, 'ab') as output_file:
+        output_file.write(b'{"ticket_id": "T-trunc')
+
+    resumed = run_shard(job)
+    assert resumed['completed'] == 1
+    assert sorted(_ticket_ids(job.output)) == sorted(ticket['ticket_id'] for ticket in TICKETS)
+    assert manifest.totals() == {'done': len(TICKETS), 'failed': 0}
+    assert manifest.shard(0)['output_size'] == os.path.getsize(job.output)
+
+
+def test_a_stopped_shard_leaves_the_remaining_tickets_for_a_resume(tmp_path, manifest):
+    manifest.request_stop()
+    stopped = run_shard(_job(tmp_path))
+    assert stopped['completed'] == 0
+    assert manifest.pending_shards() == [0]
+
+    manifest.start({'input': 'tickets.jsonl', 'output': 'out.jsonl', 'shards': 1})
+    assert run_shard(_job(tmp_path))['completed'] == len(TICKETS)
+    assert manifest.pending_shards() == []
+    assert manifest.status('T-0') == TICKET_DONE
+
+
+def test_a_backfill_merges_the_shards_and_is_not_rerun(tmp_path, settings, monkeypatch):
+    settings()
+    # Spawned workers read the test's offline settings
+    monkeypatch.setenv(SETTINGS_PATH_ENV, str(tmp_path / 'settings.yaml'))
+    _write_input(tmp_path / 'tickets.jsonl')
+    output = str(tmp_path / 'out.jsonl')
+
+    stats = run_backfill(str(tmp_path / 'tickets.jsonl'), output, workers=2, store=False, report_interval=0.5)
+    assert stats['done'] == len(TICKETS) and stats['evaluated'] == len(TICKETS)
+    assert sorted(_ticket_ids(output)) == sorted(ticket['ticket_id'] for ticket in TICKETS)
+    assert not os.path.exists(shard_path(output, 0))
+
+    again = run_backfill(str(tmp_path / 'tickets.jsonl'), output, workers=2, store=False)
+    assert again['already_merged'] and again['evaluated'] == 0
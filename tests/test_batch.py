@@ -0,0 +1,48 @@
+import csv
+import json
+
+from src.batch.io import ResultWriter, count_tickets, read_tickets
+from src.batch.runner import run_batch
+from src.constants import BATCH_ERROR_FIELDS
+
+FIXTURES = "benchmarks/fixtures/responses.jsonl"
+
+
+def test_read_tickets_maps_custom_fields(tmp_path):
+    path = tmp_path / 'tickets.csv'
+    with open(path, 'w', newline='') as tickets_file:
+        writer = csv.DictWriter(tickets_file, fieldnames=['id', 'body'])
+        writer.writeheader()
+        writer.writerows([{'id': 'A', 'body': 'Hello'}, {'id': 'B', 'body': ''}])
+    assert list(read_tickets(str(path), 'id', 'body')) == [
+        {'ticket_id': 'A', 'response': 'Hello'}, {'ticket_id': 'B', 'response': ''}
+    ]
+    assert count_tickets(str(path)) == 2
+
+
+def test_run_batch_writes_every_result(tmp_path):
+    output = tmp_path / 'results.jsonl'
+    with ResultWriter(str(output)) as writer:
+        progress = run_batch(read_tickets(FIXTURES), writer, concurrency=4, report_interval=60)
+    with open(output) as results_file:
+        results = [json.loads(line) for line in results_file]
+    assert progress.failed == 0
+    assert sorted(result['ticket_id'] for result in results) == sorted(
+        ticket['ticket_id'] for ticket in read_tickets(FIXTURES))
+    assert all(result['feedback'] for result in results)
+
+
+def test_run_batch_records_failures_and_keeps_going(tmp_path):
+    def evaluate(ticket):
+        if ticket['ticket_id'] == 'bad':
+            raise RuntimeError("boom")
+        return {'ticket_id': ticket['ticket_id']}
+
+    tickets = [{'ticket_id': ticket_id, 'response': ''} for ticket_id in ('a', 'bad', 'c')]
+    with ResultWriter(str(tmp_path / 'out.jsonl')) as writer, \
+            ResultWriter(str(tmp_path / 'errors.jsonl'), fields=BATCH_ERROR_FIELDS) as error_writer:
+        progress = run_batch(tickets, writer, concurrency=2, error_writer=error_writer, report_interval=60,
+                             evaluate=evaluate)
+    assert (progress.completed, progress.failed) == (3, 1)
+    with open(tmp_path / 'errors.jsonl') as errors_file:
+        assert json.loads(errors_file.read()) == {'ticket_id': 'bad', 'error': 'boom'}
@@ -0,0 +1,34 @@
+from src.evaluator.cache import EvaluationCache
+from src.evaluator.instrumentation import get_metrics
+from src.evaluator.workflow import run_evaluation
+
+RESPONSE = "Hi Jo, I've refunded the duplicate charge; it will show on your statement within 3 days. Thanks, Sam"
+
+
+def _key(cache, response):
+    return cache.make_key('clarity', "Rate: {response}", {'response': response}, 'gpt-4o-mini', 0.0)
+
+
+def test_keys_ignore_whitespace_and_depend_on_the_model(tmp_path):
+    cache = EvaluationCache(str(tmp_path / 'cache.sqlite3'))
+    assert _key(cache, "Hello   there") == _key(cache, "Hello there")
+    assert _key(cache, "Hello there") != cache.make_key('clarity', "Rate: {response}", {'response': "Hello there"},
+                                                        'gpt-4o', 0.0)
+
+
+def test_a_repeated_evaluation_is_served_from_the_cache(settings):
+    settings(cache={'enabled': True})
+    first = run_evaluation(RESPONSE)
+    misses = get_metrics().total('evaluator_llm_calls_total', {'cache': 'miss'})
+    second = run_evaluation(RESPONSE)
+    assert second['effectiveness_score'] == first['effectiveness_score']
+    assert get_metrics().total('evaluator_llm_calls_total', {'cache': 'miss'}) == misses
+
+
+def test_raising_a_token_limit_misses_the_cached_output(settings):
+    settings(cache={'enabled': True})
+    run_evaluation(RESPONSE)
+    misses = get_metrics().total('evaluator_llm_calls_total', {'cache': 'miss'})
+    settings(cache={'enabled': True}, llm={'routing': {'feedback': {'max_tokens': 1200}}})
+    run_evaluation(RESPONSE)
+    assert get_metrics().total('evaluator_llm_calls_total', {'cache': 'miss'}) == misses + 1
@@ -0,0 +1,81 @@
+import asyncio
+import sqlite3
+
+import pytest
+
+from src.evaluator import evaluator
+from src.evaluator.checkpoint import TicketCheckpointer, checkpoint_config, close_checkpointer
+from src.evaluator.instrumentation import get_metrics
+from src.evaluator.workflow import aevaluate_ticket, run_evaluation
+
+RESPONSE = "Hi Jo, I've refunded the duplicate charge; it will show on your statement within 3 days. Thanks, Sam"
+
+
+@pytest.fixture
+def checkpoints(settings):
+    settings(checkpoints={'enabled': True})
+    yield
+    close_checkpointer()
+
+
+def _llm_calls():
+    return get_metrics().total('evaluator_llm_calls_total', {'cache': 'miss'})
+
+
+def test_a_failed_evaluation_resumes_after_its_last_completed_node(checkpoints, monkeypatch):
+    complete = evaluator._complete
+
+    def failing_feedback(prompt_name, *args, **kwargs):
+        if prompt_name == 'feedback':
+            raise TimeoutError("feedback timed out")
+        return complete(prompt_name, *args, **kwargs)
+
+    monkeypatch.setattr(evaluator, '_complete', failing_feedback)
+    with pytest.raises(TimeoutError):
+        run_evaluation(RESPONSE, ticket_id="T-1")
+    monkeypatch.setattr(evaluator, '_complete', complete)
+
+    calls = _llm_calls()
+    result = run_evaluation(RESPONSE, ticket_id="T-1")
+    # Only the feedback node runs again
+    assert _llm_calls() == calls + 1
+    assert result['feedback']
+
+    # A completed evaluation is restored without running any node
+    assert run_evaluation(RESPONSE, ticket_id="T-1") == result
+    assert _llm_calls() == calls + 1
+    assert get_metrics().total('evaluator_checkpoint_runs_total', {'outcome': 'restored'}) == 1
+
+
+def test_async_evaluations_are_checkpointed_too(checkpoints):
+    first = asyncio.run(aevaluate_ticket(RESPONSE, ticket_id="T-2"))
+    calls = _llm_calls()
+    assert asyncio.run(aevaluate_ticket(RESPONSE, ticket_id="T-2")) == first
+    assert _llm_calls() == calls
+
+
+def test_a_concurrent_run_of_the_same_ticket_gets_a_private_thread(tmp_path):
+    checkpointer = TicketCheckpointer(str(tmp_path / 'checkpoints.sqlite3'))
+    config = checkpoint_config(RESPONSE, "T-3", "workflow")
+    first = checkpointer.claim(config)
+    second = checkpointer.claim(config)
+    assert first['configurable']['thread_id'] == "T-3"
+    assert second['configurable']['thread_id'].startswith("T-3#")
+
+    # Completing and releasing the private run leaves the claimed thread alone
+    checkpointer.release(second)
+    assert checkpointer.claim(config)['configurable']['thread_id'].startswith("T-3#")
+    checkpointer.release(first)
+    assert checkpointer.claim(config)['configurable']['thread_id'] == "T-3"
+    checkpointer.close()
+
+
+def test_a_claim_left_by_a_dead_process_is_taken_over(tmp_path):
+    path = str(tmp_path / 'checkpoints.sqlite3')
+    checkpointer = TicketCheckpointer(path)
+    with sqlite3.connect(path) as connection:
+        connection.execute("INSERT INTO checkpoint_threads (thread_id, updated_at, owner) "
+                           "VALUES ('T-4', strftime('%s', 'now'), '999999999:deadbeef')")
+    config = checkpointer.claim(checkpoint_config(RESPONSE, "T-4", "workflow"))
+    assert config['configurable']['thread_id'] == "T-4"
+    checkpointer.close()
@@ -0,0 +1,26 @@
+import pytest
+
+
+def test_optional_sections_are_validated_into_typed_settings(settings):
+    validated = settings(feedback={'policy': 'templates', 'llm_bands': ['average']},
+                         near_duplicates={'similarity': 0.9})
+    assert validated.feedback.policy == 'templates'
+    assert validated.feedback.llm_bands == ('average',)
+    assert validated.near_duplicates.similarity == 0.9
+    assert validated.rate_limit.models['gpt-4o-mini']['requests_per_minute'] == 500
+    assert validated.llm.pool['max_connections'] == 20
+
+
+@pytest.mark.parametrize('overrides', [
+    {'feedback': {'policy': 'sometimes'}},
+    {'feedback': {'llm_bands': ['excellent']}},
+    {'near_duplicates': {'similarity': 1.5}},
+    {'prescore': {'cutoffs': {'resolution': {'fail_below': 0.2}}}},
+    {'rate_limit': {'models': {'gpt-4o-mini': {'requests_per_second': 5}}}},
+    {'rate_limit': {'concurrency': {'initial': 'many'}}},
+    {'llm': {'pool': {'max_connections': -1}}},
+    {'llm': {'fake': {'profile': 'missing'}}}
+])
+def test_invalid_settings_are_rejected(settings, overrides):
+    with pytest.raises(ValueError):
+        settings(**overrides)
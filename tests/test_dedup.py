@@ -0,0 +1,116 @@
+import sqlite3
+
+import numpy as np
+import pytest
+
+from src.evaluator import dedup
+from src.evaluator.dedup import (NearDuplicateIndex, get_near_duplicate_index, index_namespace, minhash_signature,
+                                 remember_scores)
+from src.evaluator.instrumentation import get_metrics
+from src.evaluator.workflow import run_evaluation
+from src.utils.config import get_app_config
+
+MACRO = ("Hi Dana, thanks for reaching out. I have reset your password and sent a confirmation email to the "
+         "address on file. Please log in within 24 hours and choose a new password. Let us know if anything "
+         "else comes up. Best regards, Sam")
+EDITED = MACRO.replace("Dana", "Priya").replace("24 hours", "48 hours").replace("Best regards", "Kind regards")
+UNRELATED = ("Your parcel left our warehouse on Monday and the courier expects to deliver it by Thursday "
+             "afternoon. The tracking link in your order email shows each stop along the way.")
+SCORES = {'clarity_score': 0.8, 'politeness_score': 0.9, 'professionalism_score': 0.7, 'resolution_score': 0.6}
+
+
+@pytest.fixture(autouse=True)
+def _close_index():
+    yield
+    dedup.close_near_duplicate_index()
+
+
+def _rows(path):
+    with sqlite3.connect(path) as connection:
+        return connection.execute("SELECT COUNT(*) FROM near_duplicates").fetchone()[0]
+
+
+def test_signatures_estimate_the_similarity_of_responses():
+    def similarity(a, b):
+        return (minhash_signature(a) == minhash_signature(b)).mean()
+
+    assert similarity(MACRO, MACRO) == 1.0
+    # Numbers are masked, so a changed delay alone does not lower the similarity
+    assert similarity(MACRO, MACRO.replace("24", "48")) == 1.0
+    assert similarity(MACRO, EDITED) > 0.6
+    assert similarity(MACRO, UNRELATED) < 0.2
+
+
+def test_lookup_finds_edited_macros_only(tmp_path):
+    index = NearDuplicateIndex(str(tmp_path / 'index.sqlite3'), 'ns', similarity=0.6)
+    index.insert(minhash_signature(MACRO), SCORES)
+    match = index.lookup(minhash_signature(EDITED))
+    assert match is not None and match[0] == SCORES
+    assert index.lookup(minhash_signature(UNRELATED)) is None
+    assert index.stats()['reuses'] == 1
+
+
+def test_inserts_are_written_in_batches_and_survive_a_reopen(tmp_path):
+    path = str(tmp_path / 'index.sqlite3')
+    index = NearDuplicateIndex(path, 'ns', flush_every=2, flush_interval=3600)
+    index.insert(minhash_signature(MACRO), SCORES)
+    assert _rows(path) == 0
+    index.insert(minhash_signature(UNRELATED), SCORES)
+    assert _rows(path) == 2
+    index.insert(minhash_signature(MACRO + " P.S. Our office is closed on Friday."), SCORES)
+    index.close()
+    assert _rows(path) == 3
+
+    reopened = NearDuplicateIndex(path, 'ns')
+    assert len(reopened) == 3
+    assert reopened.lookup(minhash_signature(UNRELATED))[0] == SCORES
+    assert len(NearDuplicateIndex(path, 'other')) == 0
+
+
+def test_entries_over_the_limit_are_evicted_least_recently_used_first(tmp_path):
+    path = str(tmp_path / 'index.sqlite3')
+    index = NearDuplicateIndex(path, 'ns', max_entries=10, flush_every=4)
+    responses = [f"Ticket about topic {chr(97 + i)} {'word' + chr(97 + i)} and more {chr(97 + i) * 3}"
+                 for i in range(12)]
+    for response in responses:
+        index.insert(minhash_signature(response), SCORES)
+    assert len(index) <= 10
+    assert index.lookup(minhash_signature(responses[0])) is None
+    assert index.lookup(minhash_signature(responses[-1])) is not None
+    index.close()
+    assert _rows(path) == len(index)
+
+
+def test_only_the_metrics_that_were_scored_are_remembered(settings):
+    settings(near_duplicates={'enabled': True},
+             evaluation={'thresholds': {'clarity': 0.3, 'politeness': 0.5, 'professionalism': 0.5}})
+    state = {'response': MACRO, 'reused_scores': None, **SCORES, 'politeness_score': 0.4,
+             'professionalism_score': 0.0, 'resolution_score': 0.0}
+    remember_scores(state)
+    scores, _ = get_near_duplicate_index().lookup(minhash_signature(MACRO))
+    assert scores == {'clarity_score': 0.8, 'politeness_score': 0.4}
+
+
+def test_the_namespace_changes_with_every_setting_that_changes_the_scores(settings):
+    templates = get_app_config().templates
+    base = index_namespace(settings(), templates)
+    assert index_namespace(settings(), templates) == base
+    variants = [
+        {'evaluation': {'thresholds': {'clarity': 0.1}}},
+        {'prescore': {'enabled': True}},
+        {'llm': {'routing': {'clarity': {'model': 'gpt-4o'}}}},
+        {'llm': {'escalation': {'enabled': True}}},
+    ]
+    for overrides in variants:
+        assert index_namespace(settings(**overrides), templates) != base, overrides
+
+
+def test_a_near_duplicate_is_scored_without_llm_calls(settings):
+    settings(near_duplicates={'enabled': True})
+    first = run_evaluation(MACRO)
+    calls = get_metrics().total('evaluator_llm_calls_total', {'cache': 'miss'})
+    second = run_evaluation(MACRO.replace("24 hours", "two days"))
+    # Only the feedback is written by the LLM
+    assert get_metrics().total('evaluator_llm_calls_total', {'cache': 'miss'}) == calls + 1
+    assert second['effectiveness_score'] == pytest.approx(first['effectiveness_score'])
+    assert not np.isnan(second['resolution_score'])
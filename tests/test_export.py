@@ -0,0 +1,84 @@
+import csv
+import io
+import json
+import zipfile
+
+import pytest
+
+from src.batch.export import _chunks, export_format, export_results, iter_csv, iter_jsonl, iter_parquet_batches
+from src.evaluator.store import ResultStore
+
+THRESHOLDS = {'clarity': 0.3, 'politeness': 0.5, 'professionalism': 0.5}
+
+
+def _record(index, effectiveness):
+    return {'ticket_id': f"T-{index}", 'response': f"Response {index}", 'clarity_score': 0.9,
+            'politeness_score': 0.9, 'professionalism_score': 0.9, 'resolution_score': 0.5,
+            'effectiveness_score': effectiveness, 'feedback': "Fine",
+            'timestamp': f"2024-0{1 + index % 3}-01 00:00:00"}
+
+
+RECORDS = [_record(index, 0.9 if index % 2 else 0.3) for index in range(7)]
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(str(tmp_path / 'results.sqlite3'), {'good': 0.8, 'average': 0.6}, THRESHOLDS)
+    for record in RECORDS:
+        store.add(record)
+    store.flush()
+    yield store
+    store.close()
+
+
+def test_records_are_grouped_into_chunks():
+    assert [len(chunk) for chunk in _chunks(RECORDS, 3)] == [3, 3, 1]
+    assert list(_chunks([], 3)) == []
+
+
+def test_csv_and_jsonl_are_rendered_one_chunk_at_a_time():
+    chunks = list(iter_csv(RECORDS, chunk_size=3))
+    # The header, then one chunk of rows per three records
+    assert len(chunks) == 4
+    rows = list(csv.DictReader(io.StringIO(''.join(chunks))))
+    assert [row['ticket_id'] for row in rows] == [record['ticket_id'] for record in RECORDS]
+
+    chunks = list(iter_jsonl(RECORDS, chunk_size=3))
+    assert [chunk.count('\n') for chunk in chunks] == [3, 3, 1]
+    assert json.loads(chunks[0].splitlines()[0])['effectiveness_score'] == 0.3
+
+
+def test_parquet_batches_follow_the_chunk_size():
+    pytest.importorskip('pyarrow')
+    batches = list(iter_parquet_batches(RECORDS, chunk_size=3))
+    assert [batch.num_rows for batch in batches] == [3, 3, 1]
+    assert batches[0].schema.field('effectiveness_score').type == 'double'
+
+
+def test_the_format_follows_the_extension():
+    assert export_format("out.NDJSON") == 'jsonl'
+    with pytest.raises(ValueError):
+        export_format("out.xlsx")
+
+
+@pytest.mark.parametrize('extension', ['csv', 'jsonl', 'zip'])
+def test_exports_apply_the_filters_newest_first(store, tmp_path, extension):
+    output = str(tmp_path / f"poor.{extension}")
+    stats = export_results(store, output, chunk_size=2, band='poor')
+    assert stats['exported'] == 4 and stats['bytes'] > 0
+    if extension == 'zip':
+        with zipfile.ZipFile(output) as archive:
+            assert len(archive.namelist()) == 4
+    else:
+        exported = export_results(store, str(tmp_path / f"since.{extension}"), chunk_size=2, since="2024-02-01")
+        assert exported['exported'] == sum(1 for record in RECORDS if record['timestamp'] >= "2024-02-01")
+
+
+def test_parquet_row_groups_are_not_cut_to_the_chunk_size(store, tmp_path):
+    pq = pytest.importorskip('pyarrow.parquet')
+    output = str(tmp_path / 'results.parquet')
+    stats = export_results(store, output, chunk_size=2, row_group_size=4)
+    parquet = pq.ParquetFile(output)
+    assert stats['exported'] == parquet.metadata.num_rows == len(RECORDS)
+    assert [parquet.metadata.row_group(index).num_rows for index in range(parquet.num_row_groups)] == [4, 3]
+    assert parquet.read().column('ticket_id').to_pylist() == [f"T-{index}" for index in reversed(range(7))]
@@ -0,0 +1,28 @@
+import pytest
+from langchain_core.messages import HumanMessage
+
+from src.evaluator.fake_llm import FakeChatModel, FakeRateLimitError, fake_rating
+from src.utils.helpers import parse_rating, parse_rubric
+
+
+def test_ratings_are_deterministic_per_prompt():
+    model = FakeChatModel(latency=0.0)
+    prompt = [HumanMessage("Provide a rating. Your response should start with 'Rating: '.\n\nResponse: Hi")]
+    first = parse_rating(model.invoke(prompt).content)
+    assert first == parse_rating(model.invoke(prompt).content) == fake_rating(prompt[0].content)
+    assert 0.3 <= first <= 1.0
+
+
+def test_structured_requests_get_a_rubric():
+    model = FakeChatModel(latency=0.0)
+    reply = model.invoke([HumanMessage("Rate this response")], response_format={'type': 'json_object'})
+    assert set(parse_rubric(reply.content)) == {'clarity', 'politeness', 'professionalism', 'resolution'}
+
+
+def test_requests_beyond_the_rpm_limit_are_rejected():
+    model = FakeChatModel(latency=0.0, rpm_limit=60)
+    model.invoke([HumanMessage("Rating: ?")])
+    with pytest.raises(FakeRateLimitError) as error:
+        model.invoke([HumanMessage("Rating: ?")])
+    assert error.value.status_code == 429
+    assert error.value.retry_after > 0
@@ -0,0 +1,26 @@
+import yaml
+
+from src.constants import FEEDBACK_SOURCE_LLM, FEEDBACK_SOURCE_TEMPLATE, SETTINGS_PATH
+from src.evaluator.instrumentation import get_metrics
+from src.evaluator.workflow import run_evaluation
+
+RESPONSE = "Hi Jo, I've refunded the duplicate charge; it will show on your statement within 3 days. Thanks, Sam"
+
+
+def test_feedback_is_written_by_the_llm_unless_templates_are_enabled():
+    with open(SETTINGS_PATH, 'r') as settings_file:
+        assert yaml.safe_load(settings_file)['feedback']['policy'] == 'llm'
+    assert run_evaluation(RESPONSE)['feedback_source'] == FEEDBACK_SOURCE_LLM
+
+
+def test_the_templates_policy_fills_in_feedback_without_an_llm_call(settings):
+    settings(feedback={'policy': 'templates', 'llm_bands': []})
+    before = get_metrics().total('evaluator_llm_calls_total', {'cache': 'miss'})
+    result = run_evaluation(RESPONSE)
+    scoring_calls = get_metrics().total('evaluator_llm_calls_total', {'cache': 'miss'}) - before
+    assert result['feedback_source'] == FEEDBACK_SOURCE_TEMPLATE and result['feedback']
+
+    settings(feedback={'policy': 'llm'})
+    before = get_metrics().total('evaluator_llm_calls_total', {'cache': 'miss'})
+    assert run_evaluation(RESPONSE)['feedback_source'] == FEEDBACK_SOURCE_LLM
+    assert get_metrics().total('evaluator_llm_calls_total', {'cache': 'miss'}) - before == scoring_calls + 1
@@ -0,0 +1,50 @@
+import asyncio
+import time
+from dataclasses import replace
+
+from src.evaluator.llm import LLMClientProvider
+from src.utils.config import LLMSettings
+
+LLM_SETTINGS = LLMSettings(provider='openai', model='gpt-4o-mini', temperature=0.0, timeout=0.05,
+                           pool={'max_connections': 4})
+
+
+async def _model(provider, llm_settings=LLM_SETTINGS):
+    return provider.get_chat_model(llm_settings, 'test-key')
+
+
+def test_each_event_loop_gets_its_own_async_client():
+    provider = LLMClientProvider()
+    first = asyncio.run(_model(provider))
+    second = asyncio.run(_model(provider))
+    assert first is not second
+    assert first.http_async_client is not second.http_async_client
+    assert first.http_client is second.http_client
+    provider.close()
+
+
+def test_models_are_shared_within_an_event_loop():
+    provider = LLMClientProvider()
+
+    async def models():
+        return await _model(provider), await _model(provider)
+
+    first, second = asyncio.run(models())
+    assert first is second
+    provider.close()
+
+
+def test_pool_changes_swap_clients_and_close_the_old_ones_later():
+    provider = LLMClientProvider()
+    old = provider.get_chat_model(LLM_SETTINGS, 'test-key')
+    new = provider.get_chat_model(replace(LLM_SETTINGS, pool={'max_connections': 8}), 'test-key')
+    assert new.http_client is not old.http_client
+    # Requests already sent with the old model must still find their client open
+    assert not old.http_client.is_closed
+    assert provider.stats()['retired_clients'] == 1
+
+    time.sleep(LLM_SETTINGS.timeout)
+    provider.get_chat_model(replace(LLM_SETTINGS, pool={'max_connections': 8}), 'test-key')
+    assert old.http_client.is_closed
+    assert provider.stats()['retired_clients'] == 0
+    provider.close()
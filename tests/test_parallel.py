@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from src.evaluator.workflow import evaluate_ticket, run_evaluation, skipped_metrics
+
+FIXTURES = "benchmarks/fixtures/responses.jsonl"
+SCORES = ('clarity_score', 'politeness_score', 'professionalism_score', 'resolution_score', 'effectiveness_score')
+
+
+def _responses():
+    with open(FIXTURES, 'r') as fixtures_file:
+        return [json.loads(line)['response'] for line in fixtures_file if line.strip()]
+
+
+def test_skipped_metrics_follow_the_first_failing_gate():
+    thresholds = {'clarity': 0.4, 'politeness': 0.5, 'professionalism': 0.5}
+    state = {'clarity_score': 0.9, 'politeness_score': 0.5, 'professionalism_score': 0.9, 'resolution_score': 0.9}
+    assert skipped_metrics(state, thresholds) == ['professionalism_score', 'resolution_score']
+    state['politeness_score'] = 0.6
+    assert skipped_metrics(state, thresholds) == []
+
+
+@pytest.mark.parametrize('thresholds', [
+    {'clarity': 0.4, 'politeness': 0.5, 'professionalism': 0.5},
+    {'clarity': 0.8, 'politeness': 0.8, 'professionalism': 0.8}
+])
+def test_parallel_mode_matches_the_sequential_scores(settings, thresholds):
+    settings(evaluation={'mode': 'sequential', 'thresholds': thresholds})
+    sequential = [run_evaluation(response) for response in _responses()]
+    settings(evaluation={'mode': 'parallel', 'thresholds': thresholds})
+    parallel = [run_evaluation(response) for response in _responses()]
+    for expected, result in zip(sequential, parallel):
+        assert {score: result[score] for score in SCORES} == {score: expected[score] for score in SCORES}
+
+
+def test_speculation_stats_are_logged_rather_than_printed(settings, capsys, caplog):
+    settings(evaluation={'mode': 'parallel'})
+    with caplog.at_level('DEBUG', logger='src.evaluator.workflow'):
+        assert evaluate_ticket(_responses()[0]) is not None
+    assert "Parallel latency saved" not in capsys.readouterr().out
+    assert any("Parallel latency saved" in record.getMessage() for record in caplog.records)
@@ -0,0 +1,37 @@
+from src.evaluator.preprocess import clean_response, enforce_budget
+
+REPLY = "Hi Dana,\n\nYour replacement card was posted today and should arrive by Friday."
+
+
+def test_contact_block_after_the_sign_off_is_dropped():
+    text = f"{REPLY}\n\nBest regards,\nJohn Smith\nCustomer Support Team\nAcme Inc.\n+1 (555) 010-2000\njohn@acme.com"
+    assert clean_response(text) == f"{REPLY}\n\nBest regards,\nJohn Smith"
+
+
+def test_a_mid_reply_thank_you_keeps_the_rest_of_the_reply():
+    text = ("Hi Dana,\n\nThank you\n\nI checked your order and it shipped this morning. "
+            "You can track it with the link in your confirmation email.\n\nLet me know if it does not arrive.")
+    assert clean_response(text) == text
+
+
+def test_a_sign_off_followed_by_a_sentence_is_kept():
+    text = f"{REPLY}\n\nThanks,\nJohn\n\nP.S. Your refund has also been issued."
+    assert clean_response(text) == text
+
+
+def test_a_short_last_line_after_thanks_is_treated_as_the_name():
+    text = f"{REPLY}\n\nThanks\nJohn"
+    assert clean_response(text) == text
+
+
+def test_quoted_history_and_disclaimers_are_dropped():
+    text = (f"{REPLY}\n\nOn Mon, 3 Jun 2024, Dana <dana@example.com> wrote:\n> Where is my card?\n"
+            "This email is confidential and intended for the recipient only.")
+    assert clean_response(text) == REPLY
+
+
+def test_over_budget_responses_keep_their_start_and_end():
+    text = " ".join(f"word{i}" for i in range(2000))
+    shortened, tokens = enforce_budget(text, 100, 'gpt-4o-mini')
+    assert tokens <= 100
+    assert shortened.startswith("word0 ") and shortened.endswith("word1999")
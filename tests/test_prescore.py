@@ -0,0 +1,42 @@
+from src.evaluator.prescore import prescore, prescore_batch
+from src.utils.config import get_settings
+from benchmarks.prescore_agreement import agreement
+
+RUDE = "WTF is wrong with u?? this is so stupid lol, just reinstall the damn app, dunno what else u want!!!"
+POLISHED = ("Hello Maria,\n\nThank you for reaching out, and I'm sorry for the trouble with your invoice. "
+            "I have corrected the billing address and sent you an updated copy. You should receive it within "
+            "the next hour. Please let me know if anything else needs to change.\n\nKind regards,\nAlex")
+
+
+def test_nothing_is_decided_when_disabled():
+    assert get_settings().prescore.enabled is False
+    assert prescore(RUDE) == {}
+
+
+def test_obvious_cases_are_decided_and_borderline_ones_left_to_the_llm(settings):
+    settings(prescore={'enabled': True})
+    rude, polished, vague = prescore_batch([RUDE, POLISHED, "Ok, will check."])
+    assert rude['professionalism_score'] <= 0.25
+    assert all(score > 0.5 for score in polished.values())
+    assert 'professionalism_score' not in polished or polished['professionalism_score'] >= 0.9
+    assert vague == {}
+
+
+def _record(response, clarity, politeness, professionalism, resolution=0.5):
+    return {'response': response, 'clarity_score': clarity, 'politeness_score': politeness,
+            'professionalism_score': professionalism, 'resolution_score': resolution}
+
+
+def test_agreement_compares_decisions_with_the_llm_scores(settings):
+    thresholds = {'clarity': 0.4, 'politeness': 0.5, 'professionalism': 0.5}
+    prescore_settings = settings().prescore
+    agreeing = agreement([_record(RUDE, 0.6, 0.2, 0.1, 0.0)], prescore_settings, thresholds)
+    assert agreeing['professionalism_score']['decided'] == 1
+    assert agreeing['professionalism_score']['gate_agreement'] == 1.0
+
+    disagreeing = agreement([_record(RUDE, 0.6, 0.9, 0.8)], prescore_settings, thresholds)
+    assert disagreeing['professionalism_score']['gate_agreement'] == 0.0
+
+    # Metrics cut off by a gate were never scored by the LLM and are not compared
+    gated = agreement([_record(RUDE, 0.1, 0.0, 0.0, 0.0)], prescore_settings, thresholds)
+    assert gated['professionalism_score']['evaluated'] == 0
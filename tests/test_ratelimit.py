@@ -0,0 +1,140 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.evaluator import ratelimit
+from src.evaluator.ratelimit import (AIMDLimiter, RateLimiter, RETRY_RATE_LIMIT, RETRY_SERVER_ERROR, RETRY_TIMEOUT,
+                                     TokenBucket, classify_error, get_rate_limiter, retry_after)
+
+
+class ProviderError(Exception):
+    def __init__(self, status_code, retry_after=None):
+        super().__init__(f"HTTP {status_code}")
+        self.status_code = status_code
+        self.retry_after = retry_after
+
+
+def test_token_bucket_allows_a_burst_then_spaces_reservations():
+    bucket = TokenBucket(per_minute=600, burst_seconds=1.0)
+    assert bucket.capacity == 10
+    assert [bucket.reserve(1) for _ in range(10)] == [0.0] * 10
+    assert bucket.reserve(1) == pytest.approx(0.1, abs=0.01)
+    # Returned tokens cover the debt again
+    bucket.adjust(5)
+    assert bucket.reserve(1) == 0.0
+
+
+def test_aimd_limit_grows_on_success_and_halves_on_overload():
+    limiter = AIMDLimiter(initial=4, minimum=1, maximum=5, cooldown=60)
+    # About one limit's worth of successful calls widens the limit by one
+    for _ in range(5):
+        limiter.acquire()
+        limiter.release(False)
+    assert limiter.limit == pytest.approx(5.0)
+    limiter.acquire()
+    limiter.release(True)
+    assert limiter.limit == pytest.approx(2.5)
+    # Overload errors within the cooldown were caused by calls sent before the decrease
+    limiter.acquire()
+    limiter.release(True)
+    assert limiter.limit == pytest.approx(2.5)
+    limiter.acquire()
+    limiter.release(None)
+    assert limiter.limit == pytest.approx(2.5)
+
+
+def test_aimd_waiters_are_woken_when_a_slot_frees():
+    limiter = AIMDLimiter(initial=1, minimum=1, maximum=1)
+    limiter.acquire()
+    acquired = threading.Event()
+    thread = threading.Thread(target=lambda: (limiter.acquire(), acquired.set()))
+    thread.start()
+    assert not acquired.wait(0.05)
+    limiter.release(False)
+    assert acquired.wait(5)
+    thread.join()
+
+    async def main():
+        waiter = asyncio.ensure_future(limiter.aacquire())
+        await asyncio.sleep(0.01)
+        assert not waiter.done()
+        limiter.release(False)
+        await asyncio.wait_for(waiter, 5)
+
+    asyncio.run(main())
+    assert limiter.in_flight == 1
+
+
+def test_errors_are_classified_for_retries():
+    assert classify_error(ProviderError(429)) == RETRY_RATE_LIMIT
+    assert classify_error(ProviderError(408)) == RETRY_TIMEOUT
+    assert classify_error(TimeoutError()) == RETRY_TIMEOUT
+    assert classify_error(ProviderError(503)) == RETRY_SERVER_ERROR
+    assert classify_error(ProviderError(400)) is None
+    assert classify_error(ValueError("bad prompt")) is None
+    assert retry_after(ProviderError(429, retry_after=2)) == 2.0
+
+
+def test_transient_errors_are_retried_within_the_budget():
+    limiter = RateLimiter('gpt-4o-mini', retry={'budget': 2, 'base_delay': 0.0, 'max_delay': 0.0}, seed=0)
+    attempts = []
+
+    def flaky():
+        attempts.append(1)
+        if len(attempts) < 3:
+            raise ProviderError(503)
+        return "ok"
+
+    assert limiter.call(flaky) == "ok"
+    assert limiter.stats()['retries'] == 2
+
+    with pytest.raises(ProviderError):
+        limiter.call(lambda: (_ for _ in ()).throw(ProviderError(503)))
+    with pytest.raises(ProviderError):
+        limiter.call(lambda: (_ for _ in ()).throw(ProviderError(400)))
+    assert limiter.stats()['failures'] == 2
+
+
+def test_retry_after_pauses_the_model():
+    limiter = RateLimiter('gpt-4o-mini', retry={'budget': 1}, seed=0)
+    attempts = []
+
+    def limited():
+        attempts.append(time.monotonic())
+        if len(attempts) == 1:
+            raise ProviderError(429, retry_after=0.1)
+        return "ok"
+
+    assert limiter.call(limited) == "ok"
+    assert attempts[1] - attempts[0] >= 0.1
+    assert limiter.stats()['concurrency_limit'] < 16
+
+
+def test_limiters_are_shared_until_the_rate_limit_settings_change(settings):
+    settings(rate_limit={'enabled': True})
+    limiter = get_rate_limiter('gpt-4o-mini')
+    assert get_rate_limiter('gpt-4o-mini') is limiter
+    # A reload that leaves the section unchanged keeps the limiters and their adapted limits
+    settings(rate_limit={'enabled': True}, llm={'temperature': 0.5})
+    assert get_rate_limiter('gpt-4o-mini') is limiter
+    settings(rate_limit={'enabled': True, 'concurrency': {'initial': 4}})
+    assert get_rate_limiter('gpt-4o-mini') is not limiter
+    settings(rate_limit={'enabled': False})
+    assert get_rate_limiter('gpt-4o-mini') is None
+
+
+def test_the_offline_backend_uses_the_limits_of_the_real_model(settings):
+    settings(rate_limit={'enabled': True, 'models': {'gpt-4o-mini': {'requests_per_minute': 120}}})
+    limiter = get_rate_limiter('fake/gpt-4o-mini')
+    assert limiter._requests is not None and limiter._requests.rate == pytest.approx(2.0)
+    assert get_rate_limiter('fake/unlisted')._requests is None
+
+
+def test_rate_share_scales_the_budgets(settings, monkeypatch):
+    settings(rate_limit={'enabled': True, 'models': {'gpt-4o-mini': {'requests_per_minute': 120}}})
+    monkeypatch.setattr(ratelimit, '_rate_share', 0.5)
+    limiter = get_rate_limiter('gpt-4o-mini')
+    assert limiter._requests.rate == pytest.approx(1.0)
+    assert limiter.stats()['concurrency_limit'] == 8
@@ -0,0 +1,67 @@
+import numpy as np
+
+from src.evaluator.dedup import close_near_duplicate_index, get_near_duplicate_index, minhash_signature
+from src.evaluator.preprocess import preprocess_response
+from src.evaluator.rescore import inferred_evaluated, plan_rescore, rescore_results
+from src.evaluator.store import ResultStore
+from src.evaluator.workflow import create_initial_state
+
+THRESHOLDS = {'clarity': 0.4, 'politeness': 0.5, 'professionalism': 0.5}
+RAMBLING = ("Hello, so regarding your question, there are a number of things that could be going on and it really "
+            "depends on a variety of factors, some of which are related to your setup and some of which may or may "
+            "not be related to our systems, and in any case we are looking into things generally and will probably "
+            "have more information at some point.")
+
+
+def test_trailing_zero_scores_are_inferred_as_never_evaluated():
+    scores = np.array([[0.5, 0.0, 0.0, 0.0], [0.0, 0.0, 0.0, 0.0], [0.5, 0.6, 0.7, 0.8], [0.5, 0.0, 0.7, 0.0]])
+    assert inferred_evaluated(scores).tolist() == [1, 1, 4, 3]
+
+
+def test_plan_rescore_replays_the_gates_over_stored_scores():
+    scores = np.array([
+        [0.3, 0.0, 0.0, 0.0],  # stopped at clarity
+        [0.9, 0.9, 0.9, 0.7],  # fully evaluated
+        [0.9, 0.3, 0.0, 0.0],  # stopped at politeness
+    ])
+    evaluated = np.array([1, 4, 2])
+
+    reached, pending = plan_rescore(scores, evaluated, THRESHOLDS)
+    assert reached.tolist() == [1, 4, 2] and not pending.any()
+
+    # A lowered clarity gate needs the politeness node for the first result only
+    reached, pending = plan_rescore(scores, evaluated, {**THRESHOLDS, 'clarity': 0.2})
+    assert reached.tolist() == [1, 4, 2] and pending.tolist() == [True, False, False]
+
+    # A raised clarity gate cuts the other two short without any node call
+    reached, pending = plan_rescore(scores, evaluated, {**THRESHOLDS, 'clarity': 0.95})
+    assert reached.tolist() == [1, 1, 1] and not pending.any()
+
+    reached, pending = plan_rescore(scores, evaluated, {**THRESHOLDS, 'politeness': 0.2})
+    assert reached.tolist() == [1, 4, 2] and pending.tolist() == [False, False, True]
+
+
+def test_ungated_metrics_are_scored_by_the_llm_not_reused(settings, tmp_path):
+    store = ResultStore(str(tmp_path / 'rescore.sqlite3'), {'good': 0.8, 'average': 0.6}, THRESHOLDS)
+    store.save({'ticket_id': 'FIXTURE-rambling', 'response': RAMBLING, 'clarity_score': 0.3,
+                'politeness_score': 0.0, 'professionalism_score': 0.0, 'resolution_score': 0.0,
+                'effectiveness_score': 0.075, 'feedback': "Stopped early at clarity.",
+                'timestamp': "2024-01-01 00:00:00"})
+
+    lowered = {'clarity': 0.05, 'politeness': 0.05, 'professionalism': 0.05}
+    settings(evaluation={'thresholds': lowered}, near_duplicates={'enabled': True}, prescore={'enabled': True})
+    try:
+        # A near duplicate scored only on clarity, which would cut the result short again if reused
+        cleaned = preprocess_response(create_initial_state(RAMBLING, prescores={}))['response']
+        get_near_duplicate_index().insert(minhash_signature(cleaned), {'clarity_score': 0.01})
+
+        stats = rescore_results(store)
+    finally:
+        close_near_duplicate_index()
+
+    assert stats['ungated'] == 1 and stats['metric_calls'] == 3 and stats['failed'] == 0
+    record = store.latest('FIXTURE-rambling')
+    store.close()
+    assert record['clarity_score'] == 0.3
+    assert all(record[metric] >= 0.3 for metric in ('politeness_score', 'professionalism_score', 'resolution_score'))
+    assert record['feedback'] != "Stopped early at clarity."
@@ -0,0 +1,120 @@
+import asyncio
+
+import pytest
+
+from src.evaluator.evaluator import model_options
+from src.evaluator.fake_llm import fake_rating
+from src.evaluator.instrumentation import get_metrics
+from src.evaluator.llm import get_client_provider
+from src.evaluator.workflow import aevaluate_tickets, run_evaluation
+from src.utils.config import get_prompt
+
+RESPONSE = "Hello, your refund was issued today and should arrive within 5 days. Best, Alex"
+ROUTING = {
+    'clarity': {'model': 'clarity-model', 'max_tokens': 32},
+    'politeness': {'model': 'politeness-model', 'temperature': 0.3},
+    'professionalism': {'model': 'professionalism-model', 'timeout': 5},
+    'resolution': {'model': 'resolution-model', 'max_tokens': 48},
+    'feedback': {'model': 'feedback-model', 'max_tokens': 900}
+}
+NODES = {
+    'evaluate_clarity': 'clarity-model',
+    'assess_politeness': 'politeness-model',
+    'examine_professionalism': 'professionalism-model',
+    'verify_resolution': 'resolution-model',
+    'generate_feedback': 'feedback-model'
+}
+OPEN = {'clarity': 0.0, 'politeness': 0.0, 'professionalism': 0.0}
+
+
+def _calls(node, model):
+    return get_metrics().total('evaluator_llm_calls_total', {'node': node, 'model': f"fake/{model}"})
+
+
+def _escalations(node):
+    return get_metrics().total('evaluator_llm_escalations_total', {'node': node})
+
+
+def test_model_options_apply_the_route_then_the_escalation_model(settings):
+    settings(llm={'model': 'base', 'temperature': 0.0, 'max_tokens': None, 'routing': ROUTING,
+                  'escalation': {'enabled': True, 'model': 'large', 'margin': 0.05}})
+    assert model_options() == {'model': 'base', 'temperature': 0.0, 'timeout': 60, 'max_tokens': None}
+    assert model_options('clarity') == {'model': 'clarity-model', 'temperature': 0.0, 'timeout': 60, 'max_tokens': 32}
+    assert model_options('politeness')['temperature'] == 0.3
+    assert model_options('professionalism')['timeout'] == 5
+    assert model_options('clarity', escalated=True) == {'model': 'large', 'temperature': 0.0, 'timeout': 60,
+                                                        'max_tokens': 32}
+
+
+def test_escalated_options_fall_back_to_the_route_when_escalation_is_disabled(settings):
+    settings(llm={'routing': ROUTING})
+    assert model_options('clarity', escalated=True) == model_options('clarity')
+
+
+def test_each_node_calls_the_model_it_is_routed_to(settings):
+    settings(llm={'routing': ROUTING}, evaluation={'thresholds': OPEN})
+    before = {node: _calls(node, model) for node, model in NODES.items()}
+    run_evaluation(RESPONSE)
+    assert {node: _calls(node, model) - before[node] for node, model in NODES.items()} == dict.fromkeys(NODES, 1)
+
+
+def test_routed_options_reach_the_chat_model(settings):
+    pytest.importorskip('langchain_openai')
+    llm_settings = settings(llm={'provider': 'openai', 'routing': ROUTING}).llm
+    provider = get_client_provider()
+    try:
+        clarity = provider.get_chat_model(llm_settings, 'sk-test', model_options('clarity'))
+        feedback = provider.get_chat_model(llm_settings, 'sk-test', model_options('feedback'))
+        politeness = provider.get_chat_model(llm_settings, 'sk-test', model_options('politeness'))
+    finally:
+        provider.close()
+    assert (clarity.model_name, clarity.max_tokens) == ('clarity-model', 32)
+    assert (feedback.model_name, feedback.max_tokens) == ('feedback-model', 900)
+    assert politeness.temperature == 0.3
+
+
+def _clarity_rating():
+    return fake_rating(get_prompt('clarity').format(response=RESPONSE))
+
+
+def test_a_rating_inside_the_margin_is_re_asked_with_the_escalation_model(settings):
+    rating = _clarity_rating()
+    settings(llm={'escalation': {'enabled': True, 'model': 'large', 'margin': 0.05}},
+             evaluation={'thresholds': {**OPEN, 'clarity': round(rating - 0.03, 2)}})
+    escalations, large = _escalations('evaluate_clarity'), _calls('evaluate_clarity', 'large')
+    result = run_evaluation(RESPONSE)
+    assert _escalations('evaluate_clarity') - escalations == 1
+    assert _calls('evaluate_clarity', 'large') - large == 1
+    assert result['clarity_score'] == rating
+
+
+def test_a_rating_outside_the_margin_is_not_escalated(settings):
+    rating = _clarity_rating()
+    settings(llm={'escalation': {'enabled': True, 'model': 'large', 'margin': 0.05}},
+             evaluation={'thresholds': {**OPEN, 'clarity': round(rating - 0.1, 2)}})
+    escalations, large = _escalations('evaluate_clarity'), _calls('evaluate_clarity', 'large')
+    run_evaluation(RESPONSE)
+    assert _escalations('evaluate_clarity') == escalations
+    assert _calls('evaluate_clarity', 'large') == large
+
+
+def test_the_async_path_escalates_near_threshold_ratings(settings):
+    rating = _clarity_rating()
+    settings(llm={'escalation': {'enabled': True, 'model': 'large', 'margin': 0.05}},
+             evaluation={'thresholds': {**OPEN, 'clarity': round(rating - 0.03, 2)}})
+    large = _calls('evaluate_clarity', 'large')
+    asyncio.run(aevaluate_tickets([RESPONSE]))
+    assert _calls('evaluate_clarity', 'large') - large == 1
+
+
+@pytest.mark.parametrize('offset, escalated', [(0.03, 1), (0.1, 0)])
+def test_the_fused_rubric_is_re_scored_only_near_a_threshold(settings, offset, escalated):
+    prompt = get_prompt('rubric').format(response=RESPONSE)
+    thresholds = {metric: 0.0 for metric in OPEN}
+    thresholds['politeness'] = round(fake_rating(prompt, 'politeness') - offset, 2)
+    settings(llm={'escalation': {'enabled': True, 'model': 'large', 'margin': 0.05}},
+             evaluation={'scoring_engine': 'fused', 'thresholds': thresholds})
+    escalations, large = _escalations('score_rubric'), _calls('score_rubric', 'large')
+    run_evaluation(RESPONSE)
+    assert _escalations('score_rubric') - escalations == escalated
+    assert _calls('score_rubric', 'large') - large == escalated
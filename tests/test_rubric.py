@@ -0,0 +1,49 @@
+import json
+
+import pytest
+
+from src.evaluator.instrumentation import get_metrics
+from src.evaluator.workflow import run_evaluation
+from src.utils.helpers import parse_rating, parse_rubric
+
+RUBRIC = {'clarity': 0.8, 'politeness': 1, 'professionalism': 0.65, 'resolution': 0.0, 'explanation': "ok"}
+
+
+def test_parse_rating_reads_the_leading_rating():
+    assert parse_rating("Rating: 0.75\nClear and concise.") == 0.75
+
+
+def test_parse_rating_rejects_content_without_a_rating():
+    with pytest.raises(ValueError):
+        parse_rating("The response is clear.")
+
+
+def test_parse_rubric_returns_every_field_as_a_float():
+    ratings = parse_rubric(json.dumps(RUBRIC))
+    assert ratings == {'clarity': 0.8, 'politeness': 1.0, 'professionalism': 0.65, 'resolution': 0.0}
+    assert all(isinstance(value, float) for value in ratings.values())
+
+
+@pytest.mark.parametrize('content', [
+    "Rating: 0.8",
+    json.dumps([0.8, 0.9]),
+    json.dumps({**RUBRIC, 'resolution': None}),
+    json.dumps({key: value for key, value in RUBRIC.items() if key != 'clarity'}),
+    json.dumps({**RUBRIC, 'politeness': 1.2}),
+    json.dumps({**RUBRIC, 'politeness': True}),
+    json.dumps({**RUBRIC, 'politeness': "0.9"})
+])
+def test_parse_rubric_rejects_invalid_ratings(content):
+    with pytest.raises(ValueError):
+        parse_rubric(content)
+
+
+def test_fused_engine_scores_all_metrics_in_one_call(settings):
+    settings(evaluation={'scoring_engine': 'fused',
+                         'thresholds': {'clarity': 0.0, 'politeness': 0.0, 'professionalism': 0.0}})
+    calls = get_metrics().total('evaluator_llm_calls_total')
+    result = run_evaluation("Hello, your refund was issued today and should arrive within 5 days. Best, Alex")
+    assert all(0.3 <= result[f"{metric}_score"] <= 1.0
+               for metric in ('clarity', 'politeness', 'professionalism', 'resolution'))
+    # One rubric call and one feedback call
+    assert get_metrics().total('evaluator_llm_calls_total') - calls == 2
@@ -0,0 +1,51 @@
+import time
+
+import pytest
+
+from src.service.server import EvaluationService, SHUTTING_DOWN
+from src.utils.helpers import require_api_key
+
+TICKETS = [{'ticket_id': f"T-{index}", 'response': f"Hello, your refund {index} has been issued."}
+           for index in range(5)]
+
+
+def _wait(job, timeout=10.0):
+    deadline = time.monotonic() + timeout
+    while job.to_dict()['status'] != 'done' and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return job.to_dict()
+
+
+def test_a_job_is_evaluated_by_the_workers():
+    service = EvaluationService(workers=2, queue_size=4)
+    service.start()
+    try:
+        summary = _wait(service.submit_job(TICKETS))
+    finally:
+        service.stop()
+    assert summary['status'] == 'done' and summary['failed'] == 0
+    assert [result['ticket_id'] for result in summary['results']] == [ticket['ticket_id'] for ticket in TICKETS]
+
+
+def test_stop_fails_the_job_tickets_still_waiting_to_be_queued():
+    # Never started, so the feeder blocks once the job's share of the queue is full
+    service = EvaluationService(workers=1, queue_size=2)
+    job = service.submit_job(TICKETS)
+    time.sleep(0.2)
+    service.stop()
+
+    summary = job.to_dict()
+    assert summary['status'] == 'done'
+    assert summary['completed'] == summary['failed'] == len(TICKETS)
+    assert all(result['error'] == SHUTTING_DOWN for result in summary['results'])
+    assert service.stats()['jobs_running'] == 0
+
+
+def test_require_api_key_accepts_the_fake_provider_only(settings, monkeypatch):
+    monkeypatch.delenv('OPENAI_API_KEY', raising=False)
+    require_api_key()
+    settings(llm={'provider': 'openai'})
+    with pytest.raises(SystemExit):
+        require_api_key()
+    monkeypatch.setenv('OPENAI_API_KEY', 'sk-test')
+    require_api_key()
@@ -0,0 +1,112 @@
+import asyncio
+import threading
+import time
+
+import pytest
+
+from src.evaluator.singleflight import SingleFlight
+
+
+def test_concurrent_threads_share_one_call():
+    group = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+    calls = []
+
+    def call():
+        calls.append(1)
+        started.set()
+        release.wait(5)
+        return "rating"
+
+    results = []
+    leader = threading.Thread(target=lambda: results.append(group.do('key', call)))
+    leader.start()
+    started.wait(5)
+    followers = [threading.Thread(target=lambda: results.append(group.do('key', call))) for _ in range(3)]
+    for follower in followers:
+        follower.start()
+    time.sleep(0.05)
+    release.set()
+    for thread in [leader, *followers]:
+        thread.join()
+
+    assert len(calls) == 1
+    assert sorted(results) == [("rating", False)] + [("rating", True)] * 3
+    assert group.stats() == {'calls': 1, 'coalesced': 3, 'pending': 0}
+
+
+def test_every_waiter_gets_the_exception_and_the_next_call_runs_again():
+    group = SingleFlight()
+
+    async def main():
+        async def failing():
+            await asyncio.sleep(0.01)
+            raise ValueError("rate limited")
+
+        results = await asyncio.gather(*(group.ado('key', failing) for _ in range(3)), return_exceptions=True)
+        assert all(isinstance(result, ValueError) for result in results)
+
+        async def succeeding():
+            return "rating"
+
+        assert await group.ado('key', succeeding) == ("rating", False)
+
+    asyncio.run(main())
+    assert group.stats() == {'calls': 2, 'coalesced': 2, 'pending': 0}
+
+    with pytest.raises(ValueError):
+        group.do('sync', lambda: (_ for _ in ()).throw(ValueError("boom")))
+    assert group.stats()['pending'] == 0
+
+
+def test_cancelling_one_waiter_keeps_the_call_for_the_others():
+    group = SingleFlight()
+    finished = []
+
+    async def call():
+        await asyncio.sleep(0.05)
+        finished.append(1)
+        return "rating"
+
+    async def main():
+        first = asyncio.ensure_future(group.ado('key', call))
+        second = asyncio.ensure_future(group.ado('key', call))
+        await asyncio.sleep(0.01)
+        first.cancel()
+        with pytest.raises(asyncio.CancelledError):
+            await first
+        return await second
+
+    assert asyncio.run(main()) == ("rating", True)
+    assert finished == [1]
+
+
+def test_cancelling_every_waiter_cancels_the_call():
+    group = SingleFlight()
+    cancelled = []
+
+    async def call():
+        try:
+            await asyncio.sleep(5)
+        except asyncio.CancelledError:
+            cancelled.append(1)
+            raise
+
+    async def main():
+        waiters = [asyncio.ensure_future(group.ado('key', call)) for _ in range(2)]
+        await asyncio.sleep(0.01)
+        for waiter in waiters:
+            waiter.cancel()
+        await asyncio.gather(*waiters, return_exceptions=True)
+        await asyncio.sleep(0.01)
+        assert group.stats()['pending'] == 0
+
+        async def fresh():
+            return "rating"
+
+        # A later caller starts a new call instead of joining the cancelled one
+        return await group.ado('key', fresh)
+
+    assert asyncio.run(main()) == ("rating", False)
+    assert cancelled == [1]
@@ -0,0 +1,81 @@
+import sqlite3
+import threading
+import time
+
+import pytest
+
+from src.evaluator.store import ResultStore, close_result_store, get_result_store
+
+THRESHOLDS = {'clarity': 0.3, 'politeness': 0.5, 'professionalism': 0.5}
+BANDS = {'good': 0.8, 'average': 0.5}
+
+
+def _record(index, effectiveness=0.6):
+    return {'ticket_id': f"T-{index}", 'response': "Hello", 'clarity_score': 0.9, 'politeness_score': 0.9,
+            'professionalism_score': 0.9, 'resolution_score': 0.5, 'effectiveness_score': effectiveness,
+            'feedback': "Fine", 'timestamp': f"2024-01-01 00:00:{index % 60:02d}"}
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = ResultStore(str(tmp_path / 'results.sqlite3'), BANDS, THRESHOLDS, batch_size=100,
+                        flush_interval=0.1, read_connections=2)
+    yield store
+    store.close()
+
+
+def test_a_buffered_record_is_written_without_another_add(store):
+    store.add(_record(1))
+    with sqlite3.connect(store.path) as connection:
+        assert connection.execute("SELECT COUNT(*) FROM evaluation_results").fetchone()[0] == 0
+    deadline = time.monotonic() + 5
+    while store.stats()['buffered'] and time.monotonic() < deadline:
+        time.sleep(0.02)
+    assert store.count() == 1
+
+
+def test_threads_share_a_bounded_pool_of_read_connections(store):
+    for index in range(10):
+        store.add(_record(index))
+    store.flush()
+    counts = []
+    threads = [threading.Thread(target=lambda: counts.append(store.count())) for _ in range(16)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert counts == [10] * 16
+    assert len(store._idle_readers) <= 2
+
+
+def test_queries_page_by_cursor_and_filter_by_band(store):
+    for index in range(5):
+        store.add(_record(index, effectiveness=0.9 if index % 2 else 0.2))
+    store.flush()
+    first = store.query(limit=2)
+    second = store.query(limit=2, before=first['next_cursor'])
+    assert [record['ticket_id'] for record in first['results'] + second['results']] == ['T-4', 'T-3', 'T-2', 'T-1']
+    assert store.count(band='good') == 2 and store.count(band='poor') == 3
+    assert [record['ticket_id'] for record in store.iter_results(chunk_size=2, band='poor')] == ['T-4', 'T-2', 'T-0']
+    with pytest.raises(ValueError):
+        store.count(band='excellent')
+
+
+def test_a_reload_replaces_the_store_without_closing_the_one_in_use(settings):
+    settings(results={'enabled': True, 'batch_size': 100})
+    store = get_result_store()
+    store.add(_record(1))
+    settings(results={'enabled': True, 'batch_size': 50})
+    replacement = get_result_store()
+    assert replacement is not store
+    store.add(_record(2))
+    store.flush()
+    assert replacement.count() == 2
+    close_result_store()
+
+
+def test_update_feedback_rewrites_the_saved_record_in_place(store):
+    record_id = store.save(_record(1))
+    store.update_feedback(record_id, "Detailed")
+    assert store.count() == 1
+    assert store.latest('T-1')['feedback'] == "Detailed"
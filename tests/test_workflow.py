@@ -0,0 +1,37 @@
+from src.evaluator import workflow
+from src.evaluator.workflow import get_workflow, get_workflow_stats, run_evaluation
+
+RESPONSE = ("Hello Sam,\n\nThanks for reaching out. I've reset your password; you can sign in again now. "
+            "Let me know if anything else comes up.\n\nBest regards,\nAlex")
+
+
+def test_workflow_is_compiled_once_and_reused():
+    workflow._registry.clear()
+    first = get_workflow()
+    assert get_workflow() is first
+    assert get_workflow_stats()['hits'] >= 1
+
+
+def test_workflow_is_rebuilt_when_the_settings_change(settings):
+    workflow._registry.clear()
+    first = get_workflow()
+    rebuilds = get_workflow_stats()['rebuilds']
+    settings(evaluation={'thresholds': {'clarity': 0.1}})
+    second = get_workflow()
+    assert second is not first
+    assert get_workflow_stats()['rebuilds'] == rebuilds + 1
+
+
+def test_run_evaluation_combines_the_weighted_scores(settings):
+    weights = settings(evaluation={'thresholds': {'clarity': 0.0, 'politeness': 0.0,
+                                                  'professionalism': 0.0}}).evaluation.weights
+    result = run_evaluation(RESPONSE, ticket_id="T-1")
+    scores = {metric: result[f"{metric}_score"] for metric in weights}
+    assert all(0.3 <= score <= 1.0 for score in scores.values())
+    expected = sum(scores[metric] * weight for metric, weight in weights.items())
+    assert abs(result['effectiveness_score'] - expected) < 1e-9
+    assert result['feedback']
+
+
+def test_run_evaluation_is_deterministic_on_the_fake_backend():
+    assert run_evaluation(RESPONSE)['effectiveness_score'] == run_evaluation(RESPONSE)['effectiveness_score']